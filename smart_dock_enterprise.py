@@ -1,9 +1,41 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import random
-from datetime import datetime, timedelta, time
+import io
+import os
+import sqlite3
+from datetime import datetime, time, timedelta
+from functools import partial, wraps
+from time import perf_counter
+
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.capacidades import CAPACIDADES, TIPOS_PRODUCTO_COMUNES, etiqueta_muelle
+from smartdock.almacen import TruckStore
+from smartdock.simulacion import DockEventSimulator
+from smartdock.escenarios import PROCESOS_LLEGADA, generar_manifiesto
+from smartdock.kpis import calcular_kpis
+from smartdock.analitica import INTERVALO_DEFECTO_MIN, analizar_agenda
+from smartdock.cache import ScheduleCache
+from smartdock.incremental import IncrementalScheduler
+from smartdock.montecarlo import bandas_percentiles, simular_montecarlo
+from smartdock.planificador import configuracion_recomendada, planificar_capacidad
+from smartdock.busqueda_local import ImprovementOptimizer
+from smartdock.comparacion import comparar_politicas
+from smartdock.politicas import POLITICAS
+from smartdock.importacion import importar_manifiesto
+from smartdock.exportacion import TAM_BLOQUE, exportar_bloques
+from smartdock.servicio import ClienteAgendas
+from smartdock.persistencia import AlmacenSQLite
+from smartdock.eventos import AgendaEnVivo, IngestorEventos
+from smartdock.horizonte import AgendaRodante
+from smartdock.gantt import COLORES_ESTADO, MAX_BARRAS_DETALLE, figura_gantt, muelles_ordenados
+from smartdock.tabla import COLUMNAS_TABLA, TablaAsignaciones
+from smartdock.perfilado import activar, desactivar, fase, traza_json
+
+# Latencia del rerun completo (ver DIAGNÓSTICO DEL RERUN)
+inicio_rerun = perf_counter()
 
 # ═══════════════════════════════════════════════════════════
 # CONFIGURACIÓN VISUAL PREMIUM
@@ -170,147 +202,317 @@ st.markdown("""
 # ═══════════════════════════════════════════════════════════
 # INICIALIZACIÓN DE DATOS
 # ═══════════════════════════════════════════════════════════
-if 'df_input' not in st.session_state:
-    st.session_state.df_input = pd.DataFrame(columns=[
-        "ID_Camion", "Producto", "Tipo_Producto", "Prioridad", 
-        "Hora_Llegada_Est", "Duracion_Min"
-    ])
+if 'camiones' not in st.session_state:
+    st.session_state.camiones = TruckStore()
 
 if 'config_muelles' not in st.session_state:
     st.session_state.config_muelles = {
         1: "Seco", 2: "Seco", 3: "Frío"
     }
 
+if 'schedule_cache' not in st.session_state:
+    st.session_state.schedule_cache = ScheduleCache(max_entries=8)
+
+# ═══════════════════════════════════════════════════════════
+# PERSISTENCIA (SQLITE)
+# ═══════════════════════════════════════════════════════════
+RUTA_SQLITE_DEFECTO = os.environ.get("SMARTDOCK_DB", "smartdock.db")
+
+@st.cache_resource
+def _almacen_sqlite(ruta):
+    """Una base (y su pool de conexiones) por ruta, compartida por todas las sesiones"""
+    return AlmacenSQLite(ruta)
+
+def almacen_persistente():
+    """AlmacenSQLite activo o None si la persistencia está apagada"""
+    if not st.session_state.get('persistencia_activa'):
+        return None
+    return _almacen_sqlite(st.session_state.get('ruta_sqlite') or RUTA_SQLITE_DEFECTO)
+
+def camiones_en_base(db):
+    """Cantidad de camiones en la base; el COUNT(*) se repite solo si cambió la versión"""
+    clave = (db.ruta, db.version())
+    conteo = st.session_state.get('conteo_sqlite')
+    if conteo is None or conteo[0] != clave:
+        conteo = st.session_state.conteo_sqlite = (clave, len(db))
+    return conteo[1]
+
+# Si otro despachador modificó la base, se recarga el manifiesto local
+db = almacen_persistente()
+if db is not None:
+    version_db = db.version()
+    # Solo una base recién creada (nunca escrita) se siembra con el manifiesto
+    # de la sesión; una vaciada a propósito no se vuelve a llenar sola
+    if version_db == 0 and not st.session_state.camiones.empty:
+        try:
+            db.insertar_lote(st.session_state.camiones.to_frame())
+        except sqlite3.IntegrityError:
+            pass   # otra sesión la sembró primero
+        version_db = db.version()
+    if st.session_state.get('version_sqlite') != version_db:
+        st.session_state.camiones = db.cargar_almacen()
+        st.session_state.agendador_incremental = None
+        st.session_state.version_sqlite = version_db
+
+# Perfilado del rerun: solo si el panel de diagnóstico está activo
+perfilador = None
+if st.session_state.get('diagnostico'):
+    perfilador = activar(memoria=st.session_state.get('diagnostico_memoria', False))
+
 # ═══════════════════════════════════════════════════════════
-# CLASE OPTIMIZADOR AVANZADO
+# RERUNS PARCIALES Y LATENCIA
 # ═══════════════════════════════════════════════════════════
-class DockOptimizerPro:
+# Reruns recientes (página completa y fragmentos) para el panel de diagnóstico
+MAX_LATENCIAS = 200
+
+# Widgets con estado de cada pestaña (ver PESTAÑAS DE NAVEGACIÓN)
+WIDGETS_DASHBOARD = [
+    "ventana_gantt", "filtro_muelle", "filtro_estado", "filtro_prioridad",
+    "orden_detalle", "orden_asc", "tam_pagina", "pagina_detalle",
+]
+WIDGETS_ANALYTICS = [
+    "intervalo_analitica", "mc_escenarios", "mc_semilla", "mc_llegadas", "mc_refrigerado",
+    "mc_alta", "mc_media", "pl_rango", "pl_objetivo", "cp_politicas", "lm_presupuesto", "lm_semilla",
+]
+
+def registrar_latencia(alcance, nombre, inicio):
+    """Guarda la duración (ms) de un rerun desde inicio (perf_counter) y la devuelve"""
+    ms = (perf_counter() - inicio) * 1000
+    latencias = st.session_state.setdefault('latencias_rerun', [])
+    latencias.append({"Alcance": alcance, "Nombre": nombre, "ms": ms})
+    del latencias[:-MAX_LATENCIAS]
+    return ms
+
+def fragmento(funcion=None, *, run_every=None):
     """
-    Optimizador de muelles con:
-    - Prioridades ponderadas (Alta > Media > Baja)
-    - Restricciones de tipo de muelle
-    - Cálculo de costos de demurrage
+    st.fragment con latencia medida: un widget dentro de la función
+    reejecuta solo la función, no la página completa.
     """
+    if funcion is None:
+        return partial(fragmento, run_every=run_every)
     
-    PRIORIDAD_PESOS = {"Alta": 3, "Media": 2, "Baja": 1}
-    COSTO_DEMURRAGE_POR_HORA = 150  # USD por hora de espera
+    @wraps(funcion)
+    def medido(*args, **kwargs):
+        inicio = perf_counter()
+        try:
+            resultado = funcion(*args, **kwargs)
+        finally:
+            ms = registrar_latencia("Fragmento", funcion.__name__, inicio)
+        if st.session_state.get('diagnostico'):
+            st.caption(f"⏱️ {funcion.__name__}: {ms:,.0f} ms")
+        return resultado
     
-    def __init__(self, num_docks, dock_config, start_hour=8):
-        self.num_docks = num_docks
-        self.dock_config = dock_config  # {dock_id: "Seco" o "Frío"}
-        self.base_date = datetime.now().date()
-        self.start_time = datetime.combine(self.base_date, time(start_hour, 0))
-        self.docks = {i+1: self.start_time for i in range(num_docks)}
-    
-    def _puede_asignar_muelle(self, tipo_producto, dock_id):
-        """Valida si el producto puede ir en el muelle"""
-        tipo_muelle = self.dock_config.get(dock_id, "Seco")
-        
-        if tipo_producto == "Refrigerado":
-            return tipo_muelle == "Frío"
-        else:  # Secos/Electrónicos/etc
-            return tipo_muelle == "Seco"
-    
-    def _calcular_prioridad_score(self, row, arrival_time):
-        """
-        Calcula score de prioridad combinando:
-        - Peso de prioridad
-        - Tiempo de llegada (para romper empates)
-        """
-        peso = self.PRIORIDAD_PESOS.get(row['Prioridad'], 1)
-        # Convertimos tiempo a minutos desde inicio para ordenar
-        tiempo_minutos = (arrival_time - self.start_time).total_seconds() / 60
-        
-        # Score: Prioridad alta tiene más peso, pero el tiempo de llegada desempata
-        return (peso * 10000) - tiempo_minutos
-    
-    def agendar_camiones(self, df_camiones):
-        schedule_log = []
-        costos_totales = 0
+    return st.fragment(medido, run_every=run_every)
+
+def rerun_fragmento():
+    """Rerun solo del fragmento en curso; si corre dentro de un rerun completo, de la página"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+# ═══════════════════════════════════════════════════════════
+# CACHÉ DE AGENDAS
+# ═══════════════════════════════════════════════════════════
+MOTORES_DESPACHO = {
+    "Prioridad global (greedy)": DockOptimizerPro,
+    "Eventos (llegadas reales)": DockEventSimulator,
+}
+
+# Con más barras que esto el Gantt pasa a WebGL con ventana visible
+UMBRAL_GANTT_ESCALABLE = 1500
+
+# Analytics: anchos de intervalo para ocupación y cola, y color por prioridad
+INTERVALOS_ANALITICA = [15, 30, 60, 120]
+COLORES_PRIORIDAD = {"Alta": "#ef4444", "Media": "#f59e0b", "Baja": "#10b981"}
+
+@st.cache_resource
+def _cache_agendas_compartida():
+    """Caché única para todas las sesiones del servidor"""
+    return ScheduleCache(max_entries=64)
+
+@st.cache_resource
+def _cliente_servicio(direccion):
+    """Cliente del servicio de agendas (python -m smartdock.servicio), uno por dirección"""
+    host, _, puerto = direccion.rpartition(":")
+    return ClienteAgendas(host or "127.0.0.1", int(puerto))
+
+def fecha_manifiesto():
+    """Fecha base del manifiesto: un manifiesto importado se agenda en su propia fecha, no en la de hoy"""
+    return st.session_state.camiones.base.date()
+
+def obtener_agenda():
+    """
+    Agenda del manifiesto actual, compartida por Dashboard y Analytics.
+    Solo se optimiza cuando cambian los camiones, los muelles o la hora de inicio.
+    """
+    with fase("obtener_agenda"):
+        # Con eventos de portería la agenda vigente es la que los incorpora
+        en_vivo = agenda_en_vivo()
+        if en_vivo is not None:
+            return en_vivo.resultado()
+        rodante = agenda_rodante()
+        if rodante is not None:
+            return rodante.resultado()
         
-        if df_camiones.empty:
-            return pd.DataFrame(), 0
+        motor = MOTORES_DESPACHO[st.session_state.get('motor_despacho', "Prioridad global (greedy)")]
+        if (motor is DockOptimizerPro and st.session_state.get('modo_incremental')
+                and not st.session_state.get('servicio_agendas', "").strip()):
+            agendador = st.session_state.get('agendador_incremental')
+            firma = (tuple(sorted(st.session_state.config_muelles.items())), hora_inicio, fecha_manifiesto())
+            if agendador is None or agendador.firma != firma:
+                agendador = IncrementalScheduler(st.session_state.config_muelles, start_hour=hora_inicio,
+                                                 base_date=fecha_manifiesto())
+                agendador.cargar(st.session_state.camiones.to_frame())
+                st.session_state.agendador_incremental = agendador
+            return agendador.resultado()
         
-        # Agregar columna de score para ordenamiento
-        df_camiones = df_camiones.copy()
-        df_camiones['_score'] = df_camiones.apply(
-            lambda row: self._calcular_prioridad_score(row, row['Hora_Llegada_Est']), 
-            axis=1
+        cache = (_cache_agendas_compartida() if st.session_state.get('cache_compartida')
+                 else st.session_state.schedule_cache)
+        direccion = st.session_state.get('servicio_agendas', "").strip()
+        if direccion:
+            # Optimización en el servicio local; si no responde, se agenda aquí
+            try:
+                return cache.obtener(
+                    st.session_state.camiones,
+                    st.session_state.config_muelles,
+                    hora_inicio,
+                    base_date=fecha_manifiesto(),
+                    motor=motor,
+                    calcular=_cliente_servicio(direccion).calcular
+                )
+            except (OSError, RuntimeError, ValueError) as e:
+                st.warning(f"⚠️ Servicio de agendas no disponible ({e}); se agenda localmente")
+        return cache.obtener(
+            st.session_state.camiones,
+            st.session_state.config_muelles,
+            hora_inicio,
+            base_date=fecha_manifiesto(),
+            motor=motor
         )
-        
-        # Ordenar por score (prioridad + llegada)
-        df_sorted = df_camiones.sort_values(by='_score', ascending=False)
-        
-        for _, row in df_sorted.iterrows():
-            arrival_time = row['Hora_Llegada_Est']
-            duration_min = row['Duracion_Min']
-            tipo_producto = row['Tipo_Producto']
-            
-            # Buscar muelle compatible que se libere primero
-            muelles_compatibles = [
-                dock_id for dock_id in self.docks.keys()
-                if self._puede_asignar_muelle(tipo_producto, dock_id)
-            ]
-            
-            if not muelles_compatibles:
-                # No hay muelles compatibles - marcar como error
-                schedule_log.append({
-                    "Camión": row['ID_Camion'],
-                    "Producto": row['Producto'],
-                    "Tipo_Producto": tipo_producto,
-                    "Prioridad": row['Prioridad'],
-                    "Muelle_Asignado": "❌ SIN MUELLE",
-                    "Llegada_Teorica": arrival_time,
-                    "Inicio_Real": None,
-                    "Fin_Real": None,
-                    "Duracion_Min": int(duration_min),
-                    "Espera_Min": 0,
-                    "Costo_Demurrage_USD": 0,
-                    "Estado": "Error: Muelle incompatible"
-                })
-                continue
-            
-            # Elegir el que se libera primero
-            best_dock = min(muelles_compatibles, key=lambda d: self.docks[d])
-            free_time = self.docks[best_dock]
-            
-            # Calcular inicio real
-            actual_start = max(arrival_time, free_time, self.start_time)
-            actual_end = actual_start + timedelta(minutes=int(duration_min))
-            
-            # Calcular espera
-            wait_time = max(0, (actual_start - arrival_time).total_seconds() / 60)
-            
-            # Calcular costo de demurrage
-            costo_demurrage = (wait_time / 60) * self.COSTO_DEMURRAGE_POR_HORA
-            costos_totales += costo_demurrage
-            
-            # Determinar estado
-            if wait_time == 0:
-                estado = "✅ A Tiempo"
-            elif wait_time < 30:
-                estado = "⚠️ Retraso Leve"
-            else:
-                estado = "🔴 Crítico"
-            
-            schedule_log.append({
-                "Camión": row['ID_Camion'],
-                "Producto": row['Producto'],
-                "Tipo_Producto": tipo_producto,
-                "Prioridad": row['Prioridad'],
-                "Muelle_Asignado": f"Muelle {best_dock} ({self.dock_config[best_dock]})",
-                "Llegada_Teorica": arrival_time,
-                "Inicio_Real": actual_start,
-                "Fin_Real": actual_end,
-                "Duracion_Min": int(duration_min),
-                "Espera_Min": int(wait_time),
-                "Costo_Demurrage_USD": round(costo_demurrage, 2),
-                "Estado": estado
-            })
-            
-            self.docks[best_dock] = actual_end
-        
-        return pd.DataFrame(schedule_log), costos_totales
+
+def exportar_a_bytes(resultado_df, formato):
+    """Exporta una agenda ya calculada a un buffer en memoria, por bloques (para st.download_button)"""
+    buffer = io.BytesIO()
+    bloques = (resultado_df.iloc[i:i + TAM_BLOQUE] for i in range(0, len(resultado_df), TAM_BLOQUE))
+    exportar_bloques(bloques, buffer, formato=formato)
+    return buffer.getvalue()
+
+def sincronizar_incremental(operacion, *args, **kwargs):
+    """
+    Replica un alta/edición/baja del Gestor en el agendador incremental.
+    Si no se puede aplicar, se descarta y se recarga en el próximo rerun.
+    """
+    agendador = st.session_state.get('agendador_incremental')
+    if agendador is None:
+        return
+    try:
+        getattr(agendador, operacion)(*args, **kwargs)
+    except (KeyError, ValueError):
+        st.session_state.agendador_incremental = None
+
+def persistir(operacion, *args, **kwargs):
+    """
+    Replica una modificación del manifiesto en la base SQLite (si está
+    activa). La versión propia se registra para no recargar lo que ya está.
+    """
+    db = almacen_persistente()
+    if db is None:
+        return
+    try:
+        getattr(db, operacion)(*args, **kwargs)
+    except (KeyError, sqlite3.IntegrityError) as e:
+        st.warning(f"⚠️ No se pudo guardar en la base: {e}")
+        st.session_state.version_sqlite = None
+    else:
+        st.session_state.version_sqlite = db.version()
+
+# ═══════════════════════════════════════════════════════════
+# EVENTOS DE PORTERÍA (EN VIVO)
+# ═══════════════════════════════════════════════════════════
+FUENTES_EVENTOS = ["Archivo JSONL", "Socket local"]
+RUTA_EVENTOS_DEFECTO = os.environ.get("SMARTDOCK_EVENTOS", "eventos_porteria.jsonl")
+
+@st.cache_resource
+def _ingestor_eventos(fuente, destino):
+    """Un ingestor por fuente, compartido por todas las sesiones (el socket se abre una vez)"""
+    if fuente == "Socket local":
+        host, _, puerto = destino.rpartition(":")
+        return IngestorEventos.desde_socket(host or "127.0.0.1", int(puerto))
+    return IngestorEventos.desde_jsonl(destino)
+
+def ingestor_eventos():
+    """IngestorEventos activo o None si la ingesta está apagada"""
+    if not st.session_state.get('eventos_activos'):
+        return None
+    try:
+        return _ingestor_eventos(
+            st.session_state.get('fuente_eventos', FUENTES_EVENTOS[0]),
+            st.session_state.get('destino_eventos') or RUTA_EVENTOS_DEFECTO
+        )
+    except ValueError:
+        st.warning("⚠️ La fuente de eventos por socket debe ser host:puerto")
+        return None
+
+def agenda_en_vivo():
+    """
+    AgendaEnVivo del manifiesto actual, o None si la ingesta está apagada.
+    Si cambian los camiones, los muelles o la hora de inicio se reconstruye
+    y vuelve a aplicar todos los eventos retenidos por el ingestor.
+    """
+    if ingestor_eventos() is None:
+        return None
+    firma = (
+        st.session_state.camiones.hash_contenido(),
+        tuple(sorted(st.session_state.config_muelles.items())),
+        hora_inicio,
+        fecha_manifiesto()
+    )
+    agenda = st.session_state.get('agenda_en_vivo')
+    if agenda is None or st.session_state.get('firma_en_vivo') != firma:
+        agenda = AgendaEnVivo(st.session_state.config_muelles, start_hour=hora_inicio,
+                              base_date=fecha_manifiesto())
+        agenda.cargar(st.session_state.camiones)
+        st.session_state.agenda_en_vivo = agenda
+        st.session_state.firma_en_vivo = firma
+    return agenda
+
+# ═══════════════════════════════════════════════════════════
+# HORIZONTE RODANTE
+# ═══════════════════════════════════════════════════════════
+def agenda_rodante():
+    """
+    AgendaRodante del manifiesto actual avanzada hasta el reloj elegido, o
+    None si el modo está apagado. Al avanzar el reloj solo se replanifica el
+    horizonte; si cambian los camiones, los muelles o los parámetros (o el
+    reloj retrocede) se vuelve a simular desde la apertura.
+    """
+    if not st.session_state.get('horizonte_activo'):
+        return None
+    congelado = st.session_state.get('congelado_min', 60)
+    horizonte = max(st.session_state.get('horizonte_min', 240), congelado)
+    paso = st.session_state.get('paso_horizonte_min', 15)
+    motor = MOTORES_DESPACHO[st.session_state.get('motor_despacho', "Prioridad global (greedy)")]
+    firma = (
+        st.session_state.camiones.hash_contenido(),
+        tuple(sorted(st.session_state.config_muelles.items())),
+        hora_inicio,
+        fecha_manifiesto(),
+        congelado, horizonte, paso, motor.__name__
+    )
+    reloj = st.session_state.get('reloj_horizonte_min', 0)
+    agenda = st.session_state.get('agenda_rodante')
+    if (agenda is None or st.session_state.get('firma_rodante') != firma
+            or reloj * 60_000_000_000 < agenda.reloj_ns):
+        agenda = AgendaRodante(st.session_state.config_muelles, start_hour=hora_inicio,
+                               base_date=fecha_manifiesto(),
+                               congelado_min=congelado, horizonte_min=horizonte, motor=motor)
+        agenda.cargar(st.session_state.camiones)
+        st.session_state.agenda_rodante = agenda
+        st.session_state.firma_rodante = firma
+    with fase("horizonte.replanificar"):
+        agenda.avanzar(reloj, paso)
+    return agenda
 
 # ═══════════════════════════════════════════════════════════
 # INTERFAZ PRINCIPAL
@@ -331,7 +533,7 @@ st.markdown("""
 # ═══════════════════════════════════════════════════════════
 # SIDEBAR - CONFIGURACIÓN
 # ═══════════════════════════════════════════════════════════
-with st.sidebar:
+with st.sidebar, fase("sidebar"):
     st.markdown("### ⚙️ Configuración del Sistema")
     
     # Configuración de recursos
@@ -340,71 +542,132 @@ with st.sidebar:
     hora_inicio = st.number_input("Hora Inicio Turno (24hrs)", 0, 23, 8, 
                                    help="Hora a la que abre el patio de maniobras")
     
-    # Configuración de tipos de muelle
+    st.radio(
+        "Motor de Despacho", list(MOTORES_DESPACHO), key="motor_despacho",
+        help="Greedy: ordena todo el día por prioridad. Eventos: en cada momento "
+             "solo compiten los camiones que ya llegaron al patio."
+    )
+    
+    # Capacidades de cada muelle (un muelle multitemperatura tiene varias)
     st.markdown("#### 🔧 Configuración de Muelles")
-    st.session_state.config_muelles = {}
+    config_muelles = {}
     for i in range(1, num_muelles + 1):
-        tipo_muelle = st.selectbox(
+        capacidades_muelle = st.multiselect(
             f"Muelle {i}", 
-            ["Seco", "Frío"],
-            key=f"muelle_{i}",
-            index=0 if i <= 2 else 1
+            CAPACIDADES,
+            default=["Seco"] if i <= 2 else ["Frío"],
+            key=f"muelle_{i}"
         )
-        st.session_state.config_muelles[i] = tipo_muelle
+        if not capacidades_muelle:
+            st.caption(f"⚠️ El muelle {i} no tiene capacidades: no recibirá camiones")
+        config_muelles[i] = etiqueta_muelle(capacidades_muelle)
+    # Solo se reemplaza si cambió: la misma configuración conserva su identidad
+    if config_muelles != st.session_state.config_muelles:
+        st.session_state.config_muelles = config_muelles
     
     st.markdown("---")
     st.markdown("### 🎲 Simulador de Escenarios")
     
-    # Generador de escenarios
+    # Generador de escenarios (vectorizado y por bloques: admite millones de camiones)
+    with st.expander("⚙️ Parámetros del escenario"):
+        num_camiones_escenario = st.number_input("Camiones", 1, 5_000_000, 10, step=10, key="escenario_camiones")
+        semilla_escenario = st.number_input("Semilla (0 = aleatoria)", 0, 2**31 - 1, 0, key="escenario_semilla")
+        proceso_escenario = st.selectbox("Llegadas", PROCESOS_LLEGADA, key="escenario_llegadas",
+                                         help="uniforme: 6 horas parejas · poisson: proceso de Poisson · pico: ola de la mañana")
     if st.button("🔄 Generar Escenario Aleatorio", use_container_width=True):
-        st.session_state.df_input = st.session_state.df_input.iloc[0:0]
-        
-        base_time = datetime.combine(datetime.now().date(), time(hora_inicio, 0))
-        
-        # Productos con tipos
-        productos_config = [
-            ("Electrónicos", "Seco"),
-            ("Papel", "Seco"),
-            ("Textil", "Seco"),
-            ("Alimentos Refrigerados", "Refrigerado"),
-            ("Farmacéuticos", "Refrigerado"),
-            ("Automotriz", "Seco"),
-            ("Químicos", "Seco")
-        ]
-        
-        nuevos_datos = []
-        for i in range(10):  # 10 camiones
-            mins_random = random.randint(0, 360)  # Primeras 6 horas
-            llegada_random = base_time + timedelta(minutes=mins_random)
-            duracion_random = random.choice([30, 45, 60, 90, 120])
-            prioridad = random.choice(["Alta", "Alta", "Media", "Media", "Baja"])  # Más Altas
-            producto, tipo = random.choice(productos_config)
-            
-            nuevos_datos.append({
-                "ID_Camion": f"TRK-{random.randint(1000, 9999)}",
-                "Producto": producto,
-                "Tipo_Producto": tipo,
-                "Prioridad": prioridad,
-                "Hora_Llegada_Est": llegada_random,
-                "Duracion_Min": duracion_random
-            })
-        
-        st.session_state.df_input = pd.DataFrame(nuevos_datos)
+        with st.spinner(f"Generando {int(num_camiones_escenario):,} camiones..."):
+            nuevos = TruckStore()
+            for i, bloque in enumerate(generar_manifiesto(
+                int(num_camiones_escenario), semilla=int(semilla_escenario) or None, hora_inicio=hora_inicio,
+                parametros={"proceso_llegada": proceso_escenario}
+            )):
+                nuevos.agregar_lote(bloque)
+                persistir("insertar_lote", bloque, reemplazar=i == 0)
+        st.session_state.camiones = nuevos
+        st.session_state.agendador_incremental = None
         st.success("✅ Escenario generado exitosamente")
         st.rerun()
     
     st.markdown("---")
     if st.button("🗑️ Limpiar Todo", use_container_width=True):
-        st.session_state.df_input = st.session_state.df_input.iloc[0:0]
+        st.session_state.camiones.limpiar()
+        st.session_state.agendador_incremental = None
+        persistir("limpiar")
         st.rerun()
     
+    # Caché de agendas
+    with st.expander("🧠 Caché de Agendas"):
+        st.checkbox("Reagendado incremental", key="modo_incremental", value=True,
+                    help="Al agregar, editar o eliminar un camión solo se reagenda desde la primera posición afectada")
+        st.checkbox("Compartir entre sesiones", key="cache_compartida",
+                    help="Reutiliza agendas calculadas por otros usuarios con la misma entrada")
+        st.text_input("Servicio de agendas (host:puerto)", key="servicio_agendas",
+                      value=os.environ.get("SMARTDOCK_SERVICIO", ""),
+                      help="Delegar la optimización a `python -m smartdock.servicio`. Vacío = en este proceso")
+        stats = (_cache_agendas_compartida() if st.session_state.get('cache_compartida')
+                 else st.session_state.schedule_cache).estadisticas()
+        st.caption(
+            f"Entradas: {stats['entradas']}/{stats['max_entries']} · "
+            f"Hits: {stats['hits']} · Misses: {stats['misses']} · "
+            f"Hit ratio: {stats['hit_ratio']:.0%}"
+        )
+    
+    # Persistencia compartida entre despachadores
+    with st.expander("💾 Persistencia"):
+        st.checkbox("Guardar en SQLite", key="persistencia_activa",
+                    help="Camiones y agenda en una base compartida que sobrevive reinicios")
+        st.text_input("Archivo de la base", key="ruta_sqlite", value=RUTA_SQLITE_DEFECTO)
+        if db is not None:
+            st.caption(f"{camiones_en_base(db):,} camiones en la base · versión {db.version()}")
+    
+    # Eventos reales de portería (check-in, retrasos, inicio y fin en muelle)
+    with st.expander("📡 Eventos de Portería"):
+        st.checkbox("Ingesta en vivo", key="eventos_activos",
+                    help="Registra llegadas, retrasos, inicios y fines reales; solo se reagendan los camiones restantes")
+        st.radio("Fuente", FUENTES_EVENTOS, key="fuente_eventos", horizontal=True)
+        st.text_input("Archivo JSONL o host:puerto", key="destino_eventos", value=RUTA_EVENTOS_DEFECTO)
+        st.number_input("Refresco del panel (s)", 1, 60, 2, key="refresco_eventos")
+        ingestor = ingestor_eventos()
+        if ingestor is not None:
+            st.caption(
+                f"Recibidos: {ingestor.recibidos:,} · Inválidos: {ingestor.invalidos:,}"
+                + (f" · ⚠️ {ingestor.error}" if ingestor.error else "")
+            )
+    
+    # Horizonte rodante: solo se replanifican las próximas horas
+    with st.expander("🕒 Horizonte Rodante"):
+        st.checkbox("Replanificar por horizonte", key="horizonte_activo",
+                    help="Fija las asignaciones de la ventana congelada y optimiza solo las llegadas "
+                         "del horizonte; el resto queda diferido. Con eventos de portería activos, "
+                         "manda la agenda en vivo")
+        col_h1, col_h2 = st.columns(2)
+        col_h1.number_input("Congelado (min)", 0, 720, 60, step=15, key="congelado_min")
+        col_h2.number_input("Horizonte (min)", 15, 2880, 240, step=15, key="horizonte_min")
+        col_h3, col_h4 = st.columns(2)
+        col_h3.number_input("Replanificar cada (min)", 1, 240, 15, key="paso_horizonte_min")
+        col_h4.number_input("Reloj (min desde apertura)", 0, 60 * 24 * 31, 0,
+                            step=st.session_state.get('paso_horizonte_min', 15), key="reloj_horizonte_min")
+        if st.session_state.get('horizonte_min', 240) < st.session_state.get('congelado_min', 60):
+            st.caption("⚠️ El horizonte se extiende hasta la ventana congelada")
+        # Se completa al final del rerun, con la agenda que ya avanzó obtener_agenda
+        panel_horizonte = st.container()
+    
+    # Diagnóstico de rendimiento por fase
+    with st.expander("🩺 Diagnóstico"):
+        st.checkbox("Perfilar cada rerun", key="diagnostico",
+                    help="Mide tiempo y asignaciones por fase (agenda, figuras, tabla, envío)")
+        st.checkbox("Incluir pico de memoria", key="diagnostico_memoria",
+                    help="Usa tracemalloc: más preciso pero agrega overhead")
+        panel_diagnostico = st.container()
+    
     # Info del sistema
     st.markdown("---")
     st.markdown("""
         <div style='background: rgba(255,255,255,0.1); padding: 15px; border-radius: 8px; margin-top: 20px;'>
             <p style='margin: 0; font-size: 0.85rem; color: #cbd5e1;'>
                 <strong>💡 Tip:</strong> Los camiones de alta prioridad se procesan primero.
-                Los productos refrigerados requieren muelles tipo "Frío".
+                Cada producto solo va a muelles con todas las capacidades que exige
+                (ej. "Refrigerado+Peligroso" necesita un muelle Frío y Peligrosos).
             </p>
         </div>
     """, unsafe_allow_html=True)
@@ -412,73 +675,125 @@ with st.sidebar:
 # ═══════════════════════════════════════════════════════════
 # PESTAÑAS DE NAVEGACIÓN
 # ═══════════════════════════════════════════════════════════
+# Pestañas perezosas: cambiar de pestaña hace un rerun y solo se calcula
+# y dibuja la pestaña activa
 tab_dashboard, tab_gestor, tab_analytics = st.tabs([
     "📊 Dashboard Operativo", 
     "📝 Gestor de Camiones", 
     "📈 Analytics"
-])
+], key="pestana_activa", on_change="rerun")
+
+# Streamlit descarta el estado de los widgets que no se dibujan: los de las
+# pestañas ocultas se reasignan para que conserven su valor al volver
+for pestana, claves in ((tab_dashboard, WIDGETS_DASHBOARD), (tab_analytics, WIDGETS_ANALYTICS)):
+    if not pestana.open:
+        for clave in claves:
+            if clave in st.session_state:
+                st.session_state[clave] = st.session_state[clave]
 
 # ═══════════════════════════════════════════════════════════
-# TAB 1: DASHBOARD OPERATIVO
+# COMPONENTES DEL DASHBOARD
 # ═══════════════════════════════════════════════════════════
-with tab_dashboard:
-    if st.session_state.df_input.empty:
-        st.info("👈 Presiona 'Generar Escenario Aleatorio' para comenzar la simulación")
-    else:
-        # Ejecutar optimización
-        optimizer = DockOptimizerPro(
-            num_docks=num_muelles, 
-            dock_config=st.session_state.config_muelles,
-            start_hour=hora_inicio
+def tarjetas_kpis(resultado_df, costo_total):
+    """Tarjetas de KPIs (y copia de la agenda en la base persistente)"""
+    with fase("dashboard.kpis"):
+        kpis = calcular_kpis(resultado_df, costo_total)
+    
+    # La última agenda queda en la base para las consultas por índice
+    if db is not None and st.session_state.get('agenda_guardada') is not resultado_df:
+        with fase("dashboard.sqlite"):
+            db.guardar_agenda(resultado_df)
+        st.session_state.agenda_guardada = resultado_df
+    
+    # KPIs en tarjetas premium
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            "Total Cargas", 
+            kpis["total_cargas"],
+            delta=f"{kpis['a_tiempo']} a tiempo"
         )
-        resultado_df, costo_total = optimizer.agendar_camiones(st.session_state.df_input)
-        
-        # KPIs en tarjetas premium
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric(
-                "Total Cargas", 
-                len(resultado_df),
-                delta=f"{len(resultado_df[resultado_df['Estado'].str.contains('✅')])} a tiempo"
-            )
-        
-        with col2:
-            espera_avg = resultado_df['Espera_Min'].mean()
-            st.metric(
-                "Espera Promedio", 
-                f"{espera_avg:.1f} min",
-                delta="Óptimo" if espera_avg < 20 else "Alto",
-                delta_color="normal" if espera_avg < 20 else "inverse"
-            )
-        
-        with col3:
-            st.metric(
-                "Costo Demurrage", 
-                f"${costo_total:,.2f} USD",
-                delta=f"${(costo_total/len(resultado_df)):.2f} por carga" if len(resultado_df) > 0 else "$0"
+    
+    with col2:
+        espera_avg = kpis["espera_promedio"]
+        st.metric(
+            "Espera Promedio", 
+            f"{espera_avg:.1f} min",
+            delta="Óptimo" if espera_avg < 20 else "Alto",
+            delta_color="normal" if espera_avg < 20 else "inverse"
+        )
+    
+    with col3:
+        st.metric(
+            "Costo Demurrage", 
+            f"${costo_total:,.2f} USD",
+            delta=f"${kpis['costo_por_carga']:.2f} por carga" if kpis["total_cargas"] > 0 else "$0"
+        )
+    
+    with col4:
+        if kpis["fin_operaciones"] is not None:
+            st.metric("Fin de Operaciones", kpis["fin_operaciones"].strftime("%H:%M"))
+        else:
+            st.metric("Fin de Operaciones", "N/A")
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+
+@fragmento
+def diagrama_gantt(resultado_df):
+    """Gantt de ocupación: px.timeline, o WebGL con ventana visible si la agenda es grande"""
+    resultado_valido = resultado_df[resultado_df['Inicio_Real'].notna()].copy()
+    
+    if len(resultado_valido) > UMBRAL_GANTT_ESCALABLE:
+        # Agenda grande: WebGL con detalle solo en la ventana visible
+        # y bandas de ocupación por muelle cuando hay demasiadas barras
+        turno_desde = resultado_valido['Inicio_Real'].min().to_pydatetime()
+        turno_hasta = resultado_valido['Fin_Real'].max().to_pydatetime()
+        ventana = st.slider(
+            "🔍 Ventana visible",
+            min_value=turno_desde,
+            max_value=turno_hasta,
+            value=(turno_desde, turno_hasta),
+            step=timedelta(minutes=15),
+            format="DD/MM HH:mm",
+            key="ventana_gantt"
+        )
+        with fase("dashboard.gantt.figura"):
+            fig, modo_gantt = figura_gantt(resultado_valido, pd.Timestamp(ventana[0]), pd.Timestamp(ventana[1]))
+        st.caption(
+            f"{len(resultado_valido):,} barras · "
+            + ("detalle por camión" if modo_gantt == "detalle"
+               else f"ocupación por muelle (acerca la ventana a menos de {MAX_BARRAS_DETALLE:,} barras para ver el detalle)")
+        )
+        fig.update_layout(
+            height=500,
+            title="<b>Diagrama de Ocupación de Muelles (Timeline Operativo)</b>",
+            xaxis_title="<b>Horario del Turno</b>",
+            yaxis_title=None,
+            font=dict(family="Inter, sans-serif", size=12),
+            plot_bgcolor='rgba(248,250,252,0.5)',
+            paper_bgcolor='white',
+            title_font_size=18,
+            title_font_color='#1e3a8a',
+            hovermode='closest',
+            legend=dict(
+                title="Estado de Carga",
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
             )
+        )
         
-        with col4:
-            if not resultado_df.empty and resultado_df['Fin_Real'].notna().any():
-                fin_turno = resultado_df[resultado_df['Fin_Real'].notna()]['Fin_Real'].max().strftime("%H:%M")
-                st.metric("Fin de Operaciones", fin_turno)
-            else:
-                st.metric("Fin de Operaciones", "N/A")
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Gráfico Gantt Premium
-        resultado_valido = resultado_df[resultado_df['Inicio_Real'].notna()].copy()
+        with fase("dashboard.gantt.envio"):
+            st.plotly_chart(fig, use_container_width=True)
+    
+    elif not resultado_valido.empty:
+        # Mapeo de colores por estado
+        color_map = COLORES_ESTADO
         
-        if not resultado_valido.empty:
-            # Mapeo de colores por estado
-            color_map = {
-                "✅ A Tiempo": "#10b981",
-                "⚠️ Retraso Leve": "#f59e0b", 
-                "🔴 Crítico": "#ef4444"
-            }
-            
+        with fase("dashboard.gantt.figura"):
             fig = px.timeline(
                 resultado_valido,
                 x_start="Inicio_Real",
@@ -524,38 +839,161 @@ with tab_dashboard:
                 )
             )
             
-            fig.update_yaxes(categoryorder="category ascending")
+            fig.update_yaxes(categoryorder="array", categoryarray=muelles_ordenados(resultado_valido))
             fig.update_traces(textposition='inside', textfont_size=10)
             
+        with fase("dashboard.gantt.envio"):
             st.plotly_chart(fig, use_container_width=True)
+
+@fragmento
+def consultas_sqlite():
+    """Consultas por índice sobre la base persistente"""
+    if db is not None:
+        with st.expander("🔎 Consultas rápidas (SQLite)"):
+            col_q1, col_q2 = st.columns(2)
+            with col_q1:
+                horas = st.number_input("Llegadas en las próximas (horas)", 1, 24, 2)
+                ahora = datetime.now()
+                st.dataframe(db.llegadas_entre(ahora, ahora + timedelta(hours=horas)),
+                             use_container_width=True, hide_index=True)
+            with col_q2:
+                muelle_q = st.selectbox("Agenda del muelle", list(st.session_state.config_muelles))
+                st.dataframe(db.agenda_muelle(int(muelle_q)), use_container_width=True, hide_index=True)
+
+@fragmento
+def detalle_asignaciones(resultado_df):
+    """Tabla de resultados paginada, con filtros y orden"""
+    st.markdown("### 📋 Detalle de Asignaciones")
+    
+    if not resultado_df.empty:
+        # Índices de filtro y orden: una vez por agenda (se reutilizan
+        # mientras la agenda venga de la caché sin cambios)
+        tabla = st.session_state.get('tabla_detalle')
+        if tabla is None or tabla.resultado_df is not resultado_df:
+            with fase("dashboard.tabla.indices"):
+                tabla = TablaAsignaciones(resultado_df)
+            st.session_state.tabla_detalle = tabla
         
-        # Tabla de resultados con estilo
-        st.markdown("### 📋 Detalle de Asignaciones")
+        col_f1, col_f2, col_f3 = st.columns(3)
+        with col_f1:
+            filtro_muelles = st.multiselect("Muelle", tabla.opciones("Muelle_Asignado"), key="filtro_muelle")
+        with col_f2:
+            filtro_estados = st.multiselect("Estado", tabla.opciones("Estado"), key="filtro_estado")
+        with col_f3:
+            filtro_prioridades = st.multiselect("Prioridad", tabla.opciones("Prioridad"), key="filtro_prioridad")
         
-        display_df = resultado_df.copy()
-        if not display_df.empty:
-            display_df['Llegada_Teorica'] = display_df['Llegada_Teorica'].dt.strftime('%H:%M')
-            display_df['Inicio_Real'] = display_df['Inicio_Real'].apply(
-                lambda x: x.strftime('%H:%M') if pd.notna(x) else 'N/A'
-            )
-            display_df['Fin_Real'] = display_df['Fin_Real'].apply(
-                lambda x: x.strftime('%H:%M') if pd.notna(x) else 'N/A'
-            )
-            
-            st.dataframe(
-                display_df[[
-                    "Camión", "Producto", "Tipo_Producto", "Prioridad", 
-                    "Muelle_Asignado", "Llegada_Teorica", "Inicio_Real", 
-                    "Fin_Real", "Espera_Min", "Costo_Demurrage_USD", "Estado"
-                ]],
-                use_container_width=True,
-                hide_index=True
+        col_o1, col_o2, col_o3, col_o4 = st.columns([2, 1, 1, 1])
+        with col_o1:
+            orden_columna = st.selectbox(
+                "Ordenar por",
+                ["(orden de agenda)"] + COLUMNAS_TABLA,
+                key="orden_detalle"
             )
+        with col_o2:
+            orden_asc = st.toggle("Ascendente", value=True, key="orden_asc")
+        
+        posiciones = tabla.filtrar(
+            Muelle_Asignado=filtro_muelles,
+            Estado=filtro_estados,
+            Prioridad=filtro_prioridades
+        )
+        posiciones = tabla.ordenar(
+            posiciones,
+            None if orden_columna == "(orden de agenda)" else orden_columna,
+            orden_asc
+        )
+        
+        with col_o3:
+            tam_pagina = st.selectbox("Filas por página", [25, 50, 100, 250], index=2, key="tam_pagina")
+        total_paginas = TablaAsignaciones.num_paginas(posiciones, tam_pagina)
+        with col_o4:
+            numero_pagina = st.number_input("Página", min_value=1, max_value=total_paginas,
+                                            value=1, step=1, key="pagina_detalle")
+        
+        with fase("dashboard.tabla.formato"):
+            pagina_df = tabla.pagina(posiciones, min(numero_pagina, total_paginas), tam_pagina)
+        with fase("dashboard.tabla.envio"):
+            st.dataframe(pagina_df, use_container_width=True, hide_index=True)
+        desde_fila = (min(numero_pagina, total_paginas) - 1) * tam_pagina
+        st.caption(
+            f"Filas {min(desde_fila + 1, len(posiciones)):,}–{min(desde_fila + tam_pagina, len(posiciones)):,} "
+            f"de {len(posiciones):,} (total agenda: {len(tabla):,})"
+        )
+
+def botones_exportacion():
+    """
+    Exportación de la agenda en pantalla (la de obtener_agenda: incremental,
+    en vivo o rodante según el modo), escrita por bloques.
+    """
+    col_csv, col_parquet = st.columns(2)
+    resultado_df, _ = obtener_agenda()
+    for columna, formato in ((col_csv, "csv"), (col_parquet, "parquet")):
+        # El archivo se genera recién al hacer click (callable diferido)
+        columna.download_button(
+            f"⬇️ Descargar Agenda ({formato.upper()})",
+            data=partial(exportar_a_bytes, resultado_df, formato),
+            file_name=f"agenda_muelles.{formato}",
+            on_click="ignore",
+            use_container_width=True
+        )
+
+def panel_en_vivo():
+    """
+    KPIs, Gantt y detalle de la agenda en vivo. Corre como fragmento con
+    refresco periódico: cada pasada aplica los eventos de portería nuevos y
+    redibuja solo este panel, sin rerun de la página completa.
+    """
+    agenda = agenda_en_vivo()
+    ingestor = ingestor_eventos()
+    if ingestor.error is not None:
+        st.error(f"📡 La ingesta de eventos se detuvo: {ingestor.error}")
+    with fase("eventos.aplicar"):
+        nuevos = agenda.consumir(ingestor)
+    with fase("eventos.reagendar"):
+        resultado_df, costo_total = agenda.resultado()
+    
+    stats = agenda.estadisticas()
+    st.caption(
+        f"📡 {stats['pendientes']:,} por atender · {stats['en_muelle']:,} en muelle · "
+        f"{stats['completados']:,} completados · eventos aplicados: {stats['aplicados']:,} (+{nuevos:,}) · "
+        f"rechazados: {stats['rechazados']:,}"
+        + (f" · último evento {stats['reloj']:%d/%m %H:%M}" if stats['reloj'] is not None else "")
+    )
+    tarjetas_kpis(resultado_df, costo_total)
+    diagrama_gantt(resultado_df)
+    detalle_asignaciones(resultado_df)
 
 # ═══════════════════════════════════════════════════════════
-# TAB 2: GESTOR MANUAL
+# TAB 1: DASHBOARD OPERATIVO
+# ═══════════════════════════════════════════════════════════
+if tab_dashboard.open:
+    with tab_dashboard, fase("tab.dashboard"):
+        if st.session_state.camiones.empty:
+            st.info("👈 Presiona 'Generar Escenario Aleatorio' para comenzar la simulación")
+        elif ingestor_eventos() is not None:
+            # Eventos de portería: el panel se refresca solo con el timer
+            fragmento(panel_en_vivo, run_every=st.session_state.get('refresco_eventos', 2))()
+            consultas_sqlite()
+            botones_exportacion()
+        else:
+            # Ejecutar optimización
+            resultado_df, costo_total = obtener_agenda()
+            tarjetas_kpis(resultado_df, costo_total)
+            diagrama_gantt(resultado_df)
+            consultas_sqlite()
+            detalle_asignaciones(resultado_df)
+            botones_exportacion()
+
+# ═══════════════════════════════════════════════════════════
+# COMPONENTES DEL GESTOR
 # ═══════════════════════════════════════════════════════════
-with tab_gestor:
+@fragmento
+def gestor_camiones():
+    """
+    Alta, importación, edición y baja de camiones. Es un fragmento: cada
+    acción reejecuta solo el Gestor; las demás pestañas se recalculan al
+    volver a ellas.
+    """
     col_add, col_edit = st.columns([1, 1])
     
     with col_add:
@@ -565,7 +1003,7 @@ with tab_gestor:
             new_prod = st.text_input("Producto", placeholder="Ej. Papel")
             
             col_tipo, col_prior = st.columns(2)
-            new_tipo = col_tipo.selectbox("Tipo", ["Seco", "Refrigerado"])
+            new_tipo = col_tipo.selectbox("Tipo", TIPOS_PRODUCTO_COMUNES)
             new_prioridad = col_prior.selectbox("Prioridad", ["Alta", "Media", "Baja"])
             
             col_time, col_dur = st.columns(2)
@@ -573,36 +1011,68 @@ with tab_gestor:
             new_dur = col_dur.number_input("Duración (min)", min_value=15, value=60, step=15)
             
             if st.form_submit_button("➕ Agregar Camión", use_container_width=True):
-                if new_id and new_prod:
-                    full_arrival = datetime.combine(datetime.now().date(), new_time)
-                    new_row = pd.DataFrame([{
+                if new_id in st.session_state.camiones:
+                    st.error(f"Ya existe un camión con ID {new_id}")
+                elif new_id and new_prod:
+                    full_arrival = datetime.combine(fecha_manifiesto(), new_time)
+                    nuevo = {
                         "ID_Camion": new_id,
                         "Producto": new_prod,
                         "Tipo_Producto": new_tipo,
                         "Prioridad": new_prioridad,
                         "Hora_Llegada_Est": full_arrival,
                         "Duracion_Min": new_dur
-                    }])
-                    st.session_state.df_input = pd.concat([st.session_state.df_input, new_row], ignore_index=True)
+                    }
+                    st.session_state.camiones.agregar(nuevo)
+                    sincronizar_incremental("agregar", nuevo)
+                    persistir("agregar", nuevo)
                     st.success(f"✅ {new_id} agregado correctamente")
-                    st.rerun()
+                    rerun_fragmento()
                 else:
                     st.error("Por favor completa ID y Producto")
     
+        # Importación masiva desde el TMS
+        st.markdown("### 📥 Importación Masiva")
+        archivo = st.file_uploader("Manifiesto CSV o Parquet", type=["csv", "parquet"])
+        reemplazar = st.checkbox("Reemplazar el manifiesto actual", value=True)
+        if archivo is not None and st.button("📥 Importar Manifiesto", use_container_width=True):
+            try:
+                # Se importa sobre una copia: un error a mitad de archivo no deja el manifiesto a medias
+                almacen, reporte = importar_manifiesto(
+                    archivo, almacen=None if reemplazar else st.session_state.camiones.copia()
+                )
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                st.session_state.camiones = almacen
+                st.session_state.agendador_incremental = None
+                persistir("insertar_lote", almacen.to_frame(), reemplazar=True)
+                st.session_state.reporte_importacion = reporte
+        
+        if 'reporte_importacion' in st.session_state:
+            reporte = st.session_state.reporte_importacion
+            st.success(f"✅ {reporte.filas_validas:,} de {reporte.filas_leidas:,} filas importadas")
+            if reporte.filas_invalidas:
+                st.warning(f"⚠️ {reporte.filas_invalidas:,} filas inválidas descartadas")
+                st.dataframe(reporte.errores, use_container_width=True, hide_index=True)
+    
     with col_edit:
         st.markdown("### ✏️ Editar / Eliminar")
-        if not st.session_state.df_input.empty:
-            lista_ids = st.session_state.df_input['ID_Camion'].tolist()
+        if not st.session_state.camiones.empty:
+            lista_ids = st.session_state.camiones.ids()
             camion_sel = st.selectbox("Seleccionar Camión:", lista_ids)
             
-            datos_act = st.session_state.df_input[st.session_state.df_input['ID_Camion'] == camion_sel].iloc[0]
+            datos_act = st.session_state.camiones.obtener(camion_sel)
             
             with st.expander(f"🔧 Modificar {camion_sel}", expanded=True):
                 edit_prod = st.text_input("Producto", value=datos_act['Producto'], key="edit_prod")
                 
                 col_t, col_p = st.columns(2)
-                edit_tipo = col_t.selectbox("Tipo", ["Seco", "Refrigerado"], 
-                                            index=0 if datos_act['Tipo_Producto']=="Seco" else 1,
+                tipos_edit = TIPOS_PRODUCTO_COMUNES + [
+                    t for t in [datos_act['Tipo_Producto']] if t not in TIPOS_PRODUCTO_COMUNES
+                ]
+                edit_tipo = col_t.selectbox("Tipo", tipos_edit, 
+                                            index=tipos_edit.index(datos_act['Tipo_Producto']),
                                             key="edit_tipo")
                 edit_prior = col_p.selectbox("Prioridad", ["Alta", "Media", "Baja"],
                                              index=["Alta", "Media", "Baja"].index(datos_act['Prioridad']),
@@ -614,100 +1084,510 @@ with tab_gestor:
                 
                 col_save, col_del = st.columns(2)
                 if col_save.button("💾 Guardar", use_container_width=True):
-                    idx = st.session_state.df_input[st.session_state.df_input['ID_Camion'] == camion_sel].index[0]
-                    new_dt = datetime.combine(datetime.now().date(), edit_time)
+                    new_dt = datetime.combine(datos_act['Hora_Llegada_Est'].date(), edit_time)
                     
-                    st.session_state.df_input.at[idx, 'Producto'] = edit_prod
-                    st.session_state.df_input.at[idx, 'Tipo_Producto'] = edit_tipo
-                    st.session_state.df_input.at[idx, 'Prioridad'] = edit_prior
-                    st.session_state.df_input.at[idx, 'Hora_Llegada_Est'] = new_dt
-                    st.session_state.df_input.at[idx, 'Duracion_Min'] = edit_dur
+                    st.session_state.camiones.actualizar(
+                        camion_sel,
+                        Producto=edit_prod, Tipo_Producto=edit_tipo, Prioridad=edit_prior,
+                        Hora_Llegada_Est=new_dt, Duracion_Min=edit_dur
+                    )
+                    sincronizar_incremental(
+                        "editar", camion_sel,
+                        Producto=edit_prod, Tipo_Producto=edit_tipo, Prioridad=edit_prior,
+                        Hora_Llegada_Est=new_dt, Duracion_Min=edit_dur
+                    )
+                    persistir(
+                        "actualizar", camion_sel,
+                        Producto=edit_prod, Tipo_Producto=edit_tipo, Prioridad=edit_prior,
+                        Hora_Llegada_Est=new_dt, Duracion_Min=edit_dur
+                    )
                     
                     st.success("✅ Actualizado")
-                    st.rerun()
+                    rerun_fragmento()
                 
                 if col_del.button("🗑️ Eliminar", use_container_width=True):
-                    st.session_state.df_input = st.session_state.df_input[
-                        st.session_state.df_input['ID_Camion'] != camion_sel
-                    ]
-                    st.rerun()
+                    st.session_state.camiones.eliminar(camion_sel)
+                    sincronizar_incremental("eliminar", camion_sel)
+                    persistir("eliminar", camion_sel)
+                    rerun_fragmento()
         else:
             st.info("No hay camiones. Agrega uno o genera un escenario.")
 
 # ═══════════════════════════════════════════════════════════
-# TAB 3: ANALYTICS
+# TAB 2: GESTOR MANUAL
+# ═══════════════════════════════════════════════════════════
+if tab_gestor.open:
+    with tab_gestor, fase("tab.gestor"):
+        gestor_camiones()
+
+# ═══════════════════════════════════════════════════════════
+# COMPONENTES DE ANALYTICS
 # ═══════════════════════════════════════════════════════════
-with tab_analytics:
-    if st.session_state.df_input.empty:
-        st.info("📊 Los analytics aparecerán cuando haya datos para analizar")
+def analisis_agenda(resultado_df, costo_total, intervalo_min):
+    """Una sola pasada por agenda e intervalo; se reutiliza entre reruns"""
+    analisis_previo = st.session_state.get('analisis_agenda')
+    if (analisis_previo is not None and analisis_previo[0] is resultado_df
+            and analisis_previo[1] == intervalo_min):
+        return analisis_previo[2]
+    with fase("analytics.barrido"):
+        analisis = analizar_agenda(resultado_df, costo_total, intervalo_min)
+    st.session_state.analisis_agenda = (resultado_df, intervalo_min, analisis)
+    return analisis
+
+def rendimiento(analisis):
+    """Gráficos por prioridad y métricas clave"""
+    kpis = analisis["kpis"]
+    por_prioridad = analisis["por_prioridad"]
+    colores_prioridad = [COLORES_PRIORIDAD.get(p, "#64748b") for p in por_prioridad["Prioridad"]]
+    
+    st.markdown("### 📊 Análisis de Rendimiento")
+    
+    col_chart1, col_chart2 = st.columns(2)
+    
+    with col_chart1:
+        # Distribución por prioridad
+        fig_prior = go.Figure(data=[
+            go.Pie(
+                labels=por_prioridad['Prioridad'],
+                values=por_prioridad['Cargas'],
+                marker=dict(colors=colores_prioridad),
+                sort=False,
+                hole=0.4
+            )
+        ])
+        fig_prior.update_layout(
+            title="<b>Distribución por Prioridad</b>",
+            height=350,
+            font=dict(family="Inter, sans-serif")
+        )
+        st.plotly_chart(fig_prior, use_container_width=True)
+    
+    with col_chart2:
+        # Tiempo de espera por prioridad
+        fig_wait = go.Figure(data=[
+            go.Bar(
+                x=por_prioridad['Prioridad'],
+                y=por_prioridad['Espera_Promedio_Min'],
+                marker_color=colores_prioridad,
+                text=por_prioridad['Espera_Promedio_Min'].round(1),
+                textposition='auto'
+            )
+        ])
+        fig_wait.update_layout(
+            title="<b>Tiempo de Espera Promedio por Prioridad</b>",
+            yaxis_title="Minutos",
+            height=350,
+            font=dict(family="Inter, sans-serif")
+        )
+        st.plotly_chart(fig_wait, use_container_width=True)
+    
+    # Resumen estadístico
+    st.markdown("### 📈 Métricas Clave")
+    col_stat1, col_stat2, col_stat3, col_stat4, col_stat5 = st.columns(5)
+    
+    with col_stat1:
+        st.metric("Tasa de Éxito", f"{kpis['tasa_exito']:.1f}%")
+    
+    with col_stat2:
+        st.metric("Máxima Espera", f"{kpis['max_espera']:.0f} min")
+    
+    with col_stat3:
+        st.metric("Eficiencia Operativa", f"{kpis['eficiencia']:.1f}%")
+    
+    with col_stat4:
+        momento = analisis['momento_pico_muelles']
+        st.metric("Pico de Muelles Ocupados", analisis['pico_muelles'],
+                  delta=momento.strftime('%d/%m %H:%M') if momento is not None else None,
+                  delta_color="off")
+    
+    with col_stat5:
+        momento = analisis['momento_pico_cola']
+        st.metric("Pico de Cola en Patio", analisis['pico_cola'],
+                  delta=momento.strftime('%d/%m %H:%M') if momento is not None else None,
+                  delta_color="off")
+
+@fragmento
+def ocupacion_patio(resultado_df, costo_total):
+    """Ocupación por muelle y cola del patio en el tiempo"""
+    st.markdown("### 🏗️ Ocupación de Muelles y Cola del Patio")
+    intervalo_min = st.selectbox("Intervalo (min)", INTERVALOS_ANALITICA, key='intervalo_analitica',
+                                 index=INTERVALOS_ANALITICA.index(INTERVALO_DEFECTO_MIN))
+    analisis = analisis_agenda(resultado_df, costo_total, intervalo_min)
+    if analisis['intervalo_min'] != intervalo_min:
+        st.caption(f"La agenda es larga: se agrupa en intervalos de {analisis['intervalo_min']} min")
+    
+    if analisis['ocupacion'].empty:
+        st.info("No hay camiones con muelle asignado")
     else:
-        optimizer = DockOptimizerPro(
-            num_docks=num_muelles, 
-            dock_config=st.session_state.config_muelles,
-            start_hour=hora_inicio
+        ocupacion = analisis['ocupacion']
+        fig_ocupacion = go.Figure(go.Heatmap(
+            x=ocupacion.index, y=list(ocupacion.columns), z=ocupacion.to_numpy().T,
+            zmin=0, zmax=100, colorscale="Blues",
+            colorbar=dict(title="% ocupado"),
+            hovertemplate="%{y}<br>%{x|%d/%m %H:%M}<br>Ocupación: %{z:.0f}%<extra></extra>"
+        ))
+        fig_ocupacion.update_layout(
+            title="<b>Ocupación por Muelle</b>",
+            height=max(300, 40 * len(ocupacion.columns) + 120),
+            font=dict(family="Inter, sans-serif")
         )
-        resultado_df, _ = optimizer.agendar_camiones(st.session_state.df_input)
+        fig_ocupacion.update_yaxes(autorange="reversed")
+        st.plotly_chart(fig_ocupacion, use_container_width=True)
         
-        st.markdown("### 📊 Análisis de Rendimiento")
+        cola = analisis['cola']
+        fig_cola = go.Figure([
+            go.Scatter(x=cola.index, y=cola['Cola_Max'], name="Cola máxima",
+                       line=dict(color="#ef4444", shape="hv")),
+            go.Scatter(x=cola.index, y=cola['Cola_Promedio'], name="Cola promedio",
+                       line=dict(color="#f59e0b", shape="hv"), fill="tozeroy"),
+            go.Scatter(x=cola.index, y=cola['Muelles_Ocupados_Promedio'], name="Muelles ocupados",
+                       line=dict(color="#3b82f6", shape="hv", dash="dot"))
+        ])
+        fig_cola.update_layout(
+            title="<b>Camiones Esperando en Patio</b>",
+            yaxis_title="Camiones",
+            height=350,
+            font=dict(family="Inter, sans-serif")
+        )
+        st.plotly_chart(fig_cola, use_container_width=True)
+        
+        st.dataframe(
+            analisis['muelles'].round(1),
+            use_container_width=True,
+            hide_index=True
+        )
+        with st.expander(f"⏸️ Huecos ociosos entre operaciones ({len(analisis['huecos'])})"):
+            st.dataframe(
+                analisis['huecos'].nlargest(50, "Minutos"),
+                use_container_width=True,
+                hide_index=True
+            )
+
+@fragmento
+def riesgo_montecarlo():
+    """Riesgo de demurrage sobre miles de días aleatorios"""
+    st.markdown("### 🎲 Riesgo de Demurrage (Monte Carlo)")
+    with st.expander("⚙️ Configurar simulación", expanded='mc_resultado' not in st.session_state):
+        col_mc1, col_mc2, col_mc3 = st.columns(3)
+        mc_escenarios = col_mc1.number_input("Escenarios", 100, 100000, 1000, step=100, key="mc_escenarios")
+        mc_camiones = col_mc2.number_input("Camiones por día", 10, 10000,
+                                           min(10000, max(10, len(st.session_state.camiones))), step=10)
+        mc_semilla = col_mc3.number_input("Semilla", 0, 2**31 - 1, 42, key="mc_semilla")
         
-        col_chart1, col_chart2 = st.columns(2)
+        col_mc4, col_mc5, col_mc6, col_mc7 = st.columns(4)
+        mc_proceso = col_mc4.selectbox("Llegadas", PROCESOS_LLEGADA, key="mc_llegadas",
+                                       help="Pico: ola de llegadas 2 horas después de la apertura")
+        mc_refrig = col_mc5.slider("% Refrigerado", 0, 100, 29, key="mc_refrigerado")
+        mc_alta = col_mc6.slider("% Alta", 0, 100, 40, key="mc_alta")
+        mc_media = col_mc7.slider("% Media", 0, 100 - mc_alta, min(40, 100 - mc_alta), key="mc_media")
         
-        with col_chart1:
-            # Distribución por prioridad
-            if 'Prioridad' in resultado_df.columns:
-                prioridad_counts = resultado_df['Prioridad'].value_counts()
-                fig_prior = go.Figure(data=[
-                    go.Pie(
-                        labels=prioridad_counts.index,
-                        values=prioridad_counts.values,
-                        marker=dict(colors=['#ef4444', '#f59e0b', '#10b981']),
-                        hole=0.4
-                    )
-                ])
-                fig_prior.update_layout(
-                    title="<b>Distribución por Prioridad</b>",
-                    height=350,
-                    font=dict(family="Inter, sans-serif")
+        if st.button("▶️ Ejecutar Monte Carlo", use_container_width=True):
+            with st.spinner(f"Simulando {mc_escenarios:,} escenarios..."):
+                st.session_state.mc_resultado = simular_montecarlo(
+                    st.session_state.config_muelles,
+                    hora_inicio=hora_inicio,
+                    num_escenarios=int(mc_escenarios),
+                    semilla=int(mc_semilla),
+                    parametros={
+                        "num_camiones": int(mc_camiones),
+                        "proceso_llegada": mc_proceso,
+                        "fraccion_refrigerado": mc_refrig / 100,
+                        "mix_prioridad": {
+                            "Alta": mc_alta, "Media": mc_media,
+                            "Baja": max(0, 100 - mc_alta - mc_media)
+                        }
+                    }
                 )
-                st.plotly_chart(fig_prior, use_container_width=True)
+    
+    if 'mc_resultado' in st.session_state:
+        bandas = bandas_percentiles(st.session_state.mc_resultado)
         
-        with col_chart2:
-            # Tiempo de espera por prioridad
-            if 'Prioridad' in resultado_df.columns and 'Espera_Min' in resultado_df.columns:
-                espera_por_prior = resultado_df.groupby('Prioridad')['Espera_Min'].mean().reset_index()
-                
-                fig_wait = go.Figure(data=[
-                    go.Bar(
-                        x=espera_por_prior['Prioridad'],
-                        y=espera_por_prior['Espera_Min'],
-                        marker_color=['#ef4444', '#f59e0b', '#10b981'],
-                        text=espera_por_prior['Espera_Min'].round(1),
-                        textposition='auto'
-                    )
-                ])
-                fig_wait.update_layout(
-                    title="<b>Tiempo de Espera Promedio por Prioridad</b>",
-                    yaxis_title="Minutos",
-                    height=350,
-                    font=dict(family="Inter, sans-serif")
+        col_mc_a, col_mc_b, col_mc_c = st.columns(3)
+        col_mc_a.metric("Demurrage P50", f"${bandas.loc['P50', 'Costo_Demurrage_USD']:,.0f} USD")
+        col_mc_b.metric("Demurrage P95", f"${bandas.loc['P95', 'Costo_Demurrage_USD']:,.0f} USD")
+        col_mc_c.metric("Espera Promedio P95", f"{bandas.loc['P95', 'Espera_Promedio_Min']:.1f} min")
+        
+        fig_mc = go.Figure(data=[
+            go.Histogram(
+                x=st.session_state.mc_resultado['Costo_Demurrage_USD'],
+                marker_color='#3b82f6',
+                nbinsx=50
+            )
+        ])
+        for percentil, color in (("P5", "#10b981"), ("P50", "#f59e0b"), ("P95", "#ef4444")):
+            fig_mc.add_vline(x=bandas.loc[percentil, 'Costo_Demurrage_USD'],
+                             line_dash="dash", line_color=color, annotation_text=percentil)
+        fig_mc.update_layout(
+            title="<b>Distribución del Costo de Demurrage por Día</b>",
+            xaxis_title="USD",
+            yaxis_title="Escenarios",
+            height=350,
+            font=dict(family="Inter, sans-serif")
+        )
+        st.plotly_chart(fig_mc, use_container_width=True)
+        
+        tabla_bandas = bandas.copy()
+        tabla_bandas['Fin_Operaciones_Min'] = [
+            f"{int(hora_inicio * 60 + m) // 60 % 24:02d}:{int(m) % 60:02d}"
+            for m in tabla_bandas['Fin_Operaciones_Min']
+        ]
+        st.dataframe(
+            tabla_bandas.rename(columns={
+                "Costo_Demurrage_USD": "Costo Demurrage (USD)",
+                "Espera_Promedio_Min": "Espera Promedio (min)",
+                "Espera_Max_Min": "Espera Máxima (min)",
+                "Fin_Operaciones_Min": "Fin de Operaciones"
+            }).round(1),
+            use_container_width=True
+        )
+
+@fragmento
+def planificador_capacidad():
+    """Planificador de capacidad (cantidad de muelles y mezcla Seco/Frío)"""
+    st.markdown("### 🏗️ Planificador de Capacidad")
+    with st.expander("⚙️ Configurar barrido", expanded='plan_resultado' not in st.session_state):
+        col_pl1, col_pl2 = st.columns(2)
+        pl_rango = col_pl1.slider("Rango de muelles", 1, 50, (1, 10), key="pl_rango")
+        pl_objetivo = col_pl2.number_input("Espera máxima objetivo (min)", 0, 1440, 30, step=5, key="pl_objetivo")
+        
+        if st.button("▶️ Evaluar Configuraciones", use_container_width=True):
+            with st.spinner("Evaluando configuraciones..."):
+                st.session_state.plan_resultado = planificar_capacidad(
+                    st.session_state.camiones.to_frame(),
+                    muelles_min=pl_rango[0],
+                    muelles_max=pl_rango[1],
+                    hora_inicio=hora_inicio,
+                    base_date=fecha_manifiesto()
                 )
-                st.plotly_chart(fig_wait, use_container_width=True)
+                st.session_state.plan_objetivo = pl_objetivo
+    
+    if 'plan_resultado' in st.session_state:
+        plan_df = st.session_state.plan_resultado
+        recomendada = configuracion_recomendada(plan_df, st.session_state.plan_objetivo)
+        if recomendada is not None:
+            st.success(
+                f"✅ Configuración más barata que cumple espera ≤ {st.session_state.plan_objetivo} min: "
+                f"**{int(recomendada['Muelles'])} muelles** ({int(recomendada['Muelles_Seco'])} Seco, "
+                f"{int(recomendada['Muelles_Frio'])} Frío) — demurrage "
+                f"${recomendada['Costo_Demurrage_USD']:,.2f} USD"
+            )
+        else:
+            st.warning("⚠️ Ninguna configuración del rango cumple la espera máxima objetivo")
         
-        # Resumen estadístico
-        st.markdown("### 📈 Métricas Clave")
-        col_stat1, col_stat2, col_stat3 = st.columns(3)
+        factibles = plan_df[plan_df['Sin_Muelle'] == 0]
+        fig_plan = px.scatter(
+            factibles,
+            x="Makespan_Min",
+            y="Costo_Demurrage_USD",
+            color="Pareto",
+            symbol="Pareto",
+            hover_data=["Muelles", "Muelles_Seco", "Muelles_Frio", "Espera_Max_Min"],
+            color_discrete_map={True: "#ef4444", False: "#94a3b8"},
+            title="<b>Frontera de Pareto: Costo vs Makespan</b>"
+        )
+        fig_plan.update_layout(
+            xaxis_title="Makespan (min)",
+            yaxis_title="Costo Demurrage (USD)",
+            height=400,
+            font=dict(family="Inter, sans-serif")
+        )
+        st.plotly_chart(fig_plan, use_container_width=True)
         
-        with col_stat1:
-            tasa_exito = (len(resultado_df[resultado_df['Estado'].str.contains('✅')]) / len(resultado_df) * 100) if len(resultado_df) > 0 else 0
-            st.metric("Tasa de Éxito", f"{tasa_exito:.1f}%")
+        st.dataframe(
+            plan_df[plan_df['Pareto']].drop(columns="Pareto").round(1),
+            use_container_width=True,
+            hide_index=True
+        )
+
+@fragmento
+def comparacion_politicas():
+    """Mismo manifiesto agendado con varias políticas, una por proceso"""
+    st.markdown("### ⚖️ Comparar Políticas de Despacho")
+    with st.expander("⚙️ Configurar comparación", expanded='comparacion_politicas' not in st.session_state):
+        cp_politicas = st.multiselect("Políticas", list(POLITICAS), default=list(POLITICAS), key="cp_politicas")
+        
+        if st.button("▶️ Comparar Políticas", use_container_width=True, disabled=not cp_politicas):
+            motor = MOTORES_DESPACHO[st.session_state.get('motor_despacho', "Prioridad global (greedy)")]
+            with st.spinner(f"Agendando con {len(cp_politicas)} políticas en paralelo..."):
+                st.session_state.comparacion_politicas = comparar_politicas(
+                    st.session_state.camiones,
+                    st.session_state.config_muelles,
+                    cp_politicas,
+                    hora_inicio=hora_inicio,
+                    base_date=fecha_manifiesto(),
+                    motor=motor
+                )
+    
+    if 'comparacion_politicas' in st.session_state:
+        resumen_politicas, agendas_politicas = st.session_state.comparacion_politicas
+        mejor_politica = resumen_politicas.loc[resumen_politicas['costo_total'].idxmin(), 'Politica']
+        st.success(f"✅ Menor demurrage: **{mejor_politica}**")
+        tabla_politicas = resumen_politicas[[
+            "Politica", "costo_total", "espera_promedio", "max_espera",
+            "tasa_exito", "fin_operaciones", "Tiempo_s"
+        ]].copy()
+        tabla_politicas['fin_operaciones'] = pd.to_datetime(tabla_politicas['fin_operaciones']).dt.strftime('%d/%m %H:%M')
+        st.dataframe(
+            tabla_politicas.rename(columns={
+                "Politica": "Política",
+                "costo_total": "Costo Demurrage (USD)",
+                "espera_promedio": "Espera Promedio (min)",
+                "max_espera": "Espera Máxima (min)",
+                "tasa_exito": "Tasa de Éxito (%)",
+                "fin_operaciones": "Fin de Operaciones",
+                "Tiempo_s": "Tiempo (s)"
+            }).round(2),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Gantts lado a lado, dos por fila
+        nombres_politicas = list(agendas_politicas)
+        for desde in range(0, len(nombres_politicas), 2):
+            columnas_gantt = st.columns(2)
+            for columna, nombre in zip(columnas_gantt, nombres_politicas[desde:desde + 2]):
+                agenda_politica, costo_politica = agendas_politicas[nombre]
+                with columna:
+                    st.markdown(f"**{nombre}** · ${costo_politica:,.2f} USD")
+                    if agenda_politica.empty or agenda_politica['Inicio_Real'].isna().all():
+                        st.info("Sin camiones agendados")
+                        continue
+                    fig_politica, _ = figura_gantt(agenda_politica[agenda_politica['Inicio_Real'].notna()])
+                    fig_politica.update_layout(
+                        height=300,
+                        showlegend=False,
+                        margin=dict(l=10, r=10, t=10, b=10),
+                        font=dict(family="Inter, sans-serif")
+                    )
+                    st.plotly_chart(fig_politica, use_container_width=True, key=f"gantt_politica_{nombre}")
+
+@fragmento
+def optimizador_mejora():
+    """Mejora anytime de la agenda greedy (búsqueda local)"""
+    st.markdown("### 🚀 Optimizador de Mejora")
+    col_lm1, col_lm2 = st.columns(2)
+    lm_presupuesto = col_lm1.slider("Presupuesto de tiempo (s)", 1, 60, 5, key="lm_presupuesto")
+    lm_semilla = col_lm2.number_input("Semilla de búsqueda", 0, 2**31 - 1, 0, key="lm_semilla")
+    
+    if st.button("▶️ Mejorar Agenda", use_container_width=True):
+        mejorador = ImprovementOptimizer(
+            st.session_state.config_muelles, start_hour=hora_inicio, base_date=fecha_manifiesto(),
+            semilla=int(lm_semilla)
+        ).cargar(st.session_state.camiones.to_frame())
+        progreso = st.progress(0.0, text="Buscando mejoras...")
+        inicio_busqueda = datetime.now()
+        while (datetime.now() - inicio_busqueda).total_seconds() < lm_presupuesto:
+            mejorador.ejecutar(presupuesto_s=min(0.5, lm_presupuesto))
+            avance = min(1.0, (datetime.now() - inicio_busqueda).total_seconds() / lm_presupuesto)
+            progreso.progress(avance, text=f"Mejor demurrage: ${mejorador.costo_actual:,.2f} USD")
+        progreso.empty()
+        st.session_state.mejora = {
+            "costo_inicial": mejorador.costo_inicial,
+            "costo": mejorador.costo_actual,
+            "historial": pd.DataFrame(mejorador.historial, columns=["Segundos", "Costo_USD"]),
+            "resultado": mejorador.resultado()[0],
+            "iteraciones": mejorador.iteraciones
+        }
+    
+    if 'mejora' in st.session_state:
+        mejora = st.session_state.mejora
+        reduccion = (1 - mejora["costo"] / mejora["costo_inicial"]) * 100 if mejora["costo_inicial"] else 0
+        col_lm_a, col_lm_b, col_lm_c = st.columns(3)
+        col_lm_a.metric("Demurrage Greedy", f"${mejora['costo_inicial']:,.2f} USD")
+        col_lm_b.metric("Mejor Encontrado", f"${mejora['costo']:,.2f} USD",
+                        delta=f"-{reduccion:.1f}%", delta_color="inverse")
+        col_lm_c.metric("Movimientos Evaluados", f"{mejora['iteraciones']:,}")
         
-        with col_stat2:
-            max_espera = resultado_df['Espera_Min'].max() if not resultado_df.empty else 0
-            st.metric("Máxima Espera", f"{max_espera:.0f} min")
+        fig_lm = go.Figure(data=[
+            go.Scatter(
+                x=mejora["historial"]["Segundos"],
+                y=mejora["historial"]["Costo_USD"],
+                mode="lines",
+                line_shape="hv",
+                line_color="#1e3a8a"
+            )
+        ])
+        fig_lm.update_layout(
+            title="<b>Evolución del Mejor Demurrage</b>",
+            xaxis_title="Segundos",
+            yaxis_title="USD",
+            height=300,
+            font=dict(family="Inter, sans-serif")
+        )
+        st.plotly_chart(fig_lm, use_container_width=True)
         
-        with col_stat3:
-            eficiencia = (resultado_df['Duracion_Min'].sum() / ((resultado_df['Duracion_Min'].sum() + resultado_df['Espera_Min'].sum()) if (resultado_df['Duracion_Min'].sum() + resultado_df['Espera_Min'].sum()) > 0 else 1) * 100) if not resultado_df.empty else 0
-            st.metric("Eficiencia Operativa", f"{eficiencia:.1f}%")
+        with st.expander("📋 Agenda mejorada"):
+            st.dataframe(mejora["resultado"], use_container_width=True, hide_index=True)
+
+# ═══════════════════════════════════════════════════════════
+# TAB 3: ANALYTICS
+# ═══════════════════════════════════════════════════════════
+if tab_analytics.open:
+    with tab_analytics, fase("tab.analytics"):
+        if st.session_state.camiones.empty:
+            st.info("📊 Los analytics aparecerán cuando haya datos para analizar")
+        else:
+            resultado_df, costo_total = obtener_agenda()
+            rendimiento(analisis_agenda(
+                resultado_df, costo_total,
+                st.session_state.get('intervalo_analitica', INTERVALO_DEFECTO_MIN)
+            ))
+            ocupacion_patio(resultado_df, costo_total)
+            riesgo_montecarlo()
+            planificador_capacidad()
+            comparacion_politicas()
+            optimizador_mejora()
+
+# ═══════════════════════════════════════════════════════════
+# DIAGNÓSTICO DEL RERUN
+# ═══════════════════════════════════════════════════════════
+if perfilador is not None:
+    desactivar()
+    trazas = st.session_state.setdefault('trazas_diagnostico', [])
+    trazas.append(perfilador)
+    del trazas[:-20]
+    with panel_diagnostico:
+        st.caption(f"Último rerun: {perfilador.duracion_s * 1000:,.0f} ms · {len(perfilador.eventos)} fases")
+        st.dataframe(
+            perfilador.resumen().style.format({"Total_ms": "{:.1f}", "Max_ms": "{:.1f}", "Pico_KB": "{:,.0f}"}),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.download_button(
+            f"⬇️ Traza JSON ({len(trazas)} reruns)",
+            data=traza_json(trazas),
+            file_name="smartdock_traza.json",
+            mime="application/json",
+            help="Formato Trace Event: se abre en chrome://tracing o ui.perfetto.dev",
+            on_click="ignore",
+            use_container_width=True
+        )
+
+# Estado del horizonte rodante: solo lectura, sin volver a replanificar
+rodante = st.session_state.get('agenda_rodante')
+if st.session_state.get('horizonte_activo') and ingestor_eventos() is None and rodante is not None:
+    stats = rodante.estadisticas()
+    ultimo = stats['ultimo_replan']
+    with panel_horizonte:
+        st.caption(
+            f"🕒 {stats['reloj']:%d/%m %H:%M} · comprometidos: {stats['comprometidos']:,} · "
+            f"en horizonte: {stats['en_horizonte']:,} · diferidos: {stats['diferidos']:,} · "
+            f"último replan: {ultimo['camiones']:,} camiones en {ultimo['segundos'] * 1000:.1f} ms"
+        )
+
+# Latencia percibida: reruns completos por pestaña y reruns de fragmentos
+registrar_latencia("Página", st.session_state.get('pestana_activa') or "", inicio_rerun)
+if st.session_state.get('diagnostico'):
+    latencias = pd.DataFrame(st.session_state.latencias_rerun)
+    with panel_diagnostico:
+        st.markdown("**⏱️ Latencia de reruns**")
+        st.dataframe(
+            latencias.groupby(["Alcance", "Nombre"], sort=False)["ms"].agg(
+                Reruns="size", Ultimo_ms="last", Mediana_ms="median", Max_ms="max"
+            ).reset_index().style.format({"Ultimo_ms": "{:,.0f}", "Mediana_ms": "{:,.0f}", "Max_ms": "{:,.0f}"}),
+            use_container_width=True,
+            hide_index=True
+        )
 
 # Footer
 st.markdown("---")
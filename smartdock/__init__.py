@@ -0,0 +1,52 @@
+"""
+SmartDock Pro - librería headless de agendamiento de muelles.
+
+Los submódulos se importan de forma perezosa: `import smartdock` no carga
+pandas ni numpy hasta que se usa alguno de los nombres exportados.
+"""
+import importlib
+
+_EXPORTS = {
+    "DockOptimizerPro": "smartdock.optimizer",
+    "COLUMNAS_ENTRADA": "smartdock.optimizer",
+    "ESTADOS": "smartdock.optimizer",
+    "generar_escenario": "smartdock.escenarios",
+    "generar_manifiesto": "smartdock.escenarios",
+    "PRODUCTOS_CONFIG": "smartdock.escenarios",
+    "calcular_kpis": "smartdock.kpis",
+    "analizar_agenda": "smartdock.analitica",
+    "ScheduleCache": "smartdock.cache",
+    "IncrementalScheduler": "smartdock.incremental",
+    "DockEventSimulator": "smartdock.simulacion",
+    "simular_montecarlo": "smartdock.montecarlo",
+    "bandas_percentiles": "smartdock.montecarlo",
+    "planificar_capacidad": "smartdock.planificador",
+    "ImprovementOptimizer": "smartdock.busqueda_local",
+    "TruckStore": "smartdock.almacen",
+    "importar_manifiesto": "smartdock.importacion",
+    "exportar_agenda": "smartdock.exportacion",
+    "exportar_manifiesto": "smartdock.exportacion",
+    "planificar_red": "smartdock.multisitio",
+    "ClienteAgendas": "smartdock.servicio",
+    "AgendaEnVivo": "smartdock.eventos",
+    "IngestorEventos": "smartdock.eventos",
+    "AgendaRodante": "smartdock.horizonte",
+    "comparar_politicas": "smartdock.comparacion",
+    "POLITICAS": "smartdock.politicas",
+    "MatrizCapacidades": "smartdock.capacidades",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    modulo = _EXPORTS.get(name)
+    if modulo is None:
+        raise AttributeError(f"module 'smartdock' has no attribute {name!r}")
+    valor = getattr(importlib.import_module(modulo), name)
+    globals()[name] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
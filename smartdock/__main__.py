@@ -0,0 +1,5 @@
+import sys
+
+from smartdock.cli import main
+
+sys.exit(main())
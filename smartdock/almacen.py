@@ -0,0 +1,273 @@
+"""
+Almacén columnar e indexado de camiones.
+
+Reemplaza al DataFrame de object dtype como fuente de verdad del manifiesto:
+- Búsqueda por ID_Camion en O(1) (dict ID -> fila)
+- Altas in-place en arrays con capacidad que se duplica (sin pd.concat)
+- Bajas con lápida y compactación amortizada (se conserva el orden del
+  manifiesto, que desempata el orden de atención)
+- Producto, Tipo_Producto y Prioridad codificados como categóricas
+- Llegadas como minutos enteros desde la medianoche de la fecha base
+- Vistas de columnas sin copia para el optimizador (columnas())
+"""
+import copy
+import hashlib
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from smartdock.optimizer import COLUMNAS_ENTRADA
+
+_CAPACIDAD_INICIAL = 64
+
+# Columna -> dtype de sus códigos categóricos
+_CATEGORICAS = {
+    "Producto": np.int32,
+    "Tipo_Producto": np.int16,
+    "Prioridad": np.int16,
+}
+
+
+class _Categorias:
+    """Diccionario de categorías con códigos estables (solo crece)"""
+    
+    def __init__(self, valores=()):
+        self.valores = []
+        self._codigo = {}
+        for valor in valores:
+            self.codigo(valor)
+    
+    def codigo(self, valor):
+        codigo = self._codigo.get(valor)
+        if codigo is None:
+            codigo = self._codigo[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+    
+    def codificar(self, serie):
+        """Codifica una columna completa de forma vectorizada"""
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+        mapa = np.fromiter((self.codigo(v) for v in unicos), dtype=np.int64, count=len(unicos))
+        return mapa[codigos]
+
+
+class TruckStore:
+    """
+    Manifiesto de camiones en columnas NumPy.
+    
+    Las vistas devueltas por columnas() son válidas hasta la siguiente
+    modificación del almacén.
+    """
+    
+    def __init__(self, base_date=None, capacidad=_CAPACIDAD_INICIAL):
+        self.base = datetime.combine(base_date or datetime.now().date(), datetime.min.time())
+        self.categorias = {
+            "Producto": _Categorias(),
+            "Tipo_Producto": _Categorias(["Seco", "Refrigerado"]),
+            "Prioridad": _Categorias(["Alta", "Media", "Baja"]),
+        }
+        self._n = 0            # filas usadas (incluye lápidas)
+        self._muertos = 0
+        self._indice = {}      # ID_Camion -> fila
+        self._reservar(max(capacidad, 1))
+        self.version = 0
+        self._hash = None
+    
+    @classmethod
+    def desde_frame(cls, df_camiones, base_date=None):
+        """Construye el almacén a partir de un DataFrame con COLUMNAS_ENTRADA"""
+        if base_date is None and len(df_camiones):
+            base_date = pd.Timestamp(pd.to_datetime(df_camiones['Hora_Llegada_Est']).min()).date()
+        almacen = cls(base_date=base_date, capacidad=max(len(df_camiones), _CAPACIDAD_INICIAL))
+        almacen.agregar_lote(df_camiones)
+        return almacen
+    
+    # ───────────────────────── Capacidad ─────────────────────────
+    def _reservar(self, capacidad):
+        viejos = getattr(self, "_cols", None)
+        cols = {
+            "ID_Camion": np.empty(capacidad, dtype=object),
+            "Llegada_Min": np.zeros(capacidad, dtype=np.int32),
+            "Duracion_Min": np.zeros(capacidad, dtype=np.int32),
+            "vivo": np.zeros(capacidad, dtype=bool),
+        }
+        for columna, dtype in _CATEGORICAS.items():
+            cols[columna] = np.zeros(capacidad, dtype=dtype)
+        if viejos is not None:
+            for columna, arr in viejos.items():
+                cols[columna][:self._n] = arr[:self._n]
+        self._cols = cols
+    
+    def _asegurar_capacidad(self, extra):
+        capacidad = len(self._cols["vivo"])
+        if self._n + extra > capacidad:
+            while self._n + extra > capacidad:
+                capacidad *= 2
+            self._reservar(capacidad)
+    
+    def _modificado(self):
+        self.version += 1
+        self._hash = None
+    
+    def _compactar(self):
+        """Elimina las lápidas conservando el orden del manifiesto"""
+        vivos = np.flatnonzero(self._cols["vivo"][:self._n])
+        m = len(vivos)
+        for arr in self._cols.values():
+            arr[:m] = arr[vivos]
+            arr[m:self._n] = arr[m:self._n].dtype.type(0) if arr.dtype != object else None
+        self._n = m
+        self._muertos = 0
+        self._indice = {id_camion: i for i, id_camion in enumerate(self._cols["ID_Camion"][:m].tolist())}
+    
+    # ───────────────────────── Conversión de valores ─────────────────────────
+    def _a_minutos(self, llegada):
+        return int((pd.Timestamp(llegada) - pd.Timestamp(self.base)) // pd.Timedelta(minutes=1))
+    
+    # ───────────────────────── Altas / bajas / cambios ─────────────────────────
+    def agregar(self, registro):
+        """Agrega un camión (dict con COLUMNAS_ENTRADA); el ID debe ser nuevo"""
+        id_camion = registro["ID_Camion"]
+        if id_camion in self._indice:
+            raise ValueError(f"El camión {id_camion} ya existe")
+        self._asegurar_capacidad(1)
+        i = self._n
+        cols = self._cols
+        cols["ID_Camion"][i] = id_camion
+        for columna in _CATEGORICAS:
+            cols[columna][i] = self.categorias[columna].codigo(registro[columna])
+        cols["Llegada_Min"][i] = self._a_minutos(registro["Hora_Llegada_Est"])
+        cols["Duracion_Min"][i] = int(registro["Duracion_Min"])
+        cols["vivo"][i] = True
+        self._indice[id_camion] = i
+        self._n += 1
+        self._modificado()
+    
+    def agregar_lote(self, df_camiones):
+        """Agrega muchos camiones de una vez (conversión vectorizada)"""
+        m = len(df_camiones)
+        if m == 0:
+            return
+        ids = df_camiones["ID_Camion"].tolist()
+        if len(set(ids)) != m or any(id_camion in self._indice for id_camion in ids):
+            raise ValueError("ID_Camion duplicado en el lote")
+        self._asegurar_capacidad(m)
+        i, cols = self._n, self._cols
+        cols["ID_Camion"][i:i + m] = ids
+        for columna in _CATEGORICAS:
+            cols[columna][i:i + m] = self.categorias[columna].codificar(df_camiones[columna])
+        llegadas = pd.to_datetime(df_camiones["Hora_Llegada_Est"]).to_numpy()
+        cols["Llegada_Min"][i:i + m] = (llegadas - np.datetime64(self.base)) // np.timedelta64(1, 'm')
+        cols["Duracion_Min"][i:i + m] = df_camiones["Duracion_Min"].to_numpy().astype(np.int32)
+        cols["vivo"][i:i + m] = True
+        self._indice.update(zip(ids, range(i, i + m)))
+        self._n += m
+        self._modificado()
+    
+    def actualizar(self, id_camion, **campos):
+        """Modifica campos de un camión en su lugar"""
+        i = self._indice[id_camion]
+        cols = self._cols
+        for columna, valor in campos.items():
+            if columna in _CATEGORICAS:
+                cols[columna][i] = self.categorias[columna].codigo(valor)
+            elif columna == "Hora_Llegada_Est":
+                cols["Llegada_Min"][i] = self._a_minutos(valor)
+            elif columna == "Duracion_Min":
+                cols["Duracion_Min"][i] = int(valor)
+            else:
+                raise KeyError(f"Columna no editable: {columna}")
+        self._modificado()
+    
+    def eliminar(self, id_camion):
+        i = self._indice.pop(id_camion)
+        self._cols["vivo"][i] = False
+        self._cols["ID_Camion"][i] = None
+        self._muertos += 1
+        if self._muertos * 2 > self._n:
+            self._compactar()
+        self._modificado()
+    
+    def limpiar(self):
+        self.__init__(base_date=self.base.date())
+    
+    def copia(self):
+        """Copia independiente, para modificar sin tocar el original hasta confirmar"""
+        return copy.deepcopy(self)
+    
+    # ───────────────────────── Consultas ─────────────────────────
+    def __len__(self):
+        return self._n - self._muertos
+    
+    def __contains__(self, id_camion):
+        return id_camion in self._indice
+    
+    @property
+    def empty(self):
+        return len(self) == 0
+    
+    def ids(self):
+        """IDs en orden del manifiesto"""
+        return self.columnas()["ID_Camion"].tolist()
+    
+    def obtener(self, id_camion):
+        """Registro de un camión como dict de COLUMNAS_ENTRADA (O(1))"""
+        i = self._indice[id_camion]
+        cols = self._cols
+        registro = {"ID_Camion": id_camion}
+        for columna in _CATEGORICAS:
+            registro[columna] = self.categorias[columna].valores[cols[columna][i]]
+        registro["Hora_Llegada_Est"] = self.base + timedelta(minutes=int(cols["Llegada_Min"][i]))
+        registro["Duracion_Min"] = int(cols["Duracion_Min"][i])
+        return registro
+    
+    def columnas(self):
+        """
+        Vistas sin copia de las columnas vivas (compacta antes si hay lápidas):
+        ID_Camion, Producto, Tipo_Producto, Prioridad (códigos), Llegada_Min y
+        Duracion_Min. Las categorías están en self.categorias.
+        """
+        if self._muertos:
+            self._compactar()
+        n = self._n
+        return {columna: arr[:n] for columna, arr in self._cols.items() if columna != "vivo"}
+    
+    def llegadas(self):
+        """Hora_Llegada_Est como datetime64[us]"""
+        return (
+            np.datetime64(self.base, 'us')
+            + self.columnas()["Llegada_Min"].astype('timedelta64[m]')
+        )
+    
+    def to_frame(self):
+        """DataFrame con COLUMNAS_ENTRADA (columnas categóricas, sin copiar códigos)"""
+        cols = self.columnas()
+        datos = {"ID_Camion": cols["ID_Camion"]}
+        for columna in _CATEGORICAS:
+            datos[columna] = pd.Categorical.from_codes(
+                cols[columna], categories=pd.Index(self.categorias[columna].valores, dtype=object)
+            )
+        datos["Hora_Llegada_Est"] = self.llegadas()
+        datos["Duracion_Min"] = cols["Duracion_Min"]
+        return pd.DataFrame(datos, columns=COLUMNAS_ENTRADA)
+    
+    def hash_contenido(self):
+        """Hash del contenido (memoizado por versión) para claves de caché"""
+        if self._hash is None:
+            cols = self.columnas()
+            h = hashlib.sha1()
+            h.update(repr(self.base).encode())
+            h.update("\x1f".join(map(str, cols["ID_Camion"].tolist())).encode())
+            for columna in _CATEGORICAS:
+                valores = self.categorias[columna].valores
+                h.update(repr(valores).encode())
+                h.update(cols[columna].tobytes())
+            h.update(cols["Llegada_Min"].tobytes())
+            h.update(cols["Duracion_Min"].tobytes())
+            self._hash = h.hexdigest()
+        return self._hash
+    
+    def memoria_bytes(self):
+        """Bytes ocupados por los arrays (sin contar los strings de ID)"""
+        return sum(arr.nbytes for arr in self._cols.values())
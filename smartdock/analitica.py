@@ -0,0 +1,232 @@
+"""
+Analytics de una agenda por barrido (sweep-line), en una sola pasada.
+
+Se extraen una vez los arreglos de llegada, inicio y fin y con ellos se
+calculan:
+- ocupación de cada muelle por intervalo de tiempo
+- cola del patio (camiones que llegaron y esperan muelle) por intervalo
+- pico de muelles ocupados y pico de cola, con su momento
+- huecos ociosos entre operaciones consecutivas de cada muelle
+- los KPIs de calcular_kpis y el resumen por prioridad
+
+Para un conjunto de intervalos [a, b), el tiempo acumulado hasta t es
+C(t) = Σ_{a<=t} (t - a) - Σ_{b<=t} (t - b), y el nivel (intervalos abiertos)
+es #{a <= t} - #{b <= t}: con los extremos ordenados son searchsorted y
+sumas prefijas, sin recorrer los intervalos por banda.
+"""
+import numpy as np
+import pandas as pd
+
+from smartdock.kpis import contar_a_tiempo, kpis_de_totales
+from smartdock.optimizer import DockOptimizerPro
+
+INTERVALO_DEFECTO_MIN = 30
+MAX_INTERVALOS = 2000
+_US_POR_MIN = 60_000_000
+
+
+def acumulada(extremos, t):
+    """Σ_{x<=t} (t - x) para cada t, con extremos ordenados (float)"""
+    prefijo = np.concatenate(([0.0], np.cumsum(extremos)))
+    k = np.searchsorted(extremos, t, side="right")
+    return k * t - prefijo[k]
+
+
+def _barrido(inicios, fines, bordes):
+    """
+    Intervalos [inicios, fines) contra bandas de igual ancho que empiezan en
+    bordes[0] = 0.
+    Devuelve (nivel promedio por banda, nivel máximo por banda, pico,
+    instante del pico o None).
+    """
+    a, b = np.sort(inicios), np.sort(fines)
+    area = acumulada(a, bordes) - acumulada(b, bordes)
+    promedio = np.diff(area) / np.diff(bordes)
+    
+    # El nivel solo sube en un inicio: el máximo de una banda es el nivel al
+    # abrirla o el de alguno de los inicios que caen dentro
+    izquierdos = bordes[:-1]
+    maximo = np.searchsorted(a, izquierdos, side="right") - np.searchsorted(b, izquierdos, side="right")
+    if not len(a):
+        return promedio, maximo, 0, None
+    nivel = np.arange(1, len(a) + 1) - np.searchsorted(b, a, side="right")
+    banda = np.minimum((a // bordes[1]).astype(np.int64), len(maximo) - 1)
+    np.maximum.at(maximo, banda, nivel)
+    pico = int(np.argmax(nivel))
+    return promedio, maximo, int(nivel[pico]), a[pico]
+
+
+def _microsegundos(serie):
+    """Fechas -> int64 µs desde epoch (NaT queda como el mínimo int64)"""
+    return serie.to_numpy().astype("datetime64[us]").view(np.int64)
+
+
+def _numero_muelle(etiqueta):
+    """"Muelle 10 (Seco)" -> 10, para ordenar las etiquetas numéricamente"""
+    partes = str(etiqueta).split()
+    return int(partes[1]) if len(partes) > 1 and partes[1].isdigit() else float("inf")
+
+
+def _kpis(resultado_df, costo_total, fines_us, asignado, a_fecha):
+    """Los KPIs de calcular_kpis con los arreglos ya extraídos"""
+    if len(resultado_df) == 0:
+        return kpis_de_totales(0, 0, 0, 0, 0, None, costo_total)
+    espera = resultado_df["Espera_Min"].to_numpy()
+    return kpis_de_totales(
+        len(resultado_df), contar_a_tiempo(resultado_df["Estado"]), espera.sum(), espera.max(),
+        resultado_df["Duracion_Min"].to_numpy().sum(),
+        a_fecha(fines_us[asignado].max()) if asignado.any() else None, costo_total
+    )
+
+
+def _por_prioridad(resultado_df):
+    """Cargas y espera promedio por prioridad (factorize + bincount)"""
+    codigos, prioridades = pd.factorize(resultado_df["Prioridad"], sort=True)
+    validos = codigos >= 0
+    cargas = np.bincount(codigos[validos], minlength=len(prioridades))
+    espera = np.bincount(codigos[validos], weights=resultado_df["Espera_Min"].to_numpy()[validos],
+                         minlength=len(prioridades))
+    resumen = pd.DataFrame({
+        "Prioridad": np.asarray(prioridades, dtype=object),
+        "Cargas": cargas,
+        "Espera_Promedio_Min": espera / np.maximum(cargas, 1)
+    })
+    # Alta, Media, Baja y luego cualquier otra
+    peso = resumen["Prioridad"].map(DockOptimizerPro.PRIORIDAD_PESOS).fillna(0)
+    return resumen.iloc[np.argsort(-peso.to_numpy(), kind="stable")].reset_index(drop=True)
+
+
+def analizar_agenda(resultado_df, costo_total, intervalo_min=INTERVALO_DEFECTO_MIN):
+    """
+    Analytics completos de una agenda (formato de agendar_camiones).
+    Devuelve un dict con:
+    - kpis: mismo dict que calcular_kpis
+    - por_prioridad: DataFrame Prioridad, Cargas, Espera_Promedio_Min
+    - ocupacion: DataFrame (índice = inicio de cada intervalo, una columna por
+      muelle) con el % ocupado
+    - cola: DataFrame por intervalo con Cola_Promedio, Cola_Max y
+      Muelles_Ocupados_Promedio
+    - muelles: DataFrame por muelle con Operaciones, Ocupado_Min,
+      Ocupacion_Pct, Huecos, Hueco_Total_Min y Hueco_Max_Min
+    - huecos: DataFrame Muelle, Desde, Hasta, Minutos (tiempo ocioso entre
+      operaciones consecutivas del mismo muelle)
+    - pico_muelles / momento_pico_muelles, pico_cola / momento_pico_cola
+    - intervalo_min: ancho de intervalo usado (se agranda si la agenda
+      cubre más de MAX_INTERVALOS intervalos)
+    """
+    llegadas = _microsegundos(resultado_df["Llegada_Teorica"])
+    inicios = _microsegundos(resultado_df["Inicio_Real"])
+    fines = _microsegundos(resultado_df["Fin_Real"])
+    asignado = inicios != np.iinfo(np.int64).min
+    
+    def a_fecha(us):
+        return pd.Timestamp(int(us), unit="us")
+    
+    analisis = {
+        "kpis": _kpis(resultado_df, costo_total, fines, asignado, a_fecha),
+        "por_prioridad": _por_prioridad(resultado_df),
+        "ocupacion": pd.DataFrame(),
+        "cola": pd.DataFrame(columns=["Cola_Promedio", "Cola_Max", "Muelles_Ocupados_Promedio"]),
+        "muelles": pd.DataFrame(columns=["Muelle", "Operaciones", "Ocupado_Min", "Ocupacion_Pct",
+                                         "Huecos", "Hueco_Total_Min", "Hueco_Max_Min"]),
+        "huecos": pd.DataFrame(columns=["Muelle", "Desde", "Hasta", "Minutos"]),
+        "pico_muelles": 0, "momento_pico_muelles": None,
+        "pico_cola": 0, "momento_pico_cola": None,
+        "intervalo_min": intervalo_min
+    }
+    if not asignado.any():
+        return analisis
+    
+    llegadas, inicios, fines = llegadas[asignado], inicios[asignado], fines[asignado]
+    
+    # Horizonte en intervalos enteros, relativo a t0 (floats sin pérdida)
+    ancho = intervalo_min * _US_POR_MIN
+    t0 = min(llegadas.min(), inicios.min()) // ancho * ancho
+    fin_horizonte = fines.max()
+    num_intervalos = max(1, -(-(fin_horizonte - t0) // ancho))
+    if num_intervalos > MAX_INTERVALOS:
+        intervalo_min = -(-intervalo_min * num_intervalos // MAX_INTERVALOS)
+        ancho = intervalo_min * _US_POR_MIN
+        t0 = min(llegadas.min(), inicios.min()) // ancho * ancho
+        num_intervalos = max(1, -(-(fin_horizonte - t0) // ancho))
+    bordes = np.arange(num_intervalos + 1, dtype=np.float64) * ancho
+    llegadas_rel = (llegadas - t0).astype(np.float64)
+    inicios_rel = (inicios - t0).astype(np.float64)
+    fines_rel = (fines - t0).astype(np.float64)
+    indice = pd.to_datetime(t0 + np.arange(num_intervalos, dtype=np.int64) * ancho, unit="us").rename("Intervalo")
+    
+    # Cola del patio: [llegada, inicio) de quienes esperaron; muelles: [inicio, fin)
+    esperaron = inicios_rel > llegadas_rel
+    cola_prom, cola_max, pico_cola, momento_cola = _barrido(
+        llegadas_rel[esperaron], inicios_rel[esperaron], bordes
+    )
+    ocupados_prom, _, pico_muelles, momento_muelles = _barrido(inicios_rel, fines_rel, bordes)
+    analisis.update({
+        "cola": pd.DataFrame({
+            "Cola_Promedio": cola_prom,
+            "Cola_Max": cola_max,
+            "Muelles_Ocupados_Promedio": ocupados_prom
+        }, index=indice),
+        "pico_muelles": pico_muelles,
+        "momento_pico_muelles": a_fecha(t0 + momento_muelles) if momento_muelles is not None else None,
+        "pico_cola": pico_cola,
+        "momento_pico_cola": a_fecha(t0 + momento_cola) if momento_cola is not None else None,
+        "intervalo_min": intervalo_min
+    })
+    
+    # Por muelle: un único orden (muelle, inicio) sirve para ocupación y huecos.
+    # Se factoriza la columna completa (sobre la categórica de la agenda son
+    # sus códigos) y se descartan las etiquetas sin filas con muelle
+    codigos, etiquetas = pd.factorize(resultado_df["Muelle_Asignado"])
+    codigos = codigos[asignado]
+    usadas = np.flatnonzero(np.bincount(codigos, minlength=len(etiquetas)))
+    etiquetas = np.asarray(etiquetas, dtype=object)[usadas]
+    rango = sorted(range(len(etiquetas)), key=lambda i: (_numero_muelle(etiquetas[i]), str(etiquetas[i])))
+    recodificar = np.zeros(len(usadas) and usadas[-1] + 1, dtype=np.int64)
+    recodificar[usadas[rango]] = np.arange(len(rango))
+    codigos, etiquetas = recodificar[codigos], etiquetas[rango]
+    inicios_us = inicios - t0
+    extension = int(inicios_us.max()) + 1
+    if len(etiquetas) * extension < 2 ** 62:
+        # Clave entera (muelle, inicio): un argsort en lugar de lexsort
+        orden = np.argsort(codigos * extension + inicios_us)
+    else:
+        orden = np.lexsort((inicios_us, codigos))
+    codigos, inicios_rel, fines_rel = codigos[orden], inicios_rel[orden], fines_rel[orden]
+    cortes = np.searchsorted(codigos, np.arange(len(etiquetas) + 1))
+    
+    ocupacion = np.empty((num_intervalos, len(etiquetas)))
+    for i in range(len(etiquetas)):
+        propios = slice(cortes[i], cortes[i + 1])
+        area = (acumulada(inicios_rel[propios], bordes)
+                - acumulada(np.sort(fines_rel[propios]), bordes))
+        ocupacion[:, i] = np.diff(area) / ancho * 100
+    analisis["ocupacion"] = pd.DataFrame(np.clip(ocupacion, 0, 100), index=indice, columns=etiquetas)
+    
+    # Huecos: siguiente inicio del mismo muelle menos el fin anterior
+    mismo_muelle = codigos[1:] == codigos[:-1]
+    hueco = np.where(mismo_muelle, inicios_rel[1:] - fines_rel[:-1], 0.0)
+    con_hueco = np.flatnonzero(hueco > 0)
+    minutos_hueco = hueco[con_hueco] / _US_POR_MIN
+    analisis["huecos"] = pd.DataFrame({
+        "Muelle": etiquetas[codigos[con_hueco]],
+        "Desde": pd.to_datetime(t0 + fines_rel[con_hueco].astype(np.int64), unit="us"),
+        "Hasta": pd.to_datetime(t0 + inicios_rel[con_hueco + 1].astype(np.int64), unit="us"),
+        "Minutos": minutos_hueco
+    })
+    
+    ocupado_min = np.bincount(codigos, weights=fines_rel - inicios_rel, minlength=len(etiquetas)) / _US_POR_MIN
+    huecos_muelle = codigos[con_hueco]
+    hueco_max = np.zeros(len(etiquetas))
+    np.maximum.at(hueco_max, huecos_muelle, minutos_hueco)
+    horizonte_min = num_intervalos * intervalo_min
+    analisis["muelles"] = pd.DataFrame({
+        "Muelle": etiquetas,
+        "Operaciones": np.diff(cortes),
+        "Ocupado_Min": ocupado_min,
+        "Ocupacion_Pct": ocupado_min / horizonte_min * 100,
+        "Huecos": np.bincount(huecos_muelle, minlength=len(etiquetas)),
+        "Hueco_Total_Min": np.bincount(huecos_muelle, weights=minutos_hueco, minlength=len(etiquetas)),
+        "Hueco_Max_Min": hueco_max
+    })
+    return analisis
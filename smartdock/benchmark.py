@@ -0,0 +1,279 @@
+"""
+Benchmark reproducible del agendador y de la preparación de datos de la UI.
+
+    python -m smartdock.benchmark --suite rapida --salida bench.json
+    python -m smartdock.benchmark --suite rapida --baseline baseline.json --umbral 0.25
+
+Cada caso es un manifiesto sintético con semilla fija (camiones x muelles x
+fracción refrigerada). Por fase se mide el tiempo de pared (mediana de
+--repeticiones corridas) y el pico de memoria (tracemalloc, en una corrida
+aparte para no inflar los tiempos):
+- puntaje: columnas de entrada y scores
+- orden: orden de atención
+- asignacion: heaps de muelles y pasos por camión
+- resultado: DataFrame de resultado
+- kpis: calcular_kpis
+- gantt: figura del Gantt (WebGL o bandas) serializada
+- tabla: índices de la tabla de detalle, un filtro, un orden y una página
+
+Con --baseline se compara contra un JSON anterior y el proceso sale con
+código 1 si alguna fase empeora más que el umbral.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from smartdock.gantt import figura_gantt
+from smartdock.kpis import calcular_kpis
+from smartdock.montecarlo import PARAMETROS_DEFECTO, _generar_dia
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.tabla import TablaAsignaciones
+
+FASES = ["puntaje", "orden", "asignacion", "resultado", "kpis", "gantt", "tabla"]
+
+SUITES = {
+    "rapida": {
+        "camiones": [100, 1_000, 10_000],
+        "muelles": [1, 10],
+        "fraccion_refrigerado": [0.3],
+    },
+    "estandar": {
+        "camiones": [100, 1_000, 10_000, 100_000],
+        "muelles": [1, 10, 100],
+        "fraccion_refrigerado": [0.0, 0.3, 0.7],
+    },
+    "completa": {
+        "camiones": [100, 1_000, 10_000, 100_000, 1_000_000],
+        "muelles": [1, 10, 100],
+        "fraccion_refrigerado": [0.0, 0.3, 0.7],
+    },
+}
+
+BASE_DATE = date(2000, 1, 1)
+HORA_INICIO = 8
+# Diferencias menores a esto se consideran ruido aunque superen el umbral
+MIN_DELTA_S = 0.005
+MIN_DELTA_BYTES = 1 << 20
+
+
+def manifiesto_sintetico(num_camiones, fraccion_refrigerado, semilla=0):
+    """Manifiesto reproducible; la ventana de llegadas crece con el volumen"""
+    rng = np.random.default_rng(semilla)
+    parametros = {
+        **PARAMETROS_DEFECTO,
+        "num_camiones": num_camiones,
+        "ventana_llegada_min": max(360, num_camiones // 10),
+        "fraccion_refrigerado": fraccion_refrigerado,
+    }
+    llegada_min, duracion, peso, refrigerado = _generar_dia(rng, parametros)
+    prioridad_por_peso = {v: k for k, v in DockOptimizerPro.PRIORIDAD_PESOS.items()}
+    inicio = pd.Timestamp(BASE_DATE) + pd.Timedelta(hours=HORA_INICIO)
+    return pd.DataFrame({
+        "ID_Camion": [f"TRK-{i:07d}" for i in range(num_camiones)],
+        "Producto": np.where(refrigerado, "Alimentos Refrigerados", "Electrónica"),
+        "Tipo_Producto": np.where(refrigerado, "Refrigerado", "Seco"),
+        "Prioridad": pd.Series(peso).map(prioridad_por_peso).to_numpy(),
+        "Hora_Llegada_Est": inicio + pd.to_timedelta(llegada_min, unit="min"),
+        "Duracion_Min": duracion.astype(np.int64),
+    })
+
+
+def config_sintetica(num_muelles, fraccion_refrigerado):
+    """Los primeros muelles son Frío en proporción a la carga refrigerada"""
+    frio = int(round(num_muelles * fraccion_refrigerado))
+    if fraccion_refrigerado > 0 and num_muelles > 1:
+        frio = min(max(frio, 1), num_muelles - 1)
+    return {d: ("Frío" if d <= frio else "Seco") for d in range(1, num_muelles + 1)}
+
+
+def _fases(df, dock_config):
+    """
+    Generador que ejecuta el pipeline fase por fase: entrega el nombre de la
+    fase justo antes de ejecutarla, para que el llamador pueda medirla. Cada
+    fase llama a los mismos métodos que DockOptimizerPro.agendar_camiones.
+    """
+    optimizer = DockOptimizerPro(len(dock_config), dock_config, HORA_INICIO, base_date=BASE_DATE)
+    
+    yield "puntaje"
+    cols, llegada_ns, duraciones, tipos = optimizer._columnas_planas(df)
+    
+    yield "orden"
+    orden = optimizer._ordenar(np.asarray(cols["scores"], dtype=float))
+    
+    yield "asignacion"
+    pasos = optimizer._asignar_en_orden(orden, llegada_ns, duraciones, tipos)
+    
+    yield "resultado"
+    resultado_df, costo_total = optimizer._resultado_tramo(
+        cols, tipos, duraciones, orden, pasos, 0, len(orden)
+    )
+    
+    yield "kpis"
+    calcular_kpis(resultado_df, costo_total)
+    
+    yield "gantt"
+    resultado_valido = resultado_df[resultado_df["Inicio_Real"].notna()]
+    if len(resultado_valido):
+        figura_gantt(resultado_valido)[0].to_json()
+    
+    yield "tabla"
+    tabla = TablaAsignaciones(resultado_df)
+    posiciones = tabla.filtrar(Estado=tabla.opciones("Estado")[:1])
+    tabla.pagina(tabla.ordenar(posiciones, "Espera_Min", False), 1, 100)
+
+
+def _correr(df, dock_config, con_memoria):
+    """Una corrida completa; devuelve {fase: (segundos, pico_bytes)}"""
+    medidas = {}
+    fase, t0 = None, 0.0
+    
+    def cerrar():
+        pico = 0
+        if con_memoria:
+            pico = tracemalloc.get_traced_memory()[1]
+        medidas[fase] = (time.perf_counter() - t0, pico)
+    
+    for siguiente in _fases(df, dock_config):
+        if fase is not None:
+            cerrar()
+        fase = siguiente
+        if con_memoria:
+            tracemalloc.reset_peak()
+            tracemalloc.clear_traces()
+        t0 = time.perf_counter()
+    cerrar()
+    return medidas
+
+
+def medir_caso(num_camiones, num_muelles, fraccion_refrigerado, repeticiones=3, semilla=0):
+    """Mide un caso; devuelve un dict con tiempos (s) y picos (bytes) por fase"""
+    df = manifiesto_sintetico(num_camiones, fraccion_refrigerado, semilla)
+    dock_config = config_sintetica(num_muelles, fraccion_refrigerado)
+    
+    tiempos = {f: [] for f in FASES}
+    for _ in range(repeticiones):
+        for fase, (segundos, _) in _correr(df, dock_config, False).items():
+            tiempos[fase].append(segundos)
+    
+    tracemalloc.start()
+    try:
+        memoria = _correr(df, dock_config, True)
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        "caso": f"{num_camiones}x{num_muelles}@{fraccion_refrigerado:g}",
+        "camiones": num_camiones,
+        "muelles": num_muelles,
+        "fraccion_refrigerado": fraccion_refrigerado,
+        "fases": {
+            fase: {
+                "tiempo_s": statistics.median(tiempos[fase]),
+                "pico_memoria_bytes": memoria[fase][1],
+            }
+            for fase in FASES
+        },
+    }
+
+
+def correr_suite(suite, repeticiones=3, semilla=0, progreso=None):
+    config = SUITES[suite]
+    casos = []
+    for n in config["camiones"]:
+        for muelles in config["muelles"]:
+            for fraccion in config["fraccion_refrigerado"]:
+                caso = medir_caso(n, muelles, fraccion, repeticiones, semilla)
+                casos.append(caso)
+                if progreso:
+                    progreso(caso)
+    return {
+        "suite": suite,
+        "semilla": semilla,
+        "repeticiones": repeticiones,
+        "entorno": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "maquina": platform.machine(),
+        },
+        "casos": casos,
+    }
+
+
+def comparar(actual, baseline, umbral=0.25):
+    """
+    Compara dos resultados de correr_suite. Devuelve una lista de
+    regresiones (caso, fase, métrica, antes, después, variación relativa).
+    """
+    previos = {c["caso"]: c["fases"] for c in baseline["casos"]}
+    regresiones = []
+    for caso in actual["casos"]:
+        fases_previas = previos.get(caso["caso"])
+        if fases_previas is None:
+            continue
+        for fase, medida in caso["fases"].items():
+            previa = fases_previas.get(fase)
+            if previa is None:
+                continue
+            for metrica, minimo in (("tiempo_s", MIN_DELTA_S), ("pico_memoria_bytes", MIN_DELTA_BYTES)):
+                antes, despues = previa[metrica], medida[metrica]
+                if despues - antes > minimo and despues > antes * (1 + umbral):
+                    regresiones.append(
+                        (caso["caso"], fase, metrica, antes, despues, despues / antes - 1 if antes else float("inf"))
+                    )
+    return regresiones
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="smartdock.benchmark",
+        description="Benchmark por fases del agendador y de la preparación de datos de la UI"
+    )
+    parser.add_argument("--suite", choices=list(SUITES), default="rapida")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default=None, help="JSON de resultados (por defecto, stdout)")
+    parser.add_argument("--baseline", default=None, help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--umbral", type=float, default=0.25,
+                        help="Empeoramiento relativo tolerado por fase (0.25 = 25%%)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    def progreso(caso):
+        total = sum(f["tiempo_s"] for f in caso["fases"].values())
+        print(f"{caso['caso']:>22}  {total:8.3f} s", file=sys.stderr)
+    
+    resultado = correr_suite(args.suite, args.repeticiones, args.semilla, progreso)
+    texto = json.dumps(resultado, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regresiones = comparar(resultado, baseline, args.umbral)
+        for caso, fase, metrica, antes, despues, variacion in regresiones:
+            print(f"REGRESIÓN {caso} {fase} {metrica}: {antes:.4g} -> {despues:.4g} "
+                  f"(+{variacion:.0%})", file=sys.stderr)
+        if regresiones:
+            return 1
+        print(f"Sin regresiones frente a {args.baseline} (umbral {args.umbral:.0%})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Optimizador de mejora "anytime" que reduce el demurrage total.
+
+Parte de la agenda greedy de DockOptimizerPro y aplica búsqueda local con
+tres movimientos sobre las secuencias de cada muelle:
+- Intercambiar dos camiones dentro del mismo muelle
+- Mover un camión a otra posición / otro muelle compatible
+- Intercambiar camiones entre dos muelles compatibles
+
+Cada movimiento se evalúa con un delta incremental: solo se recalculan los
+muelles tocados, desde la primera posición cambiada, y el recálculo se corta
+en cuanto un fin de descarga coincide con el de la secuencia anterior. Las
+esperas se acumulan en nanosegundos enteros, sin error de redondeo.
+"""
+import random
+import time as _time
+
+import numpy as np
+import pandas as pd
+
+from smartdock.optimizer import DockOptimizerPro
+
+NS_POR_MIN = 60_000_000_000
+
+
+class ImprovementOptimizer:
+    """
+    Búsqueda local sobre la agenda greedy con presupuesto de tiempo.
+    La agenda actual es siempre la mejor encontrada (solo se aceptan
+    movimientos que no empeoran), así que resultado() puede consultarse en
+    cualquier momento entre llamadas a ejecutar().
+    """
+    
+    VENTANA_VECINOS = 4   # posiciones alrededor del punto de inserción/intercambio
+    PROB_LATERAL = 0.05   # probabilidad de aceptar movimientos de delta 0
+    
+    def __init__(self, dock_config, start_hour=8, base_date=None, semilla=0):
+        self.optimizer = DockOptimizerPro(
+            num_docks=len(dock_config),
+            dock_config=dock_config,
+            start_hour=start_hour,
+            base_date=base_date
+        )
+        self._rng = random.Random(semilla)
+        self.iteraciones = 0
+        self.mejoras = 0
+        self.historial = []   # (segundos, costo_usd) tras cada mejora
+    
+    # ───────────────────────── Carga ─────────────────────────
+    def cargar(self, df_camiones):
+        """Agenda con el greedy y prepara las secuencias por muelle"""
+        self._df = df_camiones
+        opt = self.optimizer
+        llegadas = pd.to_datetime(df_camiones['Hora_Llegada_Est']).to_numpy()
+        self._llegadas = llegadas
+        self._llegada = ((llegadas - np.datetime64(opt.start_time)) // np.timedelta64(1, 'ns')).tolist()
+        duraciones = [int(d) for d in df_camiones['Duracion_Min'].to_numpy()]
+        self._duracion_min = duraciones
+        self._duracion = [d * NS_POR_MIN for d in duraciones]
+        self._tipos = df_camiones['Tipo_Producto'].tolist()
+        
+        orden, pasos = opt._agendar_columnas(
+            opt._calcular_scores(df_camiones), self._llegada, duraciones, self._tipos
+        )
+        
+        pools = opt._pools_por_tipo()
+        self._libre0 = {d: libre for pool in pools.values() for libre, d in pool}
+        self._compatibles = {}   # tipo -> (muelles compatibles, como lista y como conjunto)
+        for tipo in set(self._tipos):
+            muelles = [d for d in opt.capacidades.muelles_compatibles(tipo) if d in self._libre0]
+            self._compatibles[tipo] = (muelles, frozenset(muelles))
+        
+        asignaciones = {d: [] for d in self._libre0}
+        self._muelle_de = {}
+        for i, (dock_id, inicio, _, _) in zip(orden.tolist(), pasos):
+            if dock_id is not None:
+                asignaciones[dock_id].append((inicio, i))
+                self._muelle_de[i] = dock_id
+        
+        self._seq, self._inicio, self._fin, self._acum = {}, {}, {}, {}
+        for d, lista in asignaciones.items():
+            self._seq[d] = [i for _, i in sorted(lista)]
+            self._inicio[d], self._fin[d], self._acum[d] = [], [], [0]
+            self._recalcular(d, 0)
+        
+        self._asignables = sorted(self._muelle_de)
+        self.espera_total_ns = sum(acum[-1] for acum in self._acum.values())
+        self.costo_inicial = self.costo_actual
+        self.iteraciones = 0
+        self.mejoras = 0
+        self.historial = [(0.0, self.costo_inicial)]
+        return self
+    
+    @property
+    def costo_actual(self):
+        """Demurrage total (USD) de la mejor agenda encontrada"""
+        return self.espera_total_ns / NS_POR_MIN / 60 * self.optimizer.COSTO_DEMURRAGE_POR_HORA
+    
+    # ───────────────────────── Evaluación incremental ─────────────────────────
+    def _recalcular(self, d, desde):
+        """Recalcula inicios, fines y esperas acumuladas del muelle d desde una posición"""
+        seq, llegada, duracion = self._seq[d], self._llegada, self._duracion
+        inicio = self._inicio[d][:desde]
+        fin = self._fin[d][:desde]
+        acum = self._acum[d][:desde + 1]
+        prev = fin[-1] if fin else self._libre0[d]
+        total = acum[-1]
+        for t in seq[desde:]:
+            a = llegada[t]
+            start = a if a > prev else prev
+            total += start - a
+            prev = start + duracion[t]
+            inicio.append(start)
+            fin.append(prev)
+            acum.append(total)
+        self._inicio[d], self._fin[d], self._acum[d] = inicio, fin, acum
+    
+    def _delta(self, d, nueva_seq, desde, hasta, desplazamiento):
+        """
+        Cambio de espera total (ns) del muelle d si su secuencia pasa a
+        nueva_seq. Las posiciones < desde no cambian; para j > hasta el camión
+        nueva_seq[j] estaba en la posición j - desplazamiento de la secuencia vieja.
+        """
+        fin_viejo, acum = self._fin[d], self._acum[d]
+        llegada, duracion = self._llegada, self._duracion
+        prev = fin_viejo[desde - 1] if desde > 0 else self._libre0[d]
+        nueva = 0
+        for j in range(desde, len(nueva_seq)):
+            t = nueva_seq[j]
+            a = llegada[t]
+            start = a if a > prev else prev
+            nueva += start - a
+            prev = start + duracion[t]
+            if j > hasta and fin_viejo[j - desplazamiento] == prev:
+                # Mismo fin que antes para el mismo camión: el resto no cambia
+                return nueva - (acum[j - desplazamiento + 1] - acum[desde])
+        return nueva - (acum[-1] - acum[desde])
+    
+    def _cerca(self, d, instante):
+        """Posición del muelle d cercana a un instante (con ruido aleatorio)"""
+        base = int(np.searchsorted(self._inicio[d], instante))
+        w = self.VENTANA_VECINOS
+        return base + self._rng.randint(-w, w)
+    
+    # ───────────────────────── Movimientos ─────────────────────────
+    def _proponer(self):
+        """
+        Propone un movimiento aleatorio. Devuelve (delta_ns, cambios) donde
+        cambios es una lista de (muelle, nueva_seq, desde), o None si no aplica.
+        """
+        rng = self._rng
+        t = rng.choice(self._asignables)
+        d = self._muelle_de[t]
+        seq = self._seq[d]
+        i = seq.index(t)
+        compatibles = self._compatibles[self._tipos[t]][0]
+        tipo_mov = rng.random()
+        
+        if tipo_mov < 0.4:
+            # Intercambio dentro del muelle
+            j = i + rng.choice((-1, 1)) * rng.randint(1, self.VENTANA_VECINOS)
+            if not 0 <= j < len(seq):
+                return None
+            nueva = list(seq)
+            nueva[i], nueva[j] = nueva[j], nueva[i]
+            lo, hi = min(i, j), max(i, j)
+            return self._delta(d, nueva, lo, hi, 0), [(d, nueva, lo)]
+        
+        e = rng.choice(compatibles)
+        if tipo_mov < 0.75:
+            # Mover el camión a otra posición (del mismo u otro muelle)
+            if e == d:
+                nueva = list(seq)
+                del nueva[i]
+                q = min(max(self._cerca(d, self._inicio[d][i]), 0), len(nueva))
+                if q == i:
+                    return None
+                nueva.insert(q, t)
+                lo, hi = min(i, q), max(i, q)
+                return self._delta(d, nueva, lo, hi, 0), [(d, nueva, lo)]
+            
+            nueva_d = seq[:i] + seq[i + 1:]
+            seq_e = self._seq[e]
+            q = min(max(self._cerca(e, self._inicio[d][i]), 0), len(seq_e))
+            nueva_e = seq_e[:q] + [t] + seq_e[q:]
+            delta = self._delta(d, nueva_d, i, i - 1, -1) + self._delta(e, nueva_e, q, q, 1)
+            return delta, [(d, nueva_d, i), (e, nueva_e, q)]
+        
+        # Intercambio entre muelles compatibles
+        seq_e = self._seq[e]
+        if e == d or not seq_e:
+            return None
+        k = min(max(self._cerca(e, self._inicio[d][i]), 0), len(seq_e) - 1)
+        u = seq_e[k]
+        if d not in self._compatibles[self._tipos[u]][1]:
+            return None
+        nueva_d, nueva_e = list(seq), list(seq_e)
+        nueva_d[i], nueva_e[k] = u, t
+        delta = self._delta(d, nueva_d, i, i, 0) + self._delta(e, nueva_e, k, k, 0)
+        return delta, [(d, nueva_d, i), (e, nueva_e, k)]
+    
+    def _aplicar(self, cambios):
+        for d, nueva, desde in cambios:
+            self._seq[d] = nueva
+            for t in nueva[desde:]:
+                self._muelle_de[t] = d
+            self._recalcular(d, desde)
+    
+    def ejecutar(self, presupuesto_s=5.0, max_iter=None, callback=None):
+        """
+        Corre búsqueda local hasta agotar el presupuesto de tiempo (o max_iter).
+        callback(segundos, costo_usd) se invoca en cada mejora.
+        Devuelve el mejor costo (USD) encontrado.
+        """
+        if not self._asignables:
+            return self.costo_actual
+        inicio = _time.perf_counter()
+        fin = inicio + presupuesto_s
+        rng = self._rng
+        n = 0
+        while max_iter is None or n < max_iter:
+            if n % 256 == 0 and _time.perf_counter() >= fin:
+                break
+            n += 1
+            propuesta = self._proponer()
+            if propuesta is None:
+                continue
+            delta, cambios = propuesta
+            if delta < 0 or (delta == 0 and rng.random() < self.PROB_LATERAL):
+                self._aplicar(cambios)
+                self.espera_total_ns += delta
+                if delta < 0:
+                    self.mejoras += 1
+                    transcurrido = _time.perf_counter() - inicio
+                    self.historial.append((transcurrido, self.costo_actual))
+                    if callback is not None:
+                        callback(transcurrido, self.costo_actual)
+        self.iteraciones += n
+        return self.costo_actual
+    
+    # ───────────────────────── Resultado ─────────────────────────
+    def resultado(self):
+        """(resultado_df, costo_total) de la mejor agenda, en orden de inicio"""
+        df = self._df
+        if df.empty:
+            return pd.DataFrame(), 0
+        n = len(df)
+        pasos = [(None, 0, 0, 0)] * n
+        claves = []
+        for d, seq in self._seq.items():
+            for t, start, end in zip(seq, self._inicio[d], self._fin[d]):
+                pasos[t] = (d, start, end, (start - self._llegada[t]) / 1e9 / 60)
+                claves.append((start, d, t))
+        orden = [t for _, _, t in sorted(claves)]
+        orden += [t for t in range(n) if pasos[t][0] is None]
+        orden = np.asarray(orden, dtype=np.int64)
+        return self.optimizer._construir_resultado(
+            df['ID_Camion'].to_numpy()[orden].tolist(),
+            df['Producto'].to_numpy()[orden].tolist(),
+            [self._tipos[i] for i in orden],
+            df['Prioridad'].to_numpy()[orden].tolist(),
+            self._llegadas[orden],
+            [self._duracion_min[i] for i in orden],
+            [pasos[i] for i in orden]
+        )
@@ -0,0 +1,110 @@
+"""
+Caché LRU de agendas calculadas.
+
+La clave es un hash del contenido del manifiesto, la configuración de
+muelles, la hora de inicio y la fecha base, de modo que dos reruns con la
+misma entrada reutilizan la misma agenda sin volver a optimizar.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+
+from smartdock.optimizer import DockOptimizerPro
+
+
+class ScheduleCache:
+    """
+    Caché de resultados de agendar_camiones con:
+    - Tamaño acotado y desalojo LRU
+    - Contadores de aciertos / fallos
+    - Lock interno para compartirla entre sesiones (hilos) de Streamlit
+    
+    Los DataFrames devueltos se comparten entre llamadas: no modificarlos
+    in-place (copiar antes de formatear).
+    """
+    
+    def __init__(self, max_entries=32):
+        if max_entries < 1:
+            raise ValueError("max_entries debe ser >= 1")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def clave(df_camiones, dock_config, hora_inicio, base_date=None, motor=DockOptimizerPro):
+        """
+        Hash de contenido de la entrada completa de la optimización
+        (manifiesto como DataFrame o TruckStore)
+        """
+        h = hashlib.sha1()
+        h.update(motor.__qualname__.encode())
+        if hasattr(df_camiones, "hash_contenido"):
+            # TruckStore: hash memoizado por versión del almacén
+            h.update(df_camiones.hash_contenido().encode())
+        else:
+            h.update(repr(list(df_camiones.columns)).encode())
+            h.update(pd.util.hash_pandas_object(df_camiones, index=False).to_numpy().tobytes())
+        h.update(repr(sorted(dock_config.items())).encode())
+        h.update(repr((hora_inicio, base_date)).encode())
+        return h.hexdigest()
+    
+    def obtener(self, df_camiones, dock_config, hora_inicio, base_date=None, motor=DockOptimizerPro,
+                calcular=None):
+        """
+        Devuelve (resultado_df, costo_total), optimizando solo si no está en caché.
+        motor: clase con la interfaz de DockOptimizerPro (p.ej. DockEventSimulator)
+        calcular: función opcional (df, dock_config, hora_inicio, base_date, motor)
+        que reemplaza la optimización local (ej. servicio.ClienteAgendas)
+        """
+        # La fecha efectiva forma parte de la clave (el turno cambia a medianoche)
+        base_date = base_date or datetime.now().date()
+        clave = self.clave(df_camiones, dock_config, hora_inicio, base_date, motor)
+        with self._lock:
+            if clave in self._entradas:
+                self.hits += 1
+                self._entradas.move_to_end(clave)
+                return self._entradas[clave]
+            self.misses += 1
+        
+        if calcular is not None:
+            resultado = calcular(df_camiones, dock_config, hora_inicio, base_date, motor)
+        else:
+            optimizer = motor(
+                num_docks=len(dock_config),
+                dock_config=dock_config,
+                start_hour=hora_inicio,
+                base_date=base_date
+            )
+            resultado = optimizer.agendar_camiones(df_camiones)
+        
+        with self._lock:
+            self._entradas[clave] = resultado
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+        return resultado
+    
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def estadisticas(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entradas": len(self._entradas),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+    
+    def __len__(self):
+        return len(self._entradas)
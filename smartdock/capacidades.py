@@ -0,0 +1,144 @@
+"""
+Capacidades de muelles y requisitos de productos, como bitmasks.
+
+Cada muelle tiene un conjunto de capacidades ("Seco+Peligrosos") y cada tipo
+de producto exige un conjunto de capacidades ("Refrigerado+Peligroso" exige
+Frío y Peligrosos). Un camión puede ir a un muelle si la máscara del muelle
+contiene toda la máscara de requisitos.
+
+Los muelles con la misma máscara forman una clase de compatibilidad. Para
+cada tipo de producto se calcula una sola vez la tupla de clases elegibles,
+así que en la asignación encontrar los muelles compatibles es un lookup en
+un dict, sin recorrer los muelles.
+
+La configuración clásica {dock_id: "Seco" | "Frío"} sigue siendo válida y
+da exactamente la regla anterior (Refrigerado solo en Frío, el resto en Seco).
+"""
+import numpy as np
+import pandas as pd
+
+SEPARADOR = "+"
+
+# Capacidades de muelle, en el orden de sus bits
+CAPACIDADES = ["Seco", "Frío", "Congelado", "Peligrosos", "Sobredimensionado", "Carga Lateral"]
+_BIT = {capacidad: 1 << i for i, capacidad in enumerate(CAPACIDADES)}
+
+# Partes de un Tipo_Producto -> capacidad que exigen. Un producto sin parte
+# de temperatura es Seco: "Peligroso" exige Seco y Peligrosos.
+REQUISITOS_TEMPERATURA = {"Seco": "Seco", "Refrigerado": "Frío", "Congelado": "Congelado"}
+REQUISITOS_ADICIONALES = {
+    "Peligroso": "Peligrosos",
+    "Sobredimensionado": "Sobredimensionado",
+    "Carga Lateral": "Carga Lateral",
+}
+TIPOS_PRODUCTO = [*REQUISITOS_TEMPERATURA, *REQUISITOS_ADICIONALES]
+
+# Combinaciones frecuentes, para elegir en la UI
+TIPOS_PRODUCTO_COMUNES = [
+    "Seco", "Refrigerado", "Congelado", "Peligroso", "Refrigerado+Peligroso",
+    "Sobredimensionado", "Carga Lateral", "Sobredimensionado+Carga Lateral",
+]
+
+
+def _partes(texto):
+    return [parte.strip() for parte in str(texto).split(SEPARADOR) if parte.strip()]
+
+
+def mascara_muelle(tipo_muelle):
+    """Bitmask de una configuración de muelle ("Seco+Peligrosos" o un iterable de capacidades)"""
+    nombres = _partes(tipo_muelle) if isinstance(tipo_muelle, str) else tipo_muelle
+    mascara = 0
+    for nombre in nombres:
+        if nombre not in _BIT:
+            raise ValueError(f"Capacidad de muelle desconocida: {nombre!r} (válidas: {CAPACIDADES})")
+        mascara |= _BIT[nombre]
+    return mascara
+
+
+def etiqueta_muelle(tipo_muelle):
+    """Forma canónica de una configuración de muelle ("Frío+Seco" -> "Seco+Frío")"""
+    mascara = mascara_muelle(tipo_muelle)
+    return SEPARADOR.join(c for c in CAPACIDADES if mascara & _BIT[c])
+
+
+def mascara_requisitos(tipo_producto):
+    """
+    "Refrigerado+Peligroso" -> bitmask de capacidades exigidas. Las partes
+    desconocidas se ignoran, así que un tipo no catalogado se trata como Seco
+    (igual que antes); validar con tipo_producto_valido.
+    """
+    mascara, con_temperatura = 0, False
+    for parte in _partes(tipo_producto):
+        if parte in REQUISITOS_TEMPERATURA:
+            mascara |= _BIT[REQUISITOS_TEMPERATURA[parte]]
+            con_temperatura = True
+        elif parte in REQUISITOS_ADICIONALES:
+            mascara |= _BIT[REQUISITOS_ADICIONALES[parte]]
+    if not con_temperatura:
+        mascara |= _BIT["Seco"]
+    return mascara
+
+
+def tipo_producto_valido(tipo_producto):
+    """Combinación de TIPOS_PRODUCTO con a lo sumo una temperatura"""
+    partes = _partes(tipo_producto) if isinstance(tipo_producto, str) else []
+    return (
+        bool(partes)
+        and all(p in REQUISITOS_TEMPERATURA or p in REQUISITOS_ADICIONALES for p in partes)
+        and sum(p in REQUISITOS_TEMPERATURA for p in partes) <= 1
+    )
+
+
+def tipos_producto_validos(serie):
+    """tipo_producto_valido vectorizado: se evalúa una vez por valor distinto"""
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    validos = np.fromiter((tipo_producto_valido(v) for v in unicos), dtype=bool, count=len(unicos))
+    return validos[codigos]
+
+
+class _ClasesPorTipo(dict):
+    """Tipo_Producto -> tupla de clases elegibles, calculada al primer uso"""
+    
+    def __init__(self, matriz):
+        super().__init__()
+        self._matriz = matriz
+    
+    def __missing__(self, tipo_producto):
+        clases = self[tipo_producto] = self._matriz.elegibles_requisitos(mascara_requisitos(tipo_producto))
+        return clases
+
+
+class MatrizCapacidades:
+    """
+    Clases de compatibilidad de una configuración de muelles.
+    - clase_de_muelle: dock_id -> bitmask de capacidades (su clase)
+    - clases: bitmasks distintas presentes
+    - por_tipo[tipo_producto]: tupla de clases elegibles (lookup O(1) tras el primer uso)
+    """
+    
+    def __init__(self, dock_config):
+        self.clase_de_muelle = {dock_id: mascara_muelle(tipo) for dock_id, tipo in dock_config.items()}
+        self.clases = sorted(set(self.clase_de_muelle.values()))
+        self._por_requisitos = {}
+        self.por_tipo = _ClasesPorTipo(self)
+    
+    def elegibles_requisitos(self, requisitos):
+        """Clases cuya máscara contiene todos los bits de requisitos"""
+        clases = self._por_requisitos.get(requisitos)
+        if clases is None:
+            clases = self._por_requisitos[requisitos] = tuple(
+                clase for clase in self.clases if requisitos & ~clase == 0
+            )
+        return clases
+    
+    def elegibles(self, tipo_producto):
+        return self.por_tipo[tipo_producto]
+    
+    def compatible(self, tipo_producto, dock_id):
+        clase = self.clase_de_muelle.get(dock_id)
+        return clase is not None and clase in self.por_tipo[tipo_producto]
+    
+    def muelles_compatibles(self, tipo_producto):
+        """dock_ids compatibles con el producto, ordenados"""
+        clases = set(self.por_tipo[tipo_producto])
+        return sorted(d for d, clase in self.clase_de_muelle.items() if clase in clases)
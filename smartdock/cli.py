@@ -0,0 +1,185 @@
+"""
+Entrada de línea de comandos para corridas batch de planificación.
+
+    python -m smartdock manifiesto.csv --muelles "1:Seco,2:Seco,3:Frío" \\
+        --hora-inicio 8 --salida agenda.csv --kpis kpis.json
+
+Con --horizonte se simula el día por horizonte rodante: cada --paso minutos
+se replanifican solo las llegadas de los próximos --horizonte minutos y se
+fijan las asignaciones de la ventana --congelado.
+
+Con --sitios el manifiesto es de red (columna Sitio, y Fecha opcional) y se
+agenda cada (sitio, día) por separado:
+    
+    python -m smartdock red.csv --sitios sitios.json --salida agenda_red.csv
+
+donde sitios.json es {"CD-Norte": {"muelles": {"1": "Seco", "2": "Frío"},
+"hora_inicio": 6, "dias": {"2026-03-02": {"muelles": {...}}}}, ...}.
+"""
+import argparse
+import json
+import sys
+
+
+def _parse_muelles(texto):
+    """
+    Convierte "1:Seco,2:Seco+Peligrosos,3:Frío" en
+    {1: "Seco", 2: "Seco+Peligrosos", 3: "Frío"} (capacidades unidas con "+")
+    """
+    from smartdock.capacidades import etiqueta_muelle
+    
+    config = {}
+    for parte in texto.split(","):
+        dock_id, _, tipo = parte.strip().partition(":")
+        try:
+            if not dock_id.isdigit() or not tipo:
+                raise ValueError
+            config[int(dock_id)] = etiqueta_muelle(tipo)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Muelle inválido: {parte!r}") from None
+    return config
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="smartdock",
+        description="Agenda un manifiesto de camiones en los muelles y calcula KPIs"
+    )
+    parser.add_argument("manifiesto", help="CSV o Parquet con columnas ID_Camion, Producto, "
+                        "Tipo_Producto, Prioridad, Hora_Llegada_Est, Duracion_Min")
+    parser.add_argument("--muelles", type=_parse_muelles, default={1: "Seco", 2: "Seco", 3: "Frío"},
+                        help='Configuración de muelles, ej. "1:Seco,2:Seco+Peligrosos,3:Frío"')
+    parser.add_argument("--hora-inicio", type=int, default=8, choices=range(24),
+                        metavar="0-23", help="Hora de apertura del patio")
+    parser.add_argument("--motor", choices=["greedy", "eventos"], default="greedy",
+                        help="greedy: orden global por prioridad; eventos: despacho por llegadas reales")
+    parser.add_argument("--salida", default="-",
+                        help="CSV o Parquet (.parquet) de la agenda resultante (- = CSV a stdout)")
+    parser.add_argument("--bloque", type=int, default=100_000,
+                        help="Filas por bloque de lectura y escritura")
+    parser.add_argument("--kpis", default=None,
+                        help="Archivo JSON donde escribir los KPIs (por defecto, stderr)")
+    parser.add_argument("--sitios", default=None,
+                        help="JSON con la configuración de muelles por sitio (manifiesto de red)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos para agendar las particiones de red (por defecto, todos los CPUs)")
+    parser.add_argument("--horizonte", type=float, default=None,
+                        help="Minutos de horizonte rodante: simula el día replanificando solo ese tramo")
+    parser.add_argument("--congelado", type=float, default=60,
+                        help="Minutos de ventana congelada del horizonte rodante")
+    parser.add_argument("--paso", type=float, default=15,
+                        help="Minutos entre replanificaciones del horizonte rodante")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    # Importaciones pesadas solo después de validar argumentos
+    from smartdock.exportacion import exportar_bloques
+    from smartdock.importacion import importar_manifiesto
+    from smartdock.kpis import AcumuladorKpis, kpis_serializables
+    from smartdock.optimizer import DockOptimizerPro
+    from smartdock.simulacion import DockEventSimulator
+    
+    motor = DockEventSimulator if args.motor == "eventos" else DockOptimizerPro
+    if args.sitios:
+        return _main_red(args, motor)
+    
+    try:
+        almacen, reporte = importar_manifiesto(args.manifiesto, tam_bloque=args.bloque)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    _reportar_invalidas(reporte)
+    
+    if args.horizonte is not None:
+        return _main_horizonte(args, motor, almacen)
+    
+    # La fecha base del turno es la del manifiesto, no la de hoy
+    optimizer = motor(
+        num_docks=len(args.muelles),
+        dock_config=args.muelles,
+        start_hour=args.hora_inicio,
+        base_date=almacen.base.date()
+    )
+    
+    # La agenda se escribe por bloques, acumulando los KPIs en el camino
+    acumulador = AcumuladorKpis()
+    
+    def bloques():
+        for bloque, costo_bloque in optimizer.agendar_por_bloques(almacen, args.bloque):
+            acumulador.agregar(bloque, costo_bloque)
+            yield bloque
+    
+    exportar_bloques(bloques(), sys.stdout if args.salida == "-" else args.salida)
+    
+    _escribir_kpis(args, kpis_serializables(acumulador.kpis()))
+    return 0
+
+
+def _main_horizonte(args, motor, almacen):
+    """Día completo por horizonte rodante (ver smartdock.horizonte)"""
+    from smartdock.exportacion import exportar_bloques
+    from smartdock.horizonte import AgendaRodante
+    from smartdock.kpis import calcular_kpis, kpis_serializables
+    
+    try:
+        agenda = AgendaRodante(args.muelles, args.hora_inicio, almacen.base.date(),
+                               congelado_min=args.congelado, horizonte_min=args.horizonte, motor=motor)
+        resultado_df, costo_total = agenda.cargar(almacen).completar(args.paso)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    
+    exportar_bloques([resultado_df] if len(resultado_df) else [],
+                     sys.stdout if args.salida == "-" else args.salida)
+    kpis = kpis_serializables(calcular_kpis(resultado_df, costo_total))
+    kpis["replanificaciones"] = agenda.replanificaciones
+    _escribir_kpis(args, kpis)
+    return 0
+
+
+def _reportar_invalidas(reporte):
+    if reporte.filas_invalidas:
+        print(f"Aviso: {reporte.filas_invalidas} filas inválidas descartadas "
+              f"({reporte.filas_validas} de {reporte.filas_leidas} válidas)", file=sys.stderr)
+        print(reporte.errores.head(20).to_string(index=False), file=sys.stderr)
+
+
+def _escribir_kpis(args, kpis):
+    kpis = json.dumps(kpis, ensure_ascii=False, indent=2)
+    if args.kpis:
+        with open(args.kpis, "w", encoding="utf-8") as f:
+            f.write(kpis)
+    else:
+        print(kpis, file=sys.stderr)
+
+
+def _main_red(args, motor):
+    """Planificación multi-sitio y multi-día (ver smartdock.multisitio)"""
+    from smartdock.exportacion import exportar_bloques
+    from smartdock.kpis import kpis_serializables
+    from smartdock.multisitio import leer_manifiesto_red, planificar_red
+    
+    try:
+        with open(args.sitios, encoding="utf-8") as f:
+            config_sitios = json.load(f)
+        df_camiones, reporte = leer_manifiesto_red(args.manifiesto, tam_bloque=args.bloque)
+        _reportar_invalidas(reporte)
+        agenda, kpis_particiones, kpis_red = planificar_red(
+            df_camiones, config_sitios, motor=motor, max_workers=args.workers
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    
+    exportar_bloques([agenda] if len(agenda) else [], sys.stdout if args.salida == "-" else args.salida)
+    _escribir_kpis(args, {
+        "red": kpis_serializables(kpis_red),
+        "particiones": [
+            kpis_serializables({**fila, "Fecha": str(fila["Fecha"])})
+            for fila in kpis_particiones.to_dict("records")
+        ]
+    })
+    return 0
@@ -0,0 +1,157 @@
+"""
+Comparación de políticas de despacho en paralelo.
+
+El manifiesto se convierte una sola vez en arrays planos (llegadas en ns,
+duraciones, pesos de prioridad, IDs y códigos de producto, tipo y prioridad)
+que se publican en memoria compartida. Cada worker se adjunta a esos bloques
+en modo solo lectura, sin copiar ni deserializar el manifiesto, y agenda con
+su política: orden de atención, asignación, armado de la agenda y KPIs. Al
+proceso principal solo vuelve el resultado de cada política.
+
+Con tantos workers como políticas, comparar cinco políticas tarda
+aproximadamente lo mismo que agendar con una.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from smartdock.kpis import calcular_kpis
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.politicas import POLITICAS, nombre_politica
+
+# Manifiesto compartido con los workers (ver _iniciar_worker)
+_COMPARTIDO = {}
+
+
+def _publicar(arreglos):
+    """Copia cada array a su propio bloque de memoria compartida"""
+    bloques, descriptores = [], {}
+    for nombre, arreglo in arreglos.items():
+        bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+        np.ndarray(arreglo.shape, arreglo.dtype, buffer=bloque.buf)[...] = arreglo
+        bloques.append(bloque)
+        descriptores[nombre] = (bloque.name, arreglo.shape, arreglo.dtype.str)
+    return bloques, descriptores
+
+
+def _iniciar_worker(descriptores, contexto):
+    """Adjunta los bloques (solo lectura); quedan abiertos mientras viva el worker"""
+    bloques = []
+    for nombre, (nombre_bloque, forma, dtype) in descriptores.items():
+        bloque = shared_memory.SharedMemory(name=nombre_bloque)
+        arreglo = np.ndarray(forma, dtype, buffer=bloque.buf)
+        arreglo.flags.writeable = False
+        bloques.append(bloque)
+        _COMPARTIDO[nombre] = arreglo
+    _COMPARTIDO.update(contexto, _bloques=bloques)
+
+
+def _liberar_worker():
+    bloques = _COMPARTIDO.pop("_bloques", [])
+    _COMPARTIDO.clear()
+    for bloque in bloques:
+        bloque.close()
+
+
+def _evaluar_politica(tarea):
+    """
+    Agenda el manifiesto compartido con una política.
+    Devuelve (k, resultado_df, costo_total, kpis, segundos).
+    """
+    k, politica = tarea
+    inicio = time.perf_counter()
+    datos = _COMPARTIDO
+    dock_config = datos["dock_config"]
+    optimizer = datos["motor"](len(dock_config), dock_config, datos["hora_inicio"],
+                               base_date=datos["base_date"], politica=politica)
+    llegada_ns = datos["llegada_ns"]
+    llegadas = (np.datetime64(optimizer.start_time, "ns")
+                + llegada_ns.astype("timedelta64[ns]")).astype(datos["dtype_llegadas"])
+    cols = {
+        "ID_Camion": datos["ids"] if "ids" in datos else datos["ids_objeto"],
+        "llegadas": llegadas,
+        "duraciones": datos["duraciones"],
+    }
+    for columna in ("Producto", "Tipo_Producto", "Prioridad"):
+        cols[columna] = datos["unicos"][columna][datos[columna]]
+    tipos = cols["Tipo_Producto"].tolist()
+    duraciones = datos["duraciones"].tolist()
+    
+    scores = optimizer._scores_desde(datos["pesos"], llegadas, datos["duraciones"])
+    orden, pasos = optimizer._agendar_columnas(scores, llegada_ns.tolist(), duraciones, tipos)
+    resultado_df, costo_total = optimizer._resultado_tramo(cols, tipos, duraciones, orden, pasos, 0, len(orden))
+    kpis = calcular_kpis(resultado_df, costo_total)
+    return k, resultado_df, costo_total, kpis, time.perf_counter() - inicio
+
+
+def comparar_politicas(df_camiones, dock_config, politicas=None, hora_inicio=8, base_date=None,
+                       motor=DockOptimizerPro, max_workers=None):
+    """
+    Agenda el mismo manifiesto (DataFrame o TruckStore) con cada política
+    (nombres de POLITICAS o funciones de módulo), una por worker.
+    Devuelve (resumen, agendas):
+    - resumen: DataFrame con una fila por política: Politica, los KPIs de
+      calcular_kpis y Tiempo_s (segundos de su worker)
+    - agendas: {politica: (resultado_df, costo_total)}, igual que
+      motor(..., politica=politica).agendar_camiones
+    """
+    politicas = list(POLITICAS) if politicas is None else list(politicas)
+    nombres = [nombre_politica(p) for p in politicas]
+    base = motor(len(dock_config), dock_config, hora_inicio, base_date=base_date)
+    if len(df_camiones) == 0 or not politicas:
+        vacio = calcular_kpis(pd.DataFrame(), 0)
+        resumen = pd.DataFrame([{"Politica": nombre, **vacio, "Tiempo_s": 0.0} for nombre in nombres])
+        return resumen, {nombre: (pd.DataFrame(), 0) for nombre in nombres}
+    
+    # Columnas planas una sola vez (las mismas que usa agendar_camiones)
+    cols = base._columnas_entrada(df_camiones)
+    arreglos = {
+        "llegada_ns": ((cols["llegadas"] - np.datetime64(base.start_time)) // np.timedelta64(1, "ns")).astype(np.int64),
+        "duraciones": np.asarray(cols["duraciones"], dtype=np.int64),
+        "pesos": pd.Series(cols["Prioridad"]).map(base.PRIORIDAD_PESOS).fillna(1).to_numpy(dtype=float),
+    }
+    contexto = {
+        "motor": motor, "dock_config": base.dock_config, "hora_inicio": hora_inicio,
+        "base_date": base.base_date, "dtype_llegadas": cols["llegadas"].dtype.str, "unicos": {},
+    }
+    for columna in ("Producto", "Tipo_Producto", "Prioridad"):
+        codigos, unicos = pd.factorize(cols[columna])
+        arreglos[columna] = codigos.astype(np.int32)
+        contexto["unicos"][columna] = np.asarray(unicos, dtype=object)
+    ids = np.asarray(cols["ID_Camion"])
+    if ids.dtype == object and pd.api.types.infer_dtype(ids, skipna=False) == "string":
+        # Texto de ancho fijo: cabe en memoria compartida y vuelve como str
+        ids = ids.astype(str)
+    if ids.dtype == object:
+        contexto["ids_objeto"] = ids
+    else:
+        arreglos["ids"] = ids
+    
+    tareas = list(enumerate(politicas))
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tareas))
+    bloques, descriptores = _publicar(arreglos)
+    try:
+        if max_workers == 1:
+            _iniciar_worker(descriptores, contexto)
+            try:
+                resultados = list(map(_evaluar_politica, tareas))
+            finally:
+                _liberar_worker()
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_iniciar_worker,
+                                     initargs=(descriptores, contexto)) as pool:
+                resultados = list(pool.map(_evaluar_politica, tareas))
+    finally:
+        for bloque in bloques:
+            bloque.close()
+            bloque.unlink()
+    
+    filas, agendas = [], {}
+    for k, resultado_df, costo_total, kpis, segundos in resultados:
+        agendas[nombres[k]] = (resultado_df, costo_total)
+        filas.append({"Politica": nombres[k], **kpis, "Tiempo_s": segundos})
+    return pd.DataFrame(filas), agendas
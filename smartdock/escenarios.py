@@ -0,0 +1,254 @@
+"""
+Generador de escenarios aleatorios de llegada de camiones.
+
+Vectorizado con NumPy y reproducible: la misma semilla y los mismos
+parámetros dan el mismo manifiesto, sin importar el tamaño de bloque con el
+que se consuma. El manifiesto se genera en unidades fijas de
+_BLOQUE_GENERACION camiones, cada una con su propio generador derivado de la
+semilla, y se entrega en bloques de tam_bloque filas: la memoria queda
+acotada aunque el manifiesto tenga millones de camiones.
+
+Uso por línea de comandos (CSV o Parquet en streaming):
+    python -m smartdock.escenarios --camiones 2000000 --semilla 42 \\
+        --llegadas pico --dias 7 --salida manifiesto.parquet
+"""
+import argparse
+import sys
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+# Productos con tipos
+PRODUCTOS_CONFIG = [
+    ("Electrónicos", "Seco"),
+    ("Papel", "Seco"),
+    ("Textil", "Seco"),
+    ("Alimentos Refrigerados", "Refrigerado"),
+    ("Farmacéuticos", "Refrigerado"),
+    ("Automotriz", "Seco"),
+    ("Químicos", "Seco")
+]
+
+DURACIONES_MIN = [30, 45, 60, 90, 120]
+PRIORIDADES = ["Alta", "Alta", "Media", "Media", "Baja"]  # Más Altas
+PROCESOS_LLEGADA = ["uniforme", "poisson", "pico"]
+DISTRIBUCIONES_DURACION = ["discreta", "lognormal"]
+
+PARAMETROS_MANIFIESTO = {
+    "dias": 1,                          # días consecutivos desde base_date
+    "ventana_llegada_min": 360,         # llegadas dentro de los primeros N minutos de cada día
+    "proceso_llegada": "uniforme",      # "uniforme", "poisson" o "pico"
+    "pico_min": 120,                    # ola única de "pico" (si olas es None)
+    "pico_desvio_min": 60,
+    "olas": None,                       # [(centro_min, desvio_min, peso), ...] para "pico"
+    "distribucion_duracion": "discreta",
+    "duraciones_min": DURACIONES_MIN,   # "discreta": valores posibles
+    "pesos_duraciones": None,           # None = equiprobables
+    "duracion_media_min": 60,           # "lognormal": media y desvío en minutos
+    "duracion_desvio_min": 30,
+    "duracion_rango_min": (15, 240),    # "lognormal": recorte
+    "redondeo_duracion_min": 5,         # "lognormal": múltiplo
+    "productos": PRODUCTOS_CONFIG,      # catálogo [(producto, tipo), ...]
+    "mix_productos": None,              # {producto: peso}; None = equiprobables
+    "mix_prioridad": {p: PRIORIDADES.count(p) / len(PRIORIDADES) for p in dict.fromkeys(PRIORIDADES)},
+}
+
+TAM_BLOQUE = 100_000
+_BLOQUE_GENERACION = 65_536
+_MAX_IDS_CORTOS = 9000      # hasta aquí, IDs TRK-1000..TRK-9999 al azar
+
+
+def minutos_llegada(rng, n, parametros, total=None, desde=0.0):
+    """
+    n llegadas en minutos (float) desde la apertura según proceso_llegada,
+    sobre una ventana de ventana_llegada_min.
+    - poisson: intervalos exponenciales con tasa total / ventana; al generar
+      por bloques, total es el tamaño del manifiesto y desde la última
+      llegada del bloque anterior
+    - pico: mezcla de olas normales (olas, o una sola ola pico_min ± pico_desvio_min)
+    - uniforme: minutos enteros equiprobables en [0, ventana]
+    """
+    ventana = parametros["ventana_llegada_min"]
+    proceso = parametros["proceso_llegada"]
+    if proceso == "poisson":
+        return desde + np.cumsum(rng.exponential(ventana / (total or n), size=n))
+    if proceso == "pico":
+        olas = parametros.get("olas")
+        if not olas:
+            return rng.normal(parametros["pico_min"], parametros["pico_desvio_min"], size=n)
+        centros, desvios, pesos = (np.asarray(c, dtype=float) for c in zip(*olas))
+        ola = rng.choice(len(olas), size=n, p=pesos / pesos.sum())
+        return rng.normal(centros[ola], desvios[ola])
+    if proceso == "uniforme":
+        return rng.integers(0, ventana + 1, size=n).astype(float)
+    raise ValueError(f"Proceso de llegada desconocido: {proceso!r}")
+
+
+def duraciones_min(rng, n, parametros):
+    """n duraciones enteras en minutos según distribucion_duracion"""
+    distribucion = parametros.get("distribucion_duracion", "discreta")
+    if distribucion == "discreta":
+        valores = np.asarray(parametros["duraciones_min"])
+        pesos = parametros["pesos_duraciones"]
+        if pesos is not None:
+            pesos = np.asarray(pesos, dtype=float) / np.sum(pesos)
+        return rng.choice(valores, size=n, p=pesos)
+    if distribucion == "lognormal":
+        # Parámetros de la normal subyacente a partir de media y desvío
+        media, desvio = parametros["duracion_media_min"], parametros["duracion_desvio_min"]
+        sigma2 = np.log1p((desvio / media) ** 2)
+        minutos = rng.lognormal(np.log(media) - sigma2 / 2, np.sqrt(sigma2), size=n)
+        paso = parametros["redondeo_duracion_min"]
+        minimo, maximo = parametros["duracion_rango_min"]
+        return np.clip(np.round(minutos / paso) * paso, minimo, maximo).astype(np.int64)
+    raise ValueError(f"Distribución de duración desconocida: {distribucion!r}")
+
+
+def _probabilidades(nombres, mix):
+    """Pesos de mix (dict) alineados con nombres; None = equiprobables"""
+    if mix is None:
+        return np.full(len(nombres), 1 / len(nombres))
+    desconocidos = set(mix) - set(nombres)
+    if desconocidos:
+        raise ValueError(f"Valores desconocidos en el mix: {sorted(desconocidos)}")
+    pesos = np.asarray([mix.get(nombre, 0) for nombre in nombres], dtype=float)
+    if pesos.sum() <= 0:
+        raise ValueError("El mix debe tener algún peso positivo")
+    return pesos / pesos.sum()
+
+
+def _generador_unidad(raiz, unidad):
+    """Generador propio de cada unidad: no depende de cómo se consumen los bloques"""
+    return np.random.default_rng(np.random.SeedSequence(raiz.entropy, spawn_key=(unidad,)))
+
+
+def generar_manifiesto(num_camiones, semilla=None, hora_inicio=8, base_date=None,
+                       parametros=None, tam_bloque=TAM_BLOQUE):
+    """
+    Genera un manifiesto sintético como iterador de DataFrames con
+    COLUMNAS_ENTRADA de hasta tam_bloque filas (Producto, Tipo_Producto y
+    Prioridad categóricas). Cada bloque se puede pasar a
+    TruckStore.agregar_lote o escribir con exportacion.exportar_manifiesto.
+    
+    - semilla: entero para reproducir el manifiesto (None = aleatorio)
+    - parametros: claves de PARAMETROS_MANIFIESTO a reemplazar
+    """
+    parametros = {**PARAMETROS_MANIFIESTO, **(parametros or {})}
+    if parametros["proceso_llegada"] not in PROCESOS_LLEGADA:
+        raise ValueError(f"Proceso de llegada desconocido: {parametros['proceso_llegada']!r}")
+    raiz = np.random.SeedSequence(semilla)
+    base_date = base_date or datetime.now().date()
+    apertura = np.datetime64(datetime.combine(base_date, time(hora_inicio, 0)), "us")
+    dias = int(parametros["dias"])
+    ventana = parametros["ventana_llegada_min"]
+    
+    productos, tipos = (list(c) for c in zip(*parametros["productos"]))
+    prob_productos = _probabilidades(productos, parametros["mix_productos"])
+    prioridades = list(parametros["mix_prioridad"])
+    prob_prioridad = _probabilidades(prioridades, parametros["mix_prioridad"])
+    tipo_de_producto = pd.Categorical(tipos).codes
+    categorias_tipo = pd.Categorical(tipos).categories
+    
+    # IDs únicos (requisito del reagendado incremental)
+    if num_camiones <= _MAX_IDS_CORTOS:
+        numeros_id = _generador_unidad(raiz, 2 ** 32).permutation(_MAX_IDS_CORTOS)[:num_camiones] + 1000
+        ancho_id = 4
+    else:
+        numeros_id, ancho_id = None, max(7, len(str(num_camiones - 1)))
+    
+    pendientes, en_espera, ultima_llegada = [], 0, 0.0
+    for desde in range(0, num_camiones, _BLOQUE_GENERACION):
+        m = min(_BLOQUE_GENERACION, num_camiones - desde)
+        rng = _generador_unidad(raiz, desde // _BLOQUE_GENERACION)
+        
+        if parametros["proceso_llegada"] == "poisson":
+            # Un solo proceso a lo largo de todos los días (ventanas concatenadas)
+            continuo = minutos_llegada(rng, m, {**parametros, "ventana_llegada_min": ventana * dias},
+                                       total=num_camiones, desde=ultima_llegada)
+            ultima_llegada = continuo[-1]
+            dia = np.minimum(continuo // ventana, dias - 1)
+            minuto = continuo - dia * ventana
+        else:
+            minuto = minutos_llegada(rng, m, parametros)
+            dia = rng.integers(0, dias, size=m) if dias > 1 else np.zeros(m)
+        minuto = np.clip(np.round(minuto), 0, None) + dia * 1440
+        
+        producto = rng.choice(len(productos), size=m, p=prob_productos)
+        indices = np.arange(desde, desde + m)
+        # "TRK-" + número con ceros a la izquierda, sin pasar por objetos Python
+        numeros = indices if numeros_id is None else numeros_id[indices]
+        bloque = pd.DataFrame({
+            "ID_Camion": np.char.add("TRK-", np.char.zfill(numeros.astype(f"U{ancho_id}"), ancho_id)),
+            "Producto": pd.Categorical.from_codes(producto, productos),
+            "Tipo_Producto": pd.Categorical.from_codes(tipo_de_producto[producto], categorias_tipo),
+            "Prioridad": pd.Categorical.from_codes(
+                rng.choice(len(prioridades), size=m, p=prob_prioridad), prioridades
+            ),
+            "Hora_Llegada_Est": apertura + (minuto.astype(np.int64) * 60_000_000).astype("timedelta64[us]"),
+            "Duracion_Min": duraciones_min(rng, m, parametros).astype(np.int64)
+        })
+        bloque.index = indices
+        
+        # Reagrupar las unidades en bloques de tam_bloque filas
+        pendientes.append(bloque)
+        en_espera += m
+        while en_espera >= tam_bloque:
+            salida = pd.concat(pendientes) if len(pendientes) > 1 else pendientes[0]
+            yield salida.iloc[:tam_bloque]
+            resto = salida.iloc[tam_bloque:]
+            pendientes, en_espera = ([resto] if len(resto) else []), len(resto)
+    if en_espera:
+        yield pd.concat(pendientes) if len(pendientes) > 1 else pendientes[0]
+
+
+def generar_escenario(hora_inicio=8, num_camiones=10, seed=None, base_date=None, parametros=None):
+    """
+    Manifiesto sintético completo en un solo DataFrame (ver
+    generar_manifiesto). Por defecto, llegadas uniformes en las primeras 6
+    horas del turno.
+    
+    - seed: semilla para reproducir el escenario (None = aleatorio)
+    - base_date: fecha de operación (por defecto, hoy)
+    """
+    bloques = list(generar_manifiesto(num_camiones, seed, hora_inicio, base_date, parametros,
+                                      tam_bloque=max(num_camiones, 1)))
+    if not bloques:
+        return pd.DataFrame(columns=["ID_Camion", "Producto", "Tipo_Producto", "Prioridad",
+                                     "Hora_Llegada_Est", "Duracion_Min"])
+    return bloques[0].reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="smartdock.escenarios",
+                                     description="Genera un manifiesto sintético reproducible (CSV o Parquet)")
+    parser.add_argument("--camiones", type=int, required=True)
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--hora-inicio", type=int, default=8, choices=range(24), metavar="0-23")
+    parser.add_argument("--fecha", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(), default=None,
+                        help="Primer día del manifiesto (AAAA-MM-DD, por defecto hoy)")
+    parser.add_argument("--dias", type=int, default=1)
+    parser.add_argument("--ventana", type=int, default=PARAMETROS_MANIFIESTO["ventana_llegada_min"],
+                        help="Minutos de llegadas por día desde la apertura")
+    parser.add_argument("--llegadas", choices=PROCESOS_LLEGADA, default="uniforme")
+    parser.add_argument("--duraciones", choices=DISTRIBUCIONES_DURACION, default="discreta")
+    parser.add_argument("--bloque", type=int, default=TAM_BLOQUE)
+    parser.add_argument("--salida", default="-", help="CSV o Parquet (.parquet); - = CSV a stdout")
+    args = parser.parse_args(argv)
+    
+    from smartdock.exportacion import exportar_manifiesto
+    bloques = generar_manifiesto(
+        args.camiones, args.semilla, args.hora_inicio, args.fecha,
+        parametros={
+            "dias": args.dias, "ventana_llegada_min": args.ventana,
+            "proceso_llegada": args.llegadas, "distribucion_duracion": args.duraciones,
+        },
+        tam_bloque=args.bloque
+    )
+    filas = exportar_manifiesto(bloques, sys.stdout if args.salida == "-" else args.salida)
+    print(f"{filas:,} camiones generados", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
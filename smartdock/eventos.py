@@ -0,0 +1,371 @@
+"""
+Eventos de portería en vivo y reagendado de los camiones restantes.
+
+Cada evento es un JSON por línea:
+    {"tipo": "llegada", "id_camion": "TRK-001", "hora": "2024-05-02T08:41:00"}
+    {"tipo": "retraso", "id_camion": "TRK-002", "minutos": 25}
+    {"tipo": "inicio", "id_camion": "TRK-001", "muelle": 2, "hora": "..."}
+    {"tipo": "fin", "id_camion": "TRK-001", "hora": "..."}
+
+- IngestorEventos consume una fuente local (archivo JSONL que se sigue como
+  `tail -f`, o un socket TCP) en un hilo con su propio loop asyncio, y
+  guarda los eventos en un registro compartido que cada sesión lee desde su
+  propio cursor
+- AgendaEnVivo aplica los eventos sobre la agenda: los camiones que ya
+  entraron a un muelle quedan fijos con su Inicio_Real/Fin_Real reales, y
+  solo los restantes se reagendan (greedy de DockOptimizerPro) a partir de
+  la ocupación real de los muelles y de la hora del último evento
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from smartdock.optimizer import DockOptimizerPro
+
+TIPOS_EVENTO = ("llegada", "retraso", "inicio", "fin")
+MAX_RETENIDOS = 200_000
+_NS_POR_MIN = 60_000_000_000
+
+
+def leer_evento(linea, recibido=None):
+    """
+    Línea JSON (str o bytes UTF-8) -> dict de evento (ValueError si es
+    inválida, también si los bytes no son UTF-8). Los eventos sin "hora"
+    (salvo retraso) se sellan con la hora de recepción.
+    """
+    evento = json.loads(linea)
+    if not isinstance(evento, dict) or evento.get("tipo") not in TIPOS_EVENTO:
+        raise ValueError(f"Evento inválido: {linea!r}")
+    if not evento.get("id_camion"):
+        raise ValueError(f"Evento sin id_camion: {linea!r}")
+    if evento["tipo"] != "retraso" and not evento.get("hora"):
+        evento["hora"] = (recibido or datetime.now()).isoformat(timespec="seconds")
+    return evento
+
+
+# ───────────────────────── Fuentes ─────────────────────────
+async def seguir_jsonl(ruta, intervalo_s=0.25, desde_inicio=True):
+    """
+    Líneas nuevas (bytes) de un archivo JSONL a medida que se escriben. Una
+    línea incompleta espera a su salto de línea; si el archivo se trunca o
+    rota, se vuelve a leer desde el principio.
+    """
+    posicion = 0
+    if not desde_inicio and os.path.exists(ruta):
+        posicion = os.path.getsize(ruta)
+    resto = b""
+    while True:
+        try:
+            tam = os.path.getsize(ruta)
+        except FileNotFoundError:
+            tam = 0
+        if tam < posicion:
+            posicion, resto = 0, b""
+        if tam == posicion:
+            await asyncio.sleep(intervalo_s)
+            continue
+        with open(ruta, "rb") as f:
+            f.seek(posicion)
+            datos = f.read(tam - posicion)
+        posicion += len(datos)
+        *lineas, resto = (resto + datos).split(b"\n")
+        for linea in lineas:
+            if linea.strip():
+                yield linea
+
+
+async def escuchar_socket(host, puerto):
+    """Líneas (bytes) recibidas por TCP en host:puerto (varios emisores a la vez)"""
+    cola = asyncio.Queue()
+    
+    async def atender(reader, writer):
+        try:
+            async for linea in reader:
+                await cola.put(linea)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    servidor = await asyncio.start_server(atender, host, puerto)
+    async with servidor:
+        while True:
+            yield await cola.get()
+
+
+class IngestorEventos:
+    """
+    Consume una fuente de líneas en segundo plano y retiene los últimos
+    max_retenidos eventos válidos. Es seguro leer desde varios hilos:
+    cada lector lleva su cursor (posición absoluta en el registro).
+    """
+    
+    def __init__(self, fuente, max_retenidos=MAX_RETENIDOS):
+        self.max_retenidos = max_retenidos
+        self.recibidos = 0
+        self.invalidos = 0
+        self.error = None
+        self._eventos = []
+        self._base = 0           # posición absoluta de self._eventos[0]
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._tarea = self._loop.create_task(self._consumir(fuente))
+        self._hilo = threading.Thread(target=self._correr, name="smartdock-eventos", daemon=True)
+        self._hilo.start()
+    
+    @classmethod
+    def desde_jsonl(cls, ruta, **kwargs):
+        return cls(seguir_jsonl(ruta), **kwargs)
+    
+    @classmethod
+    def desde_socket(cls, host, puerto, **kwargs):
+        return cls(escuchar_socket(host, int(puerto)), **kwargs)
+    
+    def _correr(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._tarea)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+    
+    async def _consumir(self, fuente):
+        # Las líneas se decodifican en leer_evento: una con bytes inválidos
+        # cuenta como inválida y no corta la ingesta
+        try:
+            async for linea in fuente:
+                try:
+                    evento = leer_evento(linea)
+                except ValueError:
+                    self.invalidos += 1
+                    continue
+                with self._lock:
+                    self._eventos.append(evento)
+                    self.recibidos += 1
+                    exceso = len(self._eventos) - self.max_retenidos
+                    if exceso > 0:
+                        del self._eventos[:exceso]
+                        self._base += exceso
+        except Exception as e:
+            # Queda visible para la app: el hilo termina y activo pasa a False
+            self.error = e
+    
+    def leer(self, cursor=0):
+        """
+        Eventos desde la posición cursor. Devuelve (eventos, nuevo_cursor,
+        perdidos); perdidos > 0 si el lector quedó detrás de lo retenido.
+        """
+        with self._lock:
+            perdidos = max(0, self._base - cursor)
+            eventos = self._eventos[max(cursor - self._base, 0):]
+            return eventos, self._base + len(self._eventos), perdidos
+    
+    @property
+    def activo(self):
+        return self._hilo.is_alive()
+    
+    def detener(self, timeout=5):
+        if self.activo:
+            self._loop.call_soon_threadsafe(self._tarea.cancel)
+            self._hilo.join(timeout)
+
+
+# ───────────────────────── Agenda en vivo ─────────────────────────
+class AgendaEnVivo:
+    """
+    Agenda del manifiesto actualizada con eventos reales.
+    - llegada: registra la llegada real (pasa a ser la llegada del camión)
+    - retraso: corre la llegada estimada "minutos" (total, no acumulativo)
+    - inicio: el camión entra al muelle indicado; queda fijo
+    - fin: registra el fin real; el muelle se libera a esa hora
+    
+    Un camión en muelle sin fin registrado ocupa el muelle al menos hasta
+    inicio + duración, o hasta la hora del último evento si ya se pasó.
+    """
+    
+    def __init__(self, dock_config, start_hour=8, base_date=None, politica=None):
+        self.optimizer = DockOptimizerPro(
+            num_docks=len(dock_config),
+            dock_config=dock_config,
+            start_hour=start_hour,
+            base_date=base_date,
+            politica=politica
+        )
+        self.cursor = 0
+        self.reloj_ns = None     # hora del último evento, en ns desde el inicio
+        self.aplicados = 0
+        self.rechazados = 0
+        self.perdidos = 0
+        self.ultimos_rechazos = deque(maxlen=20)
+        self.ultimos_reagendados = 0
+        self._resultado = None
+        self._fila = {}
+    
+    def cargar(self, camiones):
+        """Carga el plan (DataFrame con COLUMNAS_ENTRADA o TruckStore) sin eventos"""
+        cols = self.optimizer._columnas_entrada(camiones)
+        n = len(cols["ID_Camion"])
+        self._cols = cols
+        self._fila = {id_camion: i for i, id_camion in enumerate(cols["ID_Camion"].tolist())}
+        self._pesos = np.array(
+            [self.optimizer.PRIORIDAD_PESOS.get(p, 1) for p in cols["Prioridad"].tolist()], dtype=float
+        )
+        self._duraciones = np.asarray(cols["duraciones"], dtype=np.int64)
+        self._estimada_ns = (
+            (cols["llegadas"] - np.datetime64(self.optimizer.start_time)) // np.timedelta64(1, 'ns')
+        ).astype(np.int64)
+        self._llegada_ns = self._estimada_ns.copy()
+        self._llego = np.zeros(n, dtype=bool)
+        self._muelle = np.zeros(n, dtype=np.int64)       # 0 = todavía no entró
+        self._inicio_ns = np.zeros(n, dtype=np.int64)
+        self._fin_ns = np.zeros(n, dtype=np.int64)
+        self._terminado = np.zeros(n, dtype=bool)
+        self._resultado = None
+        return self
+    
+    def _a_ns(self, hora):
+        return (pd.Timestamp(hora) - pd.Timestamp(self.optimizer.start_time)) // pd.Timedelta(1, unit='ns')
+    
+    def _aplicar_evento(self, evento):
+        tipo = evento["tipo"]
+        i = self._fila[evento["id_camion"]]
+        if tipo == "retraso":
+            if self._llego[i]:
+                raise ValueError("el camión ya llegó")
+            self._llegada_ns[i] = self._estimada_ns[i] + int(float(evento["minutos"]) * _NS_POR_MIN)
+            return
+        
+        hora_ns = self._a_ns(evento["hora"])
+        if tipo == "llegada":
+            if self._muelle[i]:
+                raise ValueError("el camión ya está en muelle")
+            self._llegada_ns[i] = hora_ns
+            self._llego[i] = True
+        elif tipo == "inicio":
+            muelle = int(evento["muelle"])
+            if muelle not in self.optimizer.dock_config:
+                raise KeyError(f"Muelle {muelle} no configurado")
+            if self._muelle[i]:
+                raise ValueError("el camión ya está en muelle")
+            if not self._llego[i]:
+                self._llegada_ns[i] = min(self._llegada_ns[i], hora_ns)
+                self._llego[i] = True
+            self._muelle[i] = muelle
+            self._inicio_ns[i] = hora_ns
+        else:
+            if not self._muelle[i]:
+                raise ValueError("fin sin inicio")
+            self._fin_ns[i] = max(hora_ns, self._inicio_ns[i])
+            self._terminado[i] = True
+        self.reloj_ns = hora_ns if self.reloj_ns is None else max(self.reloj_ns, hora_ns)
+    
+    def aplicar(self, eventos):
+        """Aplica una tanda de eventos; los inválidos se cuentan y se saltean"""
+        aplicados = 0
+        for evento in eventos:
+            try:
+                self._aplicar_evento(evento)
+            except (KeyError, ValueError, TypeError) as e:
+                self.rechazados += 1
+                self.ultimos_rechazos.append((evento, f"{type(e).__name__}: {e}"))
+            else:
+                aplicados += 1
+        if aplicados:
+            self.aplicados += aplicados
+            self._resultado = None
+        return aplicados
+    
+    def consumir(self, ingestor):
+        """Aplica los eventos nuevos del ingestor desde el cursor propio"""
+        eventos, self.cursor, perdidos = ingestor.leer(self.cursor)
+        self.perdidos += perdidos
+        return self.aplicar(eventos)
+    
+    def resultado(self):
+        """
+        (resultado_df, costo_total) con el formato de agendar_camiones: primero
+        los camiones que ya entraron (por Inicio_Real) y luego los restantes
+        en su nuevo orden de atención.
+        """
+        if self._resultado is None:
+            self._resultado = self._reagendar()
+        return self._resultado
+    
+    def _reagendar(self):
+        optimizer = self.optimizer
+        if not self._fila:
+            return pd.DataFrame(), 0
+        reloj = 0 if self.reloj_ns is None else self.reloj_ns
+        
+        # Camiones fijos y ocupación real de cada muelle
+        fijos = np.flatnonzero(self._muelle)
+        fijos = fijos[np.argsort(self._inicio_ns[fijos], kind="stable")]
+        fin_fijos = np.where(
+            self._terminado[fijos],
+            self._fin_ns[fijos],
+            np.maximum(self._inicio_ns[fijos] + self._duraciones[fijos] * _NS_POR_MIN, reloj)
+        )
+        libre = {dock_id: reloj for dock_id in optimizer.dock_config}
+        for muelle, fin in zip(self._muelle[fijos].tolist(), fin_fijos.tolist()):
+            libre[muelle] = max(libre[muelle], fin)
+        optimizer.docks = {
+            dock_id: optimizer.start_time + timedelta(microseconds=libre_ns // 1000)
+            for dock_id, libre_ns in libre.items()
+        }
+        pasos = [
+            (muelle, inicio, fin, max(0, (inicio - llegada) / 1e9 / 60))
+            for muelle, inicio, fin, llegada in zip(
+                self._muelle[fijos].tolist(), self._inicio_ns[fijos].tolist(),
+                fin_fijos.tolist(), self._llegada_ns[fijos].tolist()
+            )
+        ]
+        
+        # Restantes: greedy sobre las llegadas actualizadas
+        restantes = np.flatnonzero(self._muelle == 0)
+        llegada_ns = self._llegada_ns[restantes]
+        scores = optimizer.politica(self._pesos[restantes], llegada_ns / 1e9 / 60, self._duraciones[restantes])
+        orden = restantes[optimizer._ordenar(scores)]
+        pools = optimizer._pools_por_tipo()
+        tipos = self._cols["Tipo_Producto"]
+        pasos += [
+            optimizer._asignar(pools, tipo, llegada, duracion)
+            for tipo, llegada, duracion in zip(
+                tipos[orden].tolist(), self._llegada_ns[orden].tolist(), self._duraciones[orden].tolist()
+            )
+        ]
+        self.ultimos_reagendados = len(orden)
+        
+        filas = np.concatenate([fijos, orden])
+        llegadas = (
+            np.datetime64(optimizer.start_time, 'ns') + self._llegada_ns[filas].astype('timedelta64[ns]')
+        ).astype(self._cols["llegadas"].dtype)
+        return optimizer._construir_resultado(
+            self._cols["ID_Camion"][filas].tolist(),
+            self._cols["Producto"][filas].tolist(),
+            tipos[filas].tolist(),
+            self._cols["Prioridad"][filas].tolist(),
+            llegadas,
+            self._duraciones[filas].tolist(),
+            pasos
+        )
+    
+    def estadisticas(self):
+        en_muelle = int((self._muelle != 0).sum()) if self._fila else 0
+        completados = int(self._terminado.sum()) if self._fila else 0
+        return {
+            "pendientes": len(self._fila) - en_muelle,
+            "en_muelle": en_muelle - completados,
+            "completados": completados,
+            "aplicados": self.aplicados,
+            "rechazados": self.rechazados,
+            "perdidos": self.perdidos,
+            "reloj": (None if self.reloj_ns is None
+                      else pd.Timestamp(self.optimizer.start_time) + pd.Timedelta(self.reloj_ns, unit='ns')),
+        }
@@ -0,0 +1,112 @@
+"""
+Exportación en streaming de agendas y manifiestos a CSV y Parquet.
+
+La agenda se genera y se escribe por bloques (ver
+DockOptimizerPro.agendar_por_bloques), así que una agenda muy grande nunca
+se materializa completa en memoria. Lo mismo vale para los manifiestos
+sintéticos de escenarios.generar_manifiesto. Parquet requiere pyarrow.
+"""
+import io
+
+import pandas as pd
+
+from smartdock.optimizer import COLUMNAS_ENTRADA, COLUMNAS_RESULTADO
+
+TAM_BLOQUE = 100_000
+
+
+def _normalizar_bloque(bloque):
+    """Fija los dtypes del bloque para que el esquema sea igual en todos"""
+    bloque = bloque.copy(deep=False)
+    for columna in ("Llegada_Teorica", "Inicio_Real", "Fin_Real"):
+        bloque[columna] = pd.to_datetime(bloque[columna]).astype("datetime64[us]")
+    bloque["Costo_Demurrage_USD"] = bloque["Costo_Demurrage_USD"].astype(float)
+    for columna in ("Duracion_Min", "Espera_Min"):
+        bloque[columna] = bloque[columna].astype("int64")
+    for columna in ("Camión", "Producto", "Tipo_Producto", "Prioridad", "Muelle_Asignado", "Estado"):
+        bloque[columna] = bloque[columna].astype(object).astype(str)
+    # Agendas de red (ver multisitio.planificar_red) llevan Sitio y Fecha al frente
+    particion = [c for c in ("Sitio", "Fecha") if c in bloque.columns]
+    if "Sitio" in particion:
+        bloque["Sitio"] = bloque["Sitio"].astype(object).astype(str)
+    return bloque[particion + COLUMNAS_RESULTADO]
+
+
+def _normalizar_manifiesto(bloque):
+    """Fija los dtypes de un bloque de manifiesto (COLUMNAS_ENTRADA)"""
+    bloque = bloque[COLUMNAS_ENTRADA].copy(deep=False)
+    bloque["Hora_Llegada_Est"] = pd.to_datetime(bloque["Hora_Llegada_Est"]).astype("datetime64[us]")
+    bloque["Duracion_Min"] = bloque["Duracion_Min"].astype("int64")
+    for columna in ("ID_Camion", "Producto", "Tipo_Producto", "Prioridad"):
+        bloque[columna] = bloque[columna].astype(object).astype(str)
+    return bloque
+
+
+def _escribir(bloques, destino, formato, normalizar):
+    """Escribe los bloques normalizados en CSV o Parquet; devuelve las filas escritas"""
+    nombre = getattr(destino, "name", destino)
+    formato = formato or ("parquet" if str(nombre).lower().endswith((".parquet", ".pq")) else "csv")
+    filas = 0
+    
+    if formato == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for bloque in bloques:
+                tabla = pa.Table.from_pandas(normalizar(bloque), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(destino, tabla.schema)
+                writer.write_table(tabla)
+                filas += len(bloque)
+        finally:
+            if writer is not None:
+                writer.close()
+        return filas
+    
+    # CSV: la cabecera solo en el primer bloque
+    propio = isinstance(destino, (str, bytes)) or hasattr(destino, "__fspath__")
+    archivo = open(destino, "w", encoding="utf-8", newline="") if propio else destino
+    binario = not isinstance(archivo, io.TextIOBase)
+    try:
+        for bloque in bloques:
+            texto = normalizar(bloque).to_csv(index=False, header=filas == 0)
+            archivo.write(texto.encode("utf-8") if binario else texto)
+            filas += len(bloque)
+    finally:
+        if propio:
+            archivo.close()
+    return filas
+
+
+def exportar_bloques(bloques, destino, formato=None):
+    """
+    Escribe un iterable de bloques (DataFrames de agenda) en destino (ruta o
+    archivo binario abierto). Devuelve la cantidad de filas escritas.
+    """
+    return _escribir(bloques, destino, formato, _normalizar_bloque)
+
+
+def exportar_manifiesto(bloques, destino, formato=None):
+    """
+    Escribe un manifiesto por bloques (DataFrames con COLUMNAS_ENTRADA, p. ej.
+    escenarios.generar_manifiesto) en destino. El archivo se puede volver a
+    importar. Devuelve la cantidad de filas escritas.
+    """
+    return _escribir(bloques, destino, formato, _normalizar_manifiesto)
+
+
+def exportar_agenda(optimizer, camiones, destino, formato=None, tam_bloque=TAM_BLOQUE):
+    """
+    Agenda camiones con el optimizer y escribe la agenda bloque a bloque.
+    Devuelve (filas_escritas, costo_total).
+    """
+    costo = {"total": 0}
+    
+    def bloques():
+        for bloque, costo_bloque in optimizer.agendar_por_bloques(camiones, tam_bloque):
+            costo["total"] += costo_bloque
+            yield bloque
+    
+    filas = exportar_bloques(bloques(), destino, formato)
+    return filas, costo["total"]
@@ -0,0 +1,141 @@
+"""
+Gantt escalable para agendas grandes.
+
+px.timeline genera una barra (shape) con texto y hover por camión: con miles
+de camiones la figura pesa megas y el navegador se congela. Aquí:
+- el detalle se dibuja con una traza WebGL (Scattergl) por estado, cada barra
+  como un segmento grueso [inicio, fin, None]
+- solo se dibujan las barras que cruzan la ventana visible
+- si la ventana tiene más de max_barras, se cae a bandas de ocupación por
+  muelle (heatmap de % ocupado por intervalo)
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from smartdock.analitica import _numero_muelle, acumulada
+from smartdock.optimizer import A_TIEMPO, CRITICO, ESTADOS, RETRASO_LEVE
+
+COLORES_ESTADO = {
+    ESTADOS[A_TIEMPO]: "#10b981",
+    ESTADOS[RETRASO_LEVE]: "#f59e0b",
+    ESTADOS[CRITICO]: "#ef4444"
+}
+MAX_BARRAS_DETALLE = 3000
+NUM_BANDAS = 240
+
+
+def muelles_ordenados(resultado_valido):
+    """Etiquetas de muelle presentes en orden numérico (Muelle 2 antes que Muelle 10)"""
+    return sorted(resultado_valido["Muelle_Asignado"].unique(), key=_numero_muelle)
+
+
+def barras_en_ventana(resultado_valido, desde=None, hasta=None):
+    """Filas cuya barra [Inicio_Real, Fin_Real) cruza la ventana [desde, hasta)"""
+    mascara = np.ones(len(resultado_valido), dtype=bool)
+    if desde is not None:
+        mascara &= (resultado_valido["Fin_Real"] > desde).to_numpy()
+    if hasta is not None:
+        mascara &= (resultado_valido["Inicio_Real"] < hasta).to_numpy()
+    return resultado_valido[mascara]
+
+
+def ocupacion_por_muelle(resultado_valido, desde, hasta, num_bandas=NUM_BANDAS):
+    """
+    Fracción ocupada de cada muelle en num_bandas intervalos de [desde, hasta).
+    Devuelve (muelles, bordes, matriz) con matriz de forma (muelles, bandas).
+    
+    Por muelle, la ocupación acumulada hasta t es
+    C(t) = Σ_{inicio<=t} (t - inicio) - Σ_{fin<=t} (t - fin), y la ocupación
+    de cada banda es C(borde_derecho) - C(borde_izquierdo): dos searchsorted
+    y sumas prefijas, sin recorrer las barras por banda.
+    """
+    bordes = pd.date_range(desde, hasta, periods=num_bandas + 1)
+    # Todo relativo a desde, para no perder precisión en los productos k * t
+    t0 = bordes.as_unit("us").asi8[0]
+    t = (bordes.as_unit("us").asi8 - t0).astype(np.float64)
+    ancho = np.diff(t)
+    muelles = muelles_ordenados(resultado_valido)
+    matriz = np.zeros((len(muelles), num_bandas))
+    
+    inicios = resultado_valido["Inicio_Real"].to_numpy().astype("datetime64[us]").astype(np.int64) - t0
+    fines = resultado_valido["Fin_Real"].to_numpy().astype("datetime64[us]").astype(np.int64) - t0
+    codigos = pd.Index(muelles).get_indexer(resultado_valido["Muelle_Asignado"])
+    for i in range(len(muelles)):
+        propios = codigos == i
+        c = (acumulada(np.sort(inicios[propios].astype(np.float64)), t)
+             - acumulada(np.sort(fines[propios].astype(np.float64)), t))
+        matriz[i] = np.diff(c) / ancho
+    return muelles, bordes, np.clip(matriz, 0, None)
+
+
+def _ms(serie):
+    """Fechas como ms desde epoch (float): Plotly las serializa como arreglo binario"""
+    return serie.to_numpy().astype("datetime64[ms]").astype(np.int64).astype(np.float64)
+
+
+def _trazas_detalle(barras, muelles, colores):
+    """
+    Una traza Scattergl por estado; cada barra es un segmento [inicio, fin, NaN]
+    sin hover. El hover va en una única traza de puntos en el centro de cada
+    barra, para no repetir el texto por vértice.
+    """
+    trazas = []
+    codigos = pd.Index(muelles).get_indexer(barras["Muelle_Asignado"]).astype(np.float64)
+    for estado in barras["Estado"].unique():
+        propias = (barras["Estado"] == estado).to_numpy()
+        n = int(propias.sum())
+        x = np.full(n * 3, np.nan)
+        x[0::3] = _ms(barras["Inicio_Real"][propias])
+        x[1::3] = _ms(barras["Fin_Real"][propias])
+        y = np.repeat(codigos[propias], 3)
+        y[2::3] = np.nan
+        trazas.append(go.Scattergl(
+            x=x, y=y, mode="lines", name=estado, hoverinfo="skip",
+            line=dict(color=colores.get(estado, "#64748b"), width=14)
+        ))
+    
+    texto = (barras["Camión"].astype(str) + "<br>" + barras["Producto"].astype(str)
+             + " · " + barras["Prioridad"].astype(str)
+             + "<br>Espera: " + barras["Espera_Min"].astype(str) + " min"
+             + "<br>Costo: $" + barras["Costo_Demurrage_USD"].map("{:.2f}".format))
+    trazas.append(go.Scattergl(
+        x=(_ms(barras["Inicio_Real"]) + _ms(barras["Fin_Real"])) / 2, y=codigos,
+        mode="markers", marker=dict(size=10, opacity=0), showlegend=False,
+        hovertext=texto.to_numpy(dtype=object), hoverinfo="text"
+    ))
+    return trazas
+
+
+def _traza_bandas(muelles, bordes, matriz):
+    centros = bordes[:-1] + (bordes[1:] - bordes[:-1]) / 2
+    return go.Heatmap(
+        x=centros, y=muelles, z=matriz * 100,
+        zmin=0, zmax=100, colorscale="Blues",
+        colorbar=dict(title="% ocupado"),
+        hovertemplate="%{y}<br>%{x|%H:%M}<br>Ocupación: %{z:.0f}%<extra></extra>"
+    )
+
+
+def figura_gantt(resultado_valido, desde=None, hasta=None, max_barras=MAX_BARRAS_DETALLE,
+                 colores=COLORES_ESTADO):
+    """
+    Figura del Gantt para la ventana [desde, hasta) (por defecto, todo el
+    turno). Devuelve (fig, modo) con modo "detalle" o "bandas".
+    """
+    desde = resultado_valido["Inicio_Real"].min() if desde is None else desde
+    hasta = resultado_valido["Fin_Real"].max() if hasta is None else hasta
+    barras = barras_en_ventana(resultado_valido, desde, hasta)
+    
+    if len(barras) <= max_barras:
+        muelles = muelles_ordenados(resultado_valido)
+        fig, modo = go.Figure(_trazas_detalle(barras, muelles, colores)), "detalle"
+        fig.update_yaxes(tickvals=list(range(len(muelles))), ticktext=muelles,
+                         range=[len(muelles) - 0.5, -0.5])
+    else:
+        muelles, bordes, matriz = ocupacion_por_muelle(barras, desde, hasta)
+        fig, modo = go.Figure(_traza_bandas(muelles, bordes, matriz)), "bandas"
+        # El eje de categorías crece hacia arriba: Muelle 1 queda arriba
+        fig.update_yaxes(type="category", categoryorder="array", categoryarray=muelles[::-1])
+    fig.update_xaxes(type="date", range=[desde, hasta])
+    return fig, modo
@@ -0,0 +1,258 @@
+"""
+Agendado con horizonte rodante y ventana congelada.
+
+Para operaciones de 24 horas con llegadas continuas no hace falta reagendar
+el día completo en cada cambio. En cada replanificación (un "tick" del
+reloj de operación):
+
+- solo se optimizan los camiones que llegan antes de reloj + horizonte;
+  los posteriores quedan diferidos en un heap por hora de llegada
+- los camiones que, en el plan resultante, entran a muelle antes de
+  reloj + congelado quedan comprometidos: su muelle y horario ya no cambian
+  y la ocupación que dejan es el punto de partida de los ticks siguientes
+- el resto del horizonte es un plan tentativo que el próximo tick rehace
+
+Así el costo de cada replanificación depende de los camiones dentro del
+horizonte (O(h log h)), no del largo del día. Con horizonte y ventana
+congelada infinitos, un solo tick da la misma agenda que agendar_camiones.
+"""
+import heapq
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from smartdock.optimizer import DockOptimizerPro
+
+CONGELADO_DEFECTO_MIN = 60
+HORIZONTE_DEFECTO_MIN = 240
+PASO_DEFECTO_MIN = 15
+_NS_POR_MIN = 60_000_000_000
+
+
+def _a_ns(minutos):
+    """Minutos (float('inf') incluido) -> ns; infinito se representa con float"""
+    return minutos * _NS_POR_MIN if np.isinf(minutos) else int(round(minutos * _NS_POR_MIN))
+
+
+class AgendaRodante:
+    """
+    Agenda de un manifiesto por horizonte rodante.
+    - congelado_min: ventana desde el reloj cuyas asignaciones quedan fijas
+    - horizonte_min: ventana de llegadas que se optimiza en cada tick (>= congelado_min)
+    - politica, motor: como en DockOptimizerPro / comparar_politicas
+    
+    El reloj se expresa en minutos desde la apertura y solo avanza.
+    """
+    
+    def __init__(self, dock_config, start_hour=8, base_date=None, congelado_min=CONGELADO_DEFECTO_MIN,
+                 horizonte_min=HORIZONTE_DEFECTO_MIN, politica=None, motor=DockOptimizerPro):
+        if congelado_min < 0 or horizonte_min < congelado_min:
+            raise ValueError("Se requiere 0 <= congelado_min <= horizonte_min")
+        self.optimizer = motor(len(dock_config), dock_config, start_hour,
+                               base_date=base_date, politica=politica)
+        self.congelado_ns = _a_ns(congelado_min)
+        self.horizonte_ns = _a_ns(horizonte_min)
+        self._reiniciar()
+    
+    def _reiniciar(self):
+        self.reloj_ns = 0
+        self.replanificaciones = 0
+        self.ultimo_replan = {"camiones": 0, "comprometidos": 0, "segundos": 0.0}
+        self._cols = {c: [] for c in ("ID_Camion", "Producto", "Tipo_Producto", "Prioridad",
+                                      "llegada_ns", "duraciones", "pesos")}
+        self._llegada_dtype = np.dtype("datetime64[us]")
+        self._ids = set()
+        self._diferidos = []          # heap (llegada_ns, fila) fuera del horizonte
+        self._en_horizonte = []       # filas admitidas aún no comprometidas
+        self._libre = {dock_id: 0 for dock_id in self.optimizer.docks}
+        self._filas_fijas, self._pasos_fijos = [], []
+        self._filas_plan, self._pasos_plan = [], []
+        self._resultado = None
+        self._cambios = True          # camiones sin replanificar desde el último tick
+    
+    # ───────────────────────── Manifiesto ─────────────────────────
+    def cargar(self, camiones):
+        """Carga un manifiesto (DataFrame con COLUMNAS_ENTRADA o TruckStore) con el reloj en la apertura"""
+        self._reiniciar()
+        self.agregar(camiones)
+        return self
+    
+    def agregar(self, camiones):
+        """
+        Agrega camiones nuevos (llegadas continuas). Quedan diferidos hasta
+        que entren al horizonte; el próximo tick los tiene en cuenta.
+        """
+        if len(camiones) == 0:
+            return
+        optimizer = self.optimizer
+        cols = optimizer._columnas_entrada(camiones)
+        ids = cols["ID_Camion"].tolist()
+        if len(set(ids)) != len(ids) or not self._ids.isdisjoint(ids):
+            raise ValueError("ID_Camion duplicado en el lote")
+        if not self._cols["ID_Camion"]:
+            self._llegada_dtype = cols["llegadas"].dtype
+        llegada_ns = ((cols["llegadas"] - np.datetime64(optimizer.start_time)) // np.timedelta64(1, "ns")).tolist()
+        
+        inicio = len(self._cols["ID_Camion"])
+        self._ids.update(ids)
+        self._cols["ID_Camion"] += ids
+        for columna in ("Producto", "Tipo_Producto", "Prioridad"):
+            self._cols[columna] += cols[columna].tolist()
+        self._cols["llegada_ns"] += llegada_ns
+        self._cols["duraciones"] += [int(d) for d in cols["duraciones"]]
+        self._cols["pesos"] += pd.Series(cols["Prioridad"]).map(optimizer.PRIORIDAD_PESOS).fillna(1).tolist()
+        
+        self._cambios = True
+        nuevos = list(zip(llegada_ns, range(inicio, inicio + len(ids))))
+        if self._diferidos:
+            for nuevo in nuevos:
+                heapq.heappush(self._diferidos, nuevo)
+        else:
+            heapq.heapify(nuevos)
+            self._diferidos = nuevos
+    
+    def __len__(self):
+        return len(self._cols["ID_Camion"])
+    
+    # ───────────────────────── Replanificación ─────────────────────────
+    def replanificar(self, reloj_min=None):
+        """
+        Un tick: lleva el reloj a reloj_min (por defecto, el actual),
+        replanifica el horizonte y compromete la ventana congelada.
+        Devuelve la cantidad de camiones comprometidos en este tick.
+        """
+        return self._tick(self.reloj_ns if reloj_min is None else _a_ns(reloj_min))
+    
+    def _tick(self, reloj):
+        if reloj < self.reloj_ns:
+            raise ValueError("El reloj del horizonte rodante no puede retroceder")
+        inicio_tick = time.perf_counter()
+        self.reloj_ns = reloj
+        
+        # Admitir las llegadas que entraron al horizonte
+        limite = reloj + self.horizonte_ns
+        while self._diferidos and self._diferidos[0][0] < limite:
+            self._en_horizonte.append(heapq.heappop(self._diferidos)[1])
+        candidatos = sorted(self._en_horizonte)   # orden del manifiesto: desempate estable
+        
+        comprometidos = 0
+        self._filas_plan, self._pasos_plan = [], []
+        if candidatos:
+            optimizer, cols = self.optimizer, self._cols
+            llegada_ns = [cols["llegada_ns"][i] for i in candidatos]
+            duraciones = [cols["duraciones"][i] for i in candidatos]
+            tipos = [cols["Tipo_Producto"][i] for i in candidatos]
+            scores = optimizer.politica(
+                np.asarray([cols["pesos"][i] for i in candidatos], dtype=float),
+                np.asarray(llegada_ns, dtype=np.int64) / 1e9 / 60,
+                np.asarray(duraciones)
+            )
+            
+            # Los muelles arrancan donde terminó lo comprometido, nunca antes del reloj
+            optimizer.docks = {
+                dock_id: optimizer.start_time + timedelta(microseconds=max(libre_ns, reloj) // 1000)
+                for dock_id, libre_ns in self._libre.items()
+            }
+            orden, pasos = optimizer._agendar_columnas(scores, llegada_ns, duraciones, tipos)
+            
+            # Por muelle los inicios son crecientes: comprometer la ventana
+            # congelada deja un prefijo de cada muelle
+            fin_congelado = reloj + self.congelado_ns
+            for k, paso in zip(orden.tolist(), pasos):
+                fila = candidatos[k]
+                if paso[0] is None or paso[1] <= fin_congelado:
+                    self._filas_fijas.append(fila)
+                    self._pasos_fijos.append(paso)
+                    if paso[0] is not None:
+                        self._libre[paso[0]] = max(self._libre[paso[0]], paso[2])
+                    comprometidos += 1
+                else:
+                    self._filas_plan.append(fila)
+                    self._pasos_plan.append(paso)
+            self._en_horizonte = list(self._filas_plan)
+        
+        self.replanificaciones += 1
+        self._cambios = False
+        self.ultimo_replan = {
+            "camiones": len(candidatos),
+            "comprometidos": comprometidos,
+            "segundos": time.perf_counter() - inicio_tick,
+        }
+        self._resultado = None
+        return comprometidos
+    
+    def avanzar(self, hasta_min, paso_min=PASO_DEFECTO_MIN):
+        """
+        Ticks cada paso_min desde el reloj actual hasta hasta_min (inclusive).
+        En el reloj actual solo se replanifica si hubo cambios desde el último tick.
+        """
+        if paso_min <= 0:
+            raise ValueError("paso_min debe ser positivo")
+        paso_ns, hasta_ns = _a_ns(paso_min), _a_ns(hasta_min)
+        reloj = self.reloj_ns
+        if self._cambios:
+            self._tick(reloj)
+        while reloj < hasta_ns:
+            reloj = min(reloj + paso_ns, hasta_ns)
+            self._tick(reloj)
+    
+    def completar(self, paso_min=PASO_DEFECTO_MIN):
+        """
+        Ticks cada paso_min hasta comprometer todo el manifiesto. Si el
+        horizonte queda vacío, el reloj salta a la próxima llegada.
+        """
+        if paso_min <= 0:
+            raise ValueError("paso_min debe ser positivo")
+        paso_ns = _a_ns(paso_min)
+        reloj = self.reloj_ns
+        while True:
+            self._tick(reloj)
+            if not self._en_horizonte and not self._diferidos:
+                break
+            reloj += paso_ns
+            if not self._en_horizonte:
+                # Múltiplo de paso_min en el que la próxima llegada entra al horizonte
+                proxima = self._diferidos[0][0] - self.horizonte_ns
+                if proxima > reloj:
+                    reloj += -(-(proxima - reloj) // paso_ns) * paso_ns
+        return self.resultado()
+    
+    # ───────────────────────── Resultado ─────────────────────────
+    def resultado(self):
+        """
+        (resultado_df, costo_total) con el formato de agendar_camiones:
+        primero los comprometidos (en el orden en que se fijaron) y luego el
+        plan tentativo del horizonte. Los diferidos no aparecen.
+        """
+        if self._resultado is None:
+            filas = self._filas_fijas + self._filas_plan
+            if not filas:
+                self._resultado = (pd.DataFrame(), 0)
+            else:
+                cols, optimizer = self._cols, self.optimizer
+                llegada_ns = np.fromiter((cols["llegada_ns"][i] for i in filas), dtype=np.int64, count=len(filas))
+                llegadas = (
+                    np.datetime64(optimizer.start_time, "ns") + llegada_ns.astype("timedelta64[ns]")
+                ).astype(self._llegada_dtype)
+                self._resultado = optimizer._construir_resultado(
+                    [cols["ID_Camion"][i] for i in filas],
+                    [cols["Producto"][i] for i in filas],
+                    [cols["Tipo_Producto"][i] for i in filas],
+                    [cols["Prioridad"][i] for i in filas],
+                    llegadas,
+                    [cols["duraciones"][i] for i in filas],
+                    self._pasos_fijos + self._pasos_plan
+                )
+        return self._resultado
+    
+    def estadisticas(self):
+        return {
+            "comprometidos": len(self._filas_fijas),
+            "en_horizonte": len(self._filas_plan),
+            "diferidos": len(self._diferidos),
+            "replanificaciones": self.replanificaciones,
+            "ultimo_replan": dict(self.ultimo_replan),
+            "reloj": pd.Timestamp(self.optimizer.start_time) + pd.Timedelta(self.reloj_ns, unit="ns"),
+        }
@@ -0,0 +1,137 @@
+"""
+Importación masiva de manifiestos de camiones (CSV y Parquet).
+
+El archivo se lee por bloques; cada bloque se valida y convierte de forma
+vectorizada y las filas inválidas se reportan en lugar de abortar la carga.
+Parquet requiere pyarrow (import perezoso).
+"""
+
+import numpy as np
+import pandas as pd
+
+from smartdock.almacen import TruckStore
+from smartdock.capacidades import SEPARADOR, TIPOS_PRODUCTO, tipos_producto_validos
+from smartdock.optimizer import COLUMNAS_ENTRADA, DockOptimizerPro
+
+TAM_BLOQUE = 100_000
+MAX_ERRORES_DETALLE = 10_000
+
+
+class ReporteImportacion:
+    """Resumen de una importación: filas leídas, válidas y detalle de errores"""
+    
+    def __init__(self):
+        self.filas_leidas = 0
+        self.filas_validas = 0
+        self.filas_invalidas = 0
+        self._errores = []   # (fila, ID_Camion, motivo)
+    
+    def registrar(self, filas, ids, motivos):
+        self.filas_invalidas += len(filas)
+        espacio = MAX_ERRORES_DETALLE - len(self._errores)
+        if espacio > 0:
+            self._errores.extend(zip(filas[:espacio], ids[:espacio], motivos[:espacio]))
+    
+    @property
+    def errores(self):
+        """DataFrame con Fila (1 = primera fila de datos), ID_Camion y Motivo"""
+        return pd.DataFrame(self._errores, columns=["Fila", "ID_Camion", "Motivo"])
+    
+    def __repr__(self):
+        return (f"ReporteImportacion(leidas={self.filas_leidas}, validas={self.filas_validas}, "
+                f"invalidas={self.filas_invalidas})")
+
+
+def _formato(origen, formato):
+    if formato:
+        return formato
+    nombre = getattr(origen, "name", origen)
+    return "parquet" if str(nombre).lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def leer_bloques(origen, formato=None, tam_bloque=TAM_BLOQUE):
+    """Itera DataFrames de hasta tam_bloque filas desde una ruta o archivo abierto"""
+    if _formato(origen, formato) == "parquet":
+        import pyarrow.parquet as pq
+        archivo = pq.ParquetFile(origen)
+        for lote in archivo.iter_batches(batch_size=tam_bloque):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(origen, chunksize=tam_bloque, dtype={"ID_Camion": str})
+
+
+def validar_bloque(bloque, almacen=None, primera_fila=1, columnas_extra=()):
+    """
+    Valida y normaliza un bloque. Devuelve (df_validas, filas, ids, motivos)
+    con las filas inválidas y el motivo de cada una. Las columnas_extra se
+    copian sin validar al resultado (ej. Sitio en manifiestos de red).
+    """
+    faltantes = [c for c in [*COLUMNAS_ENTRADA, *columnas_extra] if c not in bloque.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el manifiesto: {', '.join(faltantes)}")
+    
+    n = len(bloque)
+    motivo = np.full(n, None, dtype=object)
+    
+    def marcar(mascara, texto):
+        mascara = np.asarray(mascara, dtype=bool) & (motivo == None)  # noqa: E711
+        motivo[mascara] = texto
+    
+    ids = bloque["ID_Camion"].astype(object)
+    ids_str = ids.where(ids.isna(), ids.astype(str).str.strip())
+    marcar(ids_str.isna() | (ids_str == ""), "ID_Camion vacío")
+    marcar(ids_str.duplicated(keep="first"), "ID_Camion duplicado en el archivo")
+    if almacen is not None and len(almacen):
+        marcar(np.fromiter((i in almacen for i in ids_str), dtype=bool, count=n),
+               "ID_Camion ya existe")
+    
+    producto = bloque["Producto"]
+    marcar(producto.isna() | (producto.astype(str).str.strip() == ""), "Producto vacío")
+    marcar(~tipos_producto_validos(bloque["Tipo_Producto"]),
+           f"Tipo_Producto debe combinar con '{SEPARADOR}' valores de {TIPOS_PRODUCTO} "
+           f"(a lo sumo una temperatura)")
+    marcar(~bloque["Prioridad"].isin(list(DockOptimizerPro.PRIORIDAD_PESOS)),
+           f"Prioridad debe ser una de {list(DockOptimizerPro.PRIORIDAD_PESOS)}")
+    
+    llegada = pd.to_datetime(bloque["Hora_Llegada_Est"], errors="coerce")
+    marcar(llegada.isna(), "Hora_Llegada_Est inválida")
+    duracion = pd.to_numeric(bloque["Duracion_Min"], errors="coerce")
+    marcar(duracion.isna() | (duracion <= 0) | (duracion != duracion.round()),
+           "Duracion_Min debe ser un entero positivo")
+    
+    invalidas = motivo != None  # noqa: E711
+    validas = ~invalidas
+    df_validas = pd.DataFrame({
+        "ID_Camion": ids_str[validas].to_numpy(),
+        "Producto": producto[validas].astype(str).to_numpy(),
+        "Tipo_Producto": bloque["Tipo_Producto"][validas].to_numpy(),
+        "Prioridad": bloque["Prioridad"][validas].to_numpy(),
+        "Hora_Llegada_Est": llegada[validas].dt.floor("min").to_numpy(),
+        "Duracion_Min": duracion[validas].astype(np.int64).to_numpy(),
+        **{c: bloque[c][validas].to_numpy() for c in columnas_extra}
+    })
+    filas = (np.flatnonzero(invalidas) + primera_fila).tolist()
+    return df_validas, filas, ids[invalidas].tolist(), motivo[invalidas].tolist()
+
+
+def importar_manifiesto(origen, almacen=None, formato=None, tam_bloque=TAM_BLOQUE):
+    """
+    Importa un manifiesto CSV/Parquet por bloques al almacén (uno nuevo si
+    almacen es None). Devuelve (almacen, ReporteImportacion).
+    """
+    reporte = ReporteImportacion()
+    for bloque in leer_bloques(origen, formato, tam_bloque):
+        df_validas, filas, ids, motivos = validar_bloque(
+            bloque, almacen, primera_fila=reporte.filas_leidas + 1
+        )
+        reporte.filas_leidas += len(bloque)
+        reporte.registrar(filas, ids, motivos)
+        if len(df_validas):
+            if almacen is None:
+                almacen = TruckStore.desde_frame(df_validas)
+            else:
+                almacen.agregar_lote(df_validas)
+            reporte.filas_validas += len(df_validas)
+    if almacen is None:
+        almacen = TruckStore()
+    return almacen, reporte
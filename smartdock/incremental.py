@@ -0,0 +1,278 @@
+"""
+Reagendado incremental para altas, ediciones y bajas de camiones.
+
+Como la asignación es un recorrido greedy en orden de score, un cambio solo
+puede afectar a los camiones que vienen después en ese orden. El agendador
+guarda el orden, la agenda en columnas (arrays alineados con el orden) y
+checkpoints del estado de los muelles, y al cambiar un camión reproduce solo
+desde la primera posición afectada. La reproducción se detiene en cuanto el
+estado de los muelles vuelve a coincidir con el de la agenda anterior: a
+partir de ahí el resto de la agenda es idéntico y se reutiliza tal cual.
+
+El orden y las columnas se parchean en su lugar: se reescribe solo el tramo
+reproducido y la cola se corre con una copia contigua, sin rearmar la
+agenda fila por fila en cada cambio.
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from smartdock.optimizer import DockOptimizerPro, columnas_pasos
+
+# Columnas de la agenda alineadas con el orden de atención
+_COLUMNAS = {
+    "ids": object, "productos": object, "tipos": object, "prioridades": object,
+    "llegada_ns": np.int64, "duraciones": np.int64,
+    "muelle": np.int64, "inicio_ns": np.int64, "fin_ns": np.int64, "espera": np.float64,
+}
+_CAPACIDAD_MINIMA = 64
+
+
+class IncrementalScheduler:
+    """
+    Mantiene una agenda equivalente a DockOptimizerPro.agendar_camiones
+    sobre el manifiesto actual, actualizable camión a camión.
+    
+    Los camiones se identifican por ID_Camion, que debe ser único.
+    """
+    
+    def __init__(self, dock_config, start_hour=8, base_date=None, checkpoint_cada=64):
+        self.optimizer = DockOptimizerPro(
+            num_docks=len(dock_config),
+            dock_config=dock_config,
+            start_hour=start_hour,
+            base_date=base_date
+        )
+        self.firma = (tuple(sorted(dock_config.items())), start_hour, self.optimizer.base_date)
+        self.checkpoint_cada = checkpoint_cada
+        self._llegada_dtype = np.dtype('datetime64[us]')
+        self._vaciar()
+    
+    def _vaciar(self):
+        self._camiones = {}        # ID -> (producto, tipo, prioridad, llegada_ns, duracion, clave)
+        self._orden = []           # claves (-score, secuencia, ID) en orden de atención
+        self._cols = {nombre: np.empty(0, dtype=dtype) for nombre, dtype in _COLUMNAS.items()}
+        self._filas = 0            # filas válidas de _cols (la agenda antes del cambio en curso)
+        self._cp_pos = []          # posiciones de los checkpoints (ordenadas)
+        self._cp_estado = []       # pools de muelles antes de cada posición
+        self._secuencia = 0
+        self._resultado = None
+        self.ultimos_pasos_reproducidos = 0
+    
+    # ───────────────────────── Carga y cambios ─────────────────────────
+    def cargar(self, df_camiones):
+        """Carga un manifiesto completo y agenda desde cero"""
+        if df_camiones['ID_Camion'].duplicated().any():
+            raise ValueError("ID_Camion debe ser único para el reagendado incremental")
+        
+        self._vaciar()
+        if not df_camiones.empty:
+            llegadas = pd.to_datetime(df_camiones['Hora_Llegada_Est'])
+            self._llegada_dtype = llegadas.dtype
+            scores = self.optimizer._calcular_scores(df_camiones)
+            llegada_ns = (
+                (llegadas.to_numpy() - np.datetime64(self.optimizer.start_time)) // np.timedelta64(1, 'ns')
+            ).tolist()
+            filas = zip(
+                df_camiones['ID_Camion'].tolist(), df_camiones['Producto'].tolist(),
+                df_camiones['Tipo_Producto'].tolist(), df_camiones['Prioridad'].tolist(),
+                llegada_ns, df_camiones['Duracion_Min'].tolist(), scores.tolist()
+            )
+            for id_camion, producto, tipo, prioridad, llegada, duracion, score in filas:
+                clave = (-score, self._secuencia, id_camion)
+                self._secuencia += 1
+                self._camiones[id_camion] = (producto, tipo, prioridad, llegada, int(duracion), clave)
+                self._orden.append(clave)
+            self._orden.sort()
+        
+        self._aplicar(range(len(self._orden)), ())
+        return self.resultado()
+    
+    def agregar(self, registro):
+        """Agrega un camión (dict con las columnas del manifiesto)"""
+        id_camion = registro['ID_Camion']
+        if id_camion in self._camiones:
+            raise ValueError(f"El camión {id_camion} ya existe")
+        clave = self._registrar(registro, self._secuencia)
+        self._secuencia += 1
+        
+        posicion = bisect.bisect_left(self._orden, clave)
+        self._orden.insert(posicion, clave)
+        self._aplicar((posicion,), ())
+    
+    def editar(self, id_camion, **cambios):
+        """Modifica campos de un camión existente conservando su posición en el manifiesto"""
+        producto, tipo, prioridad, llegada_ns, duracion, clave_vieja = self._camiones[id_camion]
+        registro = {
+            "ID_Camion": id_camion,
+            "Producto": producto,
+            "Tipo_Producto": tipo,
+            "Prioridad": prioridad,
+            "Hora_Llegada_Est": self.optimizer.start_time + pd.Timedelta(llegada_ns, unit='ns'),
+            "Duracion_Min": duracion
+        }
+        registro.update(cambios)
+        clave = self._registrar(registro, clave_vieja[1])
+        
+        vieja = bisect.bisect_left(self._orden, clave_vieja)
+        del self._orden[vieja]
+        posicion = bisect.bisect_left(self._orden, clave)
+        self._orden.insert(posicion, clave)
+        self._aplicar((posicion,), (vieja,))
+    
+    def eliminar(self, id_camion):
+        clave_vieja = self._camiones.pop(id_camion)[-1]
+        vieja = bisect.bisect_left(self._orden, clave_vieja)
+        del self._orden[vieja]
+        self._aplicar((), (vieja,))
+    
+    def _registrar(self, registro, secuencia):
+        """Guarda los datos del camión y devuelve su clave de orden"""
+        optimizer = self.optimizer
+        llegada = pd.Timestamp(registro['Hora_Llegada_Est'])
+        llegada_ns = (llegada - pd.Timestamp(optimizer.start_time)) // pd.Timedelta(1, unit='ns')
+        # El mismo score que cargar (la política del optimizer), para una fila
+        score = optimizer._scores_desde(
+            np.array([optimizer.PRIORIDAD_PESOS.get(registro['Prioridad'], 1)], dtype=float),
+            np.array([llegada.to_datetime64()]),
+            np.array([int(registro['Duracion_Min'])])
+        )
+        clave = (-float(score[0]), secuencia, registro['ID_Camion'])
+        self._camiones[registro['ID_Camion']] = (
+            registro['Producto'], registro['Tipo_Producto'], registro['Prioridad'],
+            llegada_ns, int(registro['Duracion_Min']), clave
+        )
+        return clave
+    
+    # ───────────────────────── Reproducción ─────────────────────────
+    def _aplicar(self, insertadas, eliminadas):
+        """
+        Reproduce la asignación desde el checkpoint previo a la primera
+        posición afectada, avanzando en paralelo la agenda vieja para
+        detectar cuándo el estado de los muelles vuelve a coincidir.
+        
+        self._orden ya tiene el cambio; insertadas son posiciones en ese
+        orden y eliminadas, posiciones de la agenda vieja (self._cols).
+        """
+        orden, filas_viejas = self._orden, self._filas
+        primera = min(min(insertadas, default=len(orden)), min(eliminadas, default=len(orden)))
+        
+        k = bisect.bisect_right(self._cp_pos, primera) - 1
+        if k >= 0:
+            inicio = self._cp_pos[k]
+            pools = {tipo: list(heap) for tipo, heap in self._cp_estado[k].items()}
+        else:
+            inicio = 0
+            pools = self.optimizer._pools_por_tipo()
+        nuevos_cp_pos, nuevos_cp_estado = [], []
+        
+        libre_nuevo = {dock_id: libre for heap in pools.values() for libre, dock_id in heap}
+        libre_viejo = dict(libre_nuevo)
+        distintos = set()
+        pendientes_ins, pendientes_del = len(insertadas), len(eliminadas)
+        muelles_viejos, fines_viejos = self._cols["muelle"], self._cols["fin_ns"]
+        
+        def avanzar_viejo(j):
+            dock_id = int(muelles_viejos[j])
+            if dock_id:
+                fin = int(fines_viejos[j])
+                libre_viejo[dock_id] = fin
+                if libre_nuevo[dock_id] != fin:
+                    distintos.add(dock_id)
+                else:
+                    distintos.discard(dock_id)
+        
+        asignar = self.optimizer._asignar
+        camiones = self._camiones
+        nuevos_pasos = []
+        jn, jo = inicio, inicio
+        while jn < len(orden):
+            # Convergencia: sin cambios pendientes y mismo estado de muelles
+            if not (pendientes_ins or pendientes_del or distintos):
+                break
+            if jn % self.checkpoint_cada == 0 and jn > inicio:
+                nuevos_cp_pos.append(jn)
+                nuevos_cp_estado.append({tipo: list(heap) for tipo, heap in pools.items()})
+            
+            while jo < filas_viejas and jo in eliminadas:
+                avanzar_viejo(jo)
+                jo += 1
+                pendientes_del -= 1
+            
+            _, tipo, _, llegada_ns, duracion, _ = camiones[orden[jn][2]]
+            paso = asignar(pools, tipo, llegada_ns, duracion)
+            nuevos_pasos.append(paso)
+            if paso[0] is not None:
+                libre_nuevo[paso[0]] = paso[2]
+                if libre_viejo[paso[0]] != paso[2]:
+                    distintos.add(paso[0])
+                else:
+                    distintos.discard(paso[0])
+            
+            if jn in insertadas:
+                pendientes_ins -= 1
+            else:
+                avanzar_viejo(jo)
+                jo += 1
+            jn += 1
+        
+        # Las filas viejas [inicio, jo) pasan a ser [inicio, jn); el resto de
+        # la agenda vieja es válido, desplazado (jn - jo) posiciones. Sin
+        # convergencia se descarta hasta el final.
+        hasta = jo if jn < len(orden) else filas_viejas
+        self._empalmar(inicio, hasta, orden[inicio:jn], nuevos_pasos)
+        cola = bisect.bisect_left(self._cp_pos, hasta) if jn < len(orden) else len(self._cp_pos)
+        self._cp_pos[k + 1:] = nuevos_cp_pos + [p + (jn - hasta) for p in self._cp_pos[cola:]]
+        self._cp_estado[k + 1:] = nuevos_cp_estado + self._cp_estado[cola:]
+        self.ultimos_pasos_reproducidos = len(nuevos_pasos)
+        self._resultado = None
+    
+    def _empalmar(self, desde, hasta, claves, pasos):
+        """
+        Reemplaza las filas [desde, hasta) de las columnas por las de claves
+        y pasos, corriendo la cola en su lugar. La capacidad crece al doble.
+        """
+        datos = [self._camiones[clave[2]] for clave in claves]
+        nuevas = dict(zip(("muelle", "inicio_ns", "fin_ns", "espera"), columnas_pasos(pasos)))
+        nuevas["ids"] = [clave[2] for clave in claves]
+        for i, nombre in enumerate(("productos", "tipos", "prioridades", "llegada_ns", "duraciones")):
+            nuevas[nombre] = [d[i] for d in datos]
+        
+        m, filas_viejas = len(claves), self._filas
+        filas = filas_viejas - (hasta - desde) + m
+        if filas > len(self._cols["ids"]):
+            capacidad = max(filas, 2 * len(self._cols["ids"]), _CAPACIDAD_MINIMA)
+            for nombre, columna in self._cols.items():
+                ampliada = np.empty(capacidad, dtype=columna.dtype)
+                ampliada[:filas_viejas] = columna[:filas_viejas]
+                self._cols[nombre] = ampliada
+        for nombre, columna in self._cols.items():
+            if desde + m != hasta:
+                columna[desde + m:filas] = columna[hasta:filas_viejas]
+            columna[desde:desde + m] = nuevas[nombre]
+        self._filas = filas
+    
+    # ───────────────────────── Resultado ─────────────────────────
+    def resultado(self):
+        """(resultado_df, costo_total) con el mismo formato que agendar_camiones"""
+        if self._resultado is None:
+            n, cols = self._filas, self._cols
+            if not n:
+                self._resultado = (pd.DataFrame(), 0)
+            else:
+                llegadas = (
+                    np.datetime64(self.optimizer.start_time, 'ns') + cols["llegada_ns"][:n].astype('timedelta64[ns]')
+                ).astype(self._llegada_dtype)
+                self._resultado = self.optimizer._resultado_columnas(
+                    cols["ids"][:n], cols["productos"][:n], cols["tipos"][:n], cols["prioridades"][:n],
+                    llegadas, cols["duraciones"][:n],
+                    cols["muelle"][:n], cols["inicio_ns"][:n], cols["fin_ns"][:n], cols["espera"][:n]
+                )
+        return self._resultado
+    
+    def __len__(self):
+        return len(self._orden)
+    
+    def __contains__(self, id_camion):
+        return id_camion in self._camiones
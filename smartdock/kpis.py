@@ -0,0 +1,116 @@
+"""
+Cálculo de KPIs operativos sobre el resultado de agendar_camiones.
+"""
+import numpy as np
+import pandas as pd
+
+from smartdock.optimizer import A_TIEMPO, ESTADOS
+
+
+def contar_a_tiempo(estado):
+    """
+    Camiones en estado A Tiempo. Sobre la categórica de agendar_camiones se
+    cuentan códigos; una columna de texto (p. ej. leída de SQLite) se
+    factoriza antes. Se compara una vez por estado distinto, no por fila.
+    """
+    if isinstance(estado.dtype, pd.CategoricalDtype):
+        codigos, estados = estado.cat.codes.to_numpy(), estado.cat.categories
+    else:
+        codigos, estados = pd.factorize(estado)
+    a_tiempo = np.asarray(estados == ESTADOS[A_TIEMPO])
+    return int(a_tiempo[codigos[codigos >= 0]].sum())
+
+
+def calcular_kpis(resultado_df, costo_total):
+    """
+    Devuelve un dict con los KPIs del dashboard y de analytics:
+    - total_cargas, a_tiempo, tasa_exito (%)
+    - espera_promedio, max_espera (min)
+    - costo_total, costo_por_carga (USD)
+    - fin_operaciones (Timestamp o None)
+    - eficiencia (% del tiempo en muelle frente a tiempo total)
+    """
+    total = len(resultado_df)
+    if total == 0:
+        return kpis_de_totales(0, 0, 0, 0, 0, None, costo_total)
+    fin_real = resultado_df['Fin_Real'].dropna()
+    return kpis_de_totales(
+        total, contar_a_tiempo(resultado_df['Estado']),
+        resultado_df['Espera_Min'].sum(), resultado_df['Espera_Min'].max(),
+        resultado_df['Duracion_Min'].sum(),
+        pd.Timestamp(fin_real.max()) if not fin_real.empty else None, costo_total
+    )
+
+
+def kpis_de_totales(total, a_tiempo, suma_espera, max_espera, suma_duracion, fin, costo_total):
+    """
+    Dict de calcular_kpis a partir de los totales de la agenda (fin:
+    Timestamp del último Fin_Real o None). Lo comparten calcular_kpis,
+    AcumuladorKpis y analitica.analizar_agenda.
+    """
+    if total == 0:
+        return {
+            "total_cargas": 0, "a_tiempo": 0, "tasa_exito": 0,
+            "espera_promedio": 0, "max_espera": 0,
+            "costo_total": costo_total, "costo_por_carga": 0,
+            "fin_operaciones": None, "eficiencia": 0
+        }
+    tiempo_total = suma_duracion + suma_espera
+    return {
+        "total_cargas": total,
+        "a_tiempo": a_tiempo,
+        "tasa_exito": a_tiempo / total * 100,
+        "espera_promedio": float(suma_espera / total),
+        "max_espera": float(max_espera),
+        "costo_total": costo_total,
+        "costo_por_carga": costo_total / total,
+        "fin_operaciones": fin,
+        "eficiencia": suma_duracion / (tiempo_total if tiempo_total > 0 else 1) * 100
+    }
+
+
+def kpis_serializables(kpis):
+    """Convierte los KPIs a tipos nativos para volcarlos a JSON"""
+    salida = {}
+    for clave, valor in kpis.items():
+        if isinstance(valor, pd.Timestamp):
+            valor = valor.isoformat()
+        elif hasattr(valor, "item"):
+            valor = valor.item()
+        salida[clave] = valor
+    return salida
+
+
+class AcumuladorKpis:
+    """
+    Calcula los mismos KPIs que calcular_kpis consumiendo la agenda por
+    bloques (ver DockOptimizerPro.agendar_por_bloques), sin tenerla completa.
+    """
+    
+    def __init__(self):
+        self.total = 0
+        self.a_tiempo = 0
+        self.suma_espera = 0
+        self.max_espera = None
+        self.suma_duracion = 0
+        self.fin = None
+        self.costo_total = 0
+    
+    def agregar(self, bloque, costo_bloque):
+        if len(bloque) == 0:
+            return
+        self.total += len(bloque)
+        self.a_tiempo += contar_a_tiempo(bloque['Estado'])
+        self.suma_espera += bloque['Espera_Min'].sum()
+        max_bloque = bloque['Espera_Min'].max()
+        self.max_espera = max_bloque if self.max_espera is None else max(self.max_espera, max_bloque)
+        self.suma_duracion += bloque['Duracion_Min'].sum()
+        fin_bloque = bloque['Fin_Real'].dropna()
+        if not fin_bloque.empty:
+            fin_bloque = pd.Timestamp(fin_bloque.max())
+            self.fin = fin_bloque if self.fin is None else max(self.fin, fin_bloque)
+        self.costo_total += costo_bloque
+    
+    def kpis(self):
+        return kpis_de_totales(self.total, self.a_tiempo, self.suma_espera, self.max_espera,
+                               self.suma_duracion, self.fin, self.costo_total)
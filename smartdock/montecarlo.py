@@ -0,0 +1,119 @@
+"""
+Motor Monte Carlo de riesgo de demurrage.
+
+Corre N días aleatorios (cada uno con su propia semilla) sobre un pool de
+procesos y devuelve la distribución de los KPIs del dashboard: costo de
+demurrage, espera promedio / máxima y hora de fin de operaciones.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from smartdock.escenarios import PARAMETROS_MANIFIESTO, duraciones_min, minutos_llegada
+from smartdock.optimizer import DockOptimizerPro
+
+# Llegadas y duraciones con los mismos parámetros que el generador de
+# manifiestos (olas de "pico", duraciones "lognormal", ...)
+PARAMETROS_DEFECTO = {
+    **{clave: PARAMETROS_MANIFIESTO[clave] for clave in (
+        "ventana_llegada_min", "proceso_llegada", "pico_min", "pico_desvio_min", "olas",
+        "distribucion_duracion", "duraciones_min", "pesos_duraciones", "duracion_media_min",
+        "duracion_desvio_min", "duracion_rango_min", "redondeo_duracion_min",
+    )},
+    "num_camiones": 500,
+    "mix_prioridad": {"Alta": 0.4, "Media": 0.4, "Baja": 0.2},
+    "fraccion_refrigerado": 2 / 7,
+}
+
+PERCENTILES_DEFECTO = (5, 25, 50, 75, 95)
+
+COLUMNAS_KPI = [
+    "Costo_Demurrage_USD", "Espera_Promedio_Min", "Espera_Max_Min",
+    "Fin_Operaciones_Min"
+]
+
+
+def _generar_dia(rng, parametros):
+    """Genera las columnas de un día aleatorio de forma vectorizada"""
+    n = parametros["num_camiones"]
+    llegada_min = np.clip(np.round(minutos_llegada(rng, n, parametros)), 0, None)
+    duracion = duraciones_min(rng, n, parametros)
+    
+    mix = parametros["mix_prioridad"]
+    probs = np.asarray(list(mix.values()), dtype=float)
+    peso = rng.choice(
+        np.asarray([DockOptimizerPro.PRIORIDAD_PESOS.get(p, 1) for p in mix], dtype=float),
+        size=n, p=probs / probs.sum()
+    )
+    refrigerado = rng.random(n) < parametros["fraccion_refrigerado"]
+    return llegada_min, duracion, peso, refrigerado
+
+
+def _simular_lote(semillas, parametros, dock_config, hora_inicio, politica=None):
+    """Simula un lote de días en un proceso worker; una fila de KPIs por día"""
+    # Fecha fija: los KPIs se expresan en minutos desde el inicio del turno
+    optimizer = DockOptimizerPro(len(dock_config), dock_config, hora_inicio, base_date=date(2000, 1, 1),
+                                 politica=politica)
+    filas = []
+    for semilla in semillas:
+        rng = np.random.default_rng(semilla)
+        llegada_min, duracion, peso, refrigerado = _generar_dia(rng, parametros)
+        
+        scores = optimizer.politica(peso, llegada_min, duracion)
+        llegada_ns = (llegada_min.astype(np.int64) * 60_000_000_000).tolist()
+        tipos = np.where(refrigerado, "Refrigerado", "Seco").tolist()
+        _, pasos = optimizer._agendar_columnas(scores, llegada_ns, duracion.tolist(), tipos)
+        
+        validos = [p for p in pasos if p[0] is not None]
+        esperas = np.fromiter((p[3] for p in validos), dtype=float, count=len(validos))
+        fin_ns = max((p[2] for p in validos), default=0)
+        filas.append((
+            esperas.sum() / 60 * optimizer.COSTO_DEMURRAGE_POR_HORA,
+            esperas.mean() if len(esperas) else 0.0,
+            esperas.max() if len(esperas) else 0.0,
+            fin_ns / 60_000_000_000
+        ))
+    return filas
+
+
+def simular_montecarlo(dock_config, hora_inicio=8, num_escenarios=1000, semilla=0,
+                       parametros=None, max_workers=None, tam_lote=None, politica=None):
+    """
+    Corre num_escenarios días aleatorios reproducibles (misma semilla =
+    mismos resultados, sin importar el número de workers). politica es un
+    nombre de POLITICAS o una función de módulo (viaja a los procesos).
+    
+    Devuelve un DataFrame con una fila por escenario y las columnas de
+    COLUMNAS_KPI (Fin_Operaciones_Min en minutos desde el inicio del turno).
+    """
+    parametros = {**PARAMETROS_DEFECTO, **(parametros or {})}
+    semillas = np.random.SeedSequence(semilla).spawn(num_escenarios)
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    tam_lote = tam_lote or max(1, -(-num_escenarios // (max_workers * 4)))
+    lotes = [semillas[i:i + tam_lote] for i in range(0, num_escenarios, tam_lote)]
+    
+    if max_workers == 1 or len(lotes) == 1:
+        resultados = [_simular_lote(lote, parametros, dock_config, hora_inicio, politica) for lote in lotes]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            resultados = list(pool.map(
+                _simular_lote, lotes,
+                [parametros] * len(lotes), [dock_config] * len(lotes), [hora_inicio] * len(lotes),
+                [politica] * len(lotes)
+            ))
+    
+    filas = [fila for lote in resultados for fila in lote]
+    df = pd.DataFrame(filas, columns=COLUMNAS_KPI)
+    df.index.name = "Escenario"
+    return df
+
+
+def bandas_percentiles(df_escenarios, percentiles=PERCENTILES_DEFECTO):
+    """Tabla de percentiles (filas) por KPI (columnas)"""
+    bandas = df_escenarios[COLUMNAS_KPI].quantile([p / 100 for p in percentiles])
+    bandas.index = [f"P{p}" for p in percentiles]
+    return bandas
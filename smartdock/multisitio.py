@@ -0,0 +1,122 @@
+"""
+Planificación multi-sitio y multi-día.
+
+Un manifiesto de red trae, además de COLUMNAS_ENTRADA, las columnas Sitio y
+Fecha. Cada par (sitio, día) es independiente: tiene su propia configuración
+de muelles y su propio turno, así que se agenda en un proceso worker aparte
+y luego los resultados se unen en una agenda global con KPIs consolidados.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from smartdock.importacion import ReporteImportacion, leer_bloques, validar_bloque
+from smartdock.kpis import calcular_kpis
+from smartdock.optimizer import DockOptimizerPro
+
+COLUMNAS_PARTICION = ["Sitio", "Fecha"]
+
+
+def _config_particion(config_sitios, sitio, fecha):
+    """
+    Normaliza la configuración de una partición. Por sitio se acepta
+    {dock_id: tipo} o {"muelles": {...}, "hora_inicio": h, "dias": {...}},
+    donde "dias" sobreescribe muelles/hora_inicio para fechas puntuales
+    (clave "AAAA-MM-DD").
+    """
+    config = config_sitios[sitio]
+    if "muelles" in config:
+        config = {**config, **config.get("dias", {}).get(str(fecha), {})}
+        muelles = config["muelles"]
+        hora_inicio = config.get("hora_inicio", 8)
+    else:
+        muelles, hora_inicio = config, 8
+    return {int(d): tipo for d, tipo in muelles.items()}, int(hora_inicio)
+
+
+def _agendar_particion(tarea):
+    """Agenda una partición (sitio, fecha) en un worker"""
+    sitio, fecha, df_particion, muelles, hora_inicio, motor = tarea
+    optimizer = motor(len(muelles), muelles, start_hour=hora_inicio, base_date=fecha)
+    resultado_df, costo_total = optimizer.agendar_camiones(df_particion)
+    kpis = calcular_kpis(resultado_df, costo_total)
+    resultado_df.insert(0, "Fecha", fecha)
+    resultado_df.insert(0, "Sitio", sitio)
+    return sitio, fecha, resultado_df, kpis
+
+
+def particionar(df_camiones):
+    """Agrega Fecha (día de la llegada) si falta y agrupa por (Sitio, Fecha)"""
+    if "Sitio" not in df_camiones.columns:
+        raise ValueError("El manifiesto de red necesita la columna Sitio")
+    if "Fecha" not in df_camiones.columns:
+        df_camiones = df_camiones.assign(
+            Fecha=pd.to_datetime(df_camiones["Hora_Llegada_Est"]).dt.date
+        )
+    else:
+        df_camiones = df_camiones.assign(Fecha=pd.to_datetime(df_camiones["Fecha"]).dt.date)
+    return df_camiones.groupby(COLUMNAS_PARTICION, sort=True)
+
+
+def leer_manifiesto_red(origen, formato=None, tam_bloque=100_000):
+    """
+    Lee y valida un manifiesto de red por bloques conservando Sitio (y Fecha
+    si viene). Devuelve (df_camiones, ReporteImportacion).
+    """
+    reporte = ReporteImportacion()
+    validos = []
+    vistos = set()   # los IDs deben ser únicos en toda la red, no solo por bloque
+    for bloque in leer_bloques(origen, formato, tam_bloque):
+        extra = [c for c in COLUMNAS_PARTICION if c in bloque.columns]
+        df_validas, filas, ids, motivos = validar_bloque(
+            bloque, vistos, primera_fila=reporte.filas_leidas + 1, columnas_extra=extra
+        )
+        reporte.filas_leidas += len(bloque)
+        reporte.registrar(filas, ids, motivos)
+        reporte.filas_validas += len(df_validas)
+        vistos.update(df_validas["ID_Camion"])
+        validos.append(df_validas)
+    df_camiones = pd.concat(validos, ignore_index=True) if validos else pd.DataFrame()
+    return df_camiones, reporte
+
+
+def planificar_red(df_camiones, config_sitios, motor=DockOptimizerPro, max_workers=None):
+    """
+    Agenda todas las particiones (sitio, día) en paralelo.
+    
+    Devuelve (agenda_global, kpis_particiones, kpis_red):
+    - agenda_global: concatenación de las agendas con columnas Sitio y Fecha
+    - kpis_particiones: DataFrame con una fila de KPIs por (Sitio, Fecha)
+    - kpis_red: dict de KPIs consolidados de toda la red
+    """
+    grupos = particionar(df_camiones)
+    faltantes = sorted({sitio for sitio, _ in grupos.groups} - set(config_sitios), key=str)
+    if faltantes:
+        raise KeyError(f"Sitios sin configuración de muelles: {', '.join(map(str, faltantes))}")
+    
+    tareas = []
+    for (sitio, fecha), df_particion in grupos:
+        muelles, hora_inicio = _config_particion(config_sitios, sitio, fecha)
+        tareas.append((sitio, fecha, df_particion.drop(columns=COLUMNAS_PARTICION),
+                       muelles, hora_inicio, motor))
+    # Particiones grandes primero para balancear la carga entre workers
+    tareas.sort(key=lambda t: len(t[2]), reverse=True)
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(tareas) <= 1:
+        resultados = list(map(_agendar_particion, tareas))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            resultados = list(pool.map(_agendar_particion, tareas))
+    resultados.sort(key=lambda r: (r[0], r[1]))
+    
+    agendas = [r[2] for r in resultados if len(r[2])]
+    agenda_global = pd.concat(agendas, ignore_index=True) if agendas else pd.DataFrame()
+    kpis_particiones = pd.DataFrame(
+        [{"Sitio": sitio, "Fecha": fecha, **kpis} for sitio, fecha, _, kpis in resultados]
+    )
+    kpis_red = calcular_kpis(agenda_global, float(kpis_particiones["costo_total"].sum()) if len(resultados) else 0)
+    kpis_red["particiones"] = len(resultados)
+    kpis_red["sitios"] = len({sitio for sitio, _, _, _ in resultados})
+    return agenda_global, kpis_particiones, kpis_red
@@ -0,0 +1,357 @@
+"""
+Núcleo de optimización de muelles de SmartDock Pro (sin Streamlit).
+
+Uso:
+    from smartdock import DockOptimizerPro
+    optimizer = DockOptimizerPro(num_docks=3, dock_config={1: "Seco", 2: "Seco", 3: "Frío"})
+    resultado_df, costo_total = optimizer.agendar_camiones(df_camiones)
+"""
+import heapq
+from datetime import datetime, timedelta, time
+
+import numpy as np
+import pandas as pd
+
+from smartdock.capacidades import MatrizCapacidades, etiqueta_muelle
+from smartdock.perfilado import fase
+from smartdock.politicas import resolver_politica
+
+# Columnas que debe traer un manifiesto de camiones
+COLUMNAS_ENTRADA = [
+    "ID_Camion", "Producto", "Tipo_Producto", "Prioridad",
+    "Hora_Llegada_Est", "Duracion_Min"
+]
+
+# Columnas de la agenda que devuelve agendar_camiones
+COLUMNAS_RESULTADO = [
+    "Camión", "Producto", "Tipo_Producto", "Prioridad", "Muelle_Asignado",
+    "Llegada_Teorica", "Inicio_Real", "Fin_Real", "Duracion_Min",
+    "Espera_Min", "Costo_Demurrage_USD", "Estado"
+]
+
+# Estados de la agenda: el código es la posición en ESTADOS. La columna
+# Estado es categórica con estas categorías; KPIs y filtros trabajan sobre
+# los códigos y las etiquetas solo se usan al mostrar
+ESTADOS = ["✅ A Tiempo", "⚠️ Retraso Leve", "🔴 Crítico", "Error: Muelle incompatible"]
+A_TIEMPO, RETRASO_LEVE, CRITICO, MUELLE_INCOMPATIBLE = range(len(ESTADOS))
+ESTADO_DTYPE = pd.CategoricalDtype(ESTADOS)
+SIN_MUELLE = "❌ SIN MUELLE"
+
+
+def columnas_pasos(pasos):
+    """Pasos de _asignar -> arrays (muelle, inicio_ns, fin_ns, espera); muelle 0 = sin muelle"""
+    n = len(pasos)
+    return (
+        np.fromiter((0 if paso[0] is None else paso[0] for paso in pasos), dtype=np.int64, count=n),
+        np.fromiter((paso[1] for paso in pasos), dtype=np.int64, count=n),
+        np.fromiter((paso[2] for paso in pasos), dtype=np.int64, count=n),
+        np.fromiter((paso[3] for paso in pasos), dtype=np.float64, count=n),
+    )
+
+
+class DockOptimizerPro:
+    """
+    Optimizador de muelles con:
+    - Prioridades ponderadas (Alta > Media > Baja)
+    - Restricciones de capacidades de muelle (ver smartdock.capacidades)
+    - Cálculo de costos de demurrage
+    - Política de despacho intercambiable (ver smartdock.politicas)
+    """
+    
+    PRIORIDAD_PESOS = {"Alta": 3, "Media": 2, "Baja": 1}
+    COSTO_DEMURRAGE_POR_HORA = 150  # USD por hora de espera
+    
+    def __init__(self, num_docks, dock_config, start_hour=8, base_date=None, politica=None):
+        self.num_docks = num_docks
+        # {dock_id: capacidades}, ej. "Seco", "Frío" o "Seco+Peligrosos"
+        self.dock_config = {dock_id: etiqueta_muelle(tipo) for dock_id, tipo in dock_config.items()}
+        self.base_date = base_date or datetime.now().date()
+        self.start_time = datetime.combine(self.base_date, time(start_hour, 0))
+        self.docks = {i+1: self.start_time for i in range(num_docks)}
+        self.capacidades = MatrizCapacidades(
+            {**{dock_id: "Seco" for dock_id in self.docks}, **self.dock_config}
+        )
+        # Función de score (nombre de POLITICAS, función propia o None = por defecto)
+        self.politica = resolver_politica(politica)
+    
+    def _puede_asignar_muelle(self, tipo_producto, dock_id):
+        """Valida si el producto puede ir en el muelle (tiene todas las capacidades exigidas)"""
+        return self.capacidades.compatible(tipo_producto, dock_id)
+    
+    def _calcular_prioridad_score(self, row, arrival_time):
+        """
+        Score de un solo camión según la política de despacho (por defecto,
+        peso de prioridad con la llegada como desempate)
+        """
+        peso = self.PRIORIDAD_PESOS.get(row['Prioridad'], 1)
+        # Convertimos tiempo a minutos desde inicio para ordenar
+        tiempo_minutos = (arrival_time - self.start_time).total_seconds() / 60
+        scores = self.politica(np.array([peso], dtype=float), np.array([tiempo_minutos]),
+                               np.array([row['Duracion_Min']]))
+        return float(scores[0])
+    
+    def _calcular_scores(self, df_camiones):
+        """
+        Versión vectorizada de _calcular_prioridad_score para todo el
+        manifiesto (un solo paso, sin apply por fila)
+        """
+        prioridad = df_camiones['Prioridad']
+        if isinstance(prioridad.dtype, pd.CategoricalDtype):
+            # Un lookup por categoría en lugar de uno por fila
+            pesos = self._pesos_por_categoria(prioridad.cat.categories)[prioridad.cat.codes.to_numpy()]
+        else:
+            pesos = prioridad.map(self.PRIORIDAD_PESOS).fillna(1).to_numpy(dtype=float)
+        llegadas = pd.to_datetime(df_camiones['Hora_Llegada_Est']).to_numpy()
+        return self._scores_desde(pesos, llegadas, df_camiones['Duracion_Min'].to_numpy())
+    
+    def _pesos_por_categoria(self, categorias):
+        return np.array([self.PRIORIDAD_PESOS.get(c, 1) for c in categorias], dtype=float)
+    
+    def _scores_desde(self, pesos, llegadas, duraciones):
+        """Score vectorizado de la política a partir de pesos, llegadas datetime64 y duraciones"""
+        tiempo_minutos = (llegadas - np.datetime64(self.start_time)) / np.timedelta64(1, 's') / 60
+        return self.politica(pesos, tiempo_minutos, duraciones)
+    
+    def _columnas_entrada(self, camiones):
+        """
+        Columnas planas del manifiesto, desde un DataFrame o un TruckStore
+        (en ese caso a partir de sus vistas sin copia). Devuelve un dict con
+        arrays ID_Camion, Producto, Tipo_Producto, Prioridad, llegadas
+        (datetime64) y duraciones, más los scores de prioridad.
+        """
+        if hasattr(camiones, "columnas"):
+            cols = camiones.columnas()
+            categorias = camiones.categorias
+            decodificadas = {
+                columna: np.asarray(categorias[columna].valores, dtype=object)[cols[columna]]
+                for columna in ("Producto", "Tipo_Producto", "Prioridad")
+            }
+            llegadas = camiones.llegadas()
+            pesos = self._pesos_por_categoria(categorias["Prioridad"].valores)[cols["Prioridad"]]
+            return {
+                "ID_Camion": cols["ID_Camion"],
+                **decodificadas,
+                "llegadas": llegadas,
+                "duraciones": cols["Duracion_Min"],
+                "scores": self._scores_desde(pesos, llegadas, cols["Duracion_Min"])
+            }
+        
+        return {
+            "ID_Camion": camiones['ID_Camion'].to_numpy(),
+            "Producto": camiones['Producto'].to_numpy(),
+            "Tipo_Producto": camiones['Tipo_Producto'].to_numpy(),
+            "Prioridad": camiones['Prioridad'].to_numpy(),
+            "llegadas": pd.to_datetime(camiones['Hora_Llegada_Est']).to_numpy(),
+            "duraciones": camiones['Duracion_Min'].to_numpy(),
+            "scores": self._calcular_scores(camiones)
+        }
+    
+    def _pools_por_tipo(self):
+        """
+        Agrupa los muelles por clase de compatibilidad (bitmask de
+        capacidades) en min-heaps de (libre_ns, dock_id). El tope de cada
+        heap es el muelle de esa clase que se libera primero (empates
+        resueltos por el id de muelle más bajo).
+        """
+        pools = {}
+        clase_de_muelle = self.capacidades.clase_de_muelle
+        for dock_id, libre in self.docks.items():
+            libre_ns = (libre - self.start_time) // timedelta(microseconds=1) * 1000
+            pools.setdefault(clase_de_muelle[dock_id], []).append((libre_ns, dock_id))
+        for pool in pools.values():
+            heapq.heapify(pool)
+        return pools
+    
+    def _asignar(self, pools, tipo_producto, llegada_ns, duracion_min):
+        """
+        Asigna un camión al muelle compatible que se libera primero.
+        Devuelve el paso (dock_id, inicio_ns, fin_ns, espera_min); dock_id es
+        None si no hay muelle compatible.
+        """
+        # Tope más temprano entre las clases elegibles (una sola en la config clásica)
+        pool = None
+        for clase in self.capacidades.por_tipo[tipo_producto]:
+            candidato = pools.get(clase)
+            if candidato and (pool is None or candidato[0] < pool[0]):
+                pool = candidato
+        if pool is None:
+            return (None, 0, 0, 0)
+        
+        # El tope del heap es el muelle que se libera primero
+        free_ns, best_dock = pool[0]
+        
+        # Calcular inicio real
+        start_ns = max(llegada_ns, free_ns, 0)
+        end_ns = start_ns + duracion_min * 60_000_000_000
+        heapq.heapreplace(pool, (end_ns, best_dock))
+        
+        # Calcular espera
+        wait_time = max(0, (start_ns - llegada_ns) / 1e9 / 60)
+        return (best_dock, start_ns, end_ns, wait_time)
+    
+    def _construir_resultado(self, ids, productos, tipos, prioridades, llegadas, duraciones, pasos):
+        """
+        Arma el DataFrame de agenda a partir de las columnas en orden de
+        atención y de los pasos devueltos por _asignar. Muelle_Asignado y
+        Estado son categóricas armadas desde códigos enteros: las etiquetas
+        existen una vez por categoría, no por camión.
+        """
+        return self._resultado_columnas(ids, productos, tipos, prioridades, llegadas, duraciones,
+                                        *columnas_pasos(pasos))
+    
+    def _resultado_columnas(self, ids, productos, tipos, prioridades, llegadas, duraciones,
+                            muelle, inicio_ns, fin_ns, espera):
+        """
+        _construir_resultado con los pasos ya en arrays (ver columnas_pasos):
+        muelle (0 = sin muelle), inicio_ns, fin_ns y espera en minutos
+        """
+        n = len(muelle)
+        asignado = muelle > 0
+        
+        # Calcular costo de demurrage (sin muelle la espera es 0)
+        costo = espera / 60 * self.COSTO_DEMURRAGE_POR_HORA
+        costos_totales = float(np.cumsum(costo)[-1]) if n else 0  # suma en orden de atención
+        
+        # Código de estado por espera; sin muelle compatible es un error
+        estado = np.select([espera == 0, espera < 30], [A_TIEMPO, RETRASO_LEVE], CRITICO).astype(np.int8)
+        estado[~asignado] = MUELLE_INCOMPATIBLE
+        
+        # Una categoría por muelle del optimizer (mismo orden en todos los
+        # bloques, así concatenan sin perder el dtype) y la de sin muelle
+        ids_muelle = sorted(self.docks)
+        etiquetas = [f"Muelle {dock_id} ({self.dock_config.get(dock_id, 'Seco')})" for dock_id in ids_muelle]
+        posicion = np.full(max(ids_muelle, default=0) + 1, len(ids_muelle), dtype=np.int16)
+        posicion[ids_muelle] = np.arange(len(ids_muelle))
+        
+        # Construir fechas reales de forma vectorizada (NaT si no hubo muelle)
+        if asignado.any():
+            base = np.datetime64(self.start_time, 'ns')
+            inicio_real = (base + inicio_ns.astype('timedelta64[ns]')).astype(llegadas.dtype)
+            fin_real = (base + fin_ns.astype('timedelta64[ns]')).astype(llegadas.dtype)
+            inicio_real[~asignado] = np.datetime64('NaT')
+            fin_real[~asignado] = np.datetime64('NaT')
+        else:
+            inicio_real = [None] * n
+            fin_real = [None] * n
+        
+        schedule_df = pd.DataFrame({
+            "Camión": ids,
+            "Producto": productos,
+            "Tipo_Producto": tipos,
+            "Prioridad": prioridades,
+            "Muelle_Asignado": pd.Categorical.from_codes(posicion[muelle], etiquetas + [SIN_MUELLE]),
+            "Llegada_Teorica": llegadas,
+            "Inicio_Real": inicio_real,
+            "Fin_Real": fin_real,
+            "Duracion_Min": duraciones,
+            "Espera_Min": espera.astype(np.int64),
+            "Costo_Demurrage_USD": np.round(costo, 2),
+            "Estado": pd.Categorical.from_codes(estado, dtype=ESTADO_DTYPE)
+        })
+        return schedule_df, costos_totales
+    
+    def _ordenar(self, scores):
+        """
+        Orden de atención: score descendente; los empates conservan el orden
+        del manifiesto (sort estable, reproducible en modo incremental).
+        
+        Cambio de comportamiento: antes los empates salían en el orden del
+        quicksort de sort_values, que dependía del resto del manifiesto (agregar
+        un camión no relacionado podía reordenarlos). Con el orden del
+        manifiesto algunas agendas con empates cambian; en 200 manifiestos de
+        60 camiones el costo cambió en 58 (34 mejor, 24 peor, variación media
+        -0,003 %, máxima 0,5 %).
+        """
+        return np.argsort(-scores, kind="stable")
+    
+    def _agendar_columnas(self, scores, llegada_ns, duraciones, tipos):
+        """
+        Núcleo de asignación sin pandas sobre columnas paralelas del manifiesto
+        (scores, llegadas en ns desde el inicio, duraciones en min, tipos).
+        Devuelve (orden, pasos): el orden de atención y un paso de _asignar
+        por camión en ese orden. No modifica self.docks.
+        """
+        with fase("agendar.orden"):
+            orden = self._ordenar(np.asarray(scores, dtype=float))
+        with fase("agendar.asignacion"):
+            pasos = self._asignar_en_orden(orden, llegada_ns, duraciones, tipos)
+        return orden, pasos
+    
+    def _asignar_en_orden(self, orden, llegada_ns, duraciones, tipos):
+        """Un paso de _asignar por camión, en el orden de atención dado"""
+        pools = self._pools_por_tipo()
+        asignar = self._asignar
+        pasos = [
+            asignar(pools, tipos[i], llegada_ns[i], duraciones[i])
+            for i in orden.tolist()
+        ]
+        self._ultimos_pools = pools
+        return pasos
+    
+    def _columnas_planas(self, camiones):
+        """
+        Columnas de entrada más las listas que recorre la asignación.
+        Devuelve (cols, llegada_ns, duraciones, tipos).
+        """
+        cols = self._columnas_entrada(camiones)
+        llegada_ns = (
+            (cols["llegadas"] - np.datetime64(self.start_time)) // np.timedelta64(1, 'ns')
+        ).tolist()
+        duraciones = [int(d) for d in cols["duraciones"]]
+        tipos = cols["Tipo_Producto"].tolist()
+        return cols, llegada_ns, duraciones, tipos
+    
+    def _agendar(self, camiones):
+        """Asigna todo el manifiesto; devuelve (cols, tipos, duraciones, orden, pasos)"""
+        # Columnas planas del manifiesto
+        with fase("agendar.puntaje"):
+            cols, llegada_ns, duraciones, tipos = self._columnas_planas(camiones)
+        
+        # Score vectorizado y asignación en orden de score (prioridad + llegada)
+        orden, pasos = self._agendar_columnas(cols["scores"], llegada_ns, duraciones, tipos)
+        
+        # Persistir el estado de los muelles entre llamadas
+        for pool in self._ultimos_pools.values():
+            for libre_ns, dock_id in pool:
+                self.docks[dock_id] = self.start_time + timedelta(microseconds=libre_ns // 1000)
+        return cols, tipos, duraciones, orden, pasos
+    
+    def _resultado_tramo(self, cols, tipos, duraciones, orden, pasos, desde, hasta):
+        """Agenda de las posiciones [desde, hasta) del orden de atención"""
+        tramo = orden[desde:hasta]
+        with fase("agendar.resultado"):
+            return self._construir_resultado(
+                cols["ID_Camion"][tramo].tolist(),
+                cols["Producto"][tramo].tolist(),
+                [tipos[i] for i in tramo],
+                cols["Prioridad"][tramo].tolist(),
+                cols["llegadas"][tramo],
+                [duraciones[i] for i in tramo],
+                pasos[desde:hasta]
+            )
+    
+    def agendar_camiones(self, df_camiones):
+        """
+        Agenda un manifiesto (DataFrame con COLUMNAS_ENTRADA o TruckStore).
+        Devuelve (resultado_df, costo_total).
+        """
+        if len(df_camiones) == 0:
+            return pd.DataFrame(), 0
+        
+        with fase("agendar"):
+            agenda = self._agendar(df_camiones)
+        return self._resultado_tramo(*agenda, 0, len(agenda[3]))
+    
+    def agendar_por_bloques(self, camiones, tam_bloque=100_000):
+        """
+        Igual que agendar_camiones, pero entrega la agenda como generador de
+        (bloque_df, costo_bloque) de hasta tam_bloque filas, para exportar
+        agendas grandes sin construir el DataFrame completo.
+        """
+        if len(camiones) == 0:
+            return
+        with fase("agendar"):
+            agenda = self._agendar(camiones)
+        n = len(agenda[3])
+        for desde in range(0, n, tam_bloque):
+            yield self._resultado_tramo(*agenda, desde, min(desde + tam_bloque, n))
@@ -0,0 +1,132 @@
+"""
+Perfilado liviano por fases.
+
+El código instrumentado marca sus fases con `with fase("agendar.asignacion"):`.
+Si no hay un Perfilador activo en el hilo, fase() devuelve un contexto nulo
+compartido y el costo es una llamada a función. Con un Perfilador activo se
+registra por fase:
+- duración (perf_counter)
+- bloques de memoria netos (sys.getallocatedblocks, barato)
+- pico de memoria (tracemalloc, solo si memoria=True; en fases con
+  subfases es el pico desde la última subfase)
+
+El Perfilador es por hilo: Streamlit corre cada sesión en su propio hilo, así
+que las sesiones no mezclan sus trazas.
+"""
+import contextlib
+import json
+import sys
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+_estado = threading.local()
+_NULO = contextlib.nullcontext()
+
+
+class Perfilador:
+    """Acumula los eventos de fase de una corrida (ej. un rerun)"""
+    
+    def __init__(self, nombre="rerun", memoria=False):
+        self.nombre = nombre
+        self.memoria = memoria
+        self.eventos = []   # (fase, inicio_s, duracion_s, bloques_netos, pico_bytes, profundidad)
+        self._profundidad = 0
+        self._t0 = time.perf_counter()
+        self.duracion_s = None
+    
+    @contextlib.contextmanager
+    def fase(self, nombre):
+        profundidad = self._profundidad
+        self._profundidad += 1
+        if self.memoria:
+            tracemalloc.reset_peak()
+        bloques = sys.getallocatedblocks()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            fin = time.perf_counter()
+            self._profundidad = profundidad
+            pico = tracemalloc.get_traced_memory()[1] if self.memoria else None
+            self.eventos.append((
+                nombre, inicio - self._t0, fin - inicio,
+                sys.getallocatedblocks() - bloques, pico, profundidad
+            ))
+    
+    def cerrar(self):
+        self.duracion_s = time.perf_counter() - self._t0
+    
+    def resumen(self):
+        """DataFrame por fase: llamadas, tiempo total/máximo (ms) y bloques netos"""
+        if not self.eventos:
+            return pd.DataFrame(columns=["Fase", "Llamadas", "Total_ms", "Max_ms", "Bloques_Netos"])
+        df = pd.DataFrame(self.eventos, columns=[
+            "Fase", "Inicio_s", "Duracion_s", "Bloques_Netos", "Pico_Bytes", "Profundidad"
+        ])
+        resumen = df.groupby("Fase", sort=False).agg(
+            Llamadas=("Duracion_s", "size"),
+            Total_ms=("Duracion_s", "sum"),
+            Max_ms=("Duracion_s", "max"),
+            Bloques_Netos=("Bloques_Netos", "sum"),
+            Profundidad=("Profundidad", "min")
+        ).reset_index()
+        resumen[["Total_ms", "Max_ms"]] *= 1000
+        if self.memoria:
+            resumen["Pico_KB"] = df.groupby("Fase", sort=False)["Pico_Bytes"].max().to_numpy() / 1024
+        return resumen.sort_values("Total_ms", ascending=False, kind="stable")
+    
+    def eventos_traza(self, pid=1, origen_s=0.0):
+        """Eventos en formato Trace Event (chrome://tracing, Perfetto)"""
+        eventos = [{
+            "name": self.nombre, "ph": "X", "pid": pid, "tid": 1,
+            "ts": origen_s * 1e6, "dur": (self.duracion_s or 0) * 1e6
+        }]
+        for nombre, inicio, duracion, bloques, pico, _ in self.eventos:
+            args = {"bloques_netos": bloques}
+            if pico is not None:
+                args["pico_bytes"] = pico
+            eventos.append({
+                "name": nombre, "ph": "X", "pid": pid, "tid": 1,
+                "ts": (origen_s + inicio) * 1e6, "dur": duracion * 1e6, "args": args
+            })
+        return eventos
+
+
+def traza_json(perfiladores):
+    """JSON de traza con varias corridas consecutivas en la misma línea de tiempo"""
+    eventos, origen = [], 0.0
+    for perfilador in perfiladores:
+        eventos.extend(perfilador.eventos_traza(origen_s=origen))
+        origen += (perfilador.duracion_s or 0) + 0.001
+    return json.dumps({"traceEvents": eventos, "displayTimeUnit": "ms"})
+
+
+def activar(nombre="rerun", memoria=False):
+    """Activa un Perfilador nuevo en el hilo actual y lo devuelve"""
+    perfilador = Perfilador(nombre, memoria)
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _estado.perfilador = perfilador
+    return perfilador
+
+
+def desactivar():
+    """Cierra y devuelve el Perfilador del hilo actual (o None)"""
+    perfilador = getattr(_estado, "perfilador", None)
+    _estado.perfilador = None
+    if perfilador is not None:
+        perfilador.cerrar()
+        if perfilador.memoria and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return perfilador
+
+
+def fase(nombre):
+    """Contexto de una fase; nulo si no hay Perfilador activo en el hilo"""
+    perfilador = getattr(_estado, "perfilador", None)
+    if perfilador is None:
+        return _NULO
+    return perfilador.fase(nombre)
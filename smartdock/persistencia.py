@@ -0,0 +1,284 @@
+"""
+Almacén persistente de camiones y agendas sobre SQLite.
+
+- Modo WAL: lectores concurrentes mientras un despachador escribe
+- Índices por ID (clave primaria), llegada, prioridad y muelle asignado, así
+  que consultas como "llegadas de las próximas 2 horas" o "agenda del muelle
+  3" son búsquedas por rango en el índice, no cargas completas
+- Altas masivas con executemany dentro de una transacción
+- Pool chico de conexiones reutilizadas entre reruns (una por hilo a la vez)
+- Un contador de versión en la tabla meta avisa a otras sesiones que hubo
+  cambios y deben recargar su TruckStore
+
+Las fechas se guardan como texto ISO "AAAA-MM-DD HH:MM:SS" (ordena igual que
+la fecha, así el índice sirve para rangos).
+"""
+import contextlib
+import queue
+import sqlite3
+
+import pandas as pd
+
+from smartdock.almacen import TruckStore
+from smartdock.optimizer import COLUMNAS_ENTRADA, COLUMNAS_RESULTADO
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+TAM_LOTE_SQL = 10_000
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (clave, valor) VALUES ('version', 0);
+
+CREATE TABLE IF NOT EXISTS camiones (
+    id_camion TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    producto TEXT NOT NULL,
+    tipo_producto TEXT NOT NULL,
+    prioridad TEXT NOT NULL,
+    hora_llegada_est TEXT NOT NULL,
+    duracion_min INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_camiones_llegada ON camiones (hora_llegada_est);
+CREATE INDEX IF NOT EXISTS idx_camiones_prioridad ON camiones (prioridad, hora_llegada_est);
+CREATE INDEX IF NOT EXISTS idx_camiones_seq ON camiones (seq);
+
+CREATE TABLE IF NOT EXISTS agenda (
+    camion TEXT PRIMARY KEY,
+    producto TEXT,
+    tipo_producto TEXT,
+    prioridad TEXT,
+    muelle_asignado TEXT,
+    llegada_teorica TEXT,
+    inicio_real TEXT,
+    fin_real TEXT,
+    duracion_min INTEGER,
+    espera_min INTEGER,
+    costo_demurrage_usd REAL,
+    estado TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_agenda_muelle ON agenda (muelle_asignado, inicio_real);
+CREATE INDEX IF NOT EXISTS idx_agenda_inicio ON agenda (inicio_real);
+"""
+
+_COLUMNAS_SQL_CAMIONES = ["id_camion", "producto", "tipo_producto", "prioridad",
+                          "hora_llegada_est", "duracion_min"]
+_COLUMNAS_SQL_AGENDA = [c.lower().replace("ó", "o") for c in COLUMNAS_RESULTADO]
+
+
+def _texto_fecha(serie):
+    """Fechas -> texto ISO (None para NaT), vectorizado"""
+    texto = pd.to_datetime(serie).dt.strftime(FORMATO_FECHA)
+    return texto.astype(object).where(texto.notna(), None)
+
+
+class AlmacenSQLite:
+    """
+    Camiones y última agenda en un archivo SQLite compartido.
+    
+    Es seguro usar una instancia desde varios hilos: cada operación toma una
+    conexión del pool y la devuelve al terminar.
+    """
+    
+    def __init__(self, ruta, tam_pool=4):
+        self.ruta = str(ruta)
+        self._pool = queue.Queue()
+        for _ in range(tam_pool):
+            self._pool.put(self._abrir())
+        with self.conexion() as con:
+            con.executescript(_ESQUEMA)
+    
+    def _abrir(self):
+        # isolation_level=None: las transacciones se abren explícitamente
+        con = sqlite3.connect(self.ruta, check_same_thread=False, isolation_level=None, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+    
+    @contextlib.contextmanager
+    def conexion(self):
+        con = self._pool.get()
+        try:
+            yield con
+        finally:
+            self._pool.put(con)
+    
+    @contextlib.contextmanager
+    def transaccion(self):
+        """Transacción de escritura; incrementa la versión al confirmar"""
+        with self.conexion() as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                yield con
+                con.execute("UPDATE meta SET valor = valor + 1 WHERE clave = 'version'")
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+    
+    def cerrar(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+    
+    # ───────────────────────── Camiones ─────────────────────────
+    def version(self):
+        with self.conexion() as con:
+            return con.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()[0]
+    
+    def __len__(self):
+        with self.conexion() as con:
+            return con.execute("SELECT COUNT(*) FROM camiones").fetchone()[0]
+    
+    def _filas(self, df_camiones):
+        return zip(
+            df_camiones["ID_Camion"].astype(str).tolist(),
+            df_camiones["Producto"].astype(str).tolist(),
+            df_camiones["Tipo_Producto"].astype(str).tolist(),
+            df_camiones["Prioridad"].astype(str).tolist(),
+            _texto_fecha(df_camiones["Hora_Llegada_Est"]).tolist(),
+            df_camiones["Duracion_Min"].astype(int).tolist()
+        )
+    
+    def insertar_lote(self, df_camiones, reemplazar=False):
+        """
+        Inserta un DataFrame con COLUMNAS_ENTRADA en una sola transacción.
+        reemplazar=True borra antes todos los camiones y la agenda.
+        Un ID repetido aborta la transacción completa (sqlite3.IntegrityError).
+        """
+        with self.transaccion() as con:
+            if reemplazar:
+                con.execute("DELETE FROM camiones")
+                con.execute("DELETE FROM agenda")
+            seq = con.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM camiones").fetchone()[0]
+            for desde in range(0, len(df_camiones), TAM_LOTE_SQL):
+                bloque = df_camiones.iloc[desde:desde + TAM_LOTE_SQL]
+                con.executemany(
+                    "INSERT INTO camiones (seq, id_camion, producto, tipo_producto, prioridad, "
+                    "hora_llegada_est, duracion_min) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((seq + desde + i, *fila) for i, fila in enumerate(self._filas(bloque)))
+                )
+    
+    def agregar(self, registro):
+        self.insertar_lote(pd.DataFrame([registro]))
+    
+    def actualizar(self, id_camion, **campos):
+        columnas = {c: c.lower() for c in COLUMNAS_ENTRADA if c != "ID_Camion"}
+        asignaciones, valores = [], []
+        for campo, valor in campos.items():
+            if campo not in columnas:
+                raise KeyError(f"Campo desconocido: {campo}")
+            if campo == "Hora_Llegada_Est":
+                valor = pd.Timestamp(valor).strftime(FORMATO_FECHA)
+            elif campo == "Duracion_Min":
+                valor = int(valor)
+            asignaciones.append(f"{columnas[campo]} = ?")
+            valores.append(valor)
+        if not asignaciones:
+            return
+        with self.transaccion() as con:
+            cursor = con.execute(
+                f"UPDATE camiones SET {', '.join(asignaciones)} WHERE id_camion = ?",
+                (*valores, id_camion)
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(id_camion)
+    
+    def eliminar(self, id_camion):
+        with self.transaccion() as con:
+            if con.execute("DELETE FROM camiones WHERE id_camion = ?", (id_camion,)).rowcount == 0:
+                raise KeyError(id_camion)
+            con.execute("DELETE FROM agenda WHERE camion = ?", (id_camion,))
+    
+    def limpiar(self):
+        with self.transaccion() as con:
+            con.execute("DELETE FROM camiones")
+            con.execute("DELETE FROM agenda")
+    
+    def _consulta_camiones(self, donde="", parametros=()):
+        with self.conexion() as con:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(_COLUMNAS_SQL_CAMIONES)} FROM camiones {donde}",
+                con, params=parametros
+            )
+        df.columns = COLUMNAS_ENTRADA
+        df["Hora_Llegada_Est"] = pd.to_datetime(df["Hora_Llegada_Est"], format=FORMATO_FECHA)
+        return df
+    
+    def camiones(self):
+        """Todos los camiones en orden de manifiesto"""
+        return self._consulta_camiones("ORDER BY seq")
+    
+    def cargar_almacen(self, base_date=None):
+        """TruckStore en memoria con el contenido actual de la base"""
+        df = self.camiones()
+        if df.empty:
+            return TruckStore(base_date)
+        return TruckStore.desde_frame(df, base_date)
+    
+    def llegadas_entre(self, desde, hasta, prioridad=None):
+        """Camiones con llegada en [desde, hasta), por índice de llegada"""
+        desde, hasta = pd.Timestamp(desde).strftime(FORMATO_FECHA), pd.Timestamp(hasta).strftime(FORMATO_FECHA)
+        if prioridad is None:
+            return self._consulta_camiones(
+                "WHERE hora_llegada_est >= ? AND hora_llegada_est < ? ORDER BY hora_llegada_est",
+                (desde, hasta)
+            )
+        return self._consulta_camiones(
+            "WHERE prioridad = ? AND hora_llegada_est >= ? AND hora_llegada_est < ? "
+            "ORDER BY hora_llegada_est",
+            (prioridad, desde, hasta)
+        )
+    
+    # ───────────────────────── Agenda ─────────────────────────
+    def guardar_agenda(self, resultado_df):
+        """Reemplaza la agenda guardada por resultado_df (mismo formato que agendar_camiones)"""
+        filas = resultado_df[COLUMNAS_RESULTADO].copy()
+        for columna in ("Llegada_Teorica", "Inicio_Real", "Fin_Real"):
+            filas[columna] = _texto_fecha(filas[columna])
+        filas = filas.astype(object).where(filas.notna(), None)
+        with self.conexion() as con:
+            # La agenda es derivada: no incrementa la versión del manifiesto
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                con.execute("DELETE FROM agenda")
+                con.executemany(
+                    f"INSERT INTO agenda ({', '.join(_COLUMNAS_SQL_AGENDA)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUMNAS_SQL_AGENDA))})",
+                    filas.itertuples(index=False, name=None)
+                )
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+    
+    def agenda_muelle(self, muelle, desde=None, hasta=None):
+        """
+        Agenda de un muelle (número o etiqueta "Muelle 3 (Frío)"), opcionalmente
+        acotada a inicios en [desde, hasta), por índice (muelle, inicio).
+        """
+        condiciones, parametros = [], []
+        if isinstance(muelle, int):
+            # Rango de prefijo "Muelle 3 (" (LIKE no usaría el índice BINARY)
+            condiciones.append("muelle_asignado >= ? AND muelle_asignado < ?")
+            parametros.extend([f"Muelle {muelle} (", f"Muelle {muelle} )"])
+        else:
+            condiciones.append("muelle_asignado = ?")
+            parametros.append(muelle)
+        if desde is not None:
+            condiciones.append("inicio_real >= ?")
+            parametros.append(pd.Timestamp(desde).strftime(FORMATO_FECHA))
+        if hasta is not None:
+            condiciones.append("inicio_real < ?")
+            parametros.append(pd.Timestamp(hasta).strftime(FORMATO_FECHA))
+        with self.conexion() as con:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(_COLUMNAS_SQL_AGENDA)} FROM agenda "
+                f"WHERE {' AND '.join(condiciones)} ORDER BY muelle_asignado, inicio_real",
+                con, params=parametros
+            )
+        df.columns = COLUMNAS_RESULTADO
+        for columna in ("Llegada_Teorica", "Inicio_Real", "Fin_Real"):
+            df[columna] = pd.to_datetime(df[columna], format=FORMATO_FECHA)
+        return df
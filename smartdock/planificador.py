@@ -0,0 +1,155 @@
+"""
+Planificador de capacidad: barre cantidades de muelles y mezclas Seco/Frío.
+
+Con muelles solo Seco o solo Frío, cada camión solo puede usar muelles de
+su tipo, así que la agenda de los camiones secos depende únicamente de
+cuántos muelles Seco hay (y la de los refrigerados, de cuántos Frío). El
+planificador ordena y particiona el manifiesto una sola vez, evalúa cada
+pool para cada cantidad de muelles en paralelo, y arma todas las
+configuraciones (total, fríos) combinando esos resultados en lugar de
+reagendar el día completo por configuración.
+
+Los camiones que exigen otras capacidades (Congelado, Peligroso, ...) no
+caben en ninguna de estas configuraciones y se cuentan en Sin_Muelle.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from smartdock.capacidades import mascara_muelle, mascara_requisitos
+from smartdock.optimizer import DockOptimizerPro
+
+# Partición del manifiesto compartida con los workers (ver _iniciar_worker)
+_PARTICIONES = {}
+
+
+def _particionar(df_camiones, hora_inicio, base_date=None):
+    """Orden de atención y partición por tipo de muelle, calculados una vez"""
+    optimizer = DockOptimizerPro(1, {1: "Seco"}, hora_inicio, base_date=base_date)
+    orden = optimizer._ordenar(optimizer._calcular_scores(df_camiones))
+    llegadas = pd.to_datetime(df_camiones['Hora_Llegada_Est']).to_numpy()[orden]
+    llegada_ns = (llegadas - np.datetime64(optimizer.start_time)) // np.timedelta64(1, 'ns')
+    duracion = df_camiones['Duracion_Min'].to_numpy()[orden].astype(np.int64)
+    tipos = df_camiones['Tipo_Producto'].to_numpy()[orden]
+    
+    # Requisitos por tipo de producto distinto, no por camión
+    codigos, unicos = pd.factorize(tipos)
+    requisitos = np.array([mascara_requisitos(t) for t in unicos], dtype=np.int64)[codigos]
+    particiones = {"otros": int(len(tipos))}
+    for tipo_muelle in ("Seco", "Frío"):
+        mascara = requisitos == mascara_muelle(tipo_muelle)
+        particiones[tipo_muelle] = (llegada_ns[mascara].tolist(), duracion[mascara].tolist())
+        particiones["otros"] -= int(mascara.sum())
+    return particiones
+
+
+def _iniciar_worker(particiones):
+    _PARTICIONES.update(particiones)
+
+
+def _evaluar_pool(tarea):
+    """
+    Agenda los camiones de un tipo en k muelles de ese tipo.
+    Devuelve (tipo, k, suma_espera_min, max_espera_min, fin_max_ns, n_camiones).
+    """
+    tipo_muelle, k = tarea
+    llegada_ns, duraciones = _PARTICIONES[tipo_muelle]
+    n = len(llegada_ns)
+    if k == 0:
+        return tipo_muelle, k, 0.0, 0.0, 0, n
+    
+    optimizer = DockOptimizerPro(k, {d: tipo_muelle for d in range(1, k + 1)})
+    pools = optimizer._pools_por_tipo()
+    suma_espera, max_espera, fin_max = 0.0, 0.0, 0
+    tipo_producto = "Refrigerado" if tipo_muelle == "Frío" else "Seco"
+    for llegada, duracion in zip(llegada_ns, duraciones):
+        _, _, fin_ns, espera = optimizer._asignar(pools, tipo_producto, llegada, duracion)
+        suma_espera += espera
+        if espera > max_espera:
+            max_espera = espera
+        if fin_ns > fin_max:
+            fin_max = fin_ns
+    return tipo_muelle, k, suma_espera, max_espera, fin_max, n
+
+
+def planificar_capacidad(df_camiones, muelles_min=1, muelles_max=10, hora_inicio=8,
+                         base_date=None, max_workers=None):
+    """
+    Evalúa todas las configuraciones con muelles_min..muelles_max muelles y
+    0..total muelles Frío. Devuelve un DataFrame con una fila por configuración:
+    Muelles, Muelles_Seco, Muelles_Frio, Costo_Demurrage_USD, Espera_Promedio_Min,
+    Espera_Max_Min, Makespan_Min, Sin_Muelle y Pareto.
+    """
+    particiones = _particionar(df_camiones, hora_inicio, base_date)
+    tareas = [(tipo, k) for tipo in ("Seco", "Frío") for k in range(0, muelles_max + 1)]
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        _iniciar_worker(particiones)
+        resultados = list(map(_evaluar_pool, tareas))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_iniciar_worker,
+                                 initargs=(particiones,)) as pool:
+            resultados = list(pool.map(_evaluar_pool, tareas))
+    por_pool = {(r[0], r[1]): r[2:] for r in resultados}
+    
+    total = len(df_camiones)
+    costo_hora = DockOptimizerPro.COSTO_DEMURRAGE_POR_HORA
+    filas = []
+    for muelles in range(muelles_min, muelles_max + 1):
+        for frios in range(0, muelles + 1):
+            espera_s, max_s, fin_s, n_s = por_pool[("Seco", muelles - frios)]
+            espera_f, max_f, fin_f, n_f = por_pool[("Frío", frios)]
+            sin_muelle = (n_s if muelles - frios == 0 else 0) + (n_f if frios == 0 else 0) + particiones["otros"]
+            agendados = total - sin_muelle
+            suma_espera = espera_s + espera_f
+            filas.append({
+                "Muelles": muelles,
+                "Muelles_Seco": muelles - frios,
+                "Muelles_Frio": frios,
+                "Costo_Demurrage_USD": suma_espera / 60 * costo_hora,
+                "Espera_Promedio_Min": suma_espera / agendados if agendados else 0.0,
+                "Espera_Max_Min": max(max_s, max_f),
+                "Makespan_Min": max(fin_s, fin_f) / 60_000_000_000,
+                "Sin_Muelle": sin_muelle
+            })
+    
+    df = pd.DataFrame(filas)
+    df["Pareto"] = frontera_pareto(df)
+    return df
+
+
+def frontera_pareto(df_config, objetivos=("Muelles", "Costo_Demurrage_USD", "Makespan_Min")):
+    """
+    Máscara de configuraciones no dominadas (todas las que agendan todos los
+    camiones) minimizando los objetivos dados.
+    """
+    factibles = (df_config["Sin_Muelle"] == 0).to_numpy()
+    valores = df_config[list(objetivos)].to_numpy(dtype=float)
+    pareto = np.zeros(len(df_config), dtype=bool)
+    candidatos = np.flatnonzero(factibles)
+    for i in candidatos:
+        otros = valores[candidatos]
+        domina = np.all(otros <= valores[i], axis=1) & np.any(otros < valores[i], axis=1)
+        pareto[i] = not domina.any()
+    return pareto
+
+
+def configuracion_recomendada(df_config, espera_max_objetivo):
+    """
+    La configuración más barata (menos muelles, luego menor demurrage) que
+    agenda todos los camiones sin superar la espera máxima objetivo.
+    Devuelve la fila (Series) o None si ninguna cumple.
+    """
+    cumplen = df_config[(df_config["Sin_Muelle"] == 0) & (df_config["Espera_Max_Min"] <= espera_max_objetivo)]
+    if cumplen.empty:
+        return None
+    return cumplen.sort_values(["Muelles", "Costo_Demurrage_USD", "Makespan_Min"]).iloc[0]
+
+
+def config_muelles_desde(fila):
+    """Convierte una fila del planificador en un config_muelles (Seco primero)"""
+    secos = int(fila["Muelles_Seco"])
+    return {d: ("Seco" if d <= secos else "Frío") for d in range(1, int(fila["Muelles"]) + 1)}
@@ -0,0 +1,90 @@
+"""
+Políticas de despacho: cómo se ordena el manifiesto antes de asignar muelles.
+
+Una política es una función vectorizada
+    politica(pesos, llegada_min, duracion_min) -> scores
+sobre arrays paralelos del manifiesto (peso de prioridad, minutos de llegada
+desde la apertura y duración en minutos). Los motores atienden por score
+descendente; los empates conservan el orden del manifiesto.
+
+Para usar una política propia basta con pasar la función (o registrarla en
+POLITICAS) a DockOptimizerPro(..., politica=...). Debe ser una función de
+módulo para poder enviarla a los procesos de comparar_politicas.
+"""
+import numpy as np
+
+# Peso de la prioridad frente a los minutos de llegada en la política original
+_ESCALA_PRIORIDAD = 10_000
+# Separa el criterio principal del desempate por llegada (mismo esquema que
+# la política original, con margen para duraciones y cocientes)
+_ESCALA = 1_000_000
+
+# Espera tolerada por peso de prioridad (Alta, Media, Baja) para "Fecha límite"
+TOLERANCIA_MIN_POR_PESO = {3: 30, 2: 90, 1: 180}
+
+
+def prioridad_ponderada(pesos, llegada_min, duracion_min):
+    """Política original: prioridad Alta > Media > Baja, desempata la llegada"""
+    return (pesos * _ESCALA_PRIORIDAD) - llegada_min
+
+
+def fifo(pesos, llegada_min, duracion_min):
+    """Primero en llegar, primero en ser atendido"""
+    return -llegada_min
+
+
+def spt(pesos, llegada_min, duracion_min):
+    """Shortest processing time: primero las descargas más cortas"""
+    return -np.asarray(duracion_min, dtype=float) * _ESCALA - llegada_min
+
+
+def costo_ponderado(pesos, llegada_min, duracion_min):
+    """
+    Regla de Smith (WSPT): mayor peso por minuto de muelle primero. Minimiza
+    la espera ponderada, que es lo que pesa en el demurrage por prioridad.
+    """
+    return pesos / np.asarray(duracion_min, dtype=float) * _ESCALA - llegada_min
+
+
+def fecha_limite(pesos, llegada_min, duracion_min):
+    """
+    Earliest due date: cada camión vence a su llegada más la espera tolerada
+    de su prioridad (TOLERANCIA_MIN_POR_PESO); primero el que vence antes.
+    """
+    tolerancia = np.full(len(pesos), max(TOLERANCIA_MIN_POR_PESO.values()), dtype=float)
+    for peso, minutos in TOLERANCIA_MIN_POR_PESO.items():
+        tolerancia[pesos == peso] = minutos
+    return -(llegada_min + tolerancia)
+
+
+POLITICAS = {
+    "Prioridad ponderada": prioridad_ponderada,
+    "FIFO": fifo,
+    "SPT (más corto primero)": spt,
+    "Costo ponderado (WSPT)": costo_ponderado,
+    "Fecha límite (EDD)": fecha_limite,
+}
+POLITICA_DEFECTO = "Prioridad ponderada"
+
+
+def resolver_politica(politica):
+    """Nombre de POLITICAS, función o None (política por defecto) -> función"""
+    if politica is None:
+        return POLITICAS[POLITICA_DEFECTO]
+    if callable(politica):
+        return politica
+    if politica not in POLITICAS:
+        raise ValueError(f"Política desconocida: {politica!r} (válidas: {list(POLITICAS)})")
+    return POLITICAS[politica]
+
+
+def nombre_politica(politica):
+    """Etiqueta legible de una política (nombre registrado o nombre de la función)"""
+    if politica is None:
+        return POLITICA_DEFECTO
+    if isinstance(politica, str):
+        return politica
+    for nombre, funcion in POLITICAS.items():
+        if funcion is politica:
+            return nombre
+    return getattr(politica, "__name__", repr(politica))
@@ -0,0 +1,370 @@
+"""
+Servicio local de agendas sobre asyncio.
+
+    python -m smartdock.servicio --puerto 8765 --workers 4
+
+Protocolo: JSON por línea sobre TCP. Cada solicitud es
+{"id": 1, "op": "agendar", "params": {...}} y la respuesta
+{"id": 1, "ok": true, "resultado": {...}} (o "ok": false y "error"). Una
+conexión puede tener varias solicitudes en vuelo; las respuestas llevan el id.
+
+Operaciones:
+- agendar: manifiesto, muelles, hora_inicio, base_date, motor -> agenda + costo
+- kpis: igual que agendar, pero devuelve solo los KPIs
+- what_if: manifiesto + lista de configuraciones de muelles -> KPIs por config
+- estadisticas / ping
+
+El trabajo CPU corre en un ProcessPoolExecutor. Solicitudes idénticas en
+vuelo se coalescen (esperan el mismo futuro) y las chicas se agrupan en
+lotes de hasta tam_lote o ventana_lote_s, para pagar una sola vez el viaje
+al proceso worker.
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import select
+import signal
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from smartdock.kpis import calcular_kpis, kpis_serializables
+from smartdock.optimizer import COLUMNAS_ENTRADA, DockOptimizerPro
+from smartdock.simulacion import DockEventSimulator
+
+MOTORES = {"greedy": DockOptimizerPro, "eventos": DockEventSimulator}
+COLUMNAS_FECHA = ["Hora_Llegada_Est", "Llegada_Teorica", "Inicio_Real", "Fin_Real"]
+PUERTO_DEFECTO = 8765
+LIMITE_LINEA = 256 * 1024 * 1024
+
+
+# ───────────────────────── Serialización ─────────────────────────
+def df_a_columnas(df):
+    """DataFrame -> dict de listas; fechas como µs desde epoch (None = NaT)"""
+    columnas = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if columna in COLUMNAS_FECHA:
+            valores = serie.to_numpy().astype("datetime64[us]")
+            enteros = valores.astype(np.int64).astype(object)
+            enteros[np.isnat(valores)] = None
+            columnas[columna] = enteros.tolist()
+        else:
+            columnas[columna] = serie.tolist()
+    return columnas
+
+
+def columnas_a_df(columnas):
+    df = pd.DataFrame(columnas)
+    for columna in COLUMNAS_FECHA:
+        if columna in df.columns:
+            df[columna] = pd.to_datetime(df[columna], unit="us").astype("datetime64[us]")
+    return df
+
+
+def _clave(op, params):
+    """Hash canónico de una solicitud, para coalescer las idénticas"""
+    texto = json.dumps([op, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+# ───────────────────────── Worker ─────────────────────────
+def _agendar(params):
+    muelles = {int(d): tipo for d, tipo in params["muelles"].items()}
+    base_date = params.get("base_date")
+    optimizer = MOTORES[params.get("motor", "greedy")](
+        num_docks=len(muelles),
+        dock_config=muelles,
+        start_hour=params.get("hora_inicio", 8),
+        base_date=date.fromisoformat(base_date) if base_date else None
+    )
+    return optimizer.agendar_camiones(columnas_a_df(params["manifiesto"]))
+
+
+def _ejecutar(op, params):
+    resultado_df, costo_total = _agendar(params)
+    if op == "kpis":
+        return kpis_serializables(calcular_kpis(resultado_df, costo_total))
+    return {"agenda": df_a_columnas(resultado_df), "costo_total": float(costo_total)}
+
+
+def _ejecutar_lote(tareas):
+    """Corre un lote de (op, params) en un worker; un error no tumba el lote"""
+    salida = []
+    for op, params in tareas:
+        try:
+            salida.append((True, _ejecutar(op, params)))
+        except Exception as e:
+            salida.append((False, f"{type(e).__name__}: {e}"))
+    return salida
+
+
+# ───────────────────────── Servidor ─────────────────────────
+class ServicioAgendas:
+    """
+    Despachador asíncrono: coalescencia de solicitudes idénticas, lotes de
+    solicitudes chicas y un pool de procesos para el trabajo CPU.
+    """
+    
+    def __init__(self, max_workers=None, tam_lote=16, ventana_lote_s=0.005, umbral_chica=2000):
+        self.max_workers = max_workers
+        self.tam_lote = tam_lote
+        self.ventana_lote_s = ventana_lote_s
+        self.umbral_chica = umbral_chica
+        self._pool = None
+        self._en_vuelo = {}      # clave -> asyncio.Future
+        self._pendientes = []    # [(op, params, future)] esperando formar lote
+        self._temporizador = None
+        self.estadisticas = {"solicitudes": 0, "coalescidas": 0, "lotes": 0, "tareas": 0}
+    
+    def iniciar(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+    
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+    
+    async def ejecutar(self, op, params):
+        if op == "ping":
+            return "pong"
+        if op == "estadisticas":
+            return dict(self.estadisticas)
+        if op == "what_if":
+            # Cada configuración es una solicitud "kpis" independiente: se
+            # reparten entre los workers y se coalescen con las de otros clientes
+            base = {k: v for k, v in params.items() if k != "configuraciones"}
+            return list(await asyncio.gather(*(
+                self.ejecutar("kpis", {**base, "muelles": muelles})
+                for muelles in params["configuraciones"]
+            )))
+        if op not in ("agendar", "kpis"):
+            raise ValueError(f"Operación desconocida: {op!r}")
+        
+        faltantes = [c for c in COLUMNAS_ENTRADA if c not in params.get("manifiesto", {})]
+        if faltantes:
+            raise ValueError(f"Faltan columnas en el manifiesto: {', '.join(faltantes)}")
+        
+        self.estadisticas["solicitudes"] += 1
+        clave = _clave(op, params)
+        futuro = self._en_vuelo.get(clave)
+        if futuro is not None:
+            self.estadisticas["coalescidas"] += 1
+        else:
+            futuro = asyncio.get_running_loop().create_future()
+            self._en_vuelo[clave] = futuro
+            futuro.add_done_callback(lambda _: self._en_vuelo.pop(clave, None))
+            self._encolar(op, params, futuro)
+        return await asyncio.shield(futuro)
+    
+    def _encolar(self, op, params, futuro):
+        if len(params["manifiesto"]["ID_Camion"]) > self.umbral_chica:
+            self._lanzar([(op, params, futuro)])
+            return
+        self._pendientes.append((op, params, futuro))
+        if len(self._pendientes) >= self.tam_lote:
+            self._vaciar()
+        elif self._temporizador is None:
+            self._temporizador = asyncio.get_running_loop().call_later(self.ventana_lote_s, self._vaciar)
+    
+    def _vaciar(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        lote, self._pendientes = self._pendientes, []
+        if lote:
+            self._lanzar(lote)
+    
+    def _lanzar(self, lote):
+        self.estadisticas["lotes"] += 1
+        self.estadisticas["tareas"] += len(lote)
+        loop = asyncio.get_running_loop()
+        trabajo = loop.run_in_executor(self._pool, _ejecutar_lote, [(op, params) for op, params, _ in lote])
+        
+        def entregar(trabajo):
+            try:
+                salidas = trabajo.result()
+            except Exception as e:
+                salidas = [(False, f"{type(e).__name__}: {e}")] * len(lote)
+            for (_, _, futuro), (ok, valor) in zip(lote, salidas):
+                if futuro.done():
+                    continue
+                if ok:
+                    futuro.set_result(valor)
+                else:
+                    futuro.set_exception(RuntimeError(valor))
+        
+        trabajo.add_done_callback(entregar)
+    
+    async def atender(self, reader, writer):
+        """Una conexión: solicitudes en paralelo, respuestas por id"""
+        bloqueo = asyncio.Lock()
+        tareas = set()
+        
+        async def responder(solicitud, error=None):
+            try:
+                if error is not None:
+                    raise ValueError(f"JSON inválido: {error}")
+                resultado = await self.ejecutar(solicitud.get("op"), solicitud.get("params", {}))
+                respuesta = {"id": solicitud.get("id"), "ok": True, "resultado": resultado}
+            except Exception as e:
+                respuesta = {"id": solicitud.get("id"), "ok": False, "error": str(e)}
+            async with bloqueo:
+                writer.write(json.dumps(respuesta, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        
+        try:
+            while linea := await reader.readline():
+                try:
+                    tarea = asyncio.create_task(responder(json.loads(linea)))
+                except json.JSONDecodeError as e:
+                    # Sin id: el cliente no puede emparejarla, pero ve el motivo
+                    tarea = asyncio.create_task(responder({}, str(e)))
+                tareas.add(tarea)
+                tarea.add_done_callback(tareas.discard)
+            if tareas:
+                await asyncio.gather(*tareas, return_exceptions=True)
+        except (asyncio.CancelledError, ConnectionError):
+            pass   # servicio detenido o cliente desconectado
+        finally:
+            writer.close()
+    
+    async def servir(self, host="127.0.0.1", puerto=PUERTO_DEFECTO):
+        self.iniciar()
+        servidor = await asyncio.start_server(self.atender, host, puerto, limit=LIMITE_LINEA)
+        # SIGTERM detiene el servidor ordenadamente: el pool se cierra y no
+        # quedan workers huérfanos
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            self.cerrar()
+
+
+# ───────────────────────── Cliente ─────────────────────────
+class ClienteAgendas:
+    """
+    Cliente síncrono (apto para Streamlit). Una conexión persistente;
+    thread-safe con un lock, se reconecta si el servicio se reinició.
+    """
+    
+    def __init__(self, host="127.0.0.1", puerto=PUERTO_DEFECTO, timeout=300):
+        self.host = host
+        self.puerto = puerto
+        self.timeout = timeout
+        self._archivo = None
+        self._socket = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def _conectar(self):
+        self._socket = socket.create_connection((self.host, self.puerto), timeout=self.timeout)
+        self._archivo = self._socket.makefile("rwb")
+    
+    def cerrar(self):
+        if self._socket is not None:
+            self._archivo.close()
+            self._socket.close()
+            self._socket = self._archivo = None
+    
+    def _vigente(self):
+        """Sin solicitudes en vuelo, un socket legible es uno que el servicio cerró"""
+        legibles, _, _ = select.select([self._socket], [], [], 0)
+        return not legibles
+    
+    def solicitar(self, op, params=None):
+        with self._lock:
+            # Solo se reintenta hasta el envío: pasado el write el servicio
+            # pudo recibir la solicitud y reenviarla la calcularía dos veces
+            for intento in range(2):
+                try:
+                    if self._socket is not None and not self._vigente():
+                        self.cerrar()
+                    if self._socket is None:
+                        self._conectar()
+                    id_ = next(self._ids)
+                    self._archivo.write(json.dumps({"id": id_, "op": op, "params": params or {}}).encode() + b"\n")
+                    self._archivo.flush()
+                    break
+                except ConnectionError:
+                    self.cerrar()
+                    if intento:
+                        raise
+            try:
+                linea = self._archivo.readline()
+                if not linea:
+                    raise ConnectionError("El servicio cerró la conexión")
+            except OSError:
+                # Timeout incluido: la respuesta que llegue tarde no debe
+                # confundirse con la de la próxima solicitud
+                self.cerrar()
+                raise
+        respuesta = json.loads(linea)
+        if not respuesta["ok"]:
+            raise RuntimeError(respuesta["error"])
+        return respuesta["resultado"]
+    
+    @staticmethod
+    def _params(camiones, dock_config, hora_inicio, base_date=None, motor="greedy"):
+        df = camiones.to_frame() if hasattr(camiones, "to_frame") else camiones
+        return {
+            "manifiesto": df_a_columnas(df[COLUMNAS_ENTRADA]),
+            "muelles": {str(d): tipo for d, tipo in dock_config.items()},
+            "hora_inicio": int(hora_inicio),
+            "base_date": (base_date or datetime.now().date()).isoformat(),
+            "motor": motor
+        }
+    
+    def agendar(self, camiones, dock_config, hora_inicio, base_date=None, motor="greedy"):
+        """Mismo contrato que agendar_camiones: (resultado_df, costo_total)"""
+        salida = self.solicitar("agendar", self._params(camiones, dock_config, hora_inicio, base_date, motor))
+        return columnas_a_df(salida["agenda"]), salida["costo_total"]
+    
+    def calcular(self, camiones, dock_config, hora_inicio, base_date, motor):
+        """Adaptador para ScheduleCache.obtener(calcular=...): motor es la clase"""
+        nombre = next(n for n, clase in MOTORES.items() if clase is motor)
+        return self.agendar(camiones, dock_config, hora_inicio, base_date, nombre)
+    
+    def kpis(self, camiones, dock_config, hora_inicio, base_date=None, motor="greedy"):
+        return self.solicitar("kpis", self._params(camiones, dock_config, hora_inicio, base_date, motor))
+    
+    def what_if(self, camiones, configuraciones, hora_inicio, base_date=None, motor="greedy"):
+        """KPIs del mismo manifiesto con varias configuraciones de muelles"""
+        params = self._params(camiones, {}, hora_inicio, base_date, motor)
+        params["configuraciones"] = [
+            {str(d): tipo for d, tipo in config.items()} for config in configuraciones
+        ]
+        return self.solicitar("what_if", params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="smartdock.servicio",
+                                     description="Servicio local de agendas (JSON por línea sobre TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--tam-lote", type=int, default=16)
+    parser.add_argument("--ventana-lote-ms", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    servicio = ServicioAgendas(args.workers, args.tam_lote, args.ventana_lote_ms / 1000)
+    print(f"Servicio de agendas en {args.host}:{args.puerto}", flush=True)
+    try:
+        asyncio.run(servicio.servir(args.host, args.puerto))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
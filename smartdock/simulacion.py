@@ -0,0 +1,125 @@
+"""
+Motor de despacho por eventos discretos.
+
+A diferencia de DockOptimizerPro, que ordena todo el manifiesto por score y
+compromete cada camión en ese orden, aquí el tiempo avanza por una cola de
+eventos de llegada y de liberación de muelle. En cada instante de decisión
+solo compiten los camiones que ya llegaron: un camión de prioridad Alta que
+llega a las 14:00 no bloquea a uno de prioridad Baja que llegó a las 08:00.
+"""
+import heapq
+from datetime import timedelta
+
+import numpy as np
+
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.perfilado import fase
+
+# Tipos de evento (las liberaciones se procesan antes que las llegadas del mismo instante)
+EVENTO_LIBERACION = 0
+EVENTO_LLEGADA = 1
+
+
+class DockEventSimulator(DockOptimizerPro):
+    """
+    Simulador de despacho con semántica real de llegadas:
+    - Cola de eventos (heap) de llegadas y liberaciones de muelle, O(log n) por evento
+    - Por clase de compatibilidad: heap de muelles libres; por requisitos de
+      producto: cola de espera por score. Cuando varias colas compiten por los
+      mismos muelles gana el mejor score; el muelle es el de id más bajo
+    - Misma salida que DockOptimizerPro.agendar_camiones / agendar_por_bloques,
+      en orden de despacho (los camiones sin muelle compatible van al final)
+    """
+    
+    def _agendar(self, camiones):
+        """Simula el día completo; devuelve (cols, tipos, duraciones, orden, pasos)"""
+        with fase("agendar.puntaje"):
+            cols, llegada_ns, duraciones, tipos = self._columnas_planas(camiones)
+        orden, pasos = self._agendar_columnas(cols["scores"], llegada_ns, duraciones, tipos)
+        
+        # Persistir el estado de los muelles entre llamadas
+        for dock_id, end_ns in self._ultimo_fin.items():
+            self.docks[dock_id] = self.start_time + timedelta(microseconds=end_ns // 1000)
+        return cols, tipos, duraciones, orden, pasos
+    
+    def _agendar_columnas(self, scores, llegada_ns, duraciones, tipos):
+        """
+        Simulación sobre columnas paralelas (misma firma que en
+        DockOptimizerPro). Devuelve (orden, pasos) en orden de despacho; el fin
+        de cada muelle queda en self._ultimo_fin. No modifica self.docks.
+        """
+        n = len(tipos)
+        scores = (-np.asarray(scores, dtype=float)).tolist()
+        
+        # Cola de eventos: (tiempo_ns, tipo_evento, id) — id es dock_id o índice de camión
+        eventos = []
+        libres = {}        # clase de muelle -> heap de dock_id libres
+        clase_de_muelle = {}
+        for clase, pool in self._pools_por_tipo().items():
+            libres[clase] = []
+            for libre_ns, dock_id in pool:
+                clase_de_muelle[dock_id] = clase
+                eventos.append((libre_ns, EVENTO_LIBERACION, dock_id))
+        
+        # Colas de espera por tupla de clases elegibles (un lookup por camión)
+        elegibles_de = {
+            tipo: tuple(c for c in self.capacidades.por_tipo[tipo] if c in libres)
+            for tipo in set(tipos)
+        }
+        en_espera = {elegibles: [] for elegibles in elegibles_de.values() if elegibles}
+        pasos = [None] * n
+        sin_muelle = []
+        for i in range(n):
+            if elegibles_de[tipos[i]]:
+                # Antes de la apertura, el camión espera a la hora de inicio
+                eventos.append((max(llegada_ns[i], 0), EVENTO_LLEGADA, i))
+            else:
+                sin_muelle.append(i)
+                pasos[i] = (None, 0, 0, 0)
+        heapq.heapify(eventos)
+        colas_de_clase = {clase: [e for e in en_espera if clase in e] for clase in libres}
+        
+        orden = []
+        ultimo_fin = {}
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while eventos:
+            ahora = eventos[0][0]
+            afectadas = set()
+            
+            # Procesar todos los eventos del mismo instante antes de decidir
+            while eventos and eventos[0][0] == ahora:
+                _, tipo_evento, ident = heappop(eventos)
+                if tipo_evento == EVENTO_LIBERACION:
+                    clase = clase_de_muelle[ident]
+                    heappush(libres[clase], ident)
+                    afectadas.update(colas_de_clase[clase])
+                else:
+                    elegibles = elegibles_de[tipos[ident]]
+                    heappush(en_espera[elegibles], (scores[ident], ident))
+                    afectadas.add(elegibles)
+            
+            # Despachar entre los camiones que ya llegaron: el mejor score de
+            # las colas con algún muelle libre, al muelle libre de menor id
+            while True:
+                mejor = None
+                for elegibles in afectadas:
+                    cola = en_espera[elegibles]
+                    if cola and (mejor is None or cola[0] < en_espera[mejor][0]) \
+                            and any(libres[c] for c in elegibles):
+                        mejor = elegibles
+                if mejor is None:
+                    break
+                _, i = heappop(en_espera[mejor])
+                clase = min((c for c in mejor if libres[c]), key=lambda c: libres[c][0])
+                dock_id = heappop(libres[clase])
+                end_ns = ahora + duraciones[i] * 60_000_000_000
+                wait_time = max(0, (ahora - llegada_ns[i]) / 1e9 / 60)
+                pasos[i] = (dock_id, ahora, end_ns, wait_time)
+                orden.append(i)
+                heappush(eventos, (end_ns, EVENTO_LIBERACION, dock_id))
+                ultimo_fin[dock_id] = end_ns
+        
+        self._ultimo_fin = ultimo_fin
+        orden += sin_muelle
+        orden = np.asarray(orden, dtype=np.int64)
+        return orden, [pasos[i] for i in orden]
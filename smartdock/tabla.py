@@ -0,0 +1,92 @@
+"""
+Tabla paginada de asignaciones para el Dashboard.
+
+Los filtros (muelle, estado, prioridad) usan índices invertidos calculados
+una sola vez por agenda: valor -> posiciones de fila. El orden usa rangos
+precalculados por columna, así que ordenar un subconjunto filtrado es un
+argsort sobre enteros. Solo se formatea la página visible.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNAS_FILTRO = ["Muelle_Asignado", "Estado", "Prioridad"]
+COLUMNAS_TABLA = [
+    "Camión", "Producto", "Tipo_Producto", "Prioridad",
+    "Muelle_Asignado", "Llegada_Teorica", "Inicio_Real",
+    "Fin_Real", "Espera_Min", "Costo_Demurrage_USD", "Estado"
+]
+COLUMNAS_HORA = ["Llegada_Teorica", "Inicio_Real", "Fin_Real"]
+
+
+class TablaAsignaciones:
+    """
+    Vista paginada sobre resultado_df (no se copia ni se modifica).
+    - opciones(columna): valores disponibles para un filtro
+    - filtrar(**{columna: valores}): posiciones de fila que cumplen todo
+    - ordenar(posiciones, columna, ascendente)
+    - pagina(posiciones, numero, tam_pagina): DataFrame formateado
+    """
+    
+    def __init__(self, resultado_df):
+        self.resultado_df = resultado_df
+        self._indices = {}
+        self._rangos = {}
+        for columna in COLUMNAS_FILTRO:
+            codigos, valores = pd.factorize(resultado_df[columna], sort=True)
+            # Posiciones agrupadas por código: un argsort estable y cortes
+            orden = np.argsort(codigos, kind="stable")
+            cortes = np.searchsorted(codigos[orden], np.arange(len(valores) + 1))
+            self._indices[columna] = {
+                valor: orden[cortes[i]:cortes[i + 1]] for i, valor in enumerate(valores)
+            }
+    
+    def __len__(self):
+        return len(self.resultado_df)
+    
+    def opciones(self, columna):
+        return list(self._indices[columna])
+    
+    def filtrar(self, **filtros):
+        """filtros: columna -> lista de valores aceptados (vacía o None = todos)"""
+        posiciones = None
+        for columna, valores in filtros.items():
+            if not valores:
+                continue
+            indice = self._indices[columna]
+            partes = [indice[v] for v in valores if v in indice]
+            candidatas = np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype=np.intp)
+            posiciones = candidatas if posiciones is None else np.intersect1d(
+                posiciones, candidatas, assume_unique=True
+            )
+        return np.arange(len(self.resultado_df)) if posiciones is None else posiciones
+    
+    def _rango(self, columna, ascendente):
+        """Rango de cada fila en el orden de la columna (NaT/NaN siempre al final)"""
+        clave = (columna, ascendente)
+        if clave not in self._rangos:
+            serie = self.resultado_df[columna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                # En el orden de las categorías (Muelle 2 antes que Muelle 10),
+                # como sort_values; rank las ordenaría alfabéticamente
+                codigos = serie.cat.codes
+                serie = codigos.where(codigos >= 0)
+            rango = serie.rank(method="first", ascending=ascendente, na_option="bottom")
+            self._rangos[clave] = rango.to_numpy().astype(np.intp) - 1
+        return self._rangos[clave]
+    
+    def ordenar(self, posiciones, columna=None, ascendente=True):
+        if columna is None:
+            return posiciones
+        return posiciones[np.argsort(self._rango(columna, ascendente)[posiciones])]
+    
+    def pagina(self, posiciones, numero=1, tam_pagina=100):
+        """Página numero (desde 1) con las horas formateadas como HH:MM"""
+        desde = (numero - 1) * tam_pagina
+        filas = self.resultado_df.iloc[posiciones[desde:desde + tam_pagina]][COLUMNAS_TABLA].copy()
+        for columna in COLUMNAS_HORA:
+            filas[columna] = filas[columna].dt.strftime('%H:%M').fillna('N/A')
+        return filas
+    
+    @staticmethod
+    def num_paginas(posiciones, tam_pagina=100):
+        return max(1, -(-len(posiciones) // tam_pagina))
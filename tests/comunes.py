@@ -0,0 +1,122 @@
+"""
+Utilidades de los tests: manifiestos sembrados de generar_escenario y el
+greedy original fila a fila como referencia.
+"""
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+import pytest
+
+from smartdock.escenarios import generar_escenario
+
+BASE_DATE = date(2026, 1, 5)
+HORA_INICIO = 8
+CONFIG_MUELLES = {1: "Seco", 2: "Seco", 3: "Frío"}
+SEMILLAS = range(8)
+
+
+def manifiesto(semilla, num_camiones=60):
+    return generar_escenario(HORA_INICIO, num_camiones, semilla, BASE_DATE)
+
+
+def como_texto(df):
+    """Agenda con las columnas categóricas como texto, para comparar con columnas str"""
+    df = df.copy()
+    for columna in df.columns:
+        if isinstance(df[columna].dtype, pd.CategoricalDtype):
+            df[columna] = df[columna].astype(str)
+    return df
+
+
+def assert_agendas_iguales(a, b):
+    pd.testing.assert_frame_equal(
+        como_texto(a).reset_index(drop=True), como_texto(b).reset_index(drop=True), check_dtype=False
+    )
+
+
+def assert_kpis_iguales(a, b):
+    """Mismos KPIs; los numéricos con tolerancia de punto flotante"""
+    assert a.keys() == b.keys()
+    assert a["fin_operaciones"] == b["fin_operaciones"]
+    numericos = [clave for clave in a if clave != "fin_operaciones"]
+    assert [a[clave] for clave in numericos] == pytest.approx([b[clave] for clave in numericos])
+
+
+PESOS_PRIORIDAD = {"Alta": 3, "Media": 2, "Baja": 1}
+
+
+def apertura(hora_inicio=HORA_INICIO, base_date=BASE_DATE):
+    return datetime.combine(base_date, time(hora_inicio, 0))
+
+
+def score_original(peso, llegada_min, duracion_min):
+    return peso * 10000 - llegada_min
+
+
+def con_score(df_camiones, inicio, score=score_original):
+    """Manifiesto con la columna _score, fila a fila (por defecto, la política original)"""
+    return df_camiones.assign(_score=[
+        score(PESOS_PRIORIDAD.get(prioridad, 1), (pd.Timestamp(llegada) - inicio).total_seconds() / 60, duracion)
+        for prioridad, llegada, duracion in zip(df_camiones["Prioridad"], df_camiones["Hora_Llegada_Est"],
+                                                df_camiones["Duracion_Min"])
+    ])
+
+
+def muelles_compatibles(row, dock_config):
+    tipo_muelle = "Frío" if row["Tipo_Producto"] == "Refrigerado" else "Seco"
+    return [d for d in sorted(dock_config) if dock_config[d] == tipo_muelle]
+
+
+def fila_agenda(row, dock_config, muelle=None, inicio=None):
+    """Fila de la agenda para un camión; sin muelle si muelle es None"""
+    llegada = pd.Timestamp(row["Hora_Llegada_Est"])
+    fila = {
+        "Camión": row["ID_Camion"], "Producto": row["Producto"],
+        "Tipo_Producto": row["Tipo_Producto"], "Prioridad": row["Prioridad"],
+        "Muelle_Asignado": "❌ SIN MUELLE", "Llegada_Teorica": llegada,
+        "Inicio_Real": pd.NaT, "Fin_Real": pd.NaT, "Duracion_Min": int(row["Duracion_Min"]),
+        "Espera_Min": 0, "Costo_Demurrage_USD": 0.0, "Estado": "Error: Muelle incompatible"
+    }
+    if muelle is not None:
+        espera = max(0, (inicio - llegada).total_seconds() / 60)
+        fila.update({
+            "Muelle_Asignado": f"Muelle {muelle} ({dock_config[muelle]})",
+            "Inicio_Real": inicio, "Fin_Real": inicio + timedelta(minutes=int(row["Duracion_Min"])),
+            "Espera_Min": int(espera), "Costo_Demurrage_USD": round(espera / 60 * 150, 2),
+            "Estado": "✅ A Tiempo" if espera == 0 else "⚠️ Retraso Leve" if espera < 30 else "🔴 Crítico"
+        })
+    return fila
+
+
+def costo_agenda(filas):
+    return sum(
+        max(0, (f["Inicio_Real"] - f["Llegada_Teorica"]).total_seconds() / 60) / 60 * 150
+        for f in filas if f["Inicio_Real"] is not pd.NaT
+    )
+
+
+def agenda_referencia(df_camiones, dock_config, hora_inicio=HORA_INICIO, base_date=BASE_DATE, libre=None,
+                      compatibles=muelles_compatibles, score=score_original):
+    """
+    Greedy original: orden por score descendente (empates en orden de
+    manifiesto) y, por camión, recorrido de todos los muelles compatibles
+    buscando el que se libera primero. Por defecto, la regla Seco/Frío.
+    libre: hora a la que se libera cada muelle (por defecto, la apertura).
+    compatibles(row, dock_config): muelles donde puede ir el camión, ordenados.
+    score(peso, llegada_min, duracion_min): score escalar de la política.
+    """
+    inicio_dia = apertura(hora_inicio, base_date)
+    libre = dict(libre or {dock_id: inicio_dia for dock_id in sorted(dock_config)})
+    df = con_score(df_camiones, inicio_dia, score)
+    
+    filas = []
+    for _, row in df.sort_values("_score", ascending=False, kind="stable").iterrows():
+        candidatos = compatibles(row, dock_config)
+        if not candidatos:
+            filas.append(fila_agenda(row, dock_config))
+            continue
+        muelle = min(candidatos, key=lambda d: libre[d])
+        inicio = max(pd.Timestamp(row["Hora_Llegada_Est"]), libre[muelle], inicio_dia)
+        filas.append(fila_agenda(row, dock_config, muelle, inicio))
+        libre[muelle] = filas[-1]["Fin_Real"]
+    return pd.DataFrame(filas), costo_agenda(filas)
@@ -0,0 +1,125 @@
+import random
+
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, assert_agendas_iguales, como_texto, manifiesto
+from smartdock.almacen import TruckStore
+from smartdock.optimizer import DockOptimizerPro
+
+
+def agendar(manifiesto_o_almacen):
+    optimizer = DockOptimizerPro(len(CONFIG_MUELLES), CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE)
+    return optimizer.agendar_camiones(manifiesto_o_almacen)
+
+
+def assert_igual_al_frame(almacen, df):
+    pd.testing.assert_frame_equal(
+        como_texto(almacen.to_frame()), como_texto(df).reset_index(drop=True), check_dtype=False
+    )
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_cambios_aleatorios_igual_a_dataframe(semilla):
+    """El almacén sigue al DataFrame de session_state que reemplaza, y agenda igual"""
+    rng = random.Random(semilla)
+    df = manifiesto(semilla, 80).astype({"Prioridad": object, "Producto": object})
+    almacen = TruckStore.desde_frame(df, BASE_DATE)
+    
+    for k in range(120):
+        operacion = rng.choices(["agregar", "editar", "eliminar"], weights=[2, 2, 3])[0]
+        if operacion == "agregar" or df.empty:
+            registro = {
+                "ID_Camion": f"NUEVO-{k}", "Producto": rng.choice(["Papel", "Vacunas"]),
+                "Tipo_Producto": rng.choice(["Seco", "Refrigerado"]),
+                "Prioridad": rng.choice(["Alta", "Media", "Baja"]),
+                "Hora_Llegada_Est": pd.Timestamp(BASE_DATE) + pd.Timedelta(minutes=rng.randrange(480, 1200)),
+                "Duracion_Min": rng.choice([30, 60, 90])
+            }
+            almacen.agregar(registro)
+            df = pd.concat([df, pd.DataFrame([registro])], ignore_index=True)
+        elif operacion == "editar":
+            i = rng.randrange(len(df))
+            cambios = {"Duracion_Min": rng.choice([15, 45]), "Prioridad": rng.choice(["Alta", "Baja"])}
+            almacen.actualizar(df.loc[i, "ID_Camion"], **cambios)
+            for columna, valor in cambios.items():
+                df.loc[i, columna] = valor
+        else:
+            i = rng.randrange(len(df))
+            almacen.eliminar(df.loc[i, "ID_Camion"])
+            df = df.drop(index=i).reset_index(drop=True)
+        
+        assert len(almacen) == len(df)
+        # Entre consultas quedan lápidas; columnas() compacta antes de leer
+        if k % 10 == 0:
+            assert almacen.ids() == df["ID_Camion"].tolist()
+            assert_igual_al_frame(almacen, df)
+            resultado_df, costo_total = agendar(almacen)
+            esperado_df, esperado_costo = agendar(df)
+            assert_agendas_iguales(resultado_df, esperado_df)
+            assert costo_total == pytest.approx(esperado_costo)
+    
+    assert_igual_al_frame(almacen, df)
+
+
+def test_compactacion_conserva_el_orden():
+    df = manifiesto(4, 150)
+    almacen = TruckStore.desde_frame(df, BASE_DATE)
+    quedan = df[df.index % 3 == 0]
+    for id_camion in df.loc[df.index % 3 != 0, "ID_Camion"]:
+        almacen.eliminar(id_camion)
+    # Las bajas compactaron solas al superar la mitad de lápidas
+    assert almacen._n < len(df)
+    
+    assert almacen.ids() == quedan["ID_Camion"].tolist()
+    # El índice ID -> fila apunta a las filas compactadas
+    for registro in quedan.astype({"Producto": str, "Prioridad": str}).to_dict("records"):
+        assert almacen.obtener(registro["ID_Camion"]) == registro
+    assert_igual_al_frame(almacen, quedan)
+    resultado_df, costo_total = agendar(almacen)
+    esperado_df, esperado_costo = agendar(quedan)
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+def test_agenda_desde_almacen_igual_a_desde_frame():
+    df = manifiesto(0, 200)
+    almacen = TruckStore.desde_frame(df, BASE_DATE)
+    assert_igual_al_frame(almacen, df)
+    resultado_df, costo_total = agendar(almacen)
+    esperado_df, esperado_costo = agendar(almacen.to_frame())
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == esperado_costo
+
+
+def test_hash_sigue_al_contenido():
+    df = manifiesto(1)
+    almacen = TruckStore.desde_frame(df, BASE_DATE)
+    inicial = almacen.hash_contenido()
+    assert TruckStore.desde_frame(df, BASE_DATE).hash_contenido() == inicial
+    
+    duracion = almacen.obtener(df["ID_Camion"].iloc[0])["Duracion_Min"]
+    almacen.actualizar(df["ID_Camion"].iloc[0], Duracion_Min=duracion + 15)
+    assert almacen.hash_contenido() != inicial
+    almacen.actualizar(df["ID_Camion"].iloc[0], Duracion_Min=duracion)
+    assert almacen.hash_contenido() == inicial
+
+
+def test_id_duplicado():
+    df = manifiesto(2, 5)
+    almacen = TruckStore.desde_frame(df, BASE_DATE)
+    with pytest.raises(ValueError):
+        almacen.agregar(df.iloc[0].to_dict())
+    with pytest.raises(ValueError):
+        almacen.agregar_lote(df.iloc[:1])
+
+
+def test_copia_independiente():
+    df = manifiesto(3, 30)
+    almacen = TruckStore.desde_frame(df, BASE_DATE)
+    copia = almacen.copia()
+    copia.agregar_lote(manifiesto(4, 10))
+    copia.eliminar(df["ID_Camion"].iloc[0])
+    copia.actualizar(df["ID_Camion"].iloc[1], Prioridad="Baja", Producto="Nuevo")
+    assert_igual_al_frame(almacen, df)
+    assert len(copia) == 39 and copia.base == almacen.base
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, assert_kpis_iguales, manifiesto
+from smartdock.analitica import analizar_agenda
+from smartdock.kpis import calcular_kpis
+from smartdock.optimizer import DockOptimizerPro
+
+CONFIG_GRANDE = {d: "Frío" if d % 4 == 0 else "Seco" for d in range(1, 13)}
+
+
+def agenda(semilla, dock_config=CONFIG_MUELLES, num_camiones=60):
+    optimizer = DockOptimizerPro(len(dock_config), dock_config, HORA_INICIO, base_date=BASE_DATE)
+    return optimizer.agendar_camiones(manifiesto(semilla, num_camiones))
+
+
+def solapamiento(desde, hasta, banda_desde, banda_hasta):
+    return max(pd.Timedelta(0), min(hasta, banda_hasta) - max(desde, banda_desde))
+
+
+def ocupacion_referencia(resultado_df, indice, intervalo_min):
+    """% ocupado de cada muelle por intervalo, recorriendo operaciones y bandas"""
+    ancho = pd.Timedelta(minutes=intervalo_min)
+    asignadas = resultado_df.dropna(subset=["Inicio_Real"])
+    ocupacion = {}
+    for muelle, operaciones in asignadas.groupby(asignadas["Muelle_Asignado"].astype(str)):
+        ocupacion[muelle] = [
+            sum((solapamiento(f["Inicio_Real"], f["Fin_Real"], t, t + ancho) for _, f in operaciones.iterrows()),
+                pd.Timedelta(0))
+            / ancho * 100
+            for t in indice
+        ]
+    return pd.DataFrame(ocupacion, index=indice)
+
+
+def pico_referencia(desde, hasta):
+    """Máximo de intervalos [desde, hasta) abiertos a la vez"""
+    return max((sum(a <= t < b for a, b in zip(desde, hasta)) for t in desde), default=0)
+
+
+def huecos_referencia(resultado_df):
+    filas = []
+    asignadas = resultado_df.dropna(subset=["Inicio_Real"]).sort_values("Inicio_Real", kind="stable")
+    for muelle, operaciones in asignadas.groupby(asignadas["Muelle_Asignado"].astype(str)):
+        for fin, siguiente in zip(operaciones["Fin_Real"], operaciones["Inicio_Real"].iloc[1:]):
+            if siguiente > fin:
+                filas.append((muelle, fin, siguiente, (siguiente - fin).total_seconds() / 60))
+    return sorted(filas)
+
+
+@pytest.mark.parametrize("dock_config", [CONFIG_MUELLES, CONFIG_GRANDE])
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_kpis_igual_a_calcular_kpis(semilla, dock_config):
+    resultado_df, costo_total = agenda(semilla, dock_config)
+    assert_kpis_iguales(analizar_agenda(resultado_df, costo_total)["kpis"], calcular_kpis(resultado_df, costo_total))
+
+
+def test_agenda_sin_asignaciones():
+    df = manifiesto(0)
+    df = df[df["Tipo_Producto"] != "Refrigerado"]
+    optimizer = DockOptimizerPro(1, {1: "Frío"}, HORA_INICIO, base_date=BASE_DATE)
+    resultado_df, costo_total = optimizer.agendar_camiones(df)
+    analisis = analizar_agenda(resultado_df, costo_total)
+    assert_kpis_iguales(analisis["kpis"], calcular_kpis(resultado_df, costo_total))
+    assert analisis["kpis"]["fin_operaciones"] is None and analisis["pico_muelles"] == 0
+
+
+@pytest.mark.parametrize("intervalo_min", [15, 30, 60])
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_barrido_igual_a_fuerza_bruta(semilla, intervalo_min):
+    resultado_df, costo_total = agenda(semilla)
+    analisis = analizar_agenda(resultado_df, costo_total, intervalo_min)
+    indice = analisis["ocupacion"].index
+    
+    esperado = ocupacion_referencia(resultado_df, indice, intervalo_min)
+    assert sorted(analisis["ocupacion"].columns) == sorted(esperado.columns)
+    pd.testing.assert_frame_equal(analisis["ocupacion"][esperado.columns], esperado,
+                                  check_names=False, check_index_type=False)
+    
+    asignadas = resultado_df.dropna(subset=["Inicio_Real"])
+    assert analisis["pico_muelles"] == pico_referencia(list(asignadas["Inicio_Real"]), list(asignadas["Fin_Real"]))
+    esperaron = asignadas[asignadas["Inicio_Real"] > asignadas["Llegada_Teorica"]]
+    assert analisis["pico_cola"] == pico_referencia(list(esperaron["Llegada_Teorica"]),
+                                                    list(esperaron["Inicio_Real"]))
+    ancho = pd.Timedelta(minutes=intervalo_min)
+    cola = [
+        sum((solapamiento(a, b, t, t + ancho) for a, b in zip(esperaron["Llegada_Teorica"], esperaron["Inicio_Real"])),
+            pd.Timedelta(0)) / ancho
+        for t in indice
+    ]
+    np.testing.assert_allclose(analisis["cola"]["Cola_Promedio"].to_numpy(), cola, atol=1e-9)
+    
+    huecos = analisis["huecos"]
+    obtenidos = sorted(zip(huecos["Muelle"], huecos["Desde"], huecos["Hasta"], huecos["Minutos"]))
+    assert obtenidos == huecos_referencia(resultado_df)
+
+
+def test_muelles_en_orden_numerico():
+    resultado_df, costo_total = agenda(0, CONFIG_GRANDE, 120)
+    muelles = analizar_agenda(resultado_df, costo_total)["muelles"]["Muelle"].tolist()
+    assert muelles == sorted(muelles, key=lambda m: int(m.split()[1]))
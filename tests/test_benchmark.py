@@ -0,0 +1,62 @@
+import copy
+
+import pandas as pd
+import pytest
+
+from comunes import agenda_referencia, assert_agendas_iguales
+from smartdock.benchmark import (BASE_DATE, FASES, HORA_INICIO, MIN_DELTA_S, _correr, comparar, config_sintetica,
+                                 manifiesto_sintetico, medir_caso)
+from smartdock.optimizer import DockOptimizerPro
+
+
+@pytest.mark.parametrize("num_muelles, fraccion", [(1, 0.0), (4, 0.3), (10, 0.7)])
+def test_caso_sintetico_reproducible_y_agenda_de_referencia(num_muelles, fraccion):
+    df = manifiesto_sintetico(300, fraccion, semilla=2)
+    pd.testing.assert_frame_equal(manifiesto_sintetico(300, fraccion, semilla=2), df)
+    
+    config = config_sintetica(num_muelles, fraccion)
+    resultado_df, costo_total = DockOptimizerPro(
+        num_muelles, config, HORA_INICIO, base_date=BASE_DATE
+    ).agendar_camiones(df)
+    esperado_df, esperado_costo = agenda_referencia(df, config, HORA_INICIO, BASE_DATE)
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+def test_medir_caso_cubre_todas_las_fases():
+    caso = medir_caso(200, 3, 0.3, repeticiones=1)
+    assert caso["caso"] == "200x3@0.3"
+    assert list(caso["fases"]) == FASES
+    assert all(medida["tiempo_s"] >= 0 and medida["pico_memoria_bytes"] >= 0 for medida in caso["fases"].values())
+
+
+def test_fases_miden_los_metodos_de_produccion(monkeypatch):
+    llamadas = []
+    for metodo in ("_columnas_planas", "_ordenar", "_asignar_en_orden", "_resultado_tramo"):
+        original = getattr(DockOptimizerPro, metodo)
+        
+        def registrado(self, *args, _metodo=metodo, _original=original):
+            llamadas.append(_metodo)
+            return _original(self, *args)
+        monkeypatch.setattr(DockOptimizerPro, metodo, registrado)
+    
+    _correr(manifiesto_sintetico(100, 0.3, semilla=1), config_sintetica(3, 0.3), False)
+    assert llamadas == ["_columnas_planas", "_ordenar", "_asignar_en_orden", "_resultado_tramo"]
+
+
+def test_comparar_detecta_solo_regresiones_sobre_umbral():
+    baseline = {"casos": [{"caso": "a", "fases": {
+        "orden": {"tiempo_s": 1.0, "pico_memoria_bytes": 100 << 20},
+        "kpis": {"tiempo_s": 0.001, "pico_memoria_bytes": 0},
+    }}]}
+    actual = copy.deepcopy(baseline)
+    assert comparar(actual, baseline) == []
+    
+    actual["casos"][0]["fases"]["orden"]["tiempo_s"] = 1.2             # +20 %: dentro del umbral
+    actual["casos"][0]["fases"]["kpis"]["tiempo_s"] = MIN_DELTA_S / 2   # +250 % pero ruido absoluto
+    assert comparar(actual, baseline) == []
+    
+    actual["casos"][0]["fases"]["orden"]["pico_memoria_bytes"] = 150 << 20
+    assert [r[:3] for r in comparar(actual, baseline)] == [("a", "orden", "pico_memoria_bytes")]
+    assert comparar(actual, baseline, umbral=0.6) == []
+    assert comparar({"casos": [{"caso": "nuevo", "fases": {}}]}, baseline) == []
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, apertura, manifiesto, muelles_compatibles
+from smartdock.busqueda_local import ImprovementOptimizer
+from smartdock.optimizer import SIN_MUELLE, DockOptimizerPro
+
+CONFIGS = [CONFIG_MUELLES, {1: "Frío", 2: "Seco", 3: "Seco", 4: "Frío", 5: "Seco"}]
+
+
+def assert_agenda_valida(resultado_df, df_camiones, dock_config):
+    """Cada camión una vez, en un muelle compatible, sin solapes y sin empezar antes de llegar"""
+    assert sorted(resultado_df["Camión"]) == sorted(df_camiones["ID_Camion"])
+    camiones = df_camiones.set_index("ID_Camion")
+    agendados = resultado_df[resultado_df["Muelle_Asignado"] != SIN_MUELLE]
+    for _, fila in agendados.iterrows():
+        muelle = int(str(fila["Muelle_Asignado"]).split()[1])
+        assert muelle in muelles_compatibles(camiones.loc[fila["Camión"]], dock_config)
+        assert fila["Inicio_Real"] >= max(fila["Llegada_Teorica"], pd.Timestamp(apertura()))
+        assert fila["Fin_Real"] - fila["Inicio_Real"] == pd.Timedelta(minutes=int(fila["Duracion_Min"]))
+    for _, muelle in agendados.groupby(agendados["Muelle_Asignado"].astype(str)):
+        muelle = muelle.sort_values("Inicio_Real")
+        assert (muelle["Inicio_Real"].iloc[1:].to_numpy() >= muelle["Fin_Real"].iloc[:-1].to_numpy()).all()
+
+
+@pytest.mark.parametrize("dock_config", CONFIGS)
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_nunca_peor_que_el_greedy(semilla, dock_config):
+    df = manifiesto(semilla)
+    _, costo_greedy = DockOptimizerPro(
+        len(dock_config), dock_config, HORA_INICIO, base_date=BASE_DATE
+    ).agendar_camiones(df)
+    
+    busqueda = ImprovementOptimizer(dock_config, HORA_INICIO, BASE_DATE, semilla=semilla)
+    busqueda.cargar(df)
+    assert busqueda.costo_actual == pytest.approx(costo_greedy)
+    
+    costo = busqueda.ejecutar(presupuesto_s=60, max_iter=3000)
+    resultado_df, costo_total = busqueda.resultado()
+    assert costo <= costo_greedy + 1e-6
+    assert costo_total == pytest.approx(costo)
+    # El costo informado es el de la agenda devuelta
+    espera_min = (resultado_df["Inicio_Real"] - resultado_df["Llegada_Teorica"]).dt.total_seconds().fillna(0) / 60
+    assert espera_min.clip(lower=0).sum() / 60 * 150 == pytest.approx(costo)
+    assert_agenda_valida(resultado_df, df, dock_config)
+
+
+def test_misma_semilla_mismo_resultado():
+    agendas = []
+    for _ in range(2):
+        busqueda = ImprovementOptimizer(CONFIG_MUELLES, HORA_INICIO, BASE_DATE, semilla=5)
+        busqueda.cargar(manifiesto(3))
+        busqueda.ejecutar(presupuesto_s=60, max_iter=2000)
+        agendas.append(busqueda.resultado())
+    pd.testing.assert_frame_equal(agendas[0][0], agendas[1][0])
+    assert agendas[0][1] == agendas[1][1]
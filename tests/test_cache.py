@@ -0,0 +1,46 @@
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, assert_agendas_iguales, manifiesto
+from smartdock.cache import ScheduleCache
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.simulacion import DockEventSimulator
+
+
+def test_acierto_devuelve_la_misma_agenda():
+    cache = ScheduleCache()
+    df = manifiesto(0)
+    primero = cache.obtener(df, CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    segundo = cache.obtener(df.copy(), CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    assert segundo is primero
+    assert (cache.hits, cache.misses) == (1, 1)
+    
+    esperado = DockOptimizerPro(3, CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE).agendar_camiones(df)
+    assert_agendas_iguales(primero[0], esperado[0])
+    assert primero[1] == esperado[1]
+
+
+def test_la_clave_cubre_toda_la_entrada():
+    df = manifiesto(0)
+    base = ScheduleCache.clave(df, CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    editado = df.copy()
+    editado.loc[0, "Duracion_Min"] += 1
+    variantes = [
+        ScheduleCache.clave(editado, CONFIG_MUELLES, HORA_INICIO, BASE_DATE),
+        ScheduleCache.clave(df, {**CONFIG_MUELLES, 3: "Seco"}, HORA_INICIO, BASE_DATE),
+        ScheduleCache.clave(df, CONFIG_MUELLES, HORA_INICIO + 1, BASE_DATE),
+        ScheduleCache.clave(df, CONFIG_MUELLES, HORA_INICIO, BASE_DATE, motor=DockEventSimulator),
+    ]
+    assert base not in variantes
+    assert len(set(variantes)) == len(variantes)
+
+
+def test_desalojo_lru():
+    cache = ScheduleCache(max_entries=2)
+    manifiestos = [manifiesto(semilla, 10) for semilla in range(3)]
+    cache.obtener(manifiestos[0], CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    cache.obtener(manifiestos[1], CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    cache.obtener(manifiestos[0], CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    cache.obtener(manifiestos[2], CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    assert len(cache) == 2
+    cache.obtener(manifiestos[0], CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    assert cache.hits == 2
+    cache.obtener(manifiestos[1], CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    assert cache.misses == 4
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, agenda_referencia, assert_agendas_iguales
+from smartdock.capacidades import (CAPACIDADES, REQUISITOS_ADICIONALES, REQUISITOS_TEMPERATURA,
+                                   TIPOS_PRODUCTO_COMUNES, MatrizCapacidades, etiqueta_muelle,
+                                   mascara_muelle, tipo_producto_valido, tipos_producto_validos)
+from smartdock.escenarios import PARAMETROS_MANIFIESTO, generar_escenario
+from smartdock.optimizer import DockOptimizerPro
+
+CONFIG_CAPACIDADES = {
+    1: "Seco", 2: "Seco+Peligrosos", 3: "Frío", 4: "Frío+Peligrosos",
+    5: "Congelado", 6: "Seco+Sobredimensionado+Carga Lateral", 7: "Seco+Frío",
+}
+CATALOGO = [(f"Producto {i}", tipo) for i, tipo in enumerate(TIPOS_PRODUCTO_COMUNES)]
+
+
+def requisitos_referencia(tipo_producto):
+    """Conjunto de capacidades exigidas, sin bitmasks"""
+    partes = [p.strip() for p in str(tipo_producto).split("+") if p.strip()]
+    requisitos = {REQUISITOS_TEMPERATURA[p] for p in partes if p in REQUISITOS_TEMPERATURA} or {"Seco"}
+    return requisitos | {REQUISITOS_ADICIONALES[p] for p in partes if p in REQUISITOS_ADICIONALES}
+
+
+def compatibles_referencia(row, dock_config):
+    requisitos = requisitos_referencia(row["Tipo_Producto"])
+    return [d for d in sorted(dock_config) if requisitos <= set(dock_config[d].split("+"))]
+
+
+@pytest.mark.parametrize("tipo", [*TIPOS_PRODUCTO_COMUNES, "Desconocido", "Refrigerado+Desconocido"])
+def test_muelles_compatibles_igual_a_conjuntos(tipo):
+    matriz = MatrizCapacidades(CONFIG_CAPACIDADES)
+    esperado = compatibles_referencia({"Tipo_Producto": tipo}, CONFIG_CAPACIDADES)
+    assert matriz.muelles_compatibles(tipo) == esperado
+    assert [d for d in CONFIG_CAPACIDADES if matriz.compatible(tipo, d)] == esperado
+
+
+@pytest.mark.parametrize("tipo", ["Seco", "Refrigerado", "Químico", ""])
+def test_configuracion_clasica_regla_anterior(tipo):
+    matriz = MatrizCapacidades(CONFIG_MUELLES)
+    esperado = [3] if tipo == "Refrigerado" else [1, 2]
+    assert matriz.muelles_compatibles(tipo) == esperado
+
+
+def test_clases_agrupan_muelles_con_la_misma_mascara():
+    matriz = MatrizCapacidades({1: "Seco", 2: "Frío", 3: "Seco", 4: "Peligrosos+Seco"})
+    assert matriz.clases == sorted({mascara_muelle("Seco"), mascara_muelle("Frío"),
+                                    mascara_muelle("Seco+Peligrosos")})
+    assert matriz.clase_de_muelle[1] == matriz.clase_de_muelle[3]
+
+
+def test_etiqueta_canonica_y_capacidad_desconocida():
+    assert etiqueta_muelle("Peligrosos+Seco") == "Seco+Peligrosos"
+    assert etiqueta_muelle(reversed(CAPACIDADES)) == "+".join(CAPACIDADES)
+    with pytest.raises(ValueError):
+        mascara_muelle("Seco+Ambiente")
+
+
+def test_tipos_producto_validos_vectorizado():
+    invalidos = ["Seco+Refrigerado", "Desconocido", "", None]
+    serie = pd.Series([*TIPOS_PRODUCTO_COMUNES, *invalidos] * 3)
+    esperado = np.array([tipo_producto_valido(v) for v in serie])
+    np.testing.assert_array_equal(tipos_producto_validos(serie), esperado)
+    assert esperado.tolist() == ([True] * len(TIPOS_PRODUCTO_COMUNES) + [False] * len(invalidos)) * 3
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_agenda_con_capacidades_igual_a_recorrer_muelles(semilla):
+    parametros = {**PARAMETROS_MANIFIESTO, "productos": CATALOGO}
+    df = generar_escenario(HORA_INICIO, 80, semilla, BASE_DATE, parametros)
+    optimizer = DockOptimizerPro(len(CONFIG_CAPACIDADES), CONFIG_CAPACIDADES, HORA_INICIO, base_date=BASE_DATE)
+    resultado_df, costo_total = optimizer.agendar_camiones(df)
+    esperado_df, esperado_costo = agenda_referencia(df, CONFIG_CAPACIDADES, compatibles=compatibles_referencia)
+    
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
@@ -0,0 +1,39 @@
+import json
+
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, como_texto, manifiesto
+from smartdock.cli import main
+from smartdock.kpis import calcular_kpis
+from smartdock.optimizer import DockOptimizerPro
+
+
+@pytest.mark.parametrize("semilla", [0, 1])
+def test_cli_igual_a_agendar_camiones(tmp_path, semilla):
+    df = manifiesto(semilla)
+    df.to_csv(tmp_path / "manifiesto.csv", index=False)
+    codigo = main([str(tmp_path / "manifiesto.csv"), "--muelles", "1:Seco,2:Seco,3:Frío",
+                   "--salida", str(tmp_path / "agenda.csv"), "--kpis", str(tmp_path / "kpis.json"),
+                   "--bloque", "25"])
+    assert codigo == 0
+    
+    esperado, costo = DockOptimizerPro(3, CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE).agendar_camiones(df)
+    agenda = pd.read_csv(tmp_path / "agenda.csv", parse_dates=["Llegada_Teorica", "Inicio_Real", "Fin_Real"])
+    esperado = como_texto(esperado)
+    for columna in ("Camión", "Muelle_Asignado", "Estado"):
+        assert agenda[columna].tolist() == esperado[columna].tolist()
+    for columna in ("Inicio_Real", "Fin_Real"):
+        assert (agenda[columna].to_numpy() == esperado[columna].to_numpy()).all()
+    assert agenda["Costo_Demurrage_USD"].tolist() == esperado["Costo_Demurrage_USD"].tolist()
+    
+    kpis = json.loads((tmp_path / "kpis.json").read_text(encoding="utf-8"))
+    esperados = calcular_kpis(esperado, costo)
+    assert kpis["total_cargas"] == esperados["total_cargas"]
+    assert kpis["a_tiempo"] == esperados["a_tiempo"]
+    assert kpis["costo_total"] == pytest.approx(esperados["costo_total"])
+
+
+def test_cli_muelle_invalido(capsys):
+    with pytest.raises(SystemExit):
+        main(["manifiesto.csv", "--muelles", "uno:Seco"])
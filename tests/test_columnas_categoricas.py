@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, HORA_INICIO, SEMILLAS, assert_kpis_iguales, como_texto, manifiesto
+from smartdock.analitica import analizar_agenda
+from smartdock.kpis import calcular_kpis, contar_a_tiempo
+from smartdock.optimizer import ESTADO_DTYPE, ESTADOS, SIN_MUELLE, DockOptimizerPro
+from smartdock.tabla import TablaAsignaciones
+
+# Muelle 4 no recibe camiones (no hay Congelados) y los Refrigerados quedan sin muelle
+CONFIG = {2: "Seco", 4: "Congelado", 1: "Seco", 3: "Seco"}
+
+
+def optimizador():
+    return DockOptimizerPro(len(CONFIG), CONFIG, HORA_INICIO, base_date=BASE_DATE)
+
+
+def agenda(semilla, num_camiones=60):
+    return optimizador().agendar_camiones(manifiesto(semilla, num_camiones))
+
+
+def test_categorias_fijas_y_en_orden_de_muelle():
+    resultado_df, _ = agenda(0)
+    assert resultado_df["Estado"].dtype == ESTADO_DTYPE
+    assert list(resultado_df["Estado"].cat.categories) == ESTADOS
+    assert list(resultado_df["Muelle_Asignado"].cat.categories) == [
+        f"Muelle {d} ({CONFIG[d]})" for d in sorted(CONFIG)
+    ] + [SIN_MUELLE]
+    assert (resultado_df["Muelle_Asignado"] == SIN_MUELLE).any()
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_kpis_iguales_sobre_texto(semilla):
+    resultado_df, costo_total = agenda(semilla)
+    esperado = calcular_kpis(resultado_df, costo_total)
+    assert calcular_kpis(como_texto(resultado_df), costo_total) == esperado
+    objetos = resultado_df.astype({"Estado": object, "Muelle_Asignado": object})
+    assert calcular_kpis(objetos, costo_total) == esperado
+
+
+def test_contar_a_tiempo_con_faltantes():
+    estados = [ESTADOS[0], None, ESTADOS[2], ESTADOS[0], ESTADOS[3]]
+    assert contar_a_tiempo(pd.Series(estados, dtype=object)) == 2
+    assert contar_a_tiempo(pd.Series(estados, dtype="str")) == 2
+    assert contar_a_tiempo(pd.Series(estados, dtype=ESTADO_DTYPE)) == 2
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS[:3])
+def test_bloques_concatenados_conservan_las_categorias(semilla):
+    df = manifiesto(semilla, 90)
+    bloques = [bloque for bloque, _ in optimizador().agendar_por_bloques(df, tam_bloque=25)]
+    completo, _ = optimizador().agendar_camiones(df)
+    pd.testing.assert_frame_equal(pd.concat(bloques, ignore_index=True), completo)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_tabla_igual_sobre_texto(semilla):
+    resultado_df, _ = agenda(semilla)
+    tabla, texto = TablaAsignaciones(resultado_df), TablaAsignaciones(como_texto(resultado_df))
+    for columna in ("Muelle_Asignado", "Estado"):
+        # Mismas opciones (las categóricas en su orden, el texto alfabético)
+        assert sorted(tabla.opciones(columna)) == sorted(texto.opciones(columna))
+        for valor in tabla.opciones(columna):
+            np.testing.assert_array_equal(tabla.filtrar(**{columna: [valor]}), texto.filtrar(**{columna: [valor]}))
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_analitica_igual_sobre_texto(semilla):
+    resultado_df, costo_total = agenda(semilla)
+    analisis, texto = analizar_agenda(resultado_df, costo_total), analizar_agenda(como_texto(resultado_df), costo_total)
+    assert_kpis_iguales(analisis["kpis"], texto["kpis"])
+    pd.testing.assert_frame_equal(analisis["muelles"], texto["muelles"])
+    pd.testing.assert_frame_equal(analisis["ocupacion"], texto["ocupacion"])
+    pd.testing.assert_frame_equal(analisis["huecos"], texto["huecos"], check_dtype=False)
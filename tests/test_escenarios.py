@@ -0,0 +1,89 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, HORA_INICIO
+from smartdock.escenarios import (DURACIONES_MIN, PRIORIDADES, PRODUCTOS_CONFIG, generar_escenario,
+                                  generar_manifiesto, main)
+
+APERTURA = datetime.combine(BASE_DATE, time(HORA_INICIO, 0))
+
+
+def concatenar(num_camiones, semilla, tam_bloque, parametros=None):
+    bloques = list(generar_manifiesto(num_camiones, semilla, HORA_INICIO, BASE_DATE, parametros, tam_bloque))
+    assert all(len(bloque) == tam_bloque for bloque in bloques[:-1])
+    return pd.concat(bloques)
+
+
+@pytest.mark.parametrize("parametros", [None, {"proceso_llegada": "poisson", "dias": 3},
+                                        {"proceso_llegada": "pico", "distribucion_duracion": "lognormal"}])
+def test_bloques_no_cambian_el_manifiesto(parametros):
+    # Más filas que una unidad de generación, para cruzar su borde
+    completo = concatenar(70_000, 5, 70_000, parametros)
+    for tam_bloque in (1000, 65_536, 30_001):
+        # equals también compara dtypes e índice (assert_frame_equal es lento con categóricas)
+        assert concatenar(70_000, 5, tam_bloque, parametros).equals(completo)
+
+
+def test_reproducible_con_semilla():
+    a, b = generar_escenario(HORA_INICIO, 200, 7, BASE_DATE), generar_escenario(HORA_INICIO, 200, 7, BASE_DATE)
+    pd.testing.assert_frame_equal(a, b)
+    assert not generar_escenario(HORA_INICIO, 200, 8, BASE_DATE).equals(a)
+
+
+@pytest.mark.parametrize("num_camiones", [1, 500, 9000])
+def test_ids_cortos_con_el_formato_anterior(num_camiones):
+    ids = generar_escenario(HORA_INICIO, num_camiones, 1, BASE_DATE)["ID_Camion"]
+    # Antes: f"TRK-{n}" con n muestreado sin reemplazo de range(1000, 10000)
+    numeros = ids.str.removeprefix("TRK-").astype(int)
+    assert ids.tolist() == [f"TRK-{n}" for n in numeros]
+    assert ids.is_unique and numeros.between(1000, 9999).all()
+
+
+@pytest.mark.parametrize("num_camiones", [9001, 70_000])
+def test_ids_largos_con_el_formato_anterior(num_camiones):
+    ids = concatenar(num_camiones, 1, 25_000)["ID_Camion"]
+    # Antes: f"TRK-{n:07d}" para n en range(num_camiones)
+    assert ids.tolist() == [f"TRK-{n:07d}" for n in range(num_camiones)]
+
+
+def test_mismos_valores_posibles_que_el_generador_anterior():
+    df = generar_escenario(HORA_INICIO, 3000, 2, BASE_DATE)
+    minutos = (df["Hora_Llegada_Est"] - APERTURA) / timedelta(minutes=1)
+    assert minutos.between(0, 360).all() and (minutos % 1 == 0).all()
+    assert set(df["Duracion_Min"]) == set(DURACIONES_MIN)
+    assert set(df["Prioridad"]) == set(PRIORIDADES)
+    assert set(zip(df["Producto"], df["Tipo_Producto"])) == set(PRODUCTOS_CONFIG)
+
+
+def test_duraciones_lognormales_redondeadas_y_acotadas():
+    df = generar_escenario(HORA_INICIO, 5000, 3, BASE_DATE, {"distribucion_duracion": "lognormal"})
+    assert df["Duracion_Min"].between(15, 240).all() and (df["Duracion_Min"] % 5 == 0).all()
+    assert df["Duracion_Min"].mean() == pytest.approx(60, rel=0.1)
+
+
+def test_varios_dias():
+    df = generar_escenario(HORA_INICIO, 2000, 4, BASE_DATE, {"dias": 3})
+    dias = (df["Hora_Llegada_Est"].dt.normalize() - pd.Timestamp(BASE_DATE)).dt.days
+    assert set(dias) == {0, 1, 2}
+    minutos = (df["Hora_Llegada_Est"] - df["Hora_Llegada_Est"].dt.normalize()) / timedelta(minutes=1)
+    assert minutos.between(HORA_INICIO * 60, HORA_INICIO * 60 + 360).all()
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        list(generar_manifiesto(10, 0, parametros={"proceso_llegada": "constante"}))
+    with pytest.raises(ValueError):
+        list(generar_manifiesto(10, 0, parametros={"mix_productos": {"Madera": 1}}))
+
+
+def test_cli_escribe_el_manifiesto(tmp_path):
+    salida = tmp_path / "manifiesto.csv"
+    assert main(["--camiones", "300", "--semilla", "9", "--fecha", str(BASE_DATE), "--bloque", "64",
+                 "--salida", str(salida)]) in (None, 0)
+    df = pd.read_csv(salida, parse_dates=["Hora_Llegada_Est"])
+    esperado = generar_escenario(HORA_INICIO, 300, 9, BASE_DATE)
+    assert df["ID_Camion"].tolist() == esperado["ID_Camion"].tolist()
+    assert (df["Hora_Llegada_Est"].to_numpy() == esperado["Hora_Llegada_Est"].to_numpy()).all()
@@ -0,0 +1,151 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from comunes import (BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, agenda_referencia, apertura,
+                     assert_agendas_iguales, manifiesto)
+from smartdock.eventos import AgendaEnVivo, IngestorEventos, leer_evento
+from smartdock.optimizer import DockOptimizerPro
+
+
+def agenda_en_vivo(df, politica=None):
+    return AgendaEnVivo(CONFIG_MUELLES, HORA_INICIO, BASE_DATE, politica).cargar(df)
+
+
+def agendar(df, politica=None):
+    optimizer = DockOptimizerPro(len(CONFIG_MUELLES), CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE,
+                                 politica=politica)
+    return optimizer.agendar_camiones(df)
+
+
+@pytest.mark.parametrize("politica", [None, "FIFO", "SPT (más corto primero)"])
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_sin_eventos_igual_a_agendar_camiones(semilla, politica):
+    df = manifiesto(semilla)
+    resultado_df, costo_total = agenda_en_vivo(df, politica).resultado()
+    esperado_df, esperado_costo = agendar(df, politica)
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_retrasos_igual_a_correr_las_llegadas(semilla):
+    df = manifiesto(semilla)
+    retrasos = {id_camion: 15 * (i % 5) for i, id_camion in enumerate(df["ID_Camion"]) if i % 3 == 0}
+    agenda = agenda_en_vivo(df)
+    assert agenda.aplicar([{"tipo": "retraso", "id_camion": i, "minutos": m} for i, m in retrasos.items()]) == len(retrasos)
+    
+    demorado = df.copy()
+    demorado["Hora_Llegada_Est"] += pd.to_timedelta(demorado["ID_Camion"].map(retrasos).fillna(0), unit="min")
+    resultado_df, costo_total = agenda.resultado()
+    esperado_df, esperado_costo = agendar(demorado)
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_camiones_en_muelle_quedan_fijos_y_el_resto_se_reagenda(semilla):
+    df = manifiesto(semilla)
+    plan, _ = agendar(df)
+    reloj = pd.Timestamp(apertura()) + pd.Timedelta(hours=2)
+    
+    # Los que según el plan ya entraron antes del reloj: llegan y empiezan como
+    # estaba previsto, con 10 minutos de demora; los que terminaron, con su fin
+    eventos, fin_real = [], {}
+    entrados = plan[plan["Inicio_Real"] < reloj].sort_values("Inicio_Real", kind="stable")
+    for _, fila in entrados.iterrows():
+        muelle = int(str(fila["Muelle_Asignado"]).split()[1])
+        inicio = fila["Inicio_Real"] + pd.Timedelta(minutes=10)
+        eventos += [
+            {"tipo": "llegada", "id_camion": fila["Camión"], "hora": fila["Llegada_Teorica"].isoformat()},
+            {"tipo": "inicio", "id_camion": fila["Camión"], "muelle": muelle, "hora": inicio.isoformat()},
+        ]
+        fin = inicio + pd.Timedelta(minutes=int(fila["Duracion_Min"]))
+        if fin <= reloj:
+            eventos.append({"tipo": "fin", "id_camion": fila["Camión"], "hora": fin.isoformat()})
+        fin_real[muelle] = max(fin_real.get(muelle, fin), fin)
+    eventos.append({"tipo": "llegada", "id_camion": "NO-EXISTE", "hora": reloj.isoformat()})
+    eventos.append({"tipo": "fin", "id_camion": df["ID_Camion"].iloc[-1], "hora": reloj.isoformat()})
+    
+    agenda = agenda_en_vivo(df)
+    assert agenda.aplicar(eventos) == len(eventos) - 2
+    assert agenda.rechazados == 2
+    resultado_df, _ = agenda.resultado()
+    
+    fijos = resultado_df.iloc[:len(entrados)]
+    assert fijos["Camión"].tolist() == entrados["Camión"].tolist()
+    assert (fijos["Inicio_Real"].to_numpy() == (entrados["Inicio_Real"] + pd.Timedelta(minutes=10)).to_numpy()).all()
+    
+    # Los muelles se liberan desde la hora del último evento aplicado
+    ultimo_evento = max(pd.Timestamp(e["hora"]) for e in eventos[:-2])
+    assert agenda.estadisticas()["reloj"] == ultimo_evento
+    restantes = df[~df["ID_Camion"].isin(entrados["Camión"])]
+    libre = {d: max(fin_real.get(d, ultimo_evento), ultimo_evento) for d in CONFIG_MUELLES}
+    esperado_df, _ = agenda_referencia(restantes, CONFIG_MUELLES, libre=libre)
+    assert_agendas_iguales(resultado_df.iloc[len(entrados):], esperado_df)
+    assert agenda.ultimos_reagendados == len(restantes)
+
+
+def test_ingestor_sigue_el_jsonl(tmp_path):
+    df = manifiesto(0, 10)
+    ruta = tmp_path / "porteria.jsonl"
+    lineas = [json.dumps({"tipo": "retraso", "id_camion": i, "minutos": 30}) for i in df["ID_Camion"][:4]]
+    ruta.write_text("\n".join(lineas[:2] + ["no es json"]) + "\n", encoding="utf-8")
+    
+    ingestor = IngestorEventos.desde_jsonl(str(ruta))
+    try:
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write(lineas[2] + "\n" + lineas[3][:10])   # la última línea, incompleta
+        agenda = agenda_en_vivo(df)
+        limite = time.monotonic() + 10
+        while ingestor.recibidos < 3 and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert agenda.consumir(ingestor) == 3 and ingestor.invalidos == 1
+        
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write(lineas[3][10:] + "\n")
+        while ingestor.recibidos < 4 and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert agenda.consumir(ingestor) == 1 and agenda.cursor == 4
+    finally:
+        ingestor.detener()
+    assert not ingestor.activo
+
+
+def test_bytes_invalidos_cuentan_como_invalidos(tmp_path):
+    ruta = tmp_path / "porteria.jsonl"
+    valida = json.dumps({"tipo": "retraso", "id_camion": "TRK-1", "minutos": 5}).encode()
+    ruta.write_bytes(b'{"tipo": "fin", "id_camion": "TRK-\xff"}\n' + valida + b"\n")
+    
+    ingestor = IngestorEventos.desde_jsonl(str(ruta))
+    try:
+        limite = time.monotonic() + 10
+        while ingestor.recibidos < 1 and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert ingestor.recibidos == 1 and ingestor.invalidos == 1
+        assert ingestor.activo and ingestor.error is None
+    finally:
+        ingestor.detener()
+
+
+def test_error_inesperado_queda_registrado():
+    async def fuente():
+        yield b'{"tipo": "retraso", "id_camion": "TRK-1", "minutos": 5}'
+        raise RuntimeError("fuente rota")
+    
+    ingestor = IngestorEventos(fuente())
+    ingestor._hilo.join(10)
+    assert not ingestor.activo and ingestor.recibidos == 1
+    assert isinstance(ingestor.error, RuntimeError)
+
+
+def test_leer_evento():
+    evento = leer_evento('{"tipo": "llegada", "id_camion": "TRK-1"}', recibido=pd.Timestamp("2026-01-05 09:30"))
+    assert evento["hora"] == "2026-01-05T09:30:00"
+    invalidas = ('{"tipo": "otro", "id_camion": "TRK-1"}', '{"tipo": "fin"}', "[]",
+                 b'{"tipo": "fin", "id_camion": "\xff"}')
+    for linea in invalidas:
+        with pytest.raises(ValueError):
+            leer_evento(linea)
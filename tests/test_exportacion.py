@@ -0,0 +1,116 @@
+import io
+
+import pandas as pd
+import pytest
+
+from comunes import (BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, assert_agendas_iguales, assert_kpis_iguales,
+                     como_texto, manifiesto)
+from smartdock.exportacion import exportar_agenda, exportar_bloques, exportar_manifiesto
+from smartdock.importacion import importar_manifiesto
+from smartdock.kpis import AcumuladorKpis, calcular_kpis
+from smartdock.optimizer import COLUMNAS_ENTRADA, DockOptimizerPro
+
+
+def nuevo_optimizer():
+    return DockOptimizerPro(len(CONFIG_MUELLES), CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE)
+
+
+def leer(buffer, formato):
+    buffer.seek(0)
+    if formato == "parquet":
+        return pd.read_parquet(buffer)
+    return pd.read_csv(buffer, parse_dates=["Llegada_Teorica", "Inicio_Real", "Fin_Real"])
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+@pytest.mark.parametrize("tam_bloque", [7, 60, 1000])
+def test_agenda_por_bloques_igual_a_agendar_camiones(semilla, tam_bloque):
+    df = manifiesto(semilla)
+    esperado_df, esperado_costo = nuevo_optimizer().agendar_camiones(df)
+    
+    bloques = list(nuevo_optimizer().agendar_por_bloques(df, tam_bloque))
+    assert all(len(bloque) <= tam_bloque for bloque, _ in bloques)
+    assert_agendas_iguales(pd.concat([bloque for bloque, _ in bloques]), esperado_df)
+    assert sum(costo for _, costo in bloques) == pytest.approx(esperado_costo)
+    
+    acumulador = AcumuladorKpis()
+    for bloque, costo in bloques:
+        acumulador.agregar(bloque, costo)
+    assert_kpis_iguales(acumulador.kpis(), calcular_kpis(esperado_df, esperado_costo))
+
+
+def test_kpis_acumulados_sin_bloques():
+    assert AcumuladorKpis().kpis() == calcular_kpis(pd.DataFrame(), 0)
+
+
+@pytest.mark.parametrize("formato", ["csv", "parquet"])
+def test_exportar_agenda_igual_a_agendar_camiones(formato):
+    df = manifiesto(1, 250)
+    esperado_df, esperado_costo = nuevo_optimizer().agendar_camiones(df)
+    
+    buffer = io.BytesIO()
+    filas, costo_total = exportar_agenda(nuevo_optimizer(), df, buffer, formato=formato, tam_bloque=40)
+    assert filas == len(df)
+    assert costo_total == pytest.approx(esperado_costo)
+    exportado = leer(buffer, formato)
+    assert_agendas_iguales(exportado, esperado_df)
+    
+    # La agenda ya calculada (la de pantalla) se exporta igual que reagendando
+    otro = io.BytesIO()
+    exportar_bloques((esperado_df.iloc[i:i + 40] for i in range(0, len(esperado_df), 40)), otro, formato)
+    assert otro.getvalue() == buffer.getvalue()
+
+
+@pytest.mark.parametrize("formato", ["csv", "parquet"])
+def test_manifiesto_ida_y_vuelta(formato):
+    df = manifiesto(2, 300)
+    buffer = io.BytesIO()
+    assert exportar_manifiesto((df.iloc[i:i + 70] for i in range(0, len(df), 70)), buffer, formato) == len(df)
+    
+    buffer.seek(0)
+    almacen, reporte = importar_manifiesto(buffer, formato=formato, tam_bloque=50)
+    assert (reporte.filas_leidas, reporte.filas_validas, reporte.filas_invalidas) == (len(df), len(df), 0)
+    pd.testing.assert_frame_equal(
+        como_texto(almacen.to_frame()), como_texto(df[COLUMNAS_ENTRADA]), check_dtype=False
+    )
+    assert_agendas_iguales(
+        nuevo_optimizer().agendar_camiones(almacen)[0], nuevo_optimizer().agendar_camiones(df)[0]
+    )
+
+
+def test_importacion_reporta_filas_invalidas():
+    df = manifiesto(3, 10).astype({"Prioridad": object, "Duracion_Min": object})
+    df.loc[2, "Prioridad"] = "Urgente"
+    df.loc[5, "Duracion_Min"] = -5
+    df.loc[7, "ID_Camion"] = df.loc[1, "ID_Camion"]
+    buffer = io.StringIO(df.to_csv(index=False))
+    
+    almacen, reporte = importar_manifiesto(buffer, tam_bloque=4)
+    assert len(almacen) == 7
+    assert reporte.errores["Fila"].tolist() == [3, 6, 8]
+    assert almacen.ids() == df.drop(index=[2, 5, 7])["ID_Camion"].tolist()
+
+
+def test_error_a_mitad_de_archivo_no_toca_el_original():
+    original = importar_manifiesto(io.StringIO(manifiesto(4, 10).to_csv(index=False)))[0]
+    ids = original.ids()
+    lineas = manifiesto(5, 20).to_csv(index=False).splitlines()
+    lineas[15] += ",columna,de_mas"
+    with pytest.raises(ValueError):
+        importar_manifiesto(io.StringIO("\n".join(lineas)), almacen=original.copia(), tam_bloque=5)
+    assert original.ids() == ids
+
+
+def test_manifiesto_importado_conserva_su_fecha():
+    df = manifiesto(6, 20)
+    df["Hora_Llegada_Est"] -= pd.Timedelta(days=600)
+    almacen, _ = importar_manifiesto(io.StringIO(df.to_csv(index=False)))
+    fecha = almacen.base.date()
+    assert fecha == df["Hora_Llegada_Est"].min().date()
+    optimizer = DockOptimizerPro(len(CONFIG_MUELLES), CONFIG_MUELLES, HORA_INICIO, base_date=fecha)
+    resultado_df, costo_total = optimizer.agendar_camiones(almacen)
+    esperado_df, esperado_costo = nuevo_optimizer().agendar_camiones(df.assign(
+        Hora_Llegada_Est=df["Hora_Llegada_Est"] + pd.Timedelta(days=600)
+    ))
+    assert resultado_df["Espera_Min"].tolist() == esperado_df["Espera_Min"].tolist()
+    assert costo_total == pytest.approx(esperado_costo)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, HORA_INICIO, manifiesto
+from smartdock.gantt import figura_gantt, ocupacion_por_muelle
+from smartdock.optimizer import SIN_MUELLE, DockOptimizerPro
+
+CONFIG_12 = {d: ("Frío" if d % 4 == 0 else "Seco") for d in range(1, 13)}
+ETIQUETAS_12 = [f"Muelle {d} ({CONFIG_12[d]})" for d in range(1, 13)]
+
+
+def agenda_valida(semilla=0, num_camiones=200):
+    resultado_df, _ = DockOptimizerPro(len(CONFIG_12), CONFIG_12, HORA_INICIO, base_date=BASE_DATE).agendar_camiones(
+        manifiesto(semilla, num_camiones)
+    )
+    return resultado_df[resultado_df["Muelle_Asignado"] != SIN_MUELLE]
+
+
+def ocupacion_referencia(resultado_valido, muelles, bordes):
+    """Fracción ocupada por muelle y banda, solapando cada barra con cada banda"""
+    matriz = np.zeros((len(muelles), len(bordes) - 1))
+    for i, muelle in enumerate(muelles):
+        barras = resultado_valido[resultado_valido["Muelle_Asignado"] == muelle]
+        for j, (izq, der) in enumerate(zip(bordes[:-1], bordes[1:])):
+            solape = (np.minimum(barras["Fin_Real"], der) - np.maximum(barras["Inicio_Real"], izq))
+            matriz[i, j] = solape.clip(lower=pd.Timedelta(0)).sum() / (der - izq)
+    return matriz
+
+
+def test_muelles_en_orden_numerico():
+    valido = agenda_valida()
+    fig, modo = figura_gantt(valido)
+    assert modo == "detalle"
+    assert list(fig.layout.yaxis.ticktext) == ETIQUETAS_12
+    
+    fig, modo = figura_gantt(valido, max_barras=10)
+    assert modo == "bandas"
+    assert list(fig.layout.yaxis.categoryarray) == ETIQUETAS_12[::-1]
+    assert list(ocupacion_por_muelle(valido, valido["Inicio_Real"].min(), valido["Fin_Real"].max())[0]) == ETIQUETAS_12
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_ocupacion_igual_a_solapar_barras(semilla):
+    valido = agenda_valida(semilla)
+    desde, hasta = valido["Inicio_Real"].min(), valido["Fin_Real"].max()
+    muelles, bordes, matriz = ocupacion_por_muelle(valido, desde, hasta, num_bandas=48)
+    np.testing.assert_allclose(matriz, ocupacion_referencia(valido, muelles, bordes), atol=1e-9)
@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+
+from comunes import (BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, assert_agendas_iguales,
+                     manifiesto, muelles_compatibles)
+from smartdock.escenarios import generar_escenario
+from smartdock.horizonte import AgendaRodante
+from smartdock.optimizer import SIN_MUELLE, DockOptimizerPro
+
+INFINITO = float("inf")
+
+
+def agendar(df, politica=None):
+    optimizer = DockOptimizerPro(3, CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE, politica=politica)
+    return optimizer.agendar_camiones(df)
+
+
+def rodante(congelado_min=INFINITO, horizonte_min=INFINITO, politica=None):
+    return AgendaRodante(CONFIG_MUELLES, HORA_INICIO, BASE_DATE, congelado_min, horizonte_min, politica)
+
+
+def assert_agenda_valida(resultado_df, df_camiones):
+    """Cada camión una vez, sin solapes por muelle, nunca antes de su llegada y en muelle compatible"""
+    assert sorted(resultado_df["Camión"]) == sorted(df_camiones["ID_Camion"])
+    asignadas = resultado_df[resultado_df["Muelle_Asignado"] != SIN_MUELLE]
+    assert (asignadas["Inicio_Real"] >= asignadas["Llegada_Teorica"]).all()
+    for _, operaciones in asignadas.groupby(asignadas["Muelle_Asignado"].astype(str)):
+        operaciones = operaciones.sort_values("Inicio_Real")
+        assert (operaciones["Inicio_Real"].iloc[1:].to_numpy() >= operaciones["Fin_Real"].iloc[:-1].to_numpy()).all()
+    tipos = df_camiones.set_index("ID_Camion")["Tipo_Producto"]
+    for camion, muelle in zip(asignadas["Camión"], asignadas["Muelle_Asignado"].astype(str)):
+        dock_id = int(muelle.split()[1])
+        assert dock_id in muelles_compatibles({"Tipo_Producto": tipos[camion]}, CONFIG_MUELLES)
+
+
+@pytest.mark.parametrize("politica", [None, "FIFO", "SPT (más corto primero)"])
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_ventanas_infinitas_igual_a_agendar_camiones(semilla, politica):
+    df = manifiesto(semilla)
+    agenda = rodante(politica=politica).cargar(df)
+    assert agenda.replanificar() == len(df)
+    resultado_df, costo_total = agenda.resultado()
+    esperado_df, esperado_costo = agendar(df, politica)
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+    assert agenda.estadisticas()["en_horizonte"] == agenda.estadisticas()["diferidos"] == 0
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS[:3])
+def test_lotes_con_ventanas_infinitas_igual_a_un_solo_manifiesto(semilla):
+    df = manifiesto(semilla, 90)
+    agenda = rodante()
+    for desde in range(0, len(df), 25):
+        agenda.agregar(df.iloc[desde:desde + 25])
+    agenda.replanificar()
+    assert_agendas_iguales(agenda.resultado()[0], agendar(df)[0])
+
+
+@pytest.mark.parametrize("congelado_min, horizonte_min, paso_min", [(0, 60, 15), (30, 120, 15), (60, 240, 45)])
+@pytest.mark.parametrize("semilla", SEMILLAS[:4])
+def test_ventanas_finitas_dan_una_agenda_valida(semilla, congelado_min, horizonte_min, paso_min):
+    df = manifiesto(semilla, 80)
+    agenda = rodante(congelado_min, horizonte_min)
+    resultado_df, costo_total = agenda.cargar(df).completar(paso_min)
+    assert_agenda_valida(resultado_df, df)
+    assert costo_total == pytest.approx(resultado_df["Costo_Demurrage_USD"].sum())
+    assert agenda.estadisticas()["comprometidos"] == len(df)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS[:4])
+def test_comprometidos_no_cambian(semilla):
+    df = manifiesto(semilla, 80)
+    agenda = rodante(30, 120).cargar(df)
+    fijos = None
+    for reloj in range(0, 600, 20):
+        agenda.replanificar(reloj)
+        resultado_df, _ = agenda.resultado()
+        comprometidos = agenda.estadisticas()["comprometidos"]
+        if fijos is not None and len(fijos):
+            assert comprometidos >= len(fijos)
+            assert_agendas_iguales(resultado_df.iloc[:len(fijos)], fijos)
+        # Lo comprometido entra a muelle antes de reloj + congelado
+        inicios = resultado_df["Inicio_Real"].iloc[:comprometidos].dropna()
+        assert (inicios <= pd.Timestamp(agenda.optimizer.start_time) + pd.Timedelta(minutes=reloj + 30)).all()
+        fijos = resultado_df.iloc[:comprometidos]
+
+
+def test_completar_salta_dias_sin_llegadas():
+    df = generar_escenario(HORA_INICIO, 60, 2, BASE_DATE, {"dias": 3})
+    agenda = rodante(15, 60)
+    resultado_df, _ = agenda.cargar(df).completar(15)
+    assert_agenda_valida(resultado_df, df)
+    # Sin saltos serían ~3 días / 15 min = 288 ticks
+    assert agenda.replanificaciones < 200
+
+
+def test_errores():
+    with pytest.raises(ValueError):
+        rodante(120, 60)
+    agenda = rodante(30, 120).cargar(manifiesto(0))
+    agenda.replanificar(60)
+    with pytest.raises(ValueError):
+        agenda.replanificar(30)
+    with pytest.raises(ValueError):
+        agenda.agregar(manifiesto(0).iloc[:1])
+
+
+def test_sin_camiones():
+    agenda = rodante()
+    assert agenda.replanificar() == 0
+    resultado_df, costo_total = agenda.resultado()
+    assert resultado_df.empty and costo_total == 0
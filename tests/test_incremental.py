@@ -0,0 +1,86 @@
+import random
+
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, assert_agendas_iguales, manifiesto
+from smartdock.incremental import IncrementalScheduler
+from smartdock.optimizer import DockOptimizerPro
+
+
+def agenda_completa(df):
+    optimizer = DockOptimizerPro(len(CONFIG_MUELLES), CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE)
+    return optimizer.agendar_camiones(df)
+
+
+def assert_igual_a_recalcular(agendador, df):
+    resultado_df, costo_total = agendador.resultado()
+    esperado_df, esperado_costo = agenda_completa(df)
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_altas_una_a_una(semilla):
+    df = manifiesto(semilla, 120)
+    agendador = IncrementalScheduler(CONFIG_MUELLES, HORA_INICIO, BASE_DATE, checkpoint_cada=8)
+    agendador.cargar(df.iloc[:60])
+    for registro in df.iloc[60:].to_dict("records"):
+        agendador.agregar(registro)
+    assert_igual_a_recalcular(agendador, df)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_cambios_aleatorios(semilla):
+    rng = random.Random(semilla)
+    df = manifiesto(semilla, 150)
+    agendador = IncrementalScheduler(CONFIG_MUELLES, HORA_INICIO, BASE_DATE, checkpoint_cada=8)
+    agendador.cargar(df)
+    
+    for k in range(40):
+        operacion = rng.choice(["agregar", "editar", "eliminar"])
+        if operacion == "agregar":
+            registro = {
+                "ID_Camion": f"NUEVO-{k}", "Producto": "Papel",
+                "Tipo_Producto": rng.choice(["Seco", "Refrigerado"]),
+                "Prioridad": rng.choice(["Alta", "Media", "Baja"]),
+                "Hora_Llegada_Est": pd.Timestamp(df["Hora_Llegada_Est"].iloc[rng.randrange(len(df))]),
+                "Duracion_Min": rng.choice([30, 60, 90])
+            }
+            agendador.agregar(registro)
+            df = pd.concat([df, pd.DataFrame([registro])], ignore_index=True)
+        elif operacion == "editar":
+            i = rng.randrange(len(df))
+            cambios = {"Duracion_Min": rng.choice([15, 45, 120]), "Prioridad": rng.choice(["Alta", "Baja"])}
+            if rng.random() < 0.5:
+                cambios["Hora_Llegada_Est"] = pd.Timestamp(df["Hora_Llegada_Est"].iloc[rng.randrange(len(df))])
+            agendador.editar(df.loc[i, "ID_Camion"], **cambios)
+            df = df.astype({"Prioridad": object})
+            for columna, valor in cambios.items():
+                df.loc[i, columna] = valor
+        else:
+            i = rng.randrange(len(df))
+            agendador.eliminar(df.loc[i, "ID_Camion"])
+            df = df.drop(index=i).reset_index(drop=True)
+        assert len(agendador) == len(df)
+        assert_igual_a_recalcular(agendador, df)
+
+
+def test_eliminar_todo():
+    df = manifiesto(0, 20)
+    agendador = IncrementalScheduler(CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    agendador.cargar(df)
+    for id_camion in df["ID_Camion"]:
+        agendador.eliminar(id_camion)
+    resultado_df, costo_total = agendador.resultado()
+    assert resultado_df.empty and costo_total == 0
+
+
+def test_id_duplicado():
+    df = manifiesto(0, 20)
+    agendador = IncrementalScheduler(CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+    agendador.cargar(df)
+    with pytest.raises(ValueError):
+        agendador.agregar(df.iloc[0].to_dict())
+    with pytest.raises(ValueError):
+        agendador.cargar(pd.concat([df, df.iloc[:1]]))
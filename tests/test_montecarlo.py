@@ -0,0 +1,54 @@
+from datetime import date, datetime, time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from comunes import CONFIG_MUELLES, HORA_INICIO
+from smartdock.montecarlo import PARAMETROS_DEFECTO, _generar_dia, simular_montecarlo
+from smartdock.optimizer import DockOptimizerPro
+
+PARAMETROS = {"num_camiones": 80}
+
+
+def test_independiente_de_workers_y_lotes():
+    base = simular_montecarlo(CONFIG_MUELLES, HORA_INICIO, 12, semilla=3, parametros=PARAMETROS, max_workers=1)
+    for max_workers, tam_lote in ((2, None), (2, 5), (1, 1)):
+        otro = simular_montecarlo(
+            CONFIG_MUELLES, HORA_INICIO, 12, semilla=3, parametros=PARAMETROS,
+            max_workers=max_workers, tam_lote=tam_lote
+        )
+        pd.testing.assert_frame_equal(otro, base)
+
+
+@pytest.mark.parametrize("politica", [None, "FIFO", "Costo ponderado (WSPT)"])
+def test_escenario_igual_a_agendar_camiones(politica):
+    """Cada escenario es el mismo día agendado con DockOptimizerPro sobre un DataFrame"""
+    num_escenarios = 6
+    df_escenarios = simular_montecarlo(
+        CONFIG_MUELLES, HORA_INICIO, num_escenarios, semilla=7, parametros=PARAMETROS, max_workers=1,
+        politica=politica
+    )
+    parametros = {**PARAMETROS_DEFECTO, **PARAMETROS}
+    prioridad_de_peso = {peso: prioridad for prioridad, peso in DockOptimizerPro.PRIORIDAD_PESOS.items()}
+    inicio = datetime.combine(date(2000, 1, 1), time(HORA_INICIO, 0))
+    
+    for escenario, semilla in enumerate(np.random.SeedSequence(7).spawn(num_escenarios)):
+        llegada_min, duracion, peso, refrigerado = _generar_dia(np.random.default_rng(semilla), parametros)
+        df = pd.DataFrame({
+            "ID_Camion": [f"TRK-{i}" for i in range(len(peso))],
+            "Producto": "Carga",
+            "Tipo_Producto": np.where(refrigerado, "Refrigerado", "Seco"),
+            "Prioridad": [prioridad_de_peso[p] for p in peso],
+            "Hora_Llegada_Est": pd.Timestamp(inicio) + pd.to_timedelta(llegada_min, unit="min"),
+            "Duracion_Min": duracion,
+        })
+        optimizer = DockOptimizerPro(3, CONFIG_MUELLES, HORA_INICIO, base_date=date(2000, 1, 1), politica=politica)
+        resultado_df, costo_total = optimizer.agendar_camiones(df)
+        fila = df_escenarios.loc[escenario]
+        
+        fin_min = (resultado_df["Fin_Real"].max() - pd.Timestamp(inicio)) / pd.Timedelta(minutes=1)
+        assert fila["Costo_Demurrage_USD"] == pytest.approx(costo_total)
+        assert fila["Fin_Operaciones_Min"] == pytest.approx(fin_min)
+        # Espera_Min de la agenda está truncada a minutos enteros
+        assert int(fila["Espera_Max_Min"]) == resultado_df["Espera_Min"].max()
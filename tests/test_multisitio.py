@@ -0,0 +1,91 @@
+import io
+
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, assert_agendas_iguales, assert_kpis_iguales, manifiesto
+from smartdock.exportacion import exportar_bloques
+from smartdock.kpis import calcular_kpis
+from smartdock.multisitio import leer_manifiesto_red, planificar_red
+from smartdock.optimizer import DockOptimizerPro
+
+CONFIG_SITIOS = {
+    "Norte": CONFIG_MUELLES,
+    "Sur": {
+        "muelles": {1: "Seco", 2: "Frío"}, "hora_inicio": 7,
+        "dias": {str(BASE_DATE + pd.Timedelta(days=1)): {"muelles": {1: "Seco", 2: "Seco", 3: "Frío", 4: "Frío"}}}
+    },
+}
+# Configuración y hora de inicio efectivas por partición
+PARTICIONES = {
+    ("Norte", 0): (CONFIG_MUELLES, 8),
+    ("Norte", 1): (CONFIG_MUELLES, 8),
+    ("Sur", 0): ({1: "Seco", 2: "Frío"}, 7),
+    ("Sur", 1): ({1: "Seco", 2: "Seco", 3: "Frío", 4: "Frío"}, 7),
+}
+
+
+def manifiesto_red():
+    partes = []
+    for semilla, (sitio, dia) in enumerate(PARTICIONES):
+        df = manifiesto(semilla, 40 + 10 * semilla)
+        df["ID_Camion"] = f"{sitio}-{dia}-" + df["ID_Camion"]
+        df["Hora_Llegada_Est"] = df["Hora_Llegada_Est"] + pd.Timedelta(days=dia)
+        partes.append(df.assign(Sitio=sitio))
+    return pd.concat(partes, ignore_index=True)
+
+
+def test_igual_a_agendar_cada_particion():
+    df = manifiesto_red()
+    agenda, kpis_particiones, kpis_red = planificar_red(df, CONFIG_SITIOS, max_workers=1)
+    
+    esperadas, costo_red = [], 0
+    for (sitio, dia), (muelles, hora_inicio) in PARTICIONES.items():
+        fecha = BASE_DATE + pd.Timedelta(days=dia)
+        particion = df[(df["Sitio"] == sitio) & (df["Hora_Llegada_Est"].dt.date == fecha)].drop(columns="Sitio")
+        resultado_df, costo_total = DockOptimizerPro(
+            len(muelles), muelles, hora_inicio, base_date=fecha
+        ).agendar_camiones(particion)
+        
+        fila = kpis_particiones[(kpis_particiones["Sitio"] == sitio) & (kpis_particiones["Fecha"] == fecha)]
+        assert_kpis_iguales(fila.drop(columns=["Sitio", "Fecha"]).iloc[0].to_dict(),
+                            calcular_kpis(resultado_df, costo_total))
+        esperadas.append(resultado_df.assign(Sitio=sitio, Fecha=fecha))
+        costo_red += costo_total
+    
+    esperada = pd.concat(esperadas, ignore_index=True)
+    assert_agendas_iguales(agenda, esperada[agenda.columns])
+    assert kpis_red["particiones"] == 4 and kpis_red["sitios"] == 2
+    assert kpis_red["costo_total"] == pytest.approx(costo_red)
+    assert kpis_red["total_cargas"] == len(df)
+
+
+def test_workers_no_cambian_el_resultado():
+    df = manifiesto_red()
+    agenda_1, particiones_1, red_1 = planificar_red(df, CONFIG_SITIOS, max_workers=1)
+    agenda_2, particiones_2, red_2 = planificar_red(df, CONFIG_SITIOS, max_workers=2)
+    assert_agendas_iguales(agenda_2, agenda_1)
+    pd.testing.assert_frame_equal(particiones_2, particiones_1)
+    assert red_2 == red_1
+
+
+def test_sitio_sin_configuracion():
+    with pytest.raises(KeyError):
+        planificar_red(manifiesto_red(), {"Norte": CONFIG_MUELLES}, max_workers=1)
+
+
+def test_leer_manifiesto_red_ids_unicos_en_toda_la_red():
+    df = manifiesto_red()
+    df.loc[len(df) - 1, "ID_Camion"] = df.loc[0, "ID_Camion"]
+    buffer = io.StringIO(df.to_csv(index=False))
+    
+    leido, reporte = leer_manifiesto_red(buffer, tam_bloque=25)
+    assert reporte.errores["Fila"].tolist() == [len(df)]
+    agenda, _, _ = planificar_red(leido, CONFIG_SITIOS, max_workers=1)
+    esperada, _, _ = planificar_red(df.iloc[:-1], CONFIG_SITIOS, max_workers=1)
+    assert_agendas_iguales(agenda, esperada)
+    
+    # La agenda de red se exporta con Sitio y Fecha al frente
+    salida = io.BytesIO()
+    assert exportar_bloques([agenda], salida, "csv") == len(agenda)
+    assert list(pd.read_csv(io.BytesIO(salida.getvalue()), nrows=0).columns[:2]) == ["Sitio", "Fecha"]
@@ -0,0 +1,41 @@
+import pytest
+
+from comunes import (BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, agenda_referencia,
+                     assert_agendas_iguales, manifiesto)
+from smartdock.optimizer import COLUMNAS_RESULTADO, DockOptimizerPro
+
+CONFIGS = [
+    CONFIG_MUELLES,
+    {1: "Seco"},
+    {1: "Frío", 2: "Seco", 3: "Seco", 4: "Frío", 5: "Seco"},
+]
+
+
+@pytest.mark.parametrize("dock_config", CONFIGS)
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_pools_por_tipo_igual_a_recorrer_muelles(semilla, dock_config):
+    df = manifiesto(semilla)
+    optimizer = DockOptimizerPro(len(dock_config), dock_config, HORA_INICIO, base_date=BASE_DATE)
+    resultado_df, costo_total = optimizer.agendar_camiones(df)
+    esperado_df, esperado_costo = agenda_referencia(df, dock_config)
+    
+    assert list(resultado_df.columns) == COLUMNAS_RESULTADO
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+def test_manifiesto_vacio():
+    optimizer = DockOptimizerPro(3, CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE)
+    resultado_df, costo_total = optimizer.agendar_camiones(manifiesto(0, 0))
+    assert resultado_df.empty and costo_total == 0
+
+
+def test_empates_en_orden_del_manifiesto():
+    df = manifiesto(0, 12)
+    # Todos empatan en score: misma prioridad, llegada y duración
+    df["Prioridad"] = "Media"
+    df["Hora_Llegada_Est"] = df["Hora_Llegada_Est"].iloc[0]
+    df["Duracion_Min"] = 45
+    optimizer = DockOptimizerPro(3, CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE)
+    resultado_df, _ = optimizer.agendar_camiones(df)
+    assert resultado_df["Camión"].tolist() == df["ID_Camion"].tolist()
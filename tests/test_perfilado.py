@@ -0,0 +1,71 @@
+import json
+import threading
+
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, assert_agendas_iguales, manifiesto
+from smartdock import perfilado
+from smartdock.optimizer import DockOptimizerPro
+
+
+@pytest.fixture(autouse=True)
+def sin_perfilador():
+    yield
+    perfilado.desactivar()
+
+
+def agendar():
+    optimizer = DockOptimizerPro(len(CONFIG_MUELLES), CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE)
+    return optimizer.agendar_camiones(manifiesto(0))
+
+
+@pytest.mark.parametrize("memoria", [False, True])
+def test_perfilar_no_cambia_la_agenda(memoria):
+    esperado_df, esperado_costo = agendar()
+    perfilador = perfilado.activar("prueba", memoria=memoria)
+    resultado_df, costo_total = agendar()
+    assert perfilado.desactivar() is perfilador
+    
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == esperado_costo
+    fases = {evento[0]: evento[5] for evento in perfilador.eventos}
+    # El resultado se arma fuera de "agendar" (por bloques en agendar_por_bloques)
+    assert fases == {
+        "agendar.puntaje": 1, "agendar.orden": 1, "agendar.asignacion": 1, "agendar": 0, "agendar.resultado": 0
+    }
+    
+    resumen = perfilador.resumen()
+    assert set(resumen["Fase"]) == set(fases)
+    assert ("Pico_KB" in resumen.columns) == memoria
+
+
+def test_sin_perfilador_la_fase_es_nula():
+    assert perfilado.fase("x") is perfilado.fase("y")
+    perfilador = perfilado.activar()
+    with perfilado.fase("x"):
+        pass
+    # Otro hilo no ve el perfilador de este
+    otro = []
+    hilo = threading.Thread(target=lambda: otro.append(perfilado.fase("y") is perfilado._NULO))
+    hilo.start()
+    hilo.join()
+    assert otro == [True]
+    assert [evento[0] for evento in perfilado.desactivar().eventos] == ["x"]
+    assert perfilador.duracion_s is not None
+
+
+def test_traza_json_en_una_linea_de_tiempo():
+    perfiladores = []
+    for nombre in ("a", "b"):
+        perfilado.activar(nombre)
+        with perfilado.fase("externa"):
+            with perfilado.fase("interna"):
+                pass
+        perfiladores.append(perfilado.desactivar())
+    
+    eventos = json.loads(perfilado.traza_json(perfiladores))["traceEvents"]
+    assert [e["name"] for e in eventos] == ["a", "interna", "externa", "b", "interna", "externa"]
+    corrida_a, corrida_b = eventos[0], eventos[3]
+    assert corrida_b["ts"] >= corrida_a["ts"] + corrida_a["dur"]
+    externa, interna = eventos[2], eventos[1]
+    assert externa["ts"] <= interna["ts"] and interna["ts"] + interna["dur"] <= externa["ts"] + externa["dur"]
@@ -0,0 +1,109 @@
+import random
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, HORA_INICIO, apertura, assert_agendas_iguales, como_texto, manifiesto
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.persistencia import AlmacenSQLite
+
+CONFIG_11 = {d: ("Frío" if d in (3, 10) else "Seco") for d in range(1, 12)}
+
+
+@pytest.fixture
+def db(tmp_path):
+    almacen = AlmacenSQLite(tmp_path / "smartdock.db")
+    yield almacen
+    almacen.cerrar()
+
+
+def agendar(camiones):
+    return DockOptimizerPro(len(CONFIG_11), CONFIG_11, HORA_INICIO, base_date=BASE_DATE).agendar_camiones(camiones)
+
+
+def assert_camiones_iguales(a, b):
+    pd.testing.assert_frame_equal(como_texto(a).reset_index(drop=True), como_texto(b).reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def test_cambios_igual_a_dataframe(db):
+    rng = random.Random(0)
+    df = manifiesto(0, 120).astype({"Prioridad": object})
+    db.insertar_lote(df)
+    version = db.version()
+    
+    for k in range(40):
+        operacion = rng.choice(["agregar", "editar", "eliminar"])
+        if operacion == "agregar":
+            registro = {
+                "ID_Camion": f"NUEVO-{k}", "Producto": "Papel", "Tipo_Producto": "Seco", "Prioridad": "Alta",
+                "Hora_Llegada_Est": pd.Timestamp(apertura()) + pd.Timedelta(minutes=rng.randrange(600)),
+                "Duracion_Min": 45
+            }
+            db.agregar(registro)
+            df = pd.concat([df, pd.DataFrame([registro])], ignore_index=True)
+        elif operacion == "editar":
+            i = rng.randrange(len(df))
+            cambios = {"Prioridad": rng.choice(["Alta", "Baja"]), "Duracion_Min": rng.choice([30, 90]),
+                       "Hora_Llegada_Est": pd.Timestamp(apertura()) + pd.Timedelta(minutes=rng.randrange(600))}
+            db.actualizar(df.loc[i, "ID_Camion"], **cambios)
+            for columna, valor in cambios.items():
+                df.loc[i, columna] = valor
+        else:
+            i = rng.randrange(len(df))
+            db.eliminar(df.loc[i, "ID_Camion"])
+            df = df.drop(index=i).reset_index(drop=True)
+        assert db.version() == version + k + 1
+    
+    assert len(db) == len(df)
+    assert_camiones_iguales(db.camiones(), df)
+    resultado_df, costo_total = agendar(db.cargar_almacen(BASE_DATE))
+    esperado_df, esperado_costo = agendar(df)
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+def test_id_repetido_aborta_el_lote(db):
+    df = manifiesto(1, 30)
+    db.insertar_lote(df.iloc[:10])
+    version = db.version()
+    with pytest.raises(sqlite3.IntegrityError):
+        db.insertar_lote(df.iloc[5:])
+    assert len(db) == 10 and db.version() == version
+    with pytest.raises(KeyError):
+        db.eliminar("NO-EXISTE")
+
+
+def test_llegadas_entre_igual_a_filtrar(db):
+    df = manifiesto(2, 200)
+    db.insertar_lote(df)
+    desde, hasta = pd.Timestamp(apertura()) + pd.Timedelta(hours=2), pd.Timestamp(apertura()) + pd.Timedelta(hours=4)
+    en_rango = df[(df["Hora_Llegada_Est"] >= desde) & (df["Hora_Llegada_Est"] < hasta)]
+    
+    llegadas = db.llegadas_entre(desde, hasta)
+    assert sorted(llegadas["ID_Camion"]) == sorted(en_rango["ID_Camion"])
+    assert llegadas["Hora_Llegada_Est"].is_monotonic_increasing
+    alta = db.llegadas_entre(desde, hasta, prioridad="Alta")
+    assert sorted(alta["ID_Camion"]) == sorted(en_rango.loc[en_rango["Prioridad"] == "Alta", "ID_Camion"])
+
+
+def test_agenda_muelle_igual_a_filtrar(db, tmp_path):
+    df = manifiesto(3, 300)
+    db.insertar_lote(df)
+    resultado_df, _ = agendar(df)
+    db.guardar_agenda(resultado_df)
+    
+    # Otra instancia sobre el mismo archivo (otra sesión) ve la misma agenda
+    otra = AlmacenSQLite(tmp_path / "smartdock.db")
+    try:
+        texto = como_texto(resultado_df)
+        desde = pd.Timestamp(apertura()) + pd.Timedelta(hours=3)
+        for muelle in (1, 10, 11):
+            etiqueta = f"Muelle {muelle} ({CONFIG_11[muelle]})"
+            propias = texto[texto["Muelle_Asignado"] == etiqueta].sort_values("Inicio_Real", kind="stable")
+            assert_agendas_iguales(otra.agenda_muelle(muelle), propias)
+            assert_agendas_iguales(otra.agenda_muelle(etiqueta), propias)
+            assert_agendas_iguales(otra.agenda_muelle(muelle, desde=desde), propias[propias["Inicio_Real"] >= desde])
+    finally:
+        otra.cerrar()
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, HORA_INICIO, apertura, manifiesto
+from smartdock.optimizer import SIN_MUELLE, DockOptimizerPro
+from smartdock.planificador import config_muelles_desde, frontera_pareto, planificar_capacidad
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_igual_a_agendar_cada_configuracion(semilla):
+    df = manifiesto(semilla)
+    plan = planificar_capacidad(df, 1, 4, HORA_INICIO, BASE_DATE, max_workers=1)
+    assert len(plan) == sum(m + 1 for m in range(1, 5))
+    
+    for _, fila in plan.iterrows():
+        config = config_muelles_desde(fila)
+        optimizer = DockOptimizerPro(len(config), config, HORA_INICIO, base_date=BASE_DATE)
+        resultado_df, costo_total = optimizer.agendar_camiones(df)
+        agendados = resultado_df[resultado_df["Muelle_Asignado"] != SIN_MUELLE]
+        makespan = (agendados["Fin_Real"].max() - pd.Timestamp(apertura())) / pd.Timedelta(minutes=1)
+        
+        assert fila["Sin_Muelle"] == len(resultado_df) - len(agendados)
+        assert fila["Costo_Demurrage_USD"] == pytest.approx(costo_total)
+        if len(agendados):
+            assert fila["Makespan_Min"] == pytest.approx(makespan)
+            # Espera_Min de la agenda está truncada a minutos enteros
+            assert int(fila["Espera_Max_Min"]) == agendados["Espera_Min"].max()
+
+
+def test_workers_no_cambian_el_resultado():
+    df = manifiesto(1)
+    pd.testing.assert_frame_equal(
+        planificar_capacidad(df, 1, 5, HORA_INICIO, BASE_DATE, max_workers=2),
+        planificar_capacidad(df, 1, 5, HORA_INICIO, BASE_DATE, max_workers=1)
+    )
+
+
+def test_frontera_pareto_igual_a_comparar_pares():
+    plan = planificar_capacidad(manifiesto(2), 1, 6, HORA_INICIO, BASE_DATE, max_workers=1)
+    objetivos = ["Muelles", "Costo_Demurrage_USD", "Makespan_Min"]
+    factibles = plan[plan["Sin_Muelle"] == 0]
+    
+    esperado = []
+    for i, fila in plan.iterrows():
+        dominada = any(
+            (otra[objetivos] <= fila[objetivos]).all() and (otra[objetivos] < fila[objetivos]).any()
+            for _, otra in factibles.iterrows()
+        )
+        esperado.append(fila["Sin_Muelle"] == 0 and not dominada)
+    assert frontera_pareto(plan).tolist() == esperado
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from comunes import (BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, agenda_referencia,
+                     assert_agendas_iguales, assert_kpis_iguales, manifiesto)
+from smartdock.comparacion import comparar_politicas
+from smartdock.kpis import calcular_kpis
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.politicas import POLITICAS, POLITICA_DEFECTO, nombre_politica, resolver_politica
+
+TOLERANCIA = {3: 30, 2: 90, 1: 180}
+
+# Score escalar de cada política, fila a fila
+SCORES_REFERENCIA = {
+    "Prioridad ponderada": lambda peso, llegada, duracion: peso * 10000 - llegada,
+    "FIFO": lambda peso, llegada, duracion: -llegada,
+    "SPT (más corto primero)": lambda peso, llegada, duracion: -duracion * 1_000_000 - llegada,
+    "Costo ponderado (WSPT)": lambda peso, llegada, duracion: peso / duracion * 1_000_000 - llegada,
+    "Fecha límite (EDD)": lambda peso, llegada, duracion: -(llegada + TOLERANCIA[peso]),
+}
+
+
+def ultimo_primero(pesos, llegada_min, duracion_min):
+    """Política propia, función de módulo: el último en llegar primero"""
+    return np.asarray(llegada_min, dtype=float)
+
+
+def agendar(df, politica, dock_config=CONFIG_MUELLES):
+    optimizer = DockOptimizerPro(len(dock_config), dock_config, HORA_INICIO, base_date=BASE_DATE, politica=politica)
+    return optimizer.agendar_camiones(df)
+
+
+@pytest.mark.parametrize("politica", list(POLITICAS))
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_politica_igual_a_score_fila_a_fila(semilla, politica):
+    df = manifiesto(semilla)
+    resultado_df, costo_total = agendar(df, politica)
+    esperado_df, esperado_costo = agenda_referencia(df, CONFIG_MUELLES, score=SCORES_REFERENCIA[politica])
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_comparar_igual_a_agendar_por_politica(semilla):
+    df = manifiesto(semilla)
+    resumen, agendas = comparar_politicas(df, CONFIG_MUELLES, hora_inicio=HORA_INICIO, base_date=BASE_DATE,
+                                          max_workers=1)
+    assert resumen["Politica"].tolist() == list(POLITICAS) == list(agendas)
+    for fila, politica in zip(resumen.to_dict("records"), POLITICAS):
+        resultado_df, costo_total = agendas[politica]
+        esperado_df, esperado_costo = agendar(df, politica)
+        assert_agendas_iguales(resultado_df, esperado_df)
+        assert costo_total == pytest.approx(esperado_costo)
+        kpis = {clave: fila[clave] for clave in calcular_kpis(esperado_df, esperado_costo)}
+        assert_kpis_iguales(kpis, calcular_kpis(esperado_df, esperado_costo))
+
+
+def test_comparar_en_procesos_con_politica_propia():
+    df = manifiesto(3, 120)
+    politicas = ["FIFO", ultimo_primero]
+    _, agendas = comparar_politicas(df, CONFIG_MUELLES, politicas, HORA_INICIO, BASE_DATE, max_workers=2)
+    assert list(agendas) == ["FIFO", "ultimo_primero"]
+    for politica in politicas:
+        esperado_df, esperado_costo = agendar(df, politica)
+        resultado_df, costo_total = agendas[nombre_politica(politica)]
+        assert_agendas_iguales(resultado_df, esperado_df)
+        assert costo_total == pytest.approx(esperado_costo)
+
+
+def test_comparar_manifiesto_vacio():
+    resumen, agendas = comparar_politicas(manifiesto(0, 0), CONFIG_MUELLES, base_date=BASE_DATE)
+    assert (resumen["total_cargas"] == 0).all() and all(agenda.empty for agenda, _ in agendas.values())
+
+
+@pytest.mark.parametrize("politica", list(POLITICAS))
+def test_score_de_un_camion_igual_al_vectorizado(politica):
+    df = manifiesto(4)
+    optimizer = DockOptimizerPro(len(CONFIG_MUELLES), CONFIG_MUELLES, HORA_INICIO, base_date=BASE_DATE,
+                                 politica=politica)
+    escalares = [optimizer._calcular_prioridad_score(fila, fila["Hora_Llegada_Est"]) for _, fila in df.iterrows()]
+    np.testing.assert_allclose(escalares, optimizer._calcular_scores(df))
+
+
+def test_resolver_politica():
+    assert resolver_politica(None) is POLITICAS[POLITICA_DEFECTO]
+    assert resolver_politica(ultimo_primero) is ultimo_primero
+    with pytest.raises(ValueError):
+        resolver_politica("LIFO")
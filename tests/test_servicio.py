@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, assert_agendas_iguales, assert_kpis_iguales, manifiesto
+from smartdock.kpis import calcular_kpis, kpis_serializables
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.servicio import ClienteAgendas, ServicioAgendas, _ejecutar, columnas_a_df, df_a_columnas
+from smartdock.simulacion import DockEventSimulator
+
+OTRA_CONFIG = {1: "Seco", 2: "Frío"}
+
+
+def agendar_local(df, config=CONFIG_MUELLES, motor=DockOptimizerPro):
+    return motor(len(config), config, HORA_INICIO, base_date=BASE_DATE).agendar_camiones(df)
+
+
+def params(df, config=CONFIG_MUELLES, motor="greedy"):
+    # Como viaja por el socket: JSON ida y vuelta
+    return json.loads(json.dumps(ClienteAgendas._params(df, config, HORA_INICIO, BASE_DATE, motor)))
+
+
+def test_columnas_ida_y_vuelta_con_nat():
+    resultado_df, _ = agendar_local(manifiesto(0), {1: "Seco"})
+    assert resultado_df["Inicio_Real"].isna().any()
+    columnas = json.loads(json.dumps(df_a_columnas(resultado_df)))
+    assert_agendas_iguales(columnas_a_df(columnas), resultado_df)
+
+
+@pytest.mark.parametrize("motor, clase", [("greedy", DockOptimizerPro), ("eventos", DockEventSimulator)])
+def test_ejecutar_igual_a_agendar_local(motor, clase):
+    df = manifiesto(1)
+    esperado_df, esperado_costo = agendar_local(df, motor=clase)
+    
+    salida = _ejecutar("agendar", params(df, motor=motor))
+    assert_agendas_iguales(columnas_a_df(salida["agenda"]), esperado_df)
+    assert salida["costo_total"] == pytest.approx(esperado_costo)
+    assert _ejecutar("kpis", params(df, motor=motor)) == kpis_serializables(
+        calcular_kpis(esperado_df, esperado_costo)
+    )
+
+
+def test_coalescencia_y_lotes():
+    df = manifiesto(2)
+    
+    async def correr():
+        servicio = ServicioAgendas(max_workers=1, ventana_lote_s=0.05)
+        servicio.iniciar()
+        try:
+            resultados = await asyncio.gather(
+                *(servicio.ejecutar("kpis", params(df)) for _ in range(3)),
+                servicio.ejecutar("kpis", params(df, OTRA_CONFIG)),
+                servicio.ejecutar("agendar", {"manifiesto": {}}),
+                return_exceptions=True
+            )
+            return resultados, servicio.estadisticas
+        finally:
+            servicio.cerrar()
+    
+    resultados, estadisticas = asyncio.run(correr())
+    assert resultados[0] == resultados[1] == resultados[2] == kpis_serializables(
+        calcular_kpis(*agendar_local(df))
+    )
+    assert resultados[3] == kpis_serializables(calcular_kpis(*agendar_local(df, OTRA_CONFIG)))
+    assert isinstance(resultados[4], ValueError)
+    assert estadisticas == {"solicitudes": 4, "coalescidas": 2, "lotes": 1, "tareas": 2}
+
+
+@pytest.fixture
+def puerto_servicio():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        puerto = s.getsockname()[1]
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "smartdock.servicio", "--puerto", str(puerto), "--workers", "1"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), stdout=subprocess.DEVNULL
+    )
+    try:
+        limite = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", puerto), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > limite or proceso.poll() is not None:
+                    raise
+                time.sleep(0.1)
+        yield puerto
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=30)
+
+
+def test_cliente_contra_el_servicio(puerto_servicio):
+    df = manifiesto(3)
+    cliente = ClienteAgendas("127.0.0.1", puerto_servicio, timeout=60)
+    try:
+        assert cliente.solicitar("ping") == "pong"
+        
+        esperado_df, esperado_costo = agendar_local(df)
+        resultado_df, costo_total = cliente.agendar(df, CONFIG_MUELLES, HORA_INICIO, BASE_DATE)
+        assert_agendas_iguales(resultado_df, esperado_df)
+        assert costo_total == pytest.approx(esperado_costo)
+        
+        # El adaptador de ScheduleCache recibe la clase del motor
+        resultado_df, _ = cliente.calcular(df, CONFIG_MUELLES, HORA_INICIO, BASE_DATE, DockEventSimulator)
+        assert_agendas_iguales(resultado_df, agendar_local(df, motor=DockEventSimulator)[0])
+        
+        kpis = cliente.what_if(df, [CONFIG_MUELLES, OTRA_CONFIG], HORA_INICIO, BASE_DATE)
+        for kpis_config, config in zip(kpis, [CONFIG_MUELLES, OTRA_CONFIG]):
+            esperado = kpis_serializables(calcular_kpis(*agendar_local(df, config)))
+            assert_kpis_iguales(kpis_config, esperado)
+        
+        with pytest.raises(RuntimeError):
+            cliente.solicitar("desconocida")
+        
+        # JSON mal formado: la respuesta trae el motivo, no una operación desconocida
+        with socket.create_connection(("127.0.0.1", puerto_servicio), timeout=60) as s:
+            s.sendall(b'{"id": 1, "op": \n')
+            respuesta = json.loads(s.makefile("rb").readline())
+        assert respuesta["ok"] is False and "JSON inválido" in respuesta["error"]
+    finally:
+        cliente.cerrar()
+
+
+class ServicioFalso:
+    """Servidor de una línea por conexión: responde pong y cierra, o no responde nunca"""
+    
+    def __init__(self, responder):
+        self.responder = responder
+        self.recibidas = 0
+        self.servidor = socket.create_server(("127.0.0.1", 0))
+        self.puerto = self.servidor.getsockname()[1]
+        threading.Thread(target=self._atender, daemon=True).start()
+    
+    def _atender(self):
+        while True:
+            try:
+                conexion, _ = self.servidor.accept()
+            except OSError:
+                return
+            with conexion:
+                solicitud = json.loads(conexion.makefile("rb").readline())
+                self.recibidas += 1
+                if self.responder:
+                    conexion.sendall(json.dumps({"id": solicitud["id"], "ok": True, "resultado": "pong"}).encode()
+                                     + b"\n")
+                else:
+                    conexion.recv(1)   # hasta que el cliente cierre
+    
+    def cerrar(self):
+        self.servidor.close()
+
+
+def test_cliente_reconecta_si_el_servicio_cerro_la_conexion():
+    servicio = ServicioFalso(responder=True)
+    cliente = ClienteAgendas("127.0.0.1", servicio.puerto, timeout=10)
+    try:
+        for _ in range(3):
+            assert cliente.solicitar("ping") == "pong"
+            time.sleep(0.05)   # el servicio cierra la conexión entre solicitudes
+        assert servicio.recibidas == 3
+    finally:
+        cliente.cerrar()
+        servicio.cerrar()
+
+
+def test_cliente_no_reenvia_tras_un_timeout():
+    servicio = ServicioFalso(responder=False)
+    cliente = ClienteAgendas("127.0.0.1", servicio.puerto, timeout=0.2)
+    try:
+        with pytest.raises(TimeoutError):
+            cliente.solicitar("ping")
+        assert servicio.recibidas == 1 and cliente._socket is None
+    finally:
+        cliente.cerrar()
+        servicio.cerrar()
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from comunes import (BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, apertura, assert_agendas_iguales,
+                     con_score, costo_agenda, fila_agenda, manifiesto, muelles_compatibles)
+from smartdock.simulacion import DockEventSimulator
+
+CONFIGS = [CONFIG_MUELLES, {1: "Seco"}, {1: "Frío", 2: "Seco", 3: "Seco", 4: "Frío", 5: "Seco"}]
+
+
+def simulacion_referencia(df_camiones, dock_config):
+    """
+    Despacho por instantes sin colas de prioridad: en cada instante, los
+    camiones ya llegados en orden de score toman el muelle compatible libre
+    de menor id; luego se avanza al próximo evento.
+    """
+    inicio_dia = apertura()
+    df = con_score(df_camiones, inicio_dia)
+    filas = df.to_dict("records")
+    libre = {d: inicio_dia for d in dock_config}
+    pendientes = [i for i, row in enumerate(filas) if muelles_compatibles(row, dock_config)]
+    sin_muelle = [i for i, row in enumerate(filas) if not muelles_compatibles(row, dock_config)]
+    llegada = [max(pd.Timestamp(row["Hora_Llegada_Est"]), inicio_dia) for row in filas]
+    
+    agenda = []
+    ahora = min((llegada[i] for i in pendientes), default=inicio_dia)
+    while pendientes:
+        for i in sorted((i for i in pendientes if llegada[i] <= ahora), key=lambda i: (-filas[i]["_score"], i)):
+            libres = [d for d in muelles_compatibles(filas[i], dock_config) if libre[d] <= ahora]
+            if libres:
+                agenda.append(fila_agenda(filas[i], dock_config, libres[0], ahora))
+                libre[libres[0]] = agenda[-1]["Fin_Real"]
+                pendientes.remove(i)
+        proximos = [t for t in libre.values() if t > ahora] + [llegada[i] for i in pendientes if llegada[i] > ahora]
+        if proximos:
+            ahora = min(proximos)
+    agenda += [fila_agenda(filas[i], dock_config) for i in sin_muelle]
+    return pd.DataFrame(agenda), costo_agenda(agenda)
+
+
+@pytest.mark.parametrize("dock_config", CONFIGS)
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_simulador_igual_a_despacho_por_instantes(semilla, dock_config):
+    df = manifiesto(semilla)
+    simulador = DockEventSimulator(len(dock_config), dock_config, HORA_INICIO, base_date=BASE_DATE)
+    resultado_df, costo_total = simulador.agendar_camiones(df)
+    esperado_df, esperado_costo = simulacion_referencia(df, dock_config)
+    
+    assert_agendas_iguales(resultado_df, esperado_df)
+    assert costo_total == pytest.approx(esperado_costo)
+
+
+def test_prioridad_que_llega_tarde_no_bloquea():
+    df = manifiesto(0, 2)
+    df["Prioridad"] = ["Baja", "Alta"]
+    df["Tipo_Producto"] = "Seco"
+    df["Hora_Llegada_Est"] = [pd.Timestamp(apertura()), pd.Timestamp(apertura()) + pd.Timedelta(hours=6)]
+    simulador = DockEventSimulator(1, {1: "Seco"}, HORA_INICIO, base_date=BASE_DATE)
+    resultado_df, costo_total = simulador.agendar_camiones(df)
+    
+    assert resultado_df["Camión"].tolist() == df["ID_Camion"].tolist()
+    assert costo_total == 0
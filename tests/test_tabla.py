@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from comunes import BASE_DATE, CONFIG_MUELLES, HORA_INICIO, SEMILLAS, manifiesto
+from smartdock.optimizer import DockOptimizerPro
+from smartdock.tabla import COLUMNAS_FILTRO, COLUMNAS_TABLA, TablaAsignaciones
+
+COLUMNAS_ORDEN = [None, "Camión", "Inicio_Real", "Espera_Min", "Costo_Demurrage_USD", "Estado", "Muelle_Asignado"]
+
+
+def agenda(semilla):
+    # Un muelle Frío para 60 camiones: quedan camiones sin muelle (NaT al ordenar)
+    config = {**CONFIG_MUELLES, 3: "Seco"} if semilla % 2 else CONFIG_MUELLES
+    return DockOptimizerPro(len(config), config, HORA_INICIO, base_date=BASE_DATE).agendar_camiones(
+        manifiesto(semilla)
+    )[0]
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_igual_a_filtrar_y_ordenar_con_pandas(semilla):
+    rng = random.Random(semilla)
+    resultado_df = agenda(semilla)
+    tabla = TablaAsignaciones(resultado_df)
+    
+    for _ in range(20):
+        filtros = {}
+        for columna in COLUMNAS_FILTRO:
+            opciones = tabla.opciones(columna)
+            assert sorted(map(str, opciones)) == sorted(map(str, resultado_df[columna].unique()))
+            filtros[columna] = rng.sample(opciones, rng.randint(0, len(opciones)))
+        columna_orden, ascendente = rng.choice(COLUMNAS_ORDEN), rng.random() < 0.5
+        
+        mascara = np.ones(len(resultado_df), dtype=bool)
+        for columna, valores in filtros.items():
+            if valores:
+                mascara &= resultado_df[columna].isin(valores).to_numpy()
+        esperado = resultado_df[mascara]
+        if columna_orden is not None:
+            esperado = esperado.sort_values(columna_orden, ascending=ascendente, kind="stable", na_position="last")
+        
+        posiciones = tabla.ordenar(tabla.filtrar(**filtros), columna_orden, ascendente)
+        assert posiciones.tolist() == resultado_df.index.get_indexer(esperado.index).tolist()
+        
+        tam_pagina = rng.choice([7, 25, 100])
+        assert TablaAsignaciones.num_paginas(posiciones, tam_pagina) == max(1, -(-len(esperado) // tam_pagina))
+        numero = rng.randint(1, TablaAsignaciones.num_paginas(posiciones, tam_pagina))
+        pagina = esperado.iloc[(numero - 1) * tam_pagina:numero * tam_pagina][COLUMNAS_TABLA].copy()
+        for columna in ("Llegada_Teorica", "Inicio_Real", "Fin_Real"):
+            pagina[columna] = pagina[columna].dt.strftime('%H:%M').fillna('N/A')
+        pd.testing.assert_frame_equal(tabla.pagina(posiciones, numero, tam_pagina), pagina)
+
+
+def test_muelles_y_estados_en_orden_de_categorias():
+    config = {d: "Seco" for d in range(1, 12)}
+    resultado_df = DockOptimizerPro(len(config), config, HORA_INICIO, base_date=BASE_DATE).agendar_camiones(
+        manifiesto(0, 120)
+    )[0]
+    tabla = TablaAsignaciones(resultado_df)
+    posiciones = tabla.ordenar(tabla.filtrar(), "Muelle_Asignado")
+    numeros = [int(m.split()[1]) for m in resultado_df["Muelle_Asignado"].iloc[posiciones] if m.startswith("Muelle")]
+    assert numeros == sorted(numeros) and numeros[-1] == 11
+    
+    estados = resultado_df["Estado"].iloc[tabla.ordenar(tabla.filtrar(), "Estado", ascendente=False)]
+    assert estados.cat.codes.is_monotonic_decreasing